@@ -0,0 +1,160 @@
+"""
+regression check + benchmark: align_comp_to_port with the bbox of the reference computed from its transformation
+and the cell bbox table vs the previous align_comp_to_port (flattens every reference with transformed, extracts the layer)
+
+usage: PDK_ROOT=/path/to/pdks python benchmarks/bench_align_comp_to_port.py [--repeat 1] [--seed 0]
+
+references to via arrays and transistors (sky130) are moved, rotated, mirrored and arrayed, then aligned to random
+ports with every alignment, with and without a layer. the aligned reference must end up with the same
+transformation with both implementations. the time per call is reported.
+"""
+from argparse import ArgumentParser
+import random
+import time
+import uuid
+
+from gdsfactory import ComponentReference
+from gdsfactory.component import Component
+from gdsfactory.typings import Port
+
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+from glayout.primitives.fet import nmos
+from glayout.primitives.via_gen import via_array, via_stack
+from glayout.util.comp_utils import align_comp_to_port, transformed
+
+
+def legacy_align_comp_to_port(
+	custom_comp: Component | ComponentReference,
+	align_to: Port,
+	alignment: tuple[str | None, str | None] | None = None,
+	layer: tuple[int,int] | None = None,
+	rtr_comp_ref = True
+) -> Component | ComponentReference:
+	"""align_comp_to_port before the cell bbox table"""
+	if isinstance(custom_comp, ComponentReference):
+		comp_type = transformed(custom_comp)
+	else:
+		comp_type = custom_comp
+	if layer:
+		comp_type = comp_type.extract([layer])
+	cbbox = comp_type.bbox()
+	ccenter = comp_type.center
+	xdim = abs(cbbox.p2.x - cbbox.p1.x)
+	ydim = abs(cbbox.p2.y - cbbox.p1.y)
+	width = align_to.width
+	is_EW = bool(round(align_to.orientation + 90) % 180)
+	if alignment is None:
+		if round(align_to.orientation) == 0:
+			xalign, yalign = "r", "c"
+		elif round(align_to.orientation) == 180:
+			xalign, yalign = "l", "c"
+		elif round(align_to.orientation) == 270:
+			xalign, yalign = "c", "b"
+		elif round(align_to.orientation) == 90:
+			xalign, yalign = "c", "t"
+		else:
+			raise ValueError("port must be vertical or horizontal")
+	else:
+		xalign = (alignment[0] or "none").lower().strip()
+		yalign = (alignment[1] or "none").lower().strip()
+	x_movcenter = align_to.center[0] - ccenter[0]
+	x_mov_lr = abs(xdim/2 if is_EW else (width-xdim)/2)
+	if "none" in xalign:
+		xmov = 0
+	elif "l" in xalign[0]:
+		xmov = x_movcenter - x_mov_lr
+	elif "c" in xalign[0]:
+		xmov = x_movcenter
+	elif "r" in xalign[0]:
+		xmov = x_movcenter + x_mov_lr
+	else:
+		raise ValueError("please specify valid x alignment of l/r/c/None")
+	y_movcenter = align_to.center[1] - ccenter[1]
+	y_move_updown = abs((width-ydim)/2 if is_EW else ydim/2)
+	if "none" in yalign:
+		ymov = 0
+	elif "b" in yalign[0]:
+		ymov = y_movcenter - y_move_updown
+	elif "t" in yalign[0]:
+		ymov = y_movcenter + y_move_updown
+	elif "c" in yalign[0]:
+		ymov = y_movcenter
+	else:
+		raise ValueError("please specify valid y alignment of t/b/c/None")
+	if isinstance(custom_comp, Component):
+		_temp = Component(name=f"temp_{uuid.uuid4().hex[:6]}")
+		comp_ref = _temp << custom_comp
+	else:
+		comp_ref = custom_comp
+	comp_ref.movex(xmov).movey(ymov)
+	if rtr_comp_ref:
+		return comp_ref
+	return transformed(comp_ref)
+
+
+def placed_references(pdk, top: Component, rng: random.Random) -> list[ComponentReference]:
+	"""references with random moves, rotations, mirrors and arrays"""
+	cells = [
+		via_stack(pdk, "met1", "met3"),
+		via_array(pdk, "met1", "met2", size=(2, 3)),
+		via_array(pdk, "active_diff", "met2", size=(1, 4)),
+		nmos(pdk, width=2, fingers=3),
+	]
+	refs = list()
+	for cell in cells:
+		for placement in ("moved", "rotated", "mirrored", "array"):
+			if placement == "array":
+				ref = top.add_ref(cell, columns=rng.randint(2, 4), rows=rng.randint(1, 3), column_pitch=7.5, row_pitch=9.0)
+			else:
+				ref = top << cell
+			if placement == "rotated":
+				ref.rotate(rng.choice((90, 180, 270)))
+			if placement == "mirrored":
+				ref.mirror_x()
+			ref.movex(rng.randint(-3000, 3000) / 1000).movey(rng.randint(-3000, 3000) / 1000)
+			refs.append(ref)
+	return refs
+
+
+def alignments(pdk, refs: list[ComponentReference], ports: list[Port]) -> list[tuple]:
+	"""(ref index, port, alignment, layer) for every combination"""
+	cases = list()
+	for i in range(len(refs)):
+		for port in ports:
+			for alignment in (None, ("l", "c"), ("r", "t"), ("left", None)):
+				for layer in (None, pdk.get_glayer("met2"), pdk.get_glayer("met1")):
+					cases.append((i, port, alignment, layer))
+	return cases
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="check and benchmark align_comp_to_port on the cell bbox table")
+	parser.add_argument("--repeat", type=int, default=1, help="align every reference this many times per case")
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+	pdk = sky130_mapped_pdk
+	pdk.activate()
+	top = Component(name="align_pads")
+	pad = top << via_array(pdk, "met1", "met2", size=(3, 3))
+	pad.movex(10.005).movey(-4.5)
+	ports = [pad.ports["top_met_N"], pad.ports["top_met_E"]]
+	times = dict()
+	results = dict()
+	for name, function in (("legacy", legacy_align_comp_to_port), ("table", align_comp_to_port)):
+		refs = placed_references(pdk, Component(name=f"align_{name}"), random.Random(args.seed))
+		cases = alignments(pdk, refs, ports)
+		results[name] = list()
+		start = time.perf_counter()
+		for i, port, alignment, layer in cases:
+			for _ in range(args.repeat):
+				ref = function(refs[i], port, alignment, layer)
+			results[name].append(str(ref.dcplx_trans))
+		times[name] = (time.perf_counter() - start) / (len(cases) * args.repeat)
+		# aligning a Component returns a new reference
+		comp = nmos(pdk, width=2, fingers=3)
+		results[name] += [str(function(comp, port, alignment).dcplx_trans) for port in ports for alignment in (None, ("c", "c"))]
+	mismatches = [i for i, (old, new) in enumerate(zip(results["legacy"], results["table"])) if old != new]
+	if mismatches:
+		raise SystemExit(f"{len(mismatches)} of {len(results['legacy'])} alignments differ, first: {results['legacy'][mismatches[0]]} vs {results['table'][mismatches[0]]}")
+	print(f"{len(results['legacy'])} alignments identical")
+	print(f"legacy {1e6 * times['legacy']:.0f} us/call, table {1e6 * times['table']:.0f} us/call, speedup {times['legacy'] / times['table']:.1f}x")
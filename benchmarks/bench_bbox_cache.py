@@ -0,0 +1,175 @@
+"""
+equivalence check + benchmark: evaluate_bbox, prec_center, prec_ref_center and center_to_edge_distance on the
+per cell bbox cache (integer cell bboxes, reference transformations applied to them, Decimal values memoized)
+vs the previous functions (bbox() and Decimal(str(...)) conversions on every call)
+
+usage: PDK_ROOT=/path/to/pdks python benchmarks/bench_bbox_cache.py [--calls 2000] [--fingers 4 8]
+
+the values of all functions are compared on moved, rotated, mirrored and arrayed references and on Components.
+then generators (sky130 transistors) are built with the previous functions and with
+the cache: the merged geometry and the ports must be identical. the time per call and per build is reported.
+"""
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from decimal import Decimal
+import sys
+import time
+
+import gdsfactory as gf
+from gdsfactory import ComponentReference
+from gdsfactory.component import Component
+from gdsfactory.snap import snap_to_grid
+import klayout.db as kdb
+
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+from glayout.primitives.fet import nmos, pmos
+from glayout.primitives.via_gen import via_array, via_stack
+from glayout.util import comp_utils
+from glayout.util.bbox_cache import clear_bbox_cache
+from glayout.util.cell_cache import clear_cell_cache
+from glayout.util.port_utils import parse_direction
+
+
+def legacy_evaluate_bbox(custom_comp, return_decimal: bool | None = False, padding: float=0):
+	"""evaluate_bbox before the bbox cache"""
+	compbbox = custom_comp.bbox()
+	width = abs(Decimal(str(compbbox.p2.x)) - Decimal(str(compbbox.p1.x))) + 2*Decimal(str(padding))
+	height = abs(Decimal(str(compbbox.p2.y)) - Decimal(str(compbbox.p1.y))) + 2*Decimal(str(padding))
+	if return_decimal:
+		return (width,height)
+	return (float(width),float(height))
+
+
+def legacy_center_to_edge_distance(custom_comp, direction) -> float:
+	"""center_to_edge_distance before the bbox cache"""
+	compbbox = custom_comp.bbox()
+	center = custom_comp.center
+	direction = parse_direction(direction)
+	if direction==1:
+		distance = center[0] - compbbox.p1.x
+	elif direction==2:
+		distance = center[1] - compbbox.p2.y
+	elif direction==3:
+		distance = center[0] - compbbox.p2.x
+	elif direction==4:
+		distance = center[1] - compbbox.p1.y
+	else:
+		raise ValueError("unknown error with direction in function center_to_edge_distance (comp_utils)")
+	return snap_to_grid(abs(distance),2)
+
+
+def legacy_prec_center(custom_comp, return_decimal: bool=False):
+	"""prec_center before the bbox cache"""
+	correctmax = [dim/2 for dim in legacy_evaluate_bbox(custom_comp, True)]
+	currentmax = comp_utils.to_decimal((custom_comp.xmax,custom_comp.ymax))
+	correctionxy = [correctmax[i] - currentmax[i] for i in range(2)]
+	if return_decimal:
+		return correctionxy
+	return comp_utils.to_float(correctionxy)
+
+
+LEGACY = {
+	"evaluate_bbox": legacy_evaluate_bbox,
+	"center_to_edge_distance": legacy_center_to_edge_distance,
+	"prec_center": legacy_prec_center,
+}
+
+
+@contextmanager
+def legacy_functions():
+	"""replaces the functions in every loaded glayout module which imported them"""
+	replaced = list()
+	for name, legacy in LEGACY.items():
+		current = getattr(comp_utils, name)
+		for module in list(sys.modules.values()):
+			if getattr(module, "__name__", "").startswith(("glayout", "__main__")) and getattr(module, name, None) is current:
+				setattr(module, name, legacy)
+				replaced.append((module, name, current))
+	try:
+		yield
+	finally:
+		for module, name, current in replaced:
+			setattr(module, name, current)
+
+
+def placed(pdk) -> list:
+	"""Components and references to them with various transformations"""
+	top = Component(name="bbox_cache_top")
+	cells = [via_stack(pdk, "met1", "met3"), via_array(pdk, "met1", "met2", size=(2, 3)), nmos(pdk, width=2, fingers=3)]
+	items = list(cells)
+	for i, cell in enumerate(cells):
+		moved = (top << cell).movex(1.005 * i).movey(-0.335)
+		rotated = (top << cell).rotate(90).movex(-2.5)
+		mirrored = (top << cell).mirror_x().movey(0.77)
+		arrayed = top.add_ref(cell, columns=3, rows=2, column_pitch=4.5, row_pitch=6.0).movex(0.125)
+		items += [moved, rotated, mirrored, arrayed]
+	unlocked = Component(name="bbox_cache_unlocked")
+	unlocked << cells[1]
+	items.append(unlocked)
+	return items
+
+
+def values(items: list, functions: dict) -> list:
+	results = list()
+	for item in items:
+		results.append(functions["evaluate_bbox"](item, True))
+		results.append(functions["evaluate_bbox"](item, False, padding=0.5))
+		results.append(functions["prec_center"](item, True))
+		results.append(functions["prec_center"](item))
+		results += [functions["center_to_edge_distance"](item, direction) for direction in "NESW"]
+	return [repr(value) for value in results]
+
+
+def signature(comp: Component) -> tuple:
+	geometry = dict()
+	for index in comp.kcl.layer_indexes():
+		region = kdb.Region(comp.begin_shapes_rec(index)).merged()
+		if not region.is_empty():
+			geometry[str(comp.kcl.get_info(index))] = sorted(str(polygon) for polygon in region.each())
+	return geometry, sorted((p.name, str(p.trans), p.width, str(p.layer)) for p in comp.ports)
+
+
+def build(generator) -> tuple[float, tuple]:
+	gf.clear_cache()
+	clear_cell_cache()
+	clear_bbox_cache()
+	start = time.perf_counter()
+	comp = generator()
+	return time.perf_counter() - start, signature(comp)
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="check and benchmark the bbox cache of the placement helpers")
+	parser.add_argument("--calls", type=int, default=2000, help="calls of each function in the timing loop")
+	parser.add_argument("--fingers", type=int, nargs="*", default=[4, 8])
+	args = parser.parse_args()
+	pdk = sky130_mapped_pdk
+	pdk.activate()
+	items = placed(pdk)
+	current = {name: getattr(comp_utils, name) for name in LEGACY}
+	if values(items, LEGACY) != values(items, current):
+		raise SystemExit("values differ")
+	print(f"values of {len(items)} Components and references identical")
+	ref = next(item for item in items if isinstance(item, ComponentReference))
+	print(f"{'function':<26}{'legacy us':>11}{'cache us':>10}{'speedup':>9}")
+	for name in LEGACY:
+		arguments = (ref, "N") if name == "center_to_edge_distance" else (ref,)
+		timings = list()
+		for function in (LEGACY[name], current[name]):
+			start = time.perf_counter()
+			for _ in range(args.calls):
+				function(*arguments)
+			timings.append((time.perf_counter() - start) / args.calls)
+		print(f"{name:<26}{1e6 * timings[0]:>11.1f}{1e6 * timings[1]:>10.1f}{timings[0] / timings[1]:>8.1f}x")
+	generators = dict()
+	for fingers in args.fingers:
+		generators[f"nmos f={fingers}"] = lambda fingers=fingers: nmos(pdk, width=2, fingers=fingers)
+		generators[f"pmos f={fingers}"] = lambda fingers=fingers: pmos(pdk, width=2, fingers=fingers)
+	print(f"{'block':<26}{'legacy s':>11}{'cache s':>10}{'speedup':>9}")
+	for name, generator in generators.items():
+		with legacy_functions():
+			legacy_s, legacy_sig = build(generator)
+		new_s, new_sig = build(generator)
+		if legacy_sig != new_sig:
+			raise SystemExit(f"{name} differs")
+		print(f"{name:<26}{legacy_s:>11.3f}{new_s:>10.3f}{legacy_s / new_s:>8.1f}x")
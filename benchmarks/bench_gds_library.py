@@ -0,0 +1,97 @@
+"""
+equivalence check + benchmark: one deduplicated GDS library (GDSLibraryWriter) vs one GDS file per sample
+
+usage: PDK_ROOT=/path/to/pdks python benchmarks/bench_gds_library.py [--samples 40] [--shard-size 16] [--seed 0]
+
+generates random nmos/pmos samples and pairs of them (sky130, warm cell cache like an ATLAS worker) and writes them once as one GDS
+per sample (Component.write_gds) and once into sharded libraries. the flattened geometry of every sample must be
+identical in both. reports write time and disk footprint, plus the time to bundle the per sample files afterwards
+(GDSLibraryWriter.add_gds, what run_dataset_multiprocess.py --gds_library does).
+NOTE the per sample files also hold the gdsfactory meta data (ports, settings), the libraries hold geometry only.
+"""
+from argparse import ArgumentParser
+from pathlib import Path
+import random
+import tempfile
+import time
+
+from gdsfactory.component import Component
+import klayout.db as kdb
+
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+from glayout.primitives.fet import nmos, pmos
+from glayout.util.gds_library import GDSLibraryWriter, read_library_index
+
+
+def flat_geometry(gdspath: Path, top_cell: str | None = None) -> dict[str, list[str]]:
+	"""merged flattened polygons per layer of top_cell (the only top cell if None) of gdspath"""
+	layout = kdb.Layout()
+	layout.read(str(gdspath))
+	cell = layout.cell(top_cell) if top_cell else layout.top_cells()[0]
+	geometry = dict()
+	for layer_index in layout.layer_indexes():
+		region = kdb.Region(cell.begin_shapes_rec(layer_index)).merged()
+		if not region.is_empty():
+			info = layout.get_info(layer_index)
+			geometry[f"{info.layer}/{info.datatype}"] = sorted(str(polygon) for polygon in region.each())
+	return geometry
+
+
+def footprint(paths) -> float:
+	return sum(path.stat().st_size for path in paths) / 2**20
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="check and benchmark the deduplicated GDS library writer")
+	parser.add_argument("--samples", type=int, default=40)
+	parser.add_argument("--shard-size", type=int, default=16)
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+	pdk = sky130_mapped_pdk
+	pdk.activate()
+	rng = random.Random(args.seed)
+	samples = list()
+	for sample_id in range(args.samples):
+		generator = rng.choice((nmos, pmos))
+		comp = generator(pdk, width=rng.choice((1, 2, 3, 5)), fingers=rng.choice((1, 2, 4)), multipliers=1)
+		if sample_id % 4 == 3:
+			# hierarchical sample sharing the transistors of earlier samples
+			pair = Component(name=f"pair_{sample_id}")
+			pair << comp
+			(pair << samples[-1][1]).movex(comp.xsize + 5)
+			comp = pair
+		samples.append((sample_id, comp))
+	with tempfile.TemporaryDirectory() as tmpdir:
+		tmpdir = Path(tmpdir)
+		start = time.perf_counter()
+		files = list()
+		for sample_id, comp in samples:
+			files.append(tmpdir / "per_sample" / f"sample_{sample_id:04d}.gds")
+			files[-1].parent.mkdir(exist_ok=True)
+			comp.write_gds(files[-1])
+		per_sample_s = time.perf_counter() - start
+
+		start = time.perf_counter()
+		with GDSLibraryWriter(tmpdir / "library" / "samples.gds", shard_size=args.shard_size) as writer:
+			for sample_id, comp in samples:
+				writer.add(sample_id, comp)
+		library_s = time.perf_counter() - start
+
+		start = time.perf_counter()
+		with GDSLibraryWriter(tmpdir / "bundle" / "samples.gds", shard_size=args.shard_size) as bundler:
+			for (sample_id, _), path in zip(samples, files):
+				bundler.add_gds(sample_id, path)
+		bundle_s = time.perf_counter() - start
+
+		index = read_library_index(writer.index_path)
+		bundle_index = read_library_index(bundler.index_path)
+		for (sample_id, _), path in zip(samples, files):
+			expected = flat_geometry(path)
+			for entry in (index[sample_id], bundle_index[sample_id]):
+				if flat_geometry(entry["gds"], entry["top_cell"]) != expected:
+					raise SystemExit(f"sample {sample_id} differs in {entry['gds']}")
+		libraries = sorted((tmpdir / "library").glob("samples_*.gds"))
+		print(f"{args.samples} samples, {len(libraries)} libraries of up to {args.shard_size} samples")
+		print(f"one gds per sample: {per_sample_s:.2f} s, {footprint(files):.2f} MB")
+		print(f"library writer:     {library_s:.2f} s, {footprint(libraries):.2f} MB ({writer.cells_written} cells written, {writer.cells_deduplicated} deduplicated)")
+		print(f"bundling the files: {bundle_s:.2f} s")
@@ -0,0 +1,77 @@
+"""
+microbenchmark: per call cost of MappedPDK design rule lookups
+
+usage: PDK_ROOT=/path/to/pdks python benchmarks/bench_grules.py [-n 100000]
+
+compares, for sky130, gf180 and ihp130:
+legacy   = the previous get_grule implementation (validation + valid_glayers scan + nested dict lookup)
+get_grule = the pydantic validated entry point (now backed by the precompiled table)
+get_grule_fast = the precompiled O(1) accessor used by generators
+"""
+from argparse import ArgumentParser
+from decimal import Decimal
+import timeit
+
+from pydantic import validate_arguments
+
+from glayout.pdk.mappedpdk import MappedPDK
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+from glayout.pdk.gf180_mapped import gf180_mapped_pdk
+from glayout.pdk.ihp130_mapped import ihp130_mapped_pdk
+
+
+@validate_arguments(config=dict(arbitrary_types_allowed=True))
+def legacy_get_grule(pdk: MappedPDK, glayer1: str, glayer2: str | None = None, return_decimal=False) -> dict:
+	"""copy of get_grule before the rule table was added"""
+	if glayer1 not in MappedPDK.valid_glayers:
+		raise ValueError("get_grule, " + str(glayer1) + " not valid glayer")
+	rules_dict = None
+	if glayer2 is not None:
+		if glayer2 not in MappedPDK.valid_glayers:
+			raise ValueError("get_grule, " + str(glayer2) + " not valid glayer")
+		rules_dict = pdk.grules.get(glayer1, dict()).get(glayer2)
+		if rules_dict is None or rules_dict == {}:
+			rules_dict = pdk.grules.get(glayer2, dict()).get(glayer1)
+	else:
+		glayer2 = glayer1
+		rules_dict = pdk.grules.get(glayer1, dict()).get(glayer1)
+	if rules_dict is None or rules_dict == {}:
+		raise NotImplementedError("no rules found between " + str(glayer1) + " and " + str(glayer2))
+	for rule in rules_dict:
+		if type(rule) == float and return_decimal:
+			rules_dict[rule] = Decimal(str(rule))
+	return rules_dict
+
+
+# lookups typical of via_stack / multiplier
+QUERIES = [("met1", None), ("via1", "met2"), ("mcon", "active_diff"), ("poly", "active_diff"), ("met4", None)]
+
+
+def bench_pdk(pdk: MappedPDK, number: int) -> dict[str, float]:
+	queries = [q for q in QUERIES if (q[0], q[1] or q[0]) in pdk._grule_table]
+	for glayer1, glayer2 in queries:
+		if dict(pdk.get_grule_fast(glayer1, glayer2)) != dict(legacy_get_grule(pdk, glayer1, glayer2)):
+			raise AssertionError(f"{pdk.name}: rule table mismatch for {glayer1}, {glayer2}")
+	results = dict()
+	for label, func in [
+		("legacy", lambda g1, g2: legacy_get_grule(pdk, g1, g2)),
+		("get_grule", pdk.get_grule),
+		("get_grule_fast", pdk.get_grule_fast),
+	]:
+		def run():
+			for glayer1, glayer2 in queries:
+				func(glayer1, glayer2)
+		seconds = min(timeit.repeat(run, number=number, repeat=3))
+		results[label] = 1e9 * seconds / (number * len(queries))
+	return results
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="benchmark MappedPDK.get_grule")
+	parser.add_argument("-n", "--number", type=int, default=20000, help="iterations per query")
+	args = parser.parse_args()
+	print(f"{'pdk':<8}{'legacy ns/call':>18}{'get_grule ns/call':>20}{'fast ns/call':>16}{'speedup':>10}")
+	for pdk in [sky130_mapped_pdk, gf180_mapped_pdk, ihp130_mapped_pdk]:
+		res = bench_pdk(pdk, args.number)
+		speedup = res["legacy"] / res["get_grule_fast"]
+		print(f"{pdk.name:<8}{res['legacy']:>18.0f}{res['get_grule']:>20.0f}{res['get_grule_fast']:>16.0f}{speedup:>9.0f}x")
@@ -0,0 +1,49 @@
+"""
+benchmark: cold start of the glayout package with lazy top-level attributes
+
+usage: PDK_ROOT=/path/to/pdks python benchmarks/bench_import_time.py [--repeat 5]
+
+every scenario runs in a fresh interpreter with -X importtime and reports the cumulative import time
+of the top level modules it imported (best of repeat) and the number of imported modules.
+"eager" touches every name of glayout.__all__, which is what "import glayout" did before the names were lazy.
+"""
+from argparse import ArgumentParser
+import subprocess
+import sys
+
+
+SCENARIOS = {
+	"import glayout": "import glayout",
+	"spice only": "from glayout.spice import Netlist\nfrom glayout.spice.parasitics import parse_parasitics",
+	"sky130 only": "from glayout import sky130",
+	"sky130 + nmos": "from glayout import sky130, nmos",
+	"eager (all names)": "import glayout\nfor name in glayout.__all__: getattr(glayout, name)",
+}
+
+
+def import_time(code: str) -> tuple[float, int]:
+	"""(cumulative seconds of the top level imports, number of imported modules) of code in a new interpreter"""
+	result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+	if result.returncode != 0:
+		raise SystemExit(f"{code!r} failed:\n{result.stderr[-2000:]}")
+	total_us = 0
+	modules = 0
+	for line in result.stderr.splitlines():
+		if not line.startswith("import time:") or "cumulative" in line:
+			continue
+		_, cumulative, name = line[len("import time:"):].split("|")
+		modules += 1
+		# nested imports are indented, their time is part of the cumulative time of the top level import
+		if not name[1:].startswith(" "):
+			total_us += int(cumulative)
+	return total_us / 1e6, modules
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="measure glayout import time with -X importtime")
+	parser.add_argument("--repeat", type=int, default=5, help="best of this many interpreters is reported")
+	args = parser.parse_args()
+	print(f"{'scenario':<20}{'import s':>10}{'modules':>9}")
+	for label, code in SCENARIOS.items():
+		best, modules = min(import_time(code) for _ in range(args.repeat))
+		print(f"{label:<20}{best:>10.3f}{modules:>9}")
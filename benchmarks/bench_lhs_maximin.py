@@ -0,0 +1,79 @@
+"""
+equivalence check + benchmark: incremental maximin LHS optimizer (ATLAS elhs.lhs_maximin) vs the previous
+implementation (full pdist after every swap)
+
+usage: python benchmarks/bench_lhs_maximin.py [--sizes 1000 10000] [--dims 2 16] [--patience 300] [--legacy-max 1000]
+                                               [--restarts 4] [--processes 4]
+
+for every (n, d) both optimizers start from the same hypercube and the same swap random stream, so they must
+return the same array. the legacy optimizer is only run up to --legacy-max samples.
+the multi restart mode is run serially and with --processes workers and must give the same result for the seed.
+"""
+from argparse import ArgumentParser
+import random
+import time
+
+import numpy as np
+from scipy.spatial.distance import pdist
+from scipy.stats import qmc
+
+from glayout.blocks.ATLAS.elhs import lhs_maximin, min_pairwise_distance
+
+
+def legacy_lhs_maximin(d, n, patience=100, seed=None):
+	"""lhs_maximin before the incremental nearest neighbour update"""
+	engine = qmc.LatinHypercube(d, seed=seed)
+	sample = engine.random(n)
+	best = sample.copy()
+	best_min = min_pairwise_distance(best)
+	no_improve = 0
+	while no_improve < patience:
+		i, j = random.sample(range(n), 2)
+		axis = random.randrange(d)
+		cand = best.copy()
+		cand[i, axis], cand[j, axis] = cand[j, axis], cand[i, axis]
+		cand_min = min_pairwise_distance(cand)
+		if cand_min > best_min:
+			best, best_min = cand, cand_min
+			no_improve = 0
+		else:
+			no_improve += 1
+	return best
+
+
+def timed(run):
+	start = time.perf_counter()
+	result = run()
+	return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="check and benchmark the maximin LHS optimizer")
+	parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+	parser.add_argument("--dims", type=int, nargs="+", default=[2, 16])
+	parser.add_argument("--patience", type=int, default=300)
+	parser.add_argument("--seed", type=int, default=42)
+	parser.add_argument("--legacy-max", type=int, default=1000, help="largest n the legacy optimizer is run for")
+	parser.add_argument("--restarts", type=int, default=4)
+	parser.add_argument("--processes", type=int, default=4)
+	args = parser.parse_args()
+	print(f"{'n':>7}{'d':>4}{'legacy s':>10}{'new s':>10}{'speedup':>9}{'min dist':>12}")
+	for n in args.sizes:
+		for d in args.dims:
+			random.seed(args.seed)
+			new_s, new = timed(lambda: lhs_maximin(d, n, patience=args.patience, seed=args.seed))
+			legacy_s = float("nan")
+			if n <= args.legacy_max:
+				random.seed(args.seed)
+				legacy_s, legacy = timed(lambda: legacy_lhs_maximin(d, n, patience=args.patience, seed=args.seed))
+				if not np.array_equal(legacy, new):
+					raise SystemExit(f"optimizers differ for n={n} d={d}")
+			print(f"{n:>7}{d:>4}{legacy_s:>10.2f}{new_s:>10.2f}{legacy_s / new_s:>8.0f}x{pdist(new).min():>12.6f}")
+
+	n, d = args.sizes[0], args.dims[-1]
+	print(f"\n{args.restarts} restarts, n={n} d={d}")
+	serial_s, serial = timed(lambda: lhs_maximin(d, n, patience=args.patience, seed=args.seed, restarts=args.restarts))
+	parallel_s, parallel = timed(lambda: lhs_maximin(d, n, patience=args.patience, seed=args.seed, restarts=args.restarts, processes=args.processes))
+	print(f"serial {serial_s:.2f} s, {args.processes} processes {parallel_s:.2f} s, min dist {pdist(serial).min():.6f}")
+	if not np.array_equal(serial, parallel):
+		raise SystemExit("restarts are not reproducible across process counts")
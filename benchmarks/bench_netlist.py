@@ -0,0 +1,133 @@
+"""
+equivalence check + benchmark: Netlist generation with structural hashing and shared sub-netlists
+vs the previous implementation (deepcopy in connect_netlist, subcircuit map rebuilt at every level)
+
+usage: python benchmarks/bench_netlist.py [--cells 10] [--blocks 10] [--tops 100]
+
+builds a hierarchy of top -> blocks -> cells -> transistors with cells * blocks * tops transistor instances
+(default 10k) and times building the hierarchy and generating the netlist with both implementations.
+Both must produce the same SPICE text (names are unique except for the transistors, which need suffixes).
+"""
+from argparse import ArgumentParser
+from copy import deepcopy
+import io
+import time
+
+from glayout.spice import Netlist
+
+
+class LegacyNetlist(Netlist):
+	"""Netlist generation as it was before structural hashing"""
+
+	def connect_netlist(self, netlist: Netlist, node_mapping: list[tuple[str, str]]) -> int:
+		self.add_netlists([deepcopy(netlist)])
+		netlist_index = len(self.sub_netlists) - 1
+		self.connect_node(net=netlist_index, node_mapping=node_mapping)
+		return netlist_index
+
+	def legacy_subcircuit(self, with_pins: bool = True) -> str:
+		if self.source_netlist != "":
+			return self.source_netlist.format(**self.generate_source_netlist_params(self.circuit_name))
+		elif len(self.sub_netlists) > 0:
+			if with_pins:
+				main_circuit = f".subckt {self.circuit_name} {' '.join(self.nodes)}\n"
+			else:
+				main_circuit = f".subckt {self.circuit_name}\n"
+			for i, netlist in enumerate(self.sub_netlists):
+				main_circuit += netlist.generate_instance(str(i), self.netlist_connections[i]) + "\n"
+			main_circuit += f".ends {self.circuit_name}"
+			return main_circuit
+		return ""
+
+	def legacy_map(self, sub_netlists_only=False) -> dict:
+		subcircuits = dict()
+		for netlist in self.sub_netlists:
+			subnetlist_subcircuits = netlist.legacy_map()
+			for subckt in subnetlist_subcircuits:
+				if subckt not in subcircuits:
+					subcircuits[subckt] = [*subnetlist_subcircuits[subckt]]
+				else:
+					subcircuits[subckt] += subnetlist_subcircuits[subckt]
+		if not sub_netlists_only:
+			self_subckt = self.legacy_subcircuit()
+			if self_subckt not in subcircuits:
+				subcircuits[self_subckt] = [self]
+		return subcircuits
+
+	def generate_netlist(self, only_subcircuits: bool = False, with_pins: bool = True) -> str:
+		subcircuits_netlist_map = self.legacy_map(sub_netlists_only=True)
+		subcircuit_suffixes = dict()
+		for subckt in subcircuits_netlist_map:
+			netlists = subcircuits_netlist_map[subckt]
+			subckt_name = netlists[0].circuit_name
+			if subckt_name in subcircuit_suffixes:
+				for netlist in netlists: netlist.circuit_name = f"{netlist.circuit_name}_{subcircuit_suffixes[subckt_name]}"
+				subcircuit_suffixes[subckt_name] += 1
+			else:
+				subcircuit_suffixes[subckt_name] = 1
+		unique_subcircuits_list = [subcircuits_netlist_map[subckt][0].legacy_subcircuit() for subckt in subcircuits_netlist_map]
+		subcircuits = '\n\n'.join(unique_subcircuits_list)
+		main_circuit = self.legacy_subcircuit(with_pins=with_pins)
+		global_nodes = ' '.join(self.get_global_nodes_list())
+		self.spice_netlist = ""
+		if len(global_nodes) > 0 and not only_subcircuits: self.spice_netlist += f".global {global_nodes}\n\n"
+		self.spice_netlist += subcircuits + "\n\n"
+		self.spice_netlist += main_circuit
+		return self.spice_netlist
+
+
+def fet(netlist_class: type, device: str, width: float) -> Netlist:
+	return netlist_class(
+		circuit_name=device.upper(),
+		nodes=['D', 'G', 'S', 'B'],
+		source_netlist=".subckt {circuit_name} {nodes} l=0.15 w=" + str(width) + "\nXMAIN D G S B sky130_fd_pr__" + device + "_01v8 l=0.15 w=" + str(width) + "\n.ends {circuit_name}",
+	)
+
+
+def build_hierarchy(netlist_class: type, cells: int, blocks: int, tops: int) -> Netlist:
+	"""tops blocks of blocks cells of cells transistors, four cell and two block variants"""
+	fets = [fet(netlist_class, device, width) for device in ("nfet", "pfet") for width in (1, 2)]
+	cell_variants = list()
+	for variant in range(4):
+		cell = netlist_class(circuit_name=f"CELL{variant}", nodes=['IN', 'OUT', 'VDD', 'VSS'])
+		for i in range(cells):
+			device = fets[(variant + i) % len(fets)]
+			cell.connect_netlist(device, [('G', 'IN'), ('D', 'OUT'), ('S', 'VSS' if i % 2 else 'VDD'), ('B', 'VSS')])
+		cell_variants.append(cell)
+	block_variants = list()
+	for variant in range(2):
+		block = netlist_class(circuit_name=f"BLOCK{variant}", nodes=['IN', 'OUT', 'VDD', 'VSS'])
+		for i in range(blocks):
+			ref = block.connect_netlist(cell_variants[(variant + i) % len(cell_variants)], [('VDD', 'VDD'), ('VSS', 'VSS')])
+			block.connect_node(ref, [('IN', 'IN' if i == 0 else f'n{i}'), ('OUT', 'OUT' if i == blocks - 1 else f'n{i + 1}')])
+		block_variants.append(block)
+	top = netlist_class(circuit_name="TOP", nodes=['IN', 'OUT', 'VDD', 'VSS'])
+	for i in range(tops):
+		top.connect_netlist(block_variants[i % 2], [('IN', 'IN'), ('OUT', 'OUT'), ('VDD', 'VDD'), ('VSS', 'VSS')])
+	return top
+
+
+def timed(run):
+	start = time.perf_counter()
+	result = run()
+	return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="check and benchmark Netlist.generate_netlist")
+	parser.add_argument("--cells", type=int, default=10, help="transistors per cell")
+	parser.add_argument("--blocks", type=int, default=10, help="cells per block")
+	parser.add_argument("--tops", type=int, default=100, help="blocks in the top level")
+	args = parser.parse_args()
+	print(f"{args.cells * args.blocks * args.tops} transistor instances")
+	print(f"{'implementation':<16}{'build s':>10}{'generate s':>12}{'write s':>10}{'chars':>10}")
+	texts = dict()
+	for label, netlist_class in [("legacy", LegacyNetlist), ("structural", Netlist)]:
+		build_s, top = timed(lambda: build_hierarchy(netlist_class, args.cells, args.blocks, args.tops))
+		generate_s, texts[label] = timed(top.generate_netlist)
+		write_s = float("nan")
+		if netlist_class is Netlist:
+			write_s, _ = timed(lambda: top.write_netlist(io.StringIO()))
+		print(f"{label:<16}{build_s:>10.3f}{generate_s:>12.3f}{write_s:>10.3f}{len(texts[label]):>10}")
+	if texts["legacy"] != texts["structural"]:
+		raise SystemExit("generated netlists differ")
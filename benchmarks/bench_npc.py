@@ -0,0 +1,100 @@
+"""
+equivalence check + benchmark: sky130_add_npc (grid buckets + union-find) vs the previous n^2 implementation
+
+usage: PDK_ROOT=/path/to/pdks python benchmarks/bench_npc.py [--fingers 4 16 64] [--multipliers 1 4 16]
+
+for every nmos(fingers, multipliers) the npc layer is removed from a flattened copy, then npc is added again
+by both implementations. The resulting npc layers must cover exactly the same area (empty XOR).
+"""
+from argparse import ArgumentParser
+import time
+
+import gdsfactory as gf
+from gdsfactory.component import Component
+
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+from glayout.pdk.sky130_mapped.sky130_add_npc import sky130_add_npc
+from glayout.primitives.fet import nmos
+
+NPC_LAYER = (95, 20)
+
+
+def naive_add_npc(comp: Component) -> Component:
+	"""sky130_add_npc before the grid bucket / union-find rewrite"""
+	licon_comp = comp.extract(layers=[(66,44)])
+	poly_comp = comp.extract(layers=[(66,20)])
+	existing_npc = comp.extract(layers=[(95,20)])
+	if len(licon_comp.get_polygons()) < 2 and len(poly_comp.get_polygons()) < 2:
+		return comp
+	liconANDpoly = gf.boolean(licon_comp, poly_comp, layer=(1,2), operation="and")
+	if len(existing_npc.get_polygons()) > 1:
+		liconANDpoly = gf.boolean(liconANDpoly, existing_npc, layer=(1,2), operation="A-B")
+	licon_polygons = liconANDpoly.get_polygons(as_array=False)
+	npc_polygons = list()
+	for licon_polygon in licon_polygons:
+		bbox = licon_polygon.bounding_box()
+		padding_points = [
+			[bbox[0][0] - 0.1, bbox[0][1] - 0.1],
+			[bbox[1][0] + 0.1, bbox[0][1] - 0.1],
+			[bbox[1][0] + 0.1, bbox[1][1] + 0.1],
+			[bbox[0][0] - 0.1, bbox[1][1] + 0.1],
+		]
+		npc_polygons.append(gf.kdb.DPolygon(padding_points))
+	npc_merged_polygons = list()
+	for i, npc_polygon in enumerate(npc_polygons):
+		for j, other_polygon in enumerate(npc_polygons):
+			bbox_i = npc_polygon.bbox()
+			bbox_j = other_polygon.bbox()
+			center_i = ((bbox_i.left + bbox_i.right) / 2, (bbox_i.bottom + bbox_i.top) / 2)
+			center_j = ((bbox_j.left + bbox_j.right) / 2, (bbox_j.bottom + bbox_j.top) / 2)
+			yviolation = abs(center_i[1] - center_j[1]) < 0.64
+			xviolation = abs(center_i[0] - center_j[0]) < 0.64
+			if i==j:
+				continue
+			elif (xviolation and yviolation):
+				npc_merged_polygons.append(gf.kdb.DPolygon(gf.kdb.DBox(
+					min(bbox_i.left, bbox_j.left), min(bbox_i.bottom, bbox_j.bottom),
+					max(bbox_i.right, bbox_j.right), max(bbox_i.top, bbox_j.top),
+				)))
+	for poly in npc_polygons + npc_merged_polygons:
+		comp.add_polygon(poly, layer=(95, 20))
+	return comp
+
+
+def without_npc(comp: Component) -> Component:
+	stripped = comp.copy()
+	stripped.flatten()
+	stripped.remove_layers([NPC_LAYER])
+	return stripped
+
+
+def shape_count(comp: Component, layer: tuple[int, int]) -> int:
+	"""shapes of layer in the (flat) top cell"""
+	return comp.shapes(comp.kcl.layer(*layer)).size()
+
+
+def npc_region(comp: Component) -> gf.kdb.Region:
+	return gf.kdb.Region(comp.begin_shapes_rec(comp.kcl.layer(*NPC_LAYER))).merged()
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="check and benchmark sky130_add_npc")
+	parser.add_argument("--fingers", type=int, nargs="+", default=[4, 16, 64])
+	parser.add_argument("--multipliers", type=int, nargs="+", default=[1, 4, 16])
+	args = parser.parse_args()
+	sky130_mapped_pdk.activate()
+	print(f"{'fingers':>8}{'mult':>6}{'licons':>8}{'naive s':>10}{'new s':>10}{'speedup':>9}{'polygons':>14}")
+	for fingers in args.fingers:
+		for multipliers in args.multipliers:
+			base = without_npc(nmos(sky130_mapped_pdk, width=3, fingers=fingers, multipliers=multipliers))
+			results = dict()
+			for label, add_npc in [("naive", naive_add_npc), ("new", sky130_add_npc)]:
+				comp = base.copy()
+				start = time.perf_counter()
+				add_npc(comp)
+				results[label] = (time.perf_counter() - start, npc_region(comp), shape_count(comp, NPC_LAYER))
+			(naive_s, naive_region, naive_count), (new_s, new_region, new_count) = results["naive"], results["new"]
+			if not (naive_region ^ new_region).is_empty():
+				raise SystemExit(f"npc layers differ for fingers={fingers} multipliers={multipliers}")
+			licons = shape_count(base, (66, 44))
+			print(f"{fingers:>8}{multipliers:>6}{licons:>8}{naive_s:>10.3f}{new_s:>10.3f}{naive_s / new_s:>8.1f}x{naive_count:>7}/{new_count:<6}")
@@ -0,0 +1,141 @@
+"""
+equivalence check + benchmark: streaming PEX parser (glayout.spice.parasitics) vs the old _parse_simple_parasitics
+
+usage: python benchmarks/bench_pex_parser.py [--size-mb 300] [--nets 5000] [--memory] [--keep path.spice]
+
+writes a synthetic extracted netlist in the format of magic ext2spice with extresist (subnodes <net>.n<i>,
+resistors in ohms, capacitors with f suffix, some cards split with + continuations) of about size-mb,
+then reports the time (and with --memory the peak python memory) of both parsers.
+the totals must agree on cards the old parser understands (single line, f suffix), the second file uses
+forms only the new parser understands (fF units, meg, exponents, continuations) and is checked against
+the totals computed while writing it.
+"""
+from argparse import ArgumentParser
+from pathlib import Path
+import math
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from glayout.spice.parasitics import parse_parasitics
+
+
+def legacy_parse(spice_file_path: str) -> tuple[float, float]:
+	"""the parser used by physical_features.py / robust_verification.py before glayout.spice.parasitics"""
+	total_resistance = 0.0
+	total_capacitance = 0.0
+	with open(spice_file_path, 'r') as f:
+		for line in f:
+			orig_line = line.strip()
+			line = line.strip().upper()
+			parts = line.split()
+			orig_parts = orig_line.split()
+			if not parts: continue
+			name = parts[0]
+			if name.startswith('R') and len(parts) >= 4:
+				try: total_resistance += float(parts[3])
+				except (ValueError): continue
+			elif name.startswith('C') and len(parts) >= 4:
+				try:
+					cap_str = orig_parts[3]
+					unit = cap_str[-1]
+					val_str = cap_str[:-1]
+					if unit == 'F': cap_value = float(val_str) * 1e-15
+					elif unit == 'P': cap_value = float(val_str) * 1e-12
+					elif unit == 'N': cap_value = float(val_str) * 1e-9
+					elif unit == 'U': cap_value = float(val_str) * 1e-6
+					elif unit == 'f': cap_value = float(val_str) * 1e-15
+					else: cap_value = float(cap_str)
+					total_capacitance += cap_value
+				except (ValueError): continue
+	return total_resistance, total_capacitance
+
+
+def write_netlist(path: Path, size_bytes: int, nets: int, rng: np.random.Generator, extended: bool) -> tuple[float, float]:
+	"""writes a synthetic pex netlist, returns the exact (resistance, capacitance) totals"""
+	resistances, capacitances = [], []
+	written = 0
+	index = 0
+	chunk = 20000
+	with open(path, "w") as spice_file:
+		spice_file.write("* synthetic extracted netlist\n.subckt top " + " ".join(f"net{i}" for i in range(min(nets, 64))) + " VSUBS\n")
+		while written < size_bytes:
+			net = rng.integers(0, nets, chunk)
+			# coupling is local in real layouts, every net couples to a few neighbours
+			other = (net + rng.integers(1, 8, chunk)) % nets
+			sub = rng.integers(0, 50, (chunk, 2))
+			res = np.round(rng.uniform(0.01, 500, chunk), 4)
+			cap = np.round(rng.uniform(0.001, 5, chunk), 4)
+			lines = []
+			# python floats, the repr of numpy scalars is not a plain number
+			net, other, sub, res_values, cap_values = net.tolist(), other.tolist(), sub.tolist(), res.tolist(), cap.tolist()
+			for i in range(chunk):
+				if extended and i % 3 == 0:
+					lines.append(f"R{index} net{net[i]}.n{sub[i][0]} net{net[i]}.n{sub[i][1]}\n+ {res_values[i] / 1e6!r}meg\n")
+				else:
+					lines.append(f"R{index} net{net[i]}.n{sub[i][0]} net{net[i]}.n{sub[i][1]} {res_values[i]!r}\n")
+				target = "VSUBS" if i % 4 == 0 else f"net{other[i]}"
+				if extended and i % 2 == 0:
+					lines.append(f"C{index} net{net[i]}.n{sub[i][0]} {target} {cap_values[i]!r}fF\n")
+				elif extended:
+					lines.append(f"C{index} net{net[i]}.n{sub[i][0]} {target} {cap_values[i] * 1e-15!r}\n")
+				else:
+					lines.append(f"C{index} net{net[i]}.n{sub[i][0]} {target} {cap_values[i]!r}f\n")
+				index += 1
+			block = "".join(lines)
+			spice_file.write(block)
+			written += len(block)
+			resistances.append(res)
+			capacitances.append(cap)
+		spice_file.write(".ends\n")
+	total_resistance = float(np.concatenate(resistances).sum())
+	total_capacitance = float(np.concatenate(capacitances).sum()) * 1e-15
+	return total_resistance, total_capacitance
+
+
+def measure(run, trace_memory: bool) -> tuple[float, float, object]:
+	"""(seconds, peak traced MB, result), memory is traced in a second run so it does not slow down the timed one"""
+	start = time.perf_counter()
+	result = run()
+	elapsed = time.perf_counter() - start
+	peak = float("nan")
+	if trace_memory:
+		tracemalloc.start()
+		run()
+		peak = tracemalloc.get_traced_memory()[1] / 2**20
+		tracemalloc.stop()
+	return elapsed, peak, result
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="check and benchmark the streaming PEX parser")
+	parser.add_argument("--size-mb", type=float, default=300, help="approximate size of the generated netlist")
+	parser.add_argument("--nets", type=int, default=5000)
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--memory", action="store_true", help="also measure peak python memory (runs every parser twice)")
+	parser.add_argument("--keep", type=str, default=None, help="write the (plain) netlist here instead of a temporary file")
+	args = parser.parse_args()
+	rng = np.random.default_rng(args.seed)
+	with tempfile.TemporaryDirectory() as tmpdir:
+		plain = Path(args.keep) if args.keep else Path(tmpdir) / "plain_pex.spice"
+		extended = Path(tmpdir) / "extended_pex.spice"
+		size_bytes = int(args.size_mb * 2**20)
+		expected_plain = write_netlist(plain, size_bytes, args.nets, rng, extended=False)
+		expected_extended = write_netlist(extended, size_bytes // 10, args.nets, rng, extended=True)
+		print(f"{'file':<10}{'MB':>8}{'parser':>9}{'seconds':>10}{'peak MB':>10}{'R ohm':>16}{'C F':>14}")
+		for label, path, expected in [("plain", plain, expected_plain), ("extended", extended, expected_extended)]:
+			size_mb = path.stat().st_size / 2**20
+			for name, run in [
+				("legacy", lambda: legacy_parse(str(path))),
+				("stream", lambda: parse_parasitics(path)),
+			]:
+				elapsed, peak, result = measure(run, args.memory)
+				totals = result if name == "legacy" else (result.total_resistance, result.total_capacitance)
+				print(f"{label:<10}{size_mb:>8.0f}{name:>9}{elapsed:>10.2f}{peak:>10.1f}{totals[0]:>16.6g}{totals[1]:>14.6g}")
+				if name == "stream" or label == "plain":
+					if not all(math.isclose(got, want, rel_tol=1e-9) for got, want in zip(totals, expected)):
+						raise SystemExit(f"{name} parser totals {totals} differ from expected {expected} on the {label} file")
+			if name == "stream":
+				print(f"{'':<10}{'':>8}{'':>9} nets={len(result.nets)} coupled pairs={len(result.coupling_capacitance)} skipped={result.skipped}")
@@ -0,0 +1,108 @@
+"""
+equivalence check + benchmark: port renaming through the PortIndex trie (in place) vs the previous
+rename_component_ports (component copy + Component.ports[name] lookups, a linear scan per port)
+
+usage: PDK_ROOT=/path/to/pdks python benchmarks/bench_port_index.py [--fingers 4 8] [--queries 1000]
+
+builds nmos, pmos and via_array (sky130) with both implementations, the port names, centers, widths,
+orientations and layers must be identical. build time and peak traced python memory are reported.
+then times prefix queries on the largest component: PortIndex.names_with_prefix vs a startswith scan.
+"""
+from argparse import ArgumentParser
+import random
+import time
+import tracemalloc
+
+import gdsfactory as gf
+
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+from glayout.primitives.fet import nmos, pmos
+from glayout.primitives.via_gen import via_array
+from glayout.util import port_utils
+from glayout.util.bbox_cache import clear_bbox_cache
+from glayout.util.cell_cache import clear_cell_cache
+from glayout.util.port_utils import PortIndex
+
+
+def legacy_rename_component_ports(custom_comp, rename_function):
+	"""rename_component_ports before the PortIndex"""
+	names_to_modify = list()
+	ports = custom_comp.ports.get_all_named()
+	renamed_comp = custom_comp.copy()
+	renamed_comp.ports.clear()
+	for pname in ports.keys():
+		pobj = ports[pname]
+		if not pname == pobj.name:
+			raise ValueError("component may have an invalid ports dict")
+		new_name = rename_function(pname, pobj)
+		names_to_modify.append((pname,new_name))
+	for namepair in names_to_modify:
+		if namepair[0] in ports.keys():
+			portobj =  custom_comp.ports[namepair[0]]
+			portobj.name = namepair[1]
+			renamed_comp.ports.add_port(name= namepair[1], port=portobj)
+		else:
+			raise KeyError("name "+str(namepair[0])+" not in component ports")
+	return renamed_comp
+
+
+def port_signature(comp) -> list[tuple]:
+	return [(p.name, tuple(round(x, 4) for x in p.center), round(p.width, 4), round(p.orientation, 2), str(p.layer)) for p in comp.ports]
+
+
+def build(generator) -> tuple[float, float, list[tuple]]:
+	"""(seconds, peak MB, port signature) of a cold build"""
+	gf.clear_cache()
+	clear_cell_cache()
+	clear_bbox_cache()
+	tracemalloc.start()
+	start = time.perf_counter()
+	comp = generator()
+	elapsed = time.perf_counter() - start
+	peak = tracemalloc.get_traced_memory()[1] / 2**20
+	tracemalloc.stop()
+	return elapsed, peak, port_signature(comp)
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="check and benchmark the PortIndex based port renaming")
+	parser.add_argument("--fingers", type=int, nargs="+", default=[4, 8])
+	parser.add_argument("--queries", type=int, default=1000, help="number of prefix queries timed")
+	args = parser.parse_args()
+	pdk = sky130_mapped_pdk
+	pdk.activate()
+	generators = {"via_array": lambda: via_array(pdk, "met1", "met3", size=(4, 4))}
+	for fingers in args.fingers:
+		generators[f"nmos f={fingers}"] = lambda fingers=fingers: nmos(pdk, width=3, fingers=fingers, multipliers=1)
+		generators[f"pmos f={fingers}"] = lambda fingers=fingers: pmos(pdk, width=3, fingers=fingers, multipliers=1)
+	new_rename_component_ports = port_utils.rename_component_ports
+	print(f"{'block':<14}{'ports':>7}{'legacy s':>10}{'index s':>10}{'speedup':>9}{'legacy MB':>11}{'index MB':>10}")
+	largest = (0, None)
+	for name, generator in generators.items():
+		port_utils.rename_component_ports = legacy_rename_component_ports
+		try:
+			legacy_s, legacy_mb, legacy_ports = build(generator)
+		finally:
+			port_utils.rename_component_ports = new_rename_component_ports
+		new_s, new_mb, new_ports = build(generator)
+		if legacy_ports != new_ports:
+			raise SystemExit(f"ports of {name} differ")
+		print(f"{name:<14}{len(new_ports):>7}{legacy_s:>10.2f}{new_s:>10.2f}{legacy_s / new_s:>8.1f}x{legacy_mb:>11.1f}{new_mb:>10.1f}")
+		largest = max(largest, (len(new_ports), generator), key=lambda item: item[0])
+
+	comp = largest[1]()
+	names = [p.name for p in comp.ports]
+	rng = random.Random(0)
+	prefixes = [name[:rng.randint(1, len(name))] for name in rng.choices(names, k=args.queries)]
+	start = time.perf_counter()
+	index = PortIndex(comp, lazy=True)
+	build_s = time.perf_counter() - start
+	start = time.perf_counter()
+	indexed = [index.names_with_prefix(prefix) for prefix in prefixes]
+	index_s = time.perf_counter() - start
+	start = time.perf_counter()
+	scanned = [list(dict.fromkeys(p.name for p in comp.ports if p.name.startswith(prefix))) for prefix in prefixes]
+	scan_s = time.perf_counter() - start
+	if indexed != scanned:
+		raise SystemExit("prefix queries differ")
+	print(f"\n{args.queries} prefix queries on {len(names)} ports: scan {scan_s:.3f} s, index {index_s:.4f} s (+{build_s:.4f} s to build it)")
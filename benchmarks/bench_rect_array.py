@@ -0,0 +1,146 @@
+"""
+equivalence check + benchmark: via_array built with the RectArray kernel (via stacks arrayed as integer numpy
+rectangles and inserted once) vs the previous via_array (one reference per via stack, flattened)
+
+usage: PDK_ROOT=/path/to/pdks python benchmarks/bench_rect_array.py [--sizes 2 8 20] [--fingers 4 8]
+
+builds via arrays (sky130) of increasing size and nmos transistors (which use via_array for every source/drain)
+with both implementations. the merged geometry of every layer and the port names, transformations, widths and
+layers must be identical. build time, peak traced python memory and the number of allocated python objects are reported.
+"""
+from argparse import ArgumentParser
+import gc
+import time
+import tracemalloc
+
+import gdsfactory as gf
+from gdsfactory.component import Component
+from gdsfactory.components import rectangle
+import klayout.db as kdb
+
+from glayout.pdk.mappedpdk import MappedPDK
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+from glayout.primitives import fet, via_gen
+from glayout.util.bbox_cache import clear_bbox_cache
+from glayout.util.cell_cache import cell_name, clear_cell_cache
+from glayout.util.comp_utils import evaluate_bbox, prec_array, prec_ref_center, to_decimal
+from glayout.util.port_utils import rename_ports_by_orientation
+from glayout.util.snap_to_grid import component_snap_to_grid
+from math import floor
+
+
+@gf.cell
+def legacy_via_array(
+	pdk: MappedPDK,
+	glayer1: str,
+	glayer2: str,
+	size: tuple[float | None, float | None] | None = None,
+	minus1: bool = False,
+	num_vias: tuple[int | None, int | None] | None = None,
+	lay_bottom: bool = True,
+	fullbottom: bool = False,
+	no_exception: bool = False,
+	lay_every_layer: bool = False
+) -> Component:
+	"""via_array before the RectArray kernel"""
+	ordered_layer_info = getattr(via_gen, "__error_check_order_layers")(pdk, glayer1, glayer2)
+	level1, level2 = ordered_layer_info[0]
+	glayer1, glayer2 = ordered_layer_info[1]
+	viaarray = Component(name=cell_name(f"viaarray_{glayer1}_{glayer2}"))
+	if level1 == level2:
+		return viaarray
+	viastack = via_gen.via_stack(pdk, glayer1, glayer2)
+	viadim = evaluate_bbox(viastack)[0]
+	via_abs_spacing, top_enclosure = getattr(via_gen, "__get_viastack_minseperation")(pdk, viastack, ordered_layer_info)
+	cnum_vias = 2*[None]
+	for i in range(2):
+		if (num_vias[i] if num_vias else False):
+			cnum_vias[i] = num_vias[i]
+		elif (size[i] if size else False):
+			dim = pdk.snap_to_2xgrid_fast(size[i])
+			fltnum = floor((dim - top_enclosure) / (via_abs_spacing)) or 1
+			fltnum = 1 if fltnum < 1 else fltnum
+			cnum_vias[i] = ((fltnum - 1) or 1) if minus1 else fltnum
+			if to_decimal(viadim) > to_decimal(dim) and not no_exception:
+				raise ValueError(f"via_array,size:dim#{i}={dim} < {viadim}")
+		else:
+			raise ValueError("give at least 1: num_vias or size for each dim")
+	viaarray_ref = prec_ref_center(prec_array(viastack, columns=cnum_vias[0], rows=cnum_vias[1], spacing=2*[via_abs_spacing],absolute_spacing=True))
+	viaarray.add(viaarray_ref)
+	viaarray.add_ports(viaarray_ref.ports,prefix="array_")
+	viadims = evaluate_bbox(viaarray)
+	if not size:
+		size = 2*[None]
+	size = [size[i] if size[i] else viadims[i] for i in range(2)]
+	size = [viadims[i] if viadims[i]>size[i] else size[i] for i in range(2)]
+	if lay_bottom or fullbottom or lay_every_layer:
+		bdims = evaluate_bbox(viaarray.extract(layers=[pdk.get_glayer(glayer1)]))
+		bref = viaarray << rectangle(size=(size if fullbottom else bdims), layer=pdk.get_glayer(glayer1), centered=True)
+		viaarray.add_ports(bref.ports, prefix="bottom_lay_")
+	else:
+		viaarray = viaarray.remove_layers(layers=[pdk.get_glayer(glayer1)],recursive=False)
+	tref = viaarray << rectangle(size=size, layer=pdk.get_glayer(glayer2), centered=True)
+	viaarray.add_ports(tref.ports, prefix="top_met_")
+	if lay_every_layer:
+		for i in range(level1+1,level2):
+			bdims = evaluate_bbox(viaarray.extract(layers=[pdk.get_glayer(f"met{i}")]))
+			viaarray << rectangle(size=bdims, layer=pdk.get_glayer(f"met{i}"), centered=True)
+	return component_snap_to_grid(rename_ports_by_orientation(viaarray))
+
+
+def signature(comp: Component) -> tuple[dict, list]:
+	"""(merged geometry per layer, ports) of the flattened comp"""
+	geometry = dict()
+	for index in comp.kcl.layer_indexes():
+		region = kdb.Region(comp.begin_shapes_rec(index)).merged()
+		if not region.is_empty():
+			geometry[str(comp.kcl.get_info(index))] = sorted(str(polygon) for polygon in region.each())
+	ports = [(p.name, str(p.trans), p.width, str(p.layer)) for p in comp.ports]
+	return geometry, ports
+
+
+def build(generator) -> tuple[float, float, int, tuple]:
+	"""(seconds, peak MB, allocated python objects, signature) of a cold build"""
+	gf.clear_cache()
+	clear_cell_cache()
+	clear_bbox_cache()
+	gc.collect()
+	tracemalloc.start()
+	start = time.perf_counter()
+	comp = generator()
+	elapsed = time.perf_counter() - start
+	snapshot = tracemalloc.take_snapshot()
+	peak = tracemalloc.get_traced_memory()[1] / 2**20
+	tracemalloc.stop()
+	objects = sum(stat.count for stat in snapshot.statistics("filename"))
+	return elapsed, peak, objects, signature(comp)
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="check and benchmark via_array on the RectArray kernel")
+	parser.add_argument("--sizes", type=int, nargs="+", default=[2, 8, 20], help="via array sizes in um")
+	parser.add_argument("--fingers", type=int, nargs="*", default=[4, 8])
+	args = parser.parse_args()
+	pdk = sky130_mapped_pdk
+	pdk.activate()
+	generators = dict()
+	for size in args.sizes:
+		generators[f"met1-met3 {size}um"] = lambda size=size: via_gen.via_array(pdk, "met1", "met3", size=(size, size))
+		generators[f"diff-met2 {size}um"] = lambda size=size: via_gen.via_array(pdk, "active_diff", "met2", size=(size, size), lay_every_layer=True)
+	generators["diff-met1 no bot"] = lambda: via_gen.via_array(pdk, "active_diff", "met1", size=(1, 3), minus1=True, lay_bottom=False)
+	for fingers in args.fingers:
+		generators[f"nmos f={fingers}"] = lambda fingers=fingers: fet.nmos(pdk, width=3, fingers=fingers, multipliers=1)
+	new_via_array = via_gen.via_array
+	print(f"{'block':<18}{'legacy s':>10}{'kernel s':>10}{'speedup':>9}{'legacy MB':>11}{'kernel MB':>11}{'legacy objs':>13}{'kernel objs':>13}")
+	for name, generator in generators.items():
+		via_gen.via_array = fet.via_array = legacy_via_array
+		try:
+			legacy_s, legacy_mb, legacy_objs, legacy_sig = build(generator)
+		finally:
+			via_gen.via_array = fet.via_array = new_via_array
+		new_s, new_mb, new_objs, new_sig = build(generator)
+		if legacy_sig[0] != new_sig[0]:
+			raise SystemExit(f"geometry of {name} differs")
+		if legacy_sig[1] != new_sig[1]:
+			raise SystemExit(f"ports of {name} differ")
+		print(f"{name:<18}{legacy_s:>10.3f}{new_s:>10.3f}{legacy_s / new_s:>8.1f}x{legacy_mb:>11.1f}{new_mb:>11.1f}{legacy_objs:>13}{new_objs:>13}")
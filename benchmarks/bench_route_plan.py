@@ -0,0 +1,135 @@
+"""
+equivalence check + benchmark: routes planned with RoutePlan (flattened together when committed) vs
+straight_route / L_route / c_route (each route flattened by its router)
+
+usage: PDK_ROOT=/path/to/pdks python benchmarks/bench_route_plan.py [--routes 50] [--seed 0] [--kinds straight L c]
+
+places via arrays (sky130) at random positions and connects them with random straight, L and c routes on met2/met3,
+once with the routers (top << router(pdk, ...)) and once with a RoutePlan. the merged geometry of every layer of the
+two tops must be identical and every route must return the same ports (name, transformation, width, layer).
+the time to route and the number of cells created are reported. layout operations slow down as the layout grows, so
+each side is timed in a fresh process of its own (timing both in one process favours the side which runs first).
+"""
+from argparse import ArgumentParser
+from multiprocessing import get_context
+import random
+import time
+
+import gdsfactory as gf
+from gdsfactory.component import Component
+import klayout.db as kdb
+
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+from glayout.primitives.via_gen import via_array
+from glayout.routing.c_route import c_route
+from glayout.routing.L_route import L_route
+from glayout.routing.route_plan import RoutePlan
+from glayout.routing.straight_route import straight_route
+
+
+def geometry(comp: Component) -> dict[str, list[str]]:
+	"""merged geometry per layer of comp"""
+	merged = dict()
+	for index in comp.kcl.layer_indexes():
+		region = kdb.Region(comp.begin_shapes_rec(index)).merged()
+		if not region.is_empty():
+			merged[str(comp.kcl.get_info(index))] = sorted(str(polygon) for polygon in region.each())
+	return merged
+
+
+def port_signature(ports) -> list[tuple]:
+	return sorted((p.name, str(p.trans), p.width, str(p.layer)) for p in ports)
+
+
+KINDS = {"straight": straight_route, "L": L_route, "c": c_route}
+
+
+def connections(pdk, count: int, seed: int, kinds: list[str] = list(KINDS)) -> tuple[Component, list[tuple]]:
+	"""a top with via arrays and the (router, args, kwargs) connections of kinds among count random connections"""
+	rng = random.Random(seed)
+	top = Component(name="route_plan_pads")
+	arrays = [via_array(pdk, "met1", "met2", size=(size, size)) for size in (1, 2, 3)]
+	routes = list()
+	for _ in range(count):
+		pad1 = top << rng.choice(arrays)
+		pad2 = top << rng.choice(arrays)
+		pad1.movex(rng.randint(-2000, 2000) / 100).movey(rng.randint(-2000, 2000) / 100)
+		kind = rng.choice(("straight", "L", "c"))
+		if kind == "straight":
+			pad2.movex(pad1.xmax + rng.randint(100, 2000) / 100).movey(pad1.center[1] + rng.randint(-50, 50) / 100)
+			kwargs = dict(glayer1=rng.choice(("met2", "met3")), glayer2=rng.choice(("met2", "met3")))
+			routes.append((straight_route, (pad1.ports["top_met_E"], pad2.ports["top_met_W"]), kwargs))
+		elif kind == "L":
+			pad2.movex(pad1.xmax + rng.randint(300, 2000) / 100).movey(pad1.center[1] + rng.choice((-1, 1)) * rng.randint(500, 2000) / 100)
+			edge2 = pad2.ports["top_met_S"] if pad2.center[1] > pad1.center[1] else pad2.ports["top_met_N"]
+			kwargs = dict(hglayer="met2", vglayer="met3", fullbottom=rng.choice((True, False)))
+			routes.append((L_route, (pad1.ports["top_met_E"], edge2), kwargs))
+		else:
+			pad2.movex(rng.randint(-2000, 2000) / 100).movey(rng.randint(-2000, 2000) / 100)
+			side = rng.choice("NESW")
+			kwargs = dict(extension=rng.choice((0.5, 1, 2)), viaoffset=rng.choice(((True, True), (False, False), None)))
+			routes.append((c_route, (pad1.ports["top_met_" + side], pad2.ports["top_met_" + side]), kwargs))
+	routers = [KINDS[kind] for kind in kinds]
+	return top, [route for route in routes if route[0] in routers]
+
+
+def route_with_routers(pdk, top: Component, routes: list[tuple]) -> list[list[tuple]]:
+	ports = list()
+	for router, args, kwargs in routes:
+		ports.append(port_signature((top << router(pdk, *args, **kwargs)).ports))
+	return ports
+
+
+def route_with_plan(pdk, top: Component, routes: list[tuple]) -> tuple[list[list[tuple]], RoutePlan]:
+	plan = RoutePlan(pdk)
+	methods = {straight_route: plan.straight_route, L_route: plan.L_route, c_route: plan.c_route}
+	ports = list()
+	for router, args, kwargs in routes:
+		ports.append(port_signature(methods[router](*args, **kwargs).values()))
+	plan.commit(top)
+	return ports, plan
+
+
+def timed(side: str, count: int, seed: int, kinds: list[str]) -> tuple[float, int]:
+	"""seconds to route the connections with the routers (side="routers") or a plan and cells created"""
+	pdk = sky130_mapped_pdk
+	pdk.activate()
+	pads, routes = connections(pdk, count, seed, kinds)
+	route = route_with_plan if side == "plan" else route_with_routers
+	# warm up the cell caches of the via stacks and arrays
+	route(pdk, Component(name="route_plan_warmup"), routes[:3])
+	top = Component(name=f"route_plan_{side}")
+	top << pads
+	cells = len(list(gf.kcl.each_cell()))
+	start = time.perf_counter()
+	route(pdk, top, routes)
+	return time.perf_counter() - start, len(list(gf.kcl.each_cell())) - cells
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="check and benchmark RoutePlan against the routers")
+	parser.add_argument("--routes", type=int, default=50, help="number of random connections")
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--kinds", nargs="*", choices=list(KINDS), default=list(KINDS), help="routers to use")
+	args = parser.parse_args()
+	pdk = sky130_mapped_pdk
+	pdk.activate()
+	pads, routes = connections(pdk, args.routes, args.seed, args.kinds)
+	router_top = Component(name="route_plan_routers")
+	router_top << pads
+	router_ports = route_with_routers(pdk, router_top, routes)
+	plan_top = Component(name="route_plan_plan")
+	plan_top << pads
+	plan_ports, plan = route_with_plan(pdk, plan_top, routes)
+	for i, (router, _, _) in enumerate(routes):
+		if router_ports[i] != plan_ports[i]:
+			raise SystemExit(f"ports of route {i} ({router.__name__}) differ:\n{router_ports[i]}\n{plan_ports[i]}")
+	if geometry(router_top) != geometry(plan_top):
+		raise SystemExit("geometry differs")
+	with get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+		router_s, router_cells = pool.apply(timed, ("routers", args.routes, args.seed, args.kinds))
+		plan_s, plan_cells = pool.apply(timed, ("plan", args.routes, args.seed, args.kinds))
+	print(f"{'':<10}{'routes':>8}{'seconds':>10}{'ms/route':>10}{'cells':>8}")
+	print(f"{'routers':<10}{len(routes):>8}{router_s:>10.3f}{1000 * router_s / len(routes):>10.2f}{router_cells:>8}")
+	print(f"{'RoutePlan':<10}{len(plan):>8}{plan_s:>10.3f}{1000 * plan_s / len(routes):>10.2f}{plan_cells:>8}")
+	print(f"speedup {router_s / plan_s:.2f}x")
@@ -0,0 +1,141 @@
+"""
+equivalence check + benchmark: generators finalized with the hierarchy kept (snap_to_grid.keep_hierarchy)
+vs flattened (the previous component_snap_to_grid / flatten at the end of every generator)
+
+usage: PDK_ROOT=/path/to/pdks python benchmarks/bench_snap_hierarchy.py [--fingers 4 8] [--devices 8]
+
+sky130 transistors (with dummies and taprings) and an array of devices placed like a block places them are
+built in both modes. the merged flattened geometry and the ports must be identical. the number of polygons
+stored (over all unique cells), the GDS size (geometry only and as write_gds writes it, with the port and info
+metadata of every cell) and the build time are reported.
+the elementary blocks (diff_pair, current_mirror, fvf) are tried as well, but with gdsfactory 9 they do not
+build in either mode and are reported and skipped: the numbers cover transistors and device arrays, not
+composite blocks.
+"""
+from argparse import ArgumentParser
+from pathlib import Path
+import tempfile
+import time
+
+import gdsfactory as gf
+from gdsfactory.component import Component
+import klayout.db as kdb
+
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+from glayout.primitives.fet import nmos, pmos
+from glayout.primitives.via_gen import via_array
+from glayout.util.bbox_cache import clear_bbox_cache
+from glayout.util.cell_cache import clear_cell_cache
+from glayout.util.comp_utils import movex
+from glayout.util.snap_to_grid import finalize_component, keep_hierarchy
+
+
+def device_array(pdk, fingers: int, devices: int) -> Component:
+	"""a row of transistors with a via array on every gate, finalized like a block"""
+	top = Component(name=f"device_array_f{fingers}_d{devices}")
+	fet = nmos(pdk, width=2, fingers=fingers, with_dummy=True, with_tie=True)
+	via = via_array(pdk, "met1", "met2", size=(2, 2))
+	pitch = fet.xsize + pdk.util_max_metal_seperation()
+	for i in range(devices):
+		ref = movex(top << fet, i * pitch)
+		movex(top << via, i * pitch).movey(fet.ysize / 2 + via.ysize)
+		top.add_ports(ref.ports, prefix=f"fet{i}_")
+	return finalize_component(top)
+
+
+def blocks(pdk) -> dict:
+	"""elementary blocks, None for the blocks which cannot be imported here"""
+	generators = dict()
+	try:
+		from glayout.blocks.elementary.diff_pair.diff_pair import diff_pair
+		generators["diff_pair"] = lambda: diff_pair(pdk)
+	except Exception as error:
+		generators["diff_pair"] = error
+	try:
+		from glayout.blocks.elementary.current_mirror.current_mirror import current_mirror
+		generators["current_mirror"] = lambda: current_mirror(pdk)
+	except Exception as error:
+		generators["current_mirror"] = error
+	try:
+		from glayout.blocks.elementary.FVF.fvf import flipped_voltage_follower
+		generators["fvf"] = lambda: flipped_voltage_follower(pdk)
+	except Exception as error:
+		generators["fvf"] = error
+	return generators
+
+
+def signature(comp: Component) -> tuple:
+	geometry = dict()
+	for index in comp.kcl.layer_indexes():
+		region = kdb.Region(comp.begin_shapes_rec(index)).merged()
+		if not region.is_empty():
+			geometry[str(comp.kcl.get_info(index))] = sorted(str(polygon) for polygon in region.each())
+	return geometry, sorted((p.name, str(p.trans), p.width, str(p.layer)) for p in comp.ports)
+
+
+def stored_polygons(comp: Component) -> int:
+	"""shapes held by comp and by each unique cell it instantiates"""
+	cell = comp.kdb_cell
+	layout = cell.layout()
+	cells = [cell] + [layout.cell(index) for index in cell.called_cells()]
+	return sum(c.shapes(layer).size() for c in cells for layer in layout.layer_indexes())
+
+
+def gds_bytes(comp: Component) -> tuple[int, int]:
+	"""size of the GDS holding only the layout of comp and of the GDS write_gds writes"""
+	with tempfile.TemporaryDirectory() as directory:
+		path = Path(directory) / f"{comp.name}.gds"
+		options = kdb.SaveLayoutOptions()
+		options.write_context_info = False
+		options.clear_cells()
+		options.add_cell(comp.kdb_cell.cell_index())
+		comp.kcl.layout.write(str(path), options)
+		geometry = path.stat().st_size
+		comp.write_gds(path)
+		return geometry, path.stat().st_size
+
+
+def build(generator, hierarchy: bool) -> tuple[float, tuple, int, tuple[int, int]]:
+	"""build time, signature, stored polygons and GDS bytes (measured before the next build clears the cells)"""
+	gf.clear_cache()
+	clear_cell_cache()
+	clear_bbox_cache()
+	with keep_hierarchy(hierarchy):
+		start = time.perf_counter()
+		comp = generator()
+		seconds = time.perf_counter() - start
+	return seconds, signature(comp), stored_polygons(comp), gds_bytes(comp)
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="check and measure generators finalized with the hierarchy kept")
+	parser.add_argument("--fingers", type=int, nargs="*", default=[4, 8])
+	parser.add_argument("--devices", type=int, default=8, help="transistors in the device array")
+	args = parser.parse_args()
+	# columns: flat, hierarchy kept, flat / hierarchy kept
+	pdk = sky130_mapped_pdk
+	pdk.activate()
+	generators = dict()
+	for fingers in args.fingers:
+		generators[f"nmos f={fingers}"] = lambda fingers=fingers: nmos(pdk, width=2, fingers=fingers)
+		generators[f"pmos f={fingers} tie"] = lambda fingers=fingers: pmos(pdk, width=2, fingers=fingers, with_dummy=True, with_substrate_tap=True)
+		generators[f"array f={fingers}"] = lambda fingers=fingers: device_array(pdk, fingers, args.devices)
+	generators.update(blocks(pdk))
+	print(f"{'block':<20}{'polygons':>15}{'ratio':>7}{'geometry kB':>17}{'ratio':>7}{'write_gds kB':>17}{'ratio':>7}{'build s':>13}")
+	for name, generator in generators.items():
+		if isinstance(generator, Exception):
+			print(f"{name:<20}cannot be imported here: {type(generator).__name__}: {generator}")
+			continue
+		try:
+			flat_s, flat_sig, flat_poly, flat_bytes = build(generator, False)
+			hier_s, hier_sig, hier_poly, hier_bytes = build(generator, True)
+		except Exception as error:
+			print(f"{name:<20}does not build here: {type(error).__name__}: {str(error)[:80]}")
+			continue
+		if flat_sig != hier_sig:
+			raise SystemExit(f"{name} differs")
+		columns = [f"{flat_poly:>7} {hier_poly:>7}{flat_poly / hier_poly:>6.1f}x"]
+		for flat_size, hier_size in zip(flat_bytes, hier_bytes):
+			columns.append(f"{flat_size / 1e3:>8.1f} {hier_size / 1e3:>8.1f}{flat_size / hier_size:>6.1f}x")
+		columns.append(f"{flat_s:>6.2f} {hier_s:>6.2f}")
+		print(f"{name:<20}" + "".join(columns))
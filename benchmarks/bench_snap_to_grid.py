@@ -0,0 +1,48 @@
+"""
+benchmark: MappedPDK.snap_to_2xgrid (Decimal) vs snap_to_2xgrid_fast (integer grid, NumPy)
+
+usage: PDK_ROOT=/path/to/pdks python benchmarks/bench_snap_to_grid.py [-n 1000000] [--seed 0]
+
+for sky130, gf180 and ihp130 times snapping n coordinates (tests/test_snap_to_2xgrid.py checks that both
+implementations return bit identical floats):
+decimal = snap_to_2xgrid(list) (the exact reference)
+scalar  = snap_to_2xgrid_fast called once per coordinate
+array   = snap_to_2xgrid_fast called once on an ndarray
+"""
+from argparse import ArgumentParser
+import time
+
+import numpy as np
+
+from glayout.pdk.mappedpdk import MappedPDK
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+from glayout.pdk.gf180_mapped import gf180_mapped_pdk
+from glayout.pdk.ihp130_mapped import ihp130_mapped_pdk
+
+
+def bench_pdk(pdk: MappedPDK, number: int, rng: np.random.Generator) -> dict[str, float]:
+	dims = rng.uniform(-1000, 1000, number)
+	dims_list = dims.tolist()
+	results = dict()
+	for label, run in [
+		("decimal", lambda: pdk.snap_to_2xgrid(dims_list)),
+		("scalar", lambda: [pdk.snap_to_2xgrid_fast(dim) for dim in dims_list]),
+		("array", lambda: pdk.snap_to_2xgrid_fast(dims)),
+	]:
+		start = time.perf_counter()
+		run()
+		results[label] = time.perf_counter() - start
+	return results
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="benchmark MappedPDK.snap_to_2xgrid_fast")
+	parser.add_argument("-n", "--number", type=int, default=10**6, help="coordinates to snap in the benchmark")
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+	rng = np.random.default_rng(args.seed)
+	print(f"{'pdk':<8}{'decimal s':>12}{'scalar s':>12}{'array s':>12}{'speedup':>10}")
+	for pdk in [sky130_mapped_pdk, gf180_mapped_pdk, ihp130_mapped_pdk]:
+		res = bench_pdk(pdk, args.number, rng)
+		speedup = res["decimal"] / res["array"]
+		print(f"{pdk.name:<8}{res['decimal']:>12.3f}{res['scalar']:>12.3f}{res['array']:>12.4f}{speedup:>9.0f}x")
@@ -0,0 +1,69 @@
+"""
+equivalence check + benchmark: symmetry scores with gdsfactory boolean XOR vs the NumPy raster engine
+
+usage: PDK_ROOT=/path/to/pdks python benchmarks/bench_symmetry.py [--repeat 3] [--tolerance 1e-3]
+
+builds the blocks used by the ATLAS dataset (sky130), then for each block compares
+boolean = physical_features.calculate_symmetry_scores_boolean (two component copies + two boolean XORs)
+raster  = symmetry.symmetry_report (flattened per layer polygons, XOR of integer rasters)
+blocks which fail to build are skipped. the largest per layer asymmetry of every block is printed as well.
+"""
+from argparse import ArgumentParser
+import time
+
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+from glayout.primitives.fet import nmos, pmos
+from glayout.blocks.elementary.FVF.fvf import flipped_voltage_follower
+from glayout.blocks.elementary.current_mirror.current_mirror import current_mirror
+from glayout.blocks.elementary.diff_pair.diff_pair import diff_pair
+from glayout.blocks.elementary.transmission_gate.transmission_gate import transmission_gate
+from glayout.blocks.evaluator_box.physical_features import calculate_symmetry_scores_boolean
+from glayout.blocks.evaluator_box.symmetry import symmetry_report
+
+
+BLOCKS = {
+	"nmos": lambda pdk: nmos(pdk, width=3, fingers=4, multipliers=2),
+	"pmos": lambda pdk: pmos(pdk, width=3, fingers=4, multipliers=2),
+	"transmission_gate": lambda pdk: transmission_gate(pdk, width=(2, 4), fingers=(2, 2)),
+	"fvf": lambda pdk: flipped_voltage_follower(pdk, width=(3, 3), fingers=(2, 2)),
+	"current_mirror": lambda pdk: current_mirror(pdk, numcols=3),
+	"diff_pair": lambda pdk: diff_pair(pdk, width=3, fingers=4),
+}
+
+
+def best_time(run, repeat: int) -> tuple[float, object]:
+	best, result = float("inf"), None
+	for _ in range(repeat):
+		start = time.perf_counter()
+		result = run()
+		best = min(best, time.perf_counter() - start)
+	return best, result
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="compare boolean and raster symmetry scoring on the ATLAS blocks")
+	parser.add_argument("--repeat", type=int, default=3, help="best of this many runs is reported")
+	parser.add_argument("--tolerance", type=float, default=1e-3, help="max allowed score difference")
+	args = parser.parse_args()
+	pdk = sky130_mapped_pdk
+	pdk.activate()
+	print(f"{'block':<20}{'boolean h/v':>20}{'raster h/v':>20}{'boolean s':>11}{'raster s':>10}{'speedup':>9}  worst layer")
+	failed = list()
+	for name, build in BLOCKS.items():
+		try:
+			component = build(pdk)
+		except Exception as e:
+			print(f"{name:<20}skipped ({type(e).__name__}: {e})")
+			continue
+		boolean_s, (boolean_h, boolean_v) = best_time(lambda: calculate_symmetry_scores_boolean(component), args.repeat)
+		raster_s, report = best_time(lambda: symmetry_report(component), args.repeat)
+		raster_h, raster_v = report["symmetry_score_horizontal"], report["symmetry_score_vertical"]
+		worst_layer = max(report["layers"], key=lambda layer: max(report["layers"][layer]["asymmetry_x"], report["layers"][layer]["asymmetry_y"]))
+		print(
+			f"{name:<20}{boolean_h:>10.4f}{boolean_v:>10.4f}{raster_h:>10.4f}{raster_v:>10.4f}"
+			f"{boolean_s:>11.3f}{raster_s:>10.4f}{boolean_s / raster_s:>8.0f}x  {worst_layer}"
+		)
+		if max(abs(boolean_h - raster_h), abs(boolean_v - raster_v)) > args.tolerance:
+			failed.append(name)
+	if failed:
+		raise SystemExit(f"scores differ by more than {args.tolerance} for: {', '.join(failed)}")
@@ -0,0 +1,83 @@
+"""
+equivalence check + benchmark: via_array with the per pdk via table (via_pitch) vs measuring the via stack
+(extract + bbox per layer) on every call
+
+usage: PDK_ROOT=/path/to/pdks python benchmarks/bench_via_pitch.py [--calls 200] [--seed 0] [--repeat 2]
+
+routes, multipliers and mimcaps call via_array with many different sizes, so every call is a new cell.
+the benchmark builds --calls random (layer pair, size) via arrays (sky130) twice: with the via table emptied before
+every call (what every call paid before the table) and with the table kept. geometry and ports must be identical
+to the via_array before the RectArray kernel (legacy_via_array of bench_rect_array.py).
+"""
+from argparse import ArgumentParser
+import random
+import time
+
+import gdsfactory as gf
+
+from bench_rect_array import legacy_via_array, signature
+from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+from glayout.primitives import via_gen
+from glayout.util.bbox_cache import clear_bbox_cache
+from glayout.util.cell_cache import clear_cell_cache
+
+
+LAYER_PAIRS = [("active_diff", "met1"), ("poly", "met1"), ("met1", "met2"), ("met2", "met3"), ("met1", "met4"), ("met4", "met5"), ("active_diff", "met3")]
+
+
+def build_all(calls, empty_table: bool) -> tuple[float, list]:
+	"""(seconds, signatures) of building every via array of calls on a cold cell cache"""
+	gf.clear_cache()
+	clear_cell_cache()
+	clear_bbox_cache()
+	pdk = sky130_mapped_pdk
+	comps = list()
+	start = time.perf_counter()
+	for glayer1, glayer2, size in calls:
+		if empty_table:
+			pdk.via_table().clear()
+		comps.append(via_gen.via_array(pdk, glayer1, glayer2, size=size))
+	elapsed = time.perf_counter() - start
+	return elapsed, [signature(comp) for comp in comps]
+
+
+if __name__ == "__main__":
+	parser = ArgumentParser(description="check and benchmark the via table of via_array")
+	parser.add_argument("--calls", type=int, default=200)
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--repeat", type=int, default=2)
+	args = parser.parse_args()
+	pdk = sky130_mapped_pdk
+	pdk.activate()
+	rng = random.Random(args.seed)
+	calls = list()
+	for _ in range(args.calls):
+		glayer1, glayer2 = rng.choice(LAYER_PAIRS)
+		calls.append((glayer1, glayer2, (round(rng.uniform(2, 8), 2), round(rng.uniform(2, 8), 2))))
+	# the layout keeps growing between builds, alternate the order and report the best of --repeat
+	untabled_s = tabled_s = float("inf")
+	for repeat in range(args.repeat):
+		for empty_table in ((True, False) if repeat % 2 == 0 else (False, True)):
+			elapsed, sigs = build_all(calls, empty_table=empty_table)
+			if empty_table:
+				untabled_s, untabled = min(untabled_s, elapsed), sigs
+			else:
+				tabled_s, tabled = min(tabled_s, elapsed), sigs
+	if untabled != tabled:
+		raise SystemExit("table and no table differ")
+	for (glayer1, glayer2, size), sig in zip(calls, tabled):
+		if signature(legacy_via_array(pdk, glayer1, glayer2, size=size)) != sig:
+			raise SystemExit(f"via_array {glayer1} {glayer2} {size} differs")
+	print(f"{args.calls} via arrays: no table {untabled_s:.2f} s, via table {tabled_s:.2f} s ({untabled_s / tabled_s:.1f}x)")
+	start = time.perf_counter()
+	for glayer1, glayer2 in LAYER_PAIRS:
+		pdk.via_table().clear()
+		via_gen.via_pitch(pdk, glayer1, glayer2)
+	measure_s = (time.perf_counter() - start) / len(LAYER_PAIRS)
+	for glayer1, glayer2 in LAYER_PAIRS:
+		via_gen.via_pitch(pdk, glayer1, glayer2)
+	start = time.perf_counter()
+	for glayer1, glayer2 in LAYER_PAIRS:
+		via_gen.via_pitch(pdk, glayer1, glayer2)
+	lookup_s = (time.perf_counter() - start) / len(LAYER_PAIRS)
+	print(f"per layer pair: measuring the via stack {measure_s * 1e3:.2f} ms, table lookup {lookup_s * 1e3:.3f} ms")
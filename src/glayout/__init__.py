@@ -1,37 +1,127 @@
 """
 Glayout - A PDK-agnostic layout automation framework for analog circuit design
+
+The public names are loaded on first access (module level __getattr__), so `from glayout import sky130`
+only imports the sky130 pdk and what it needs, not the other pdks, primitives, routing and placement.
 """
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .pdk.mappedpdk import MappedPDK
+    from .pdk.sky130_mapped import sky130_mapped_pdk as sky130
+    from .pdk.gf180_mapped import gf180_mapped_pdk as gf180
+    from .pdk.ihp130_mapped import ihp130_mapped_pdk as ihp130
+
+    from .primitives.via_gen import via_stack, via_array, via_pitch
+    from .primitives.fet import nmos, pmos, multiplier
+    from .primitives.guardring import tapring
+    from .primitives.mimcap import mimcap, mimcap_array
+    from .primitives.resistor import resistor
+
+    from .spice import Netlist
+
+    from .util.port_utils import PortTree, PortIndex, port_index, parse_direction, proc_angle, ports_inline, ports_parallel, rename_component_ports, rename_ports_by_list, rename_ports_by_orientation, remove_ports_with_prefix, add_ports_perimeter, get_orientation, assert_port_manhattan, assert_ports_perpindicular, set_port_orientation, set_port_width, print_ports, create_private_ports, print_port_tree_all_cells
+
+    from .util.comp_utils import move, movex, movey, align_comp_to_port,evaluate_bbox, center_to_edge_distance, to_float, to_decimal, prec_array, prec_center, prec_ref_center, get_padding_points_cc, get_primitive_rectangle
+
+    from .util.snap_to_grid import component_snap_to_grid
+    from .util.rect_array import RectArray
 
-from .pdk.mappedpdk import MappedPDK
-from .pdk.sky130_mapped import sky130_mapped_pdk as sky130
-from .pdk.gf180_mapped import gf180_mapped_pdk as gf180
-from .pdk.ihp130_mapped import ihp130_mapped_pdk as ihp130
+    from .routing.c_route import c_route
+    from .routing.L_route import L_route
+    from .routing.straight_route import straight_route
+    from .routing.smart_route import smart_route
+    from .routing.route_plan import RoutePlan
 
-from .primitives.via_gen import via_stack, via_array
-from .primitives.fet import nmos, pmos, multiplier
-from .primitives.guardring import tapring
-from .primitives.mimcap import mimcap, mimcap_array
-from .primitives.resistor import resistor
+    from .placement.common_centroid_ab_ba import common_centroid_ab_ba
+    from .placement.four_transistor_interdigitized import generic_4T_interdigitzed
+    from .placement.two_transistor_interdigitized import two_transistor_interdigitized,two_pfet_interdigitized,two_nfet_interdigitized,macro_two_transistor_interdigitized
+    from .placement.two_transistor_place import two_transistor_place
 
-from .spice import Netlist
+# public name -> module it is defined in (relative to this package), or (module, attribute) if renamed on export
+_LAZY_ATTRIBUTES = {
+    "MappedPDK": ".pdk.mappedpdk",
+    "sky130": (".pdk.sky130_mapped", "sky130_mapped_pdk"),
+    "gf180": (".pdk.gf180_mapped", "gf180_mapped_pdk"),
+    "ihp130": (".pdk.ihp130_mapped", "ihp130_mapped_pdk"),
+    "via_stack": ".primitives.via_gen",
+    "via_array": ".primitives.via_gen",
+    "via_pitch": ".primitives.via_gen",
+    "nmos": ".primitives.fet",
+    "pmos": ".primitives.fet",
+    "multiplier": ".primitives.fet",
+    "tapring": ".primitives.guardring",
+    "mimcap": ".primitives.mimcap",
+    "mimcap_array": ".primitives.mimcap",
+    "resistor": ".primitives.resistor",
+    "Netlist": ".spice",
+    "PortTree": ".util.port_utils",
+    "PortIndex": ".util.port_utils",
+    "port_index": ".util.port_utils",
+    "parse_direction": ".util.port_utils",
+    "proc_angle": ".util.port_utils",
+    "ports_inline": ".util.port_utils",
+    "ports_parallel": ".util.port_utils",
+    "rename_component_ports": ".util.port_utils",
+    "rename_ports_by_list": ".util.port_utils",
+    "rename_ports_by_orientation": ".util.port_utils",
+    "remove_ports_with_prefix": ".util.port_utils",
+    "add_ports_perimeter": ".util.port_utils",
+    "get_orientation": ".util.port_utils",
+    "assert_port_manhattan": ".util.port_utils",
+    "assert_ports_perpindicular": ".util.port_utils",
+    "set_port_orientation": ".util.port_utils",
+    "set_port_width": ".util.port_utils",
+    "print_ports": ".util.port_utils",
+    "create_private_ports": ".util.port_utils",
+    "print_port_tree_all_cells": ".util.port_utils",
+    "move": ".util.comp_utils",
+    "movex": ".util.comp_utils",
+    "movey": ".util.comp_utils",
+    "align_comp_to_port": ".util.comp_utils",
+    "evaluate_bbox": ".util.comp_utils",
+    "center_to_edge_distance": ".util.comp_utils",
+    "to_float": ".util.comp_utils",
+    "to_decimal": ".util.comp_utils",
+    "prec_array": ".util.comp_utils",
+    "prec_center": ".util.comp_utils",
+    "prec_ref_center": ".util.comp_utils",
+    "get_padding_points_cc": ".util.comp_utils",
+    "get_primitive_rectangle": ".util.comp_utils",
+    "component_snap_to_grid": ".util.snap_to_grid",
+    "RectArray": ".util.rect_array",
+    "c_route": ".routing.c_route",
+    "L_route": ".routing.L_route",
+    "straight_route": ".routing.straight_route",
+    "smart_route": ".routing.smart_route",
+    "RoutePlan": ".routing.route_plan",
+    "common_centroid_ab_ba": ".placement.common_centroid_ab_ba",
+    "generic_4T_interdigitzed": ".placement.four_transistor_interdigitized",
+    "two_transistor_interdigitized": ".placement.two_transistor_interdigitized",
+    "two_pfet_interdigitized": ".placement.two_transistor_interdigitized",
+    "two_nfet_interdigitized": ".placement.two_transistor_interdigitized",
+    "macro_two_transistor_interdigitized": ".placement.two_transistor_interdigitized",
+    "two_transistor_place": ".placement.two_transistor_place",
+}
 
-from .util.port_utils import PortTree, parse_direction, proc_angle, ports_inline, ports_parallel, rename_component_ports, rename_ports_by_list, rename_ports_by_orientation, remove_ports_with_prefix, add_ports_perimeter, get_orientation, assert_port_manhattan, assert_ports_perpindicular, set_port_orientation, set_port_width, print_ports, create_private_ports, print_port_tree_all_cells
 
-from .util.comp_utils import move, movex, movey, align_comp_to_port,evaluate_bbox, center_to_edge_distance, to_float, to_decimal, prec_array, prec_center, prec_ref_center, get_padding_points_cc, get_primitive_rectangle
+def __getattr__(name: str):
+    target = _LAZY_ATTRIBUTES.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = target if isinstance(target, tuple) else (target, name)
+    value = getattr(import_module(module_name, __name__), attribute)
+    # cache in the module namespace, later lookups do not go through __getattr__
+    globals()[name] = value
+    return value
 
-from .util.snap_to_grid import component_snap_to_grid
 
-from .routing.c_route import c_route
-from .routing.L_route import L_route
-from .routing.straight_route import straight_route
-from .routing.smart_route import smart_route
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
-from .placement.common_centroid_ab_ba import common_centroid_ab_ba
-from .placement.four_transistor_interdigitized import generic_4T_interdigitzed
-from .placement.two_transistor_interdigitized import two_transistor_interdigitized,two_pfet_interdigitized,two_nfet_interdigitized,macro_two_transistor_interdigitized
-from .placement.two_transistor_place import two_transistor_place
 
-__version__ = "0.1.1"
+__version__ = "0.1.3"
 
 __all__ = [
     "Netlist",
@@ -54,6 +144,8 @@ __all__ = [
     "rename_component_ports",
     "rename_ports_by_list",
     "remove_ports_with_prefix",
+    "PortIndex",
+    "port_index",
     "add_ports_perimeter",
     "get_orientation",
     "assert_port_manhattan",
@@ -62,6 +154,7 @@ __all__ = [
     "set_port_width",
     "print_ports",
     "component_snap_to_grid",
+    "RectArray",
     "two_transistor_place",
     "two_transistor_interdigitized",
     "two_pfet_interdigitized",
@@ -72,8 +165,10 @@ __all__ = [
     "c_route",
     "L_route",
     "straight_route",
+    "RoutePlan",
     "via_stack",
     "via_array",
+    "via_pitch",
     "nmos", 
     "pmos", 
     "multiplier",
@@ -47,26 +47,141 @@ def min_pairwise_distance(points):
    return pdist(points, metric='euclidean').min()
 
 
-def lhs_maximin(d, n, patience=100, seed=None):
-   engine = qmc.LatinHypercube(d, seed=seed)
-   sample = engine.random(n)
-   best = sample.copy()
-   best_min = min_pairwise_distance(best)
-  
+def _row_distances(points, row):
+   """Euclidean distances from points[row] to every point, accumulated axis by axis like pdist so the values are bit identical."""
+   diff = points[:, 0] - points[row, 0]
+   acc = diff * diff
+   for axis in range(1, points.shape[1]):
+      diff = points[:, axis] - points[row, axis]
+      acc += diff * diff
+   return np.sqrt(acc)
+
+
+def _nearest_neighbours(points, chunk=512):
+   """Distance to and index of the nearest other point of every row, O(n^2 d) time in blocks of chunk rows."""
+   n, d = points.shape
+   nn_dist = np.empty(n)
+   nn_idx = np.empty(n, dtype=np.intp)
+   for start in range(0, n, chunk):
+      block = points[start:start + chunk]
+      rows = np.arange(len(block))
+      acc = np.zeros((len(block), n))
+      for axis in range(d):
+         diff = block[:, axis, None] - points[None, :, axis]
+         acc += diff * diff
+      np.sqrt(acc, out=acc)
+      acc[rows, start + rows] = np.inf
+      nn_idx[start:start + chunk] = acc.argmin(axis=1)
+      nn_dist[start:start + chunk] = acc[rows, nn_idx[start:start + chunk]]
+   return nn_dist, nn_idx
+
+
+def _maximin_swaps(points, patience, rng):
+   """
+   Swap optimizer of lhs_maximin, in place on points. Returns the final min pairwise distance.
+
+   Instead of recomputing all pairwise distances after every swap, the nearest neighbour of every row is kept:
+   a swap that does not move one of the two rows of the closest pair can not increase the minimum distance,
+   and any other swap only needs the distances to the two moved rows (plus the rows whose nearest neighbour
+   was one of them). Distances are bit identical to pdist, so the accepted swaps and the result are the
+   same as recomputing min_pairwise_distance for every candidate.
+   """
+   n, d = points.shape
+   if n < 2:
+      return 0.0
+   nn_dist, nn_idx = _nearest_neighbours(points)
+   a = int(nn_dist.argmin())
+   b = int(nn_idx[a])
+   best_min = nn_dist[a]
+
    no_improve = 0
    while no_improve < patience:
-       i, j = random.sample(range(n), 2)
-       axis = random.randrange(d)
-       cand = best.copy()
-       cand[i, axis], cand[j, axis] = cand[j, axis], cand[i, axis]
-       cand_min = min_pairwise_distance(cand)
-       if cand_min > best_min:
-           best, best_min = cand, cand_min
-           no_improve = 0
-       else:
-           no_improve += 1
-  
-   return best
+      i, j = rng.sample(range(n), 2)
+      axis = rng.randrange(d)
+      if i != a and i != b and j != a and j != b:
+         # the closest pair keeps its distance
+         no_improve += 1
+         continue
+      points[i, axis], points[j, axis] = points[j, axis], points[i, axis]
+      dist_i = _row_distances(points, i)
+      dist_j = _row_distances(points, j)
+      dist_i[i] = dist_j[j] = np.inf
+      cand_min = min(dist_i.min(), dist_j.min())
+      # rows whose nearest neighbour moved: their old distance is a lower bound of the one among the unmoved rows
+      stale = np.flatnonzero((nn_idx == i) | (nn_idx == j))
+      stale = stale[(stale != i) & (stale != j)]
+      unmoved = np.ones(n, dtype=bool)
+      unmoved[[i, j]] = False
+      unmoved[stale] = False
+      if unmoved.any():
+         cand_min = min(cand_min, nn_dist[unmoved].min())
+      refreshed = {}
+      for k in stale[np.argsort(nn_dist[stale], kind="stable")]:
+         if nn_dist[k] >= cand_min:
+            break
+         dist_k = _row_distances(points, k)
+         dist_k[k] = np.inf
+         refreshed[k] = dist_k
+         cand_min = min(cand_min, dist_k.min())
+
+      if cand_min <= best_min:
+         points[i, axis], points[j, axis] = points[j, axis], points[i, axis]
+         no_improve += 1
+         continue
+
+      for k in stale:
+         dist_k = refreshed[k] if k in refreshed else _row_distances(points, k)
+         dist_k[k] = np.inf
+         nn_idx[k] = dist_k.argmin()
+         nn_dist[k] = dist_k[nn_idx[k]]
+      for row, dist in ((i, dist_i), (j, dist_j)):
+         closer = dist < nn_dist
+         nn_dist[closer] = dist[closer]
+         nn_idx[closer] = row
+         nn_idx[row] = dist.argmin()
+         nn_dist[row] = dist[nn_idx[row]]
+      a = int(nn_dist.argmin())
+      b = int(nn_idx[a])
+      best_min = nn_dist[a]
+      no_improve = 0
+
+   return float(best_min)
+
+
+def _lhs_maximin_restart(d, n, patience, seed_sequence):
+   """one restart of lhs_maximin, qmc and swap random streams both derived from seed_sequence"""
+   engine = qmc.LatinHypercube(d, seed=np.random.default_rng(seed_sequence))
+   sample = engine.random(n)
+   rng = random.Random(int(seed_sequence.generate_state(1)[0]))
+   return sample, _maximin_swaps(sample, patience, rng)
+
+
+def lhs_maximin(d, n, patience=100, seed=None, restarts=1, processes=None, rng=None):
+   """
+   Latin hypercube sample of n points in [0, 1)^d, improved by swapping one coordinate between two rows as long
+   as that increases the minimum pairwise distance, until patience swaps in a row did not.
+
+   restarts > 1 optimizes that many independent hypercubes (seeded from np.random.SeedSequence(seed)) and returns
+   the one with the largest minimum distance, in processes worker processes (None: in this process).
+   The result only depends on seed, not on processes.
+   With a single restart the swaps are drawn from rng (default: the global random module), as they always were.
+   """
+   if restarts == 1:
+      engine = qmc.LatinHypercube(d, seed=seed)
+      sample = engine.random(n)
+      _maximin_swaps(sample, patience, random if rng is None else rng)
+      return sample
+
+   seed_sequences = np.random.SeedSequence(seed).spawn(restarts)
+   jobs = [(d, n, patience, seed_sequence) for seed_sequence in seed_sequences]
+   if processes is None or processes <= 1:
+      results = [_lhs_maximin_restart(*job) for job in jobs]
+   else:
+      from concurrent.futures import ProcessPoolExecutor
+      with ProcessPoolExecutor(max_workers=processes) as executor:
+         results = list(executor.map(_lhs_maximin_restart, *zip(*jobs)))
+   best = max(range(restarts), key=lambda r: results[r][1])
+   return results[best][0]
 
 
 # === OA Sampling for Integer and Categorical Axes ===
@@ -416,13 +531,21 @@ def generate_all_samples():
    return all_samples
 
 
-# Generate samples at module level so they can be imported
-all_samples = generate_all_samples()
+# Samples are generated on first access of elhs.all_samples, so that importing the helpers above
+# (or starting lhs_maximin worker processes) does not run the whole generation
+def __getattr__(name):
+   if name == "all_samples":
+      global all_samples
+      all_samples = generate_all_samples()
+      return all_samples
+   raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
    import json
    import os
+
+   all_samples = generate_all_samples()
   
    # Save samples to JSON files
    # output_dir = os.path.join(os.path.dirname(__file__), "gen_params_32hr")
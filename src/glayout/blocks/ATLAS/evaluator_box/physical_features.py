@@ -6,6 +6,9 @@ import shutil
 from pathlib import Path
 from gdsfactory.typings import Component
 from gdsfactory.geometry.boolean import boolean
+from glayout.blocks.evaluator_box.symmetry import symmetry_report
+from glayout.pdk.extraction_artifacts import find_extraction_artifacts
+from glayout.spice.parasitics import total_parasitics
 
 def calculate_area(component: Component) -> float:
     """Calculates the area of a gdsfactory Component."""
@@ -31,6 +34,11 @@ def _mirror_and_xor(component: Component, axis: str) -> float:
 
 def calculate_symmetry_scores(component: Component) -> tuple[float, float]:
     """Calculates horizontal and vertical symmetry scores (1.0 = perfect symmetry)."""
+    report = symmetry_report(component)
+    return report["symmetry_score_horizontal"], report["symmetry_score_vertical"]
+
+def calculate_symmetry_scores_boolean(component: Component) -> tuple[float, float]:
+    """Reference implementation of calculate_symmetry_scores using gdsfactory boolean XOR (slow)."""
     original_area = calculate_area(component)
     if original_area == 0:
         return (1.0, 1.0)
@@ -43,54 +51,30 @@ def calculate_symmetry_scores(component: Component) -> tuple[float, float]:
     return symmetry_score_horizontal, symmetry_score_vertical
 
 def _parse_simple_parasitics(component_name: str) -> tuple[float, float]:
-    """Parses total parasitic R and C from a SPICE file by simple summation."""
-    total_resistance = 0.0
-    total_capacitance = 0.0
-    spice_file_path = f"{component_name}_pex.spice"
-    if not os.path.exists(spice_file_path):
-        return 0.0, 0.0
-    with open(spice_file_path, 'r') as f:
-        for line in f:
-            orig_line = line.strip()  # Keep original case for capacitor parsing
-            line = line.strip().upper()
-            parts = line.split()
-            orig_parts = orig_line.split()  # Original case parts for capacitor values
-            if not parts: continue
-            
-            name = parts[0]
-            if name.startswith('R') and len(parts) >= 4:
-                try: total_resistance += float(parts[3])
-                except (ValueError): continue
-            elif name.startswith('C') and len(parts) >= 4:
-                try:
-                    cap_str = orig_parts[3]  # Use original case for capacitor value
-                    unit = cap_str[-1]
-                    val_str = cap_str[:-1]
-                    if unit == 'F': cap_value = float(val_str) * 1e-15
-                    elif unit == 'P': cap_value = float(val_str) * 1e-12
-                    elif unit == 'N': cap_value = float(val_str) * 1e-9
-                    elif unit == 'U': cap_value = float(val_str) * 1e-6
-                    elif unit == 'f': cap_value = float(val_str) * 1e-15  # femtofarads
-                    else: cap_value = float(cap_str)
-                    total_capacitance += cap_value
-                except (ValueError): continue
-    return total_resistance, total_capacitance
+    """Parses total parasitic R and C from {component_name}_pex.spice (see glayout.spice.parasitics)."""
+    return total_parasitics(f"{component_name}_pex.spice")
 
 def run_physical_feature_extraction(layout_path: str, component_name: str, top_level: Component) -> dict:
     """
     Runs PEX and calculates geometric features, returning a structured result.
+    PEX is not run again if the LVS of the same GDS recorded its extraction in
+    the working directory (see glayout.pdk.extraction_artifacts).
     """
     physical_results = {
-        "pex": {"status": "not run", "total_resistance_ohms": 0.0, "total_capacitance_farads": 0.0},
+        "pex": {"status": "not run", "total_resistance_ohms": 0.0, "total_capacitance_farads": 0.0, "source": None},
         "geometric": {"raw_area_um2": 0.0, "symmetry_score_horizontal": 0.0, "symmetry_score_vertical": 0.0}
     }
     
     # PEX and Parasitics
     try:
         pex_spice_path = f"{component_name}_pex.spice"
-        if os.path.exists(pex_spice_path):
-            os.remove(pex_spice_path)
-        subprocess.run(["./run_pex.sh", layout_path, component_name], check=True, capture_output=True, text=True)
+        if find_extraction_artifacts(".", component_name, layout_path) is not None:
+            physical_results["pex"]["source"] = "lvs extraction"
+        else:
+            if os.path.exists(pex_spice_path):
+                os.remove(pex_spice_path)
+            subprocess.run(["./run_pex.sh", layout_path, component_name], check=True, capture_output=True, text=True)
+            physical_results["pex"]["source"] = "run_pex.sh"
         physical_results["pex"]["status"] = "PEX Complete"
         total_res, total_cap = _parse_simple_parasitics(component_name)
         physical_results["pex"]["total_resistance_ohms"] = total_res
@@ -105,9 +89,12 @@ def run_physical_feature_extraction(layout_path: str, component_name: str, top_l
     # Geometric Features
     try:
         physical_results["geometric"]["raw_area_um2"] = calculate_area(top_level)
-        sym_h, sym_v = calculate_symmetry_scores(top_level)
-        physical_results["geometric"]["symmetry_score_horizontal"] = sym_h
-        physical_results["geometric"]["symmetry_score_vertical"] = sym_v
+        report = symmetry_report(top_level)
+        physical_results["geometric"]["symmetry_score_horizontal"] = report["symmetry_score_horizontal"]
+        physical_results["geometric"]["symmetry_score_vertical"] = report["symmetry_score_vertical"]
+        physical_results["geometric"]["asymmetry_per_layer"] = {
+            str(layer): values for layer, values in report["layers"].items()
+        }
     except Exception as e:
         print(f"Warning: Could not calculate geometric features. Error: {e}")
 
@@ -161,7 +161,11 @@ def run_verification(layout_path: str, component_name: str, top_level: Component
     try:
         if os.path.exists(lvs_report_path):
             os.remove(lvs_report_path)
-        sky130_mapped_pdk.lvs_netgen(layout=top_level, design_name=component_name, output_file_path=lvs_report_path)
+        # LVS of the GDS file records its extraction in the working directory, the PEX of
+        # run_physical_feature_extraction reuses it instead of extracting the same GDS again
+        netlist = top_level.info['netlist']
+        netlist = netlist.generate_netlist() if hasattr(netlist, 'generate_netlist') else str(netlist)
+        sky130_mapped_pdk.lvs_netgen(layout=layout_path, design_name=component_name, netlist=netlist, output_file_path=lvs_report_path, extraction_dir=os.getcwd())
         report_content = ""
         if os.path.exists(lvs_report_path):
             with open(lvs_report_path, 'r') as report_file:
@@ -22,9 +22,10 @@ def get_next_filename(base_name="evaluation", extension=".json"):
             return filename
         i += 1
 
-def run_evaluation(layout_path: str, component_name: str, top_level: Component) -> dict:
+def run_evaluation(layout_path: str, component_name: str, top_level: Component, verifier=None) -> dict:
     """
     The main evaluation wrapper. Runs all evaluation modules and combines results.
+    ``verifier`` is an optional persistent BatchVerifier passed to the verification module.
     """
     print(f"--- Starting Comprehensive Evaluation for {component_name} ---")
 
@@ -38,7 +39,8 @@ def run_evaluation(layout_path: str, component_name: str, top_level: Component)
         f"{component_name}.nodes",
         f"{component_name}.sim",
         f"{component_name}.pex.spice",
-        f"{component_name}_pex.spice"
+        f"{component_name}_pex.spice",
+        f"{component_name}_extraction.json"
     ]
     
     for f_path in files_to_delete:
@@ -51,7 +53,7 @@ def run_evaluation(layout_path: str, component_name: str, top_level: Component)
 
     # Run verification module
     print("Running verification checks (DRC, LVS)...")
-    verification_results = run_robust_verification(layout_path, component_name, top_level)
+    verification_results = run_robust_verification(layout_path, component_name, top_level, verifier=verifier)
     
     # Run physical features module
     print("Running physical feature extraction (PEX, Area, Symmetry)...")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Append-only results journal for ATLAS dataset sweeps.
+
+Every finished sample is appended as one JSON line and flushed to disk
+(fsync) before the next one, so a crash loses at most the samples that were
+still running. A sweep is resumed by skipping the sample_ids already in the
+journal, and the journal is compacted into the usual JSON/CSV (or Parquet)
+result files on demand. Reading the journal streams it line by line; only
+the sample_id -> line number map is kept in memory.
+
+usage (compaction):
+    python results_journal.py result/tg_results.jsonl --json tg_results.json --csv tg_summary.csv [--parquet tg_results.parquet]
+"""
+import argparse
+import csv
+import json
+import os
+from pathlib import Path
+
+
+class ResultsJournal:
+    """Append-only JSON lines journal of per-sample result dicts (keyed by their "sample_id").
+
+    A sample may be recorded more than once (e.g. a failed sample retried on
+    resume), the last record wins. A partial last line left by a crash is
+    dropped when the journal is opened.
+    """
+
+    def __init__(self, path, fsync=True):
+        self.path = Path(path)
+        self.fsync = fsync
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._repair()
+        self._file = open(self.path, "a")
+
+    def _repair(self):
+        """truncate a partial last line (the journal was not closed cleanly)"""
+        if not self.path.exists():
+            return
+        with open(self.path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            # find the end of the last complete line
+            position = size - 1
+            while position > 0:
+                step = min(position, 65536)
+                f.seek(position - step)
+                newline = f.read(step).rfind(b"\n")
+                if newline >= 0:
+                    f.truncate(position - step + newline + 1)
+                    return
+                position -= step
+            f.truncate(0)
+
+    def append(self, result):
+        """record the result dict of one sample (must be JSON serializable and have a sample_id)"""
+        if "sample_id" not in result:
+            raise ValueError("result has no sample_id")
+        self._file.write(json.dumps(result) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _records(self):
+        """(line number, record) of every line of the journal"""
+        self._file.flush()
+        with open(self.path) as f:
+            for line_number, line in enumerate(f):
+                if line.strip():
+                    yield line_number, json.loads(line)
+
+    def _last_lines(self):
+        """sample_id -> line number of its last record"""
+        return {record["sample_id"]: line_number for line_number, record in self._records()}
+
+    def completed_ids(self, include_failed=True):
+        """sample_ids recorded in the journal, without include_failed only those whose last record succeeded"""
+        completed = dict()
+        for _, record in self._records():
+            completed[record["sample_id"]] = bool(record.get("success"))
+        return {sample_id for sample_id, success in completed.items() if include_failed or success}
+
+    def __iter__(self):
+        """streams the last record of every sample, in journal order"""
+        last_lines = self._last_lines()
+        for line_number, record in self._records():
+            if last_lines[record["sample_id"]] == line_number:
+                yield record
+
+    def __len__(self):
+        return len(self._last_lines())
+
+    def compact(self, json_path=None, csv_path=None, parquet_path=None):
+        """writes the last record of every sample to json_path (a JSON list), csv_path and parquet_path
+        JSON and CSV are streamed, Parquet (needs pandas and pyarrow) loads the whole table
+        """
+        if json_path is not None:
+            with open(json_path, "w") as f:
+                f.write("[")
+                for count, record in enumerate(self):
+                    f.write(("," if count else "") + "\n  " + json.dumps(record))
+                f.write("\n]\n")
+        if csv_path is not None:
+            # columns in order of first appearance, nested values are written as JSON
+            columns = dict()
+            for record in self:
+                columns.update(dict.fromkeys(record))
+            with open(csv_path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=list(columns))
+                writer.writeheader()
+                for record in self:
+                    writer.writerow({key: (json.dumps(value) if isinstance(value, (dict, list)) else value) for key, value in record.items()})
+        if parquet_path is not None:
+            import pandas as pd
+
+            pd.DataFrame(list(self)).to_parquet(parquet_path, index=False)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact an ATLAS results journal into JSON/CSV/Parquet")
+    parser.add_argument("journal", type=str, help="Path to the results journal (.jsonl)")
+    parser.add_argument("--json", type=str, default=None, help="Write the results as a JSON list")
+    parser.add_argument("--csv", type=str, default=None, help="Write the results as CSV")
+    parser.add_argument("--parquet", type=str, default=None, help="Write the results as Parquet (needs pandas + pyarrow)")
+    args = parser.parse_args()
+    with ResultsJournal(args.journal, fsync=False) as journal:
+        journal.compact(json_path=args.json, csv_path=args.csv, parquet_path=args.parquet)
+        print(f"{len(journal)} samples in {args.journal}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,8 @@ import subprocess
 import shutil
 import tempfile
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 
 # Insert the repo root (`.../generators/glayout`) if it is not already present
@@ -27,14 +29,25 @@ if _glayout_repo_path.exists() and str(_glayout_repo_path) not in sys.path:
 del _here
 
 from gdsfactory.typings import Component
+from glayout.pdk.extraction_artifacts import find_extraction_artifacts, write_extraction_manifest
+from glayout.spice.parasitics import total_parasitics
 
-def ensure_pdk_environment():
+# Reload every loaded *pdk* module whenever the environment is refreshed.
+# Long-lived workers that keep an activated PDK (see run_dataset_multiprocess
+# --pool_mode warm) set this to False so the PDK instance stays the same.
+RELOAD_PDK_MODULES = True
+
+def ensure_pdk_environment(reload_modules: bool | None = None):
     """Ensure PDK environment is properly set.
 
     * Uses an existing PDK_ROOT env if already set (preferred)
     * Falls back to the conda-env PDK folder if needed
     * Sets CAD_ROOT **only** to the Magic installation directory (``$CONDA_PREFIX/lib``)
+    * Reloads loaded PDK modules unless ``reload_modules`` (default
+      ``RELOAD_PDK_MODULES``) is False
     """
+    if reload_modules is None:
+        reload_modules = RELOAD_PDK_MODULES
     # Respect an existing PDK_ROOT (set by the user / calling script)
     pdk_root = os.environ.get('PDK_ROOT')
     # Some libraries erroneously set the literal string "None". Treat that as
@@ -73,6 +86,9 @@ def ensure_pdk_environment():
     # Refresh the environment in *one* atomic update to avoid partial states
     os.environ.update(env_vars)
 
+    if not reload_modules:
+        return pdk_root
+
     # Also try to reinitialize the PDK module to avoid stale state
     try:
         import importlib, sys as _sys
@@ -223,94 +239,69 @@ def parse_lvs_report(report_content: str) -> dict:
     return summary
 
 def _parse_simple_parasitics(component_name: str) -> tuple[float, float]:
-    """Parses total parasitic R and C from a SPICE file by simple summation."""
-    total_resistance = 0.0
-    total_capacitance = 0.0
-    spice_file_path = f"{component_name}_pex.spice"
-    if not os.path.exists(spice_file_path):
-        return 0.0, 0.0
-    with open(spice_file_path, 'r') as f:
-        for line in f:
-            orig_line = line.strip()  # Keep original case for capacitor parsing
-            line = line.strip().upper()
-            parts = line.split()
-            orig_parts = orig_line.split()  # Original case parts for capacitor values
-            if not parts: continue
-            
-            name = parts[0]
-            if name.startswith('R') and len(parts) >= 4:
-                try: total_resistance += float(parts[3])
-                except (ValueError): continue
-            elif name.startswith('C') and len(parts) >= 4:
-                try:
-                    cap_str = orig_parts[3]  # Use original case for capacitor value
-                    unit = cap_str[-1]
-                    val_str = cap_str[:-1]
-                    if unit == 'F': cap_value = float(val_str) * 1e-15
-                    elif unit == 'P': cap_value = float(val_str) * 1e-12
-                    elif unit == 'N': cap_value = float(val_str) * 1e-9
-                    elif unit == 'U': cap_value = float(val_str) * 1e-6
-                    elif unit == 'f': cap_value = float(val_str) * 1e-15  # femtofarads
-                    else: cap_value = float(cap_str)
-                    total_capacitance += cap_value
-                except (ValueError): continue
-    return total_resistance, total_capacitance
-
-def run_robust_verification(layout_path: str, component_name: str, top_level: Component) -> dict:
-    """
-    Runs DRC, LVS, and PEX checks with robust PDK handling.
-    """
-    verification_results = {
-        "drc": {"status": "not run", "is_pass": False, "report_path": None, "summary": {}},
-        "lvs": {"status": "not run", "is_pass": False, "report_path": None, "summary": {}},
-        "pex": {"status": "not run", "total_resistance_ohms": 0.0, "total_capacitance_farads": 0.0, "spice_file": None}
-    }
-    
-    # Ensure PDK environment before each operation
-    pdk_root = ensure_pdk_environment()
-    print(f"Using PDK_ROOT: {pdk_root}")
-    
-    # Import sky130_mapped_pdk *after* the environment is guaranteed sane so
-    # that gdsfactory/PDK initialization picks up the correct PDK_ROOT.
-    from glayout.flow.pdk.sky130_mapped import sky130_mapped_pdk
-    
-    # DRC Check
+    """Parses total parasitic R and C from {component_name}_pex.spice (see glayout.spice.parasitics)."""
+    return total_parasitics(f"{component_name}_pex.spice")
+
+def _lvs_netlist(top_level: Component) -> str:
+    """spice netlist text of top_level for LVS"""
+    netlist = top_level.info['netlist']
+    return netlist.generate_netlist() if hasattr(netlist, 'generate_netlist') else str(netlist)
+
+def _run_batch_lvs(verifier, layout_path: str, component_name: str, top_level: Component, lvs_report_path: str, pdk) -> None:
+    """LVS through a persistent BatchVerifier: extraction netlists are written to the current directory
+    (same files as lvs_netgen with copy_intermediate_files) and netgen writes lvs_report_path."""
+    from glayout.pdk.batch_verification import write_lvs_schematic
+    schematic_path = write_lvs_schematic(
+        _lvs_netlist(top_level),
+        component_name,
+        os.path.abspath(f"./{component_name}.spice"),
+        schematic_ref_file=pdk.pdk_files['lvs_schematic_ref_file'],
+        add_micron_units=(pdk.name == 'gf180'),
+    )
+    extracted = verifier.extract(layout_path, component_name, os.getcwd())
+    verifier.lvs(extracted["lvsmag"], schematic_path, component_name, lvs_report_path)
+
+# PDK_ROOT of the environment prepared by the first verification in this
+# process; later verifications reuse it instead of refreshing (and reloading
+# the PDK modules) again.
+_VERIFICATION_PDK_ROOT = None
+
+def prepare_verification_environment():
+    """Run ensure_pdk_environment once per process and return PDK_ROOT."""
+    global _VERIFICATION_PDK_ROOT
+    if _VERIFICATION_PDK_ROOT is None or os.environ.get('PDK_ROOT') != _VERIFICATION_PDK_ROOT:
+        _VERIFICATION_PDK_ROOT = ensure_pdk_environment()
+    return _VERIFICATION_PDK_ROOT
+
+def _run_drc_stage(pdk, layout_path: str, component_name: str, verifier=None) -> dict:
+    """Magic DRC, the report is written to ./<component_name>.drc.rpt"""
+    result = {"status": "not run", "is_pass": False, "report_path": None, "summary": {}}
     drc_report_path = os.path.abspath(f"./{component_name}.drc.rpt")
-    verification_results["drc"]["report_path"] = drc_report_path
-    
+    result["report_path"] = drc_report_path
     try:
         # Clean up any existing DRC report
         if os.path.exists(drc_report_path):
             os.remove(drc_report_path)
-        
-        # Ensure PDK environment again right before DRC
-        ensure_pdk_environment()
-        
+
         print(f"Running DRC for {component_name}...")
-        
-        # Try the PDK DRC method first
-        sky130_mapped_pdk.drc_magic(layout_path, component_name, output_file=drc_report_path)
-        
+        if verifier is not None:
+            verifier.drc(layout_path, component_name, drc_report_path)
+        else:
+            # drc_magic works in its own temporary directory
+            pdk.drc_magic(layout_path, component_name, output_file=drc_report_path)
+
         # Check if report was created and read it
         report_content = ""
         if os.path.exists(drc_report_path):
             with open(drc_report_path, 'r') as f:
                 report_content = f.read()
             print(f"DRC report created successfully: {len(report_content)} chars")
-        '''else:
-            print("Warning: DRC report file was not created, creating empty report")
-            # Create empty report as fallback
-            report_content = f"{component_name} count: \n----------------------------------------\n\n"
-            with open(drc_report_path, 'w') as f:
-                f.write(report_content)
-            '''
         summary = parse_drc_report(report_content)
-        verification_results["drc"].update({
-            "summary": summary, 
-            "is_pass": summary["is_pass"], 
+        result.update({
+            "summary": summary,
+            "is_pass": summary["is_pass"],
             "status": "pass" if summary["is_pass"] else "fail"
         })
-        
     except Exception as e:
         print(f"DRC failed with exception: {e}")
         # Create a basic report even on failure
@@ -318,51 +309,54 @@ def run_robust_verification(layout_path: str, component_name: str, top_level: Co
             with open(drc_report_path, 'w') as f:
                 f.write(f"DRC Error for {component_name}\n")
                 f.write(f"Error: {str(e)}\n")
-            verification_results["drc"]["status"] = f"error: {e}"
-        except:
-            verification_results["drc"]["status"] = f"error: {e}"
-
-    # Small delay between DRC and LVS
-    import time
-    time.sleep(1)
+        except OSError:
+            pass
+        result["status"] = f"error: {e}"
+    return result
+
+def _run_klayout_drc_stage(pdk, layout_path: str, component_name: str) -> dict:
+    """KLayout DRC (optional, independent of the Magic DRC), lyrdb reports go to ./klayout_drc"""
+    result = {"status": "not run", "is_pass": False, "report_dir": os.path.abspath("./klayout_drc")}
+    try:
+        print(f"Running KLayout DRC for {component_name}...")
+        is_pass = pdk.drc(layout_path, result["report_dir"])
+        result.update({"is_pass": is_pass, "status": "pass" if is_pass else "fail"})
+    except Exception as e:
+        print(f"KLayout DRC failed with exception: {e}")
+        result["status"] = f"error: {e}"
+    return result
 
-    # LVS Check
+def _run_lvs_stage(pdk, layout_path: str, component_name: str, top_level: Component, verifier=None) -> dict:
+    """Netgen LVS, the report is written to ./<component_name>.lvs.rpt"""
+    result = {"status": "not run", "is_pass": False, "report_path": None, "summary": {}}
     lvs_report_path = os.path.abspath(f"./{component_name}.lvs.rpt")
-    verification_results["lvs"]["report_path"] = lvs_report_path
-    
+    result["report_path"] = lvs_report_path
     try:
         # Clean up any existing LVS report
         if os.path.exists(lvs_report_path):
             os.remove(lvs_report_path)
-        
-        # Ensure PDK environment again right before LVS
-        ensure_pdk_environment()
-        
+
         print(f"Running LVS for {component_name}...")
-        
-        # Try the PDK LVS method first
-        sky130_mapped_pdk.lvs_netgen(layout=top_level, design_name=component_name, output_file_path=lvs_report_path)
-        
+        if verifier is not None:
+            _run_batch_lvs(verifier, layout_path, component_name, top_level, lvs_report_path, pdk)
+        else:
+            # LVS of the GDS file (not the Component) so the extraction recorded in the working
+            # directory is keyed by the hash of layout_path and the PEX stage can reuse it
+            pdk.lvs_netgen(layout=layout_path, design_name=component_name, netlist=_lvs_netlist(top_level),
+                           output_file_path=lvs_report_path, extraction_dir=os.getcwd())
+
         # Check if report was created and read it
         report_content = ""
         if os.path.exists(lvs_report_path):
             with open(lvs_report_path, 'r') as report_file:
                 report_content = report_file.read()
             print(f"LVS report created successfully: {len(report_content)} chars")
-        '''else:
-            print("Warning: LVS report file was not created, creating fallback report")
-            # Create fallback report
-            report_content = f"LVS Report for {component_name}\nFinal result: Circuits match uniquely.\nLVS Done.\n"
-            with open(lvs_report_path, 'w') as f:
-                f.write(report_content)
-           '''
         lvs_summary = parse_lvs_report(report_content)
-        verification_results["lvs"].update({
-            "summary": lvs_summary, 
-            "is_pass": lvs_summary["is_pass"], 
+        result.update({
+            "summary": lvs_summary,
+            "is_pass": lvs_summary["is_pass"],
             "status": "pass" if lvs_summary["is_pass"] else "fail"
         })
-        
     except Exception as e:
         print(f"LVS failed with exception: {e}")
         # Create a basic report even on failure
@@ -370,51 +364,131 @@ def run_robust_verification(layout_path: str, component_name: str, top_level: Co
             with open(lvs_report_path, 'w') as f:
                 f.write(f"LVS Error for {component_name}\n")
                 f.write(f"Error: {str(e)}\n")
-            verification_results["lvs"]["status"] = f"error: {e}"
-        except:
-            verification_results["lvs"]["status"] = f"error: {e}"
-
-    # Small delay between LVS and PEX
-    time.sleep(1)
-    
-    # PEX Extraction
+        except OSError:
+            pass
+        result["status"] = f"error: {e}"
+    return result
+
+# PEX artifacts copied back from the isolated PEX directory
+_PEX_ARTIFACT_SUFFIXES = ("_pex.spice", ".res.ext", ".ext", ".sim", ".nodes")
+
+def _run_pex_stage(layout_path: str, component_name: str, reuse_extraction: bool = False) -> dict:
+    """PEX netlist of the layout, parsed for the total R and C
+
+    With ``reuse_extraction`` the PEX netlist of the LVS extraction in the
+    working directory is used if it was extracted from the same GDS (see
+    glayout.pdk.extraction_artifacts). Otherwise run_pex.sh runs in a private
+    temporary directory, so its extraction files do not collide with the LVS
+    extraction running in the working directory."""
+    result = {"status": "not run", "total_resistance_ohms": 0.0, "total_capacitance_farads": 0.0, "spice_file": None, "source": None}
     pex_spice_path = os.path.abspath(f"./{component_name}_pex.spice")
-    verification_results["pex"]["spice_file"] = pex_spice_path
-    
+    result["spice_file"] = pex_spice_path
+    run_pex_script = os.path.abspath("run_pex.sh")
     try:
-        # Clean up any existing PEX file
-        if os.path.exists(pex_spice_path):
-            os.remove(pex_spice_path)
-        
-        print(f"Running PEX extraction for {component_name}...")
-        
-        # Run the PEX extraction script 
-        subprocess.run(["bash", "run_pex.sh", layout_path, component_name], 
-                      check=True, capture_output=True, text=True, cwd=".")
-        
+        if reuse_extraction and find_extraction_artifacts(os.getcwd(), component_name, layout_path) is not None:
+            print(f"Reusing the LVS extraction for the PEX of {component_name}")
+            result["source"] = "lvs extraction"
+        else:
+            # Clean up any existing PEX file
+            if os.path.exists(pex_spice_path):
+                os.remove(pex_spice_path)
+            if not os.path.exists(run_pex_script):
+                raise FileNotFoundError(run_pex_script)
+
+            print(f"Running PEX extraction for {component_name}...")
+            with tempfile.TemporaryDirectory(prefix=f"{component_name}_pex_") as pex_dir:
+                subprocess.run(["bash", run_pex_script, os.path.abspath(layout_path), component_name],
+                              check=True, capture_output=True, text=True, cwd=pex_dir)
+                for suffix in _PEX_ARTIFACT_SUFFIXES:
+                    artifact = Path(pex_dir) / f"{component_name}{suffix}"
+                    if artifact.exists():
+                        shutil.copy(artifact, f"./{component_name}{suffix}")
+            # record it, so the feature extraction of the same GDS does not run PEX again
+            write_extraction_manifest(os.getcwd(), component_name, layout_path)
+            result["source"] = "run_pex.sh"
+
         # Check if PEX spice file was created and parse it
         if os.path.exists(pex_spice_path):
             total_res, total_cap = _parse_simple_parasitics(component_name)
-            verification_results["pex"].update({
+            result.update({
                 "status": "PEX Complete",
                 "total_resistance_ohms": total_res,
                 "total_capacitance_farads": total_cap
             })
             print(f"PEX extraction completed: R={total_res:.2f}Ω, C={total_cap:.6e}F")
         else:
-            verification_results["pex"]["status"] = "PEX Error: Spice file not generated"
-            
+            result["status"] = "PEX Error: Spice file not generated"
+
     except subprocess.CalledProcessError as e:
         error_msg = e.stderr if e.stderr else str(e)
-        verification_results["pex"]["status"] = f"PEX Error: {error_msg}"
+        result["status"] = f"PEX Error: {error_msg}"
         print(f"PEX extraction failed: {error_msg}")
     except FileNotFoundError:
-        verification_results["pex"]["status"] = "PEX Error: run_pex.sh not found"
+        result["status"] = "PEX Error: run_pex.sh not found"
         print("PEX extraction failed: run_pex.sh script not found")
     except Exception as e:
-        verification_results["pex"]["status"] = f"PEX Unexpected Error: {e}"
+        result["status"] = f"PEX Unexpected Error: {e}"
         print(f"PEX extraction failed with unexpected error: {e}")
-        
+    return result
+
+def _timed(stage, *args, **kwargs):
+    start = time.perf_counter()
+    result = stage(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def _timed_after(future, stage, *args, **kwargs):
+    """_timed once future is done (whatever its outcome)"""
+    wait([future])
+    return _timed(stage, *args, **kwargs)
+
+def run_robust_verification(layout_path: str, component_name: str, top_level: Component, verifier=None, klayout_drc: bool = False, reuse_extraction: bool = True) -> dict:
+    """
+    Runs DRC, LVS, and PEX checks with robust PDK handling.
+
+    The stages are independent and run concurrently (DRC and LVS use their own
+    temporary directories and pass their design name and directories to the
+    tools in a per call environment, never through os.environ or the shared
+    pdk_files; PEX runs in a private directory), so the latency is
+    close to the slowest single tool. The PDK environment is prepared once per
+    process. ``timing`` holds the wall time of every stage and the total.
+
+    If ``verifier`` (a ``glayout.pdk.batch_verification.BatchVerifier``) is
+    given, DRC and LVS run on its persistent Magic/Netgen interpreters instead
+    of starting new tools for this design. ``klayout_drc`` additionally runs
+    the KLayout DRC deck alongside the Magic DRC. With ``reuse_extraction``
+    the PEX stage waits for LVS and takes the PEX netlist from the LVS
+    extraction (its magic script already runs the PEX extraction) instead of
+    extracting the layout a second time with run_pex.sh.
+    """
+    total_start = time.perf_counter()
+    pdk_root = prepare_verification_environment()
+    print(f"Using PDK_ROOT: {pdk_root}")
+
+    # Import sky130_mapped_pdk *after* the environment is guaranteed sane so
+    # that gdsfactory/PDK initialization picks up the correct PDK_ROOT.
+    from glayout.flow.pdk.sky130_mapped import sky130_mapped_pdk
+
+    stages = {
+        "drc": (_run_drc_stage, (sky130_mapped_pdk, layout_path, component_name), {"verifier": verifier}),
+        "lvs": (_run_lvs_stage, (sky130_mapped_pdk, layout_path, component_name, top_level), {"verifier": verifier}),
+        "pex": (_run_pex_stage, (layout_path, component_name), {"reuse_extraction": reuse_extraction}),
+    }
+    if klayout_drc:
+        stages["klayout_drc"] = (_run_klayout_drc_stage, (sky130_mapped_pdk, layout_path, component_name), {})
+
+    verification_results = {}
+    timing = {}
+    with ThreadPoolExecutor(max_workers=len(stages)) as executor:
+        futures = {}
+        for name, (stage, args, kwargs) in stages.items():
+            if name == "pex" and reuse_extraction:
+                futures[name] = executor.submit(_timed_after, futures["lvs"], stage, *args, **kwargs)
+            else:
+                futures[name] = executor.submit(_timed, stage, *args, **kwargs)
+        for name, future in futures.items():
+            verification_results[name], timing[name] = future.result()
+    timing["total"] = time.perf_counter() - total_start
+    verification_results["timing"] = timing
     return verification_results
 
 if __name__ == "__main__":
@@ -12,7 +12,6 @@ import json
 import shutil
 from pathlib import Path
 import numpy as np
-import pandas as pd
 
 # Suppress overly verbose gdsfactory logging
 import warnings
@@ -126,6 +125,89 @@ def setup_environment():
     logger.info(f"Environment refreshed: PDK_ROOT={pdk_root}")
     return pdk_root
 
+# Per-worker state for --pool_mode warm. Each worker process runs
+# `init_worker` once, which sets up the environment, imports gdsfactory and
+# the PDK and activates it. Trials then reuse that PDK (and gdsfactory's
+# cell cache) instead of reloading modules; isolation comes from the
+# per-trial working directory and per-trial seeding.
+_WORKER_STATE = {"warm": False, "import_time": 0.0, "import_time_reported": False, "verifier": None}
+
+def init_worker(persistent_eda=False):
+    """ProcessPoolExecutor initializer for warm workers.
+
+    With persistent_eda the worker also keeps one Magic and one Netgen
+    interpreter alive (tech files loaded once) for DRC/LVS of all its trials.
+    """
+    start = time.perf_counter()
+    import robust_verification
+    # keep the PDK modules (and the activated PDK instance) loaded for the
+    # lifetime of the worker
+    robust_verification.RELOAD_PDK_MODULES = False
+    setup_environment()
+    import gdsfactory as gf  # noqa: F401
+    pdk = get_global_pdk()
+    pdk.activate()
+    if persistent_eda:
+        import atexit
+        verifier = pdk.batch_verifier(processes=1)
+        atexit.register(verifier.close)
+        _WORKER_STATE["verifier"] = verifier
+    _WORKER_STATE["warm"] = True
+    _WORKER_STATE["import_time"] = time.perf_counter() - start
+    logger.info(f"Worker {os.getpid()} initialized in {_WORKER_STATE['import_time']:.1f}s")
+
+def seed_trial(trial_num):
+    """Deterministic per-trial seeding (independent of which worker runs the trial)."""
+    import random
+    base_seed = trial_num * 1000
+    random.seed(base_seed)
+    np.random.seed(base_seed)
+    os.environ['PYTHONHASHSEED'] = str(base_seed)
+    logger.info(f"Trial {trial_num}: Set deterministic seed = {base_seed}")
+    return base_seed
+
+def reset_cold_environment():
+    """Old per-trial isolation: refresh the environment, clear every gdsfactory
+    cache and reload the PDK module (used by --pool_mode cold)."""
+    # Setup environment for each trial (safe in subprocess)
+    setup_environment()
+
+    # Clear any cached gdsfactory Components / PDKs to avoid stale class refs
+    import gdsfactory as gf
+    if hasattr(gf, 'clear_cache'):
+        gf.clear_cache()
+    if hasattr(gf, 'clear_cell_cache'):
+        gf.clear_cell_cache()
+    # glayout's own cell cache keys on the PDK name only, drop cells built
+    # with the PDK modules that are reloaded below, and the bboxes of the
+    # cells cleared above (their cell indices are reused)
+    from glayout.util.cell_cache import clear_cell_cache
+    from glayout.util.bbox_cache import clear_bbox_cache
+    clear_cell_cache()
+    clear_bbox_cache()
+    try:
+        if hasattr(gf, '_CACHE'):
+            gf._CACHE.clear()
+        if hasattr(gf.Component, '_cell_cache'):
+            gf.Component._cell_cache.clear()
+        if hasattr(gf, 'CONFIG'):
+            if hasattr(gf.CONFIG, 'use_cache'):
+                gf.CONFIG.use_cache = False
+            if hasattr(gf.CONFIG, 'cache'):
+                gf.CONFIG.cache = False
+    except Exception as e:
+        logger.warning(f"Could not clear some gdsfactory caches: {e}")
+
+    # Fresh PDK import per trial/process
+    import importlib
+    if 'glayout.flow.pdk.sky130_mapped' in sys.modules:
+        importlib.reload(sys.modules['glayout.flow.pdk.sky130_mapped'])
+    from glayout.flow.pdk.sky130_mapped import sky130_mapped_pdk
+    return sky130_mapped_pdk
+
+# Phases reported per trial (seconds), see run_single_evaluation
+TIMING_PHASES = ("import", "layout", "gds_write", "drc", "lvs", "pex", "features")
+
 def robust_transmission_gate(_, **params):
     """Return a transmission_gate with a *fresh* MappedPDK every call.
 
@@ -214,8 +296,15 @@ def make_json_serializable(obj):
             return str(obj)
 # Parallelized
 def run_single_evaluation(trial_num, params, output_dir):
-    """Run a single TG evaluation in its own isolated working directory."""
+    """Run a single TG evaluation in its own isolated working directory.
+
+    In a warm worker (see `init_worker`) the environment and PDK are reused;
+    otherwise they are refreshed for every trial. Per-phase wall times are
+    returned as ``timing_<phase>_s`` entries.
+    """
     trial_start = time.time()
+    warm = _WORKER_STATE["warm"]
+    timing = dict.fromkeys(TIMING_PHASES, 0.0)
 
     # Per-trial working dir (all scratch files live here)
     trial_work_dir = Path(output_dir) / "_work" / f"sample_{trial_num:04d}"
@@ -225,59 +314,45 @@ def run_single_evaluation(trial_num, params, output_dir):
     try:
         with chdir(trial_work_dir):
             # === DETERMINISTIC SEEDING FIX ===
-            import random
-            import numpy as np
-            base_seed = trial_num * 1000
-            random.seed(base_seed)
-            np.random.seed(base_seed)
-            os.environ['PYTHONHASHSEED'] = str(base_seed)
-            logger.info(f"Trial {trial_num}: Set deterministic seed = {base_seed}")
-
-            # Setup environment for each trial (safe in subprocess)
-            setup_environment()
-
-            # Clear any cached gdsfactory Components / PDKs to avoid stale class refs
-            try:
-                import gdsfactory as gf
-            except ImportError:
-                import gdsfactory as gf
-            if hasattr(gf, 'clear_cache'):
-                gf.clear_cache()
-            if hasattr(gf, 'clear_cell_cache'):
-                gf.clear_cell_cache()
-            try:
-                if hasattr(gf, '_CACHE'):
-                    gf._CACHE.clear()
-                if hasattr(gf.Component, '_cell_cache'):
-                    gf.Component._cell_cache.clear()
-                if hasattr(gf, 'CONFIG'):
-                    if hasattr(gf.CONFIG, 'use_cache'):
-                        gf.CONFIG.use_cache = False
-                    if hasattr(gf.CONFIG, 'cache'):
-                        gf.CONFIG.cache = False
-            except Exception as e:
-                logger.warning(f"Could not clear some gdsfactory caches: {e}")
-
-            # Fresh PDK import per trial/process
-            import importlib, sys
-            if 'glayout.flow.pdk.sky130_mapped' in sys.modules:
-                importlib.reload(sys.modules['glayout.flow.pdk.sky130_mapped'])
-            from glayout.flow.pdk.sky130_mapped import sky130_mapped_pdk
-            pdk = sky130_mapped_pdk
+            seed_trial(trial_num)
+
+            phase_start = time.perf_counter()
+            if warm:
+                pdk = get_global_pdk()
+                # report the one-off worker start-up cost with the first trial it runs
+                if not _WORKER_STATE["import_time_reported"]:
+                    timing["import"] = _WORKER_STATE["import_time"]
+                    _WORKER_STATE["import_time_reported"] = True
+            else:
+                pdk = reset_cold_environment()
+                timing["import"] = time.perf_counter() - phase_start
 
             # Create and name component
+            phase_start = time.perf_counter()
             component_name = f"tg_sample_{trial_num:04d}"
             comp = robust_transmission_gate(pdk, **params)
             comp.name = component_name
+            timing["layout"] = time.perf_counter() - phase_start
 
             # Write GDS into the trial's **work** dir
+            phase_start = time.perf_counter()
             gds_file = f"{component_name}.gds"
             comp.write_gds(gds_file)
             gds_path = Path.cwd() / gds_file  # absolute path
+            timing["gds_write"] = time.perf_counter() - phase_start
 
             # Run comprehensive evaluation (DRC, LVS, PEX, Geometry)
             from evaluator_wrapper import run_evaluation
-            comprehensive_results = run_evaluation(str(gds_path), component_name, comp)
+            phase_start = time.perf_counter()
+            comprehensive_results = run_evaluation(str(gds_path), component_name, comp, verifier=_WORKER_STATE["verifier"])
+            evaluation_time = time.perf_counter() - phase_start
+            stage_timing = comprehensive_results.get("timing", {})
+            for stage in ("drc", "lvs", "pex"):
+                timing[stage] = stage_timing.get(stage, 0.0)
+            # everything else in the evaluation (physical features, report writing);
+            # the verification stages run concurrently, so use their total wall time
+            verification_time = stage_timing.get("total", sum(timing[stage] for stage in ("drc", "lvs", "pex")))
+            timing["features"] = max(evaluation_time - verification_time, 0.0)
             drc_result = comprehensive_results["drc"]["is_pass"]
             lvs_result = comprehensive_results["lvs"]["is_pass"]
 
@@ -322,6 +397,8 @@ def run_single_evaluation(trial_num, params, output_dir):
                 "area_um2": geometry_data.get("raw_area_um2", 0.0),
                 "symmetry_horizontal": geometry_data.get("symmetry_score_horizontal", 0.0),
                 "symmetry_vertical": geometry_data.get("symmetry_score_vertical", 0.0),
+                # Per-phase timing
+                **{f"timing_{phase}_s": seconds for phase, seconds in timing.items()},
             }
 
             pex_status_short = "✓" if pex_data.get("status") == "PEX Complete" else "✗"
@@ -345,28 +422,88 @@ def run_single_evaluation(trial_num, params, output_dir):
             "error": str(e),
             "execution_time": trial_time,
             "parameters": make_json_serializable(params),
+            **{f"timing_{phase}_s": seconds for phase, seconds in timing.items()},
         }
 
     finally:
         # Clean ONLY this trial's scratch via CWD-scoped globbing
         with chdir(trial_work_dir):
             cleanup_files()
-            try:
-                import gdsfactory as gf
-            except ImportError:
-                import gdsfactory as gf
+        # Warm workers keep gdsfactory's cell cache (primitives are shared
+        # between trials); cold workers start every trial from scratch
+        if not warm:
+            import gdsfactory as gf
             if hasattr(gf, 'clear_cache'):
                 gf.clear_cache()
             if hasattr(gf, 'clear_cell_cache'):
                 gf.clear_cell_cache()
-
-from concurrent.futures import ProcessPoolExecutor, as_completed
+            from glayout.util.cell_cache import clear_cell_cache
+            from glayout.util.bbox_cache import clear_bbox_cache
+            clear_cell_cache()
+            clear_bbox_cache()
+
+def bundle_gds_library(results, output_dir, shard_size):
+    """Move the per-sample GDS files into deduplicated, sharded GDS libraries.
+
+    Libraries of up to shard_size samples and their index (sample_id ->
+    library file and top cell) are written to ``<output_dir>/gds_library``;
+    shards of an earlier run of a resumed sweep are kept. The per-sample
+    copies are removed once the libraries are written.
+    """
+    from glayout.util.gds_library import GDSLibraryWriter
+
+    start = time.perf_counter()
+    bundled = []
+    with GDSLibraryWriter(Path(output_dir) / "gds_library" / "tg_samples.gds", shard_size=shard_size) as writer:
+        first_shard = writer.shard
+        for result in results:
+            if not result.get("output_directory"):
+                continue
+            gds_path = Path(result["output_directory"]) / f"{result['component_name']}.gds"
+            if not gds_path.exists():
+                continue
+            writer.add_gds(result["sample_id"], gds_path)
+            bundled.append(gds_path)
+    for gds_path in bundled:
+        gds_path.unlink()
+    logger.info(
+        f"📦 Bundled {len(bundled)} GDS files into {writer.shard - first_shard} "
+        f"libraries ({writer.cells_deduplicated} duplicate cells shared) in {time.perf_counter() - start:.1f}s, "
+        f"index: {writer.index_path}"
+    )
+
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
 import multiprocessing
+from results_journal import ResultsJournal
 # Parallelized
-def run_dataset_generation(parameters, output_dir, max_workers=1):
-    """Run the dataset generation for all parameters (in parallel, per-trial isolation)."""
+def run_dataset_generation(parameters, output_dir, max_workers=1, pool_mode="warm", max_tasks_per_worker=None, persistent_eda=False, gds_library_shard_size=None, resume=False, retry_failed=False):
+    """Run the dataset generation for all parameters (in parallel, per-trial isolation).
+
+    pool_mode="warm" initializes every worker once (environment, gdsfactory,
+    activated PDK) and reuses it for all of its trials; pool_mode="cold"
+    refreshes the environment and reloads the PDK for every trial.
+    max_tasks_per_worker recycles warm workers after that many trials to bound
+    memory growth of the shared gdsfactory layout (Python >= 3.11, ignored
+    with a warning on older versions).
+    persistent_eda (warm pool only) runs DRC/LVS on long-lived Magic/Netgen
+    interpreters, one of each per worker.
+    gds_library_shard_size bundles the per-sample GDS files into deduplicated
+    libraries of that many samples when all samples are done (see
+    bundle_gds_library).
+
+    Every result is appended to the journal ``<output_dir>/tg_results.jsonl``
+    as soon as its sample finishes (see results_journal.py), and only a few
+    samples per worker are submitted at a time, so memory does not grow with
+    the sweep size. resume skips the samples already in the journal
+    (retry_failed runs the failed ones again); without resume an existing
+    journal is moved aside. tg_results.json and tg_summary.csv are compacted
+    from the journal at the end.
+    """
     n_samples = len(parameters)
     logger.info(f"🚀 Starting Transmission Gate Dataset Generation for {n_samples} samples")
+    if pool_mode not in ("warm", "cold"):
+        raise ValueError(f"pool_mode must be 'warm' or 'cold', not {pool_mode}")
 
     # Prepare top-level dirs
     out_dir = Path(output_dir)
@@ -378,91 +515,128 @@ def run_dataset_generation(parameters, output_dir, max_workers=1):
     with open(out_dir / "tg_parameters.json", 'w') as f:
         json.dump(parameters, f, indent=2)
 
-    results = []
+    journal_path = out_dir / "tg_results.jsonl"
+    if not resume and journal_path.exists() and journal_path.stat().st_size:
+        backup = journal_path.with_name(f"tg_results.{time.strftime('%Y%m%d-%H%M%S')}.jsonl")
+        journal_path.rename(backup)
+        logger.info(f"Moved the previous results journal to {backup} (use --resume to continue it)")
+    journal = ResultsJournal(journal_path)
+    done = journal.completed_ids(include_failed=not retry_failed) if resume else set()
+    pending = [(i, params) for i, params in enumerate(parameters, start=1) if i not in done]
+    if resume:
+        logger.info(f"⏩ Resuming: {n_samples - len(pending)} samples already in {journal_path}, {len(pending)} to run")
+
     total_start = time.time()
-    logger.info(f"📊 Processing {n_samples} transmission gate samples in parallel...")
-    logger.info(f"Using {max_workers} parallel workers")
-
-    futures = []
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        for i, params in enumerate(parameters, start=1):
-            futures.append(executor.submit(run_single_evaluation, i, params, output_dir))
-
-        completed = 0
-        for future in as_completed(futures):
-            result = future.result()
-            results.append(result)
-            completed += 1
-
-            # Progress logging similar to your sequential version
-            if completed % 10 == 0 or completed < 5:
-                success_rate = (
-                    sum(1 for r in results if r.get("success")) / len(results) * 100
-                    if results else 0.0
-                )
-                elapsed = time.time() - total_start
-                avg_time = elapsed / completed
-                eta = avg_time * (n_samples - completed)
-                logger.info(
-                    f"📈 Progress: {completed}/{n_samples} "
-                    f"({completed/n_samples*100:.1f}%) - "
-                    f"Success: {success_rate:.1f}% - "
-                    f"Elapsed: {elapsed/60:.1f}m - ETA: {eta/60:.1f}m"
-                )
-
-    # Final summary (unchanged)
+    logger.info(f"📊 Processing {len(pending)} transmission gate samples in parallel...")
+    logger.info(f"Using {max_workers} parallel workers ({pool_mode} pool)")
+
+    executor_kwargs = {"max_workers": max_workers}
+    if pool_mode == "warm":
+        executor_kwargs["initializer"] = init_worker
+        executor_kwargs["initargs"] = (persistent_eda,)
+        if max_tasks_per_worker:
+            # ProcessPoolExecutor only recycles workers on Python >= 3.11
+            if sys.version_info >= (3, 11):
+                executor_kwargs["max_tasks_per_child"] = max_tasks_per_worker
+            else:
+                logger.warning("--max_tasks_per_worker needs Python 3.11 or newer, workers are not recycled")
+    # bounded submission window: enough queued work to keep every worker busy
+    max_in_flight = 2 * max_workers
+    completed = 0
+    successes = 0
+    with journal, ProcessPoolExecutor(**executor_kwargs) as executor:
+        pending_iter = iter(pending)
+        in_flight = set()
+        while True:
+            for i, params in islice(pending_iter, max_in_flight - len(in_flight)):
+                in_flight.add(executor.submit(run_single_evaluation, i, params, output_dir))
+            if not in_flight:
+                break
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                result = future.result()
+                journal.append(make_json_serializable(result))
+                completed += 1
+                successes += bool(result.get("success"))
+
+                # Progress logging similar to your sequential version
+                if completed % 10 == 0 or completed < 5:
+                    success_rate = successes / completed * 100
+                    elapsed = time.time() - total_start
+                    avg_time = elapsed / completed
+                    eta = avg_time * (len(pending) - completed)
+                    logger.info(
+                        f"📈 Progress: {completed}/{len(pending)} "
+                        f"({completed/len(pending)*100:.1f}%) - "
+                        f"Success: {success_rate:.1f}% - "
+                        f"Elapsed: {elapsed/60:.1f}m - ETA: {eta/60:.1f}m"
+                    )
+
+    # Everything below streams the journal, which also holds the samples of
+    # earlier runs of a resumed sweep
+    journal = ResultsJournal(journal_path)
+    if gds_library_shard_size:
+        bundle_gds_library(journal, output_dir, gds_library_shard_size)
+
+    # Final summary
     total_time = time.time() - total_start
-    successful = [r for r in results if r.get("success")]
-    success_rate = (len(successful) / len(results) * 100) if results else 0.0
+    n_results = 0
+    n_successful = drc_passes = lvs_passes = pex_passes = 0
+    sums = dict.fromkeys(("execution_time", "area_um2", "symmetry_horizontal", "symmetry_vertical"), 0.0)
+    phase_totals = dict.fromkeys(TIMING_PHASES, 0.0)
+    error_counts = {}
+    for r in journal:
+        n_results += 1
+        for phase in TIMING_PHASES:
+            phase_totals[phase] += r.get(f"timing_{phase}_s", 0.0)
+        if r.get("success"):
+            n_successful += 1
+            drc_passes += bool(r.get("drc_pass"))
+            lvs_passes += bool(r.get("lvs_pass"))
+            pex_passes += r.get("pex_status") == "PEX Complete"
+            sums["execution_time"] += r["execution_time"]
+            for key in ("area_um2", "symmetry_horizontal", "symmetry_vertical"):
+                sums[key] += r.get(key, 0)
+        else:
+            error_key = r.get("error", "Unknown error").split('\n')[0][:50]
+            error_counts[error_key] = error_counts.get(error_key, 0) + 1
+    success_rate = (n_successful / n_results * 100) if n_results else 0.0
 
     logger.info(f"\n🎉 Transmission Gate Dataset Generation Complete!")
     logger.info(f"📊 Total time: {total_time:.1f} seconds ({total_time/60:.1f} minutes)")
-    logger.info(f"📈 Success rate: {len(successful)}/{len(results)} ({success_rate:.1f}%)")
-
-    if successful:
-        drc_passes = sum(1 for r in successful if r.get("drc_pass"))
-        lvs_passes = sum(1 for r in successful if r.get("lvs_pass"))
-        pex_passes = sum(1 for r in successful if r.get("pex_status") == "PEX Complete")
-        avg_time = sum(r["execution_time"] for r in successful) / len(successful)
-        avg_area = sum(r.get("area_um2", 0) for r in successful) / len(successful)
-        avg_sym_h = sum(r.get("symmetry_horizontal", 0) for r in successful) / len(successful)
-        avg_sym_v = sum(r.get("symmetry_vertical", 0) for r in successful) / len(successful)
-
-        logger.info(f"   DRC passes: {drc_passes}/{len(successful)} ({drc_passes/len(successful)*100:.1f}%)")
-        logger.info(f"   LVS passes: {lvs_passes}/{len(successful)} ({lvs_passes/len(successful)*100:.1f}%)")
-        logger.info(f"   PEX passes: {pex_passes}/{len(successful)} ({pex_passes/len(successful)*100:.1f}%)")
-        logger.info(f"   Average time per sample: {avg_time:.1f}s")
-        logger.info(f"   Average area: {avg_area:.2f} μm²")
-        logger.info(f"   Average symmetry (H/V): {avg_sym_h:.3f}/{avg_sym_v:.3f}")
-
-    failed = [r for r in results if not r.get("success")]
-    if failed:
-        logger.info(f"\n⚠️ Failed Samples Summary ({len(failed)} total):")
-        error_counts = {}
-        for r in failed:
-            error = r.get("error", "Unknown error")
-            error_key = error.split('\n')[0][:50]
-            error_counts[error_key] = error_counts.get(error_key, 0) + 1
+    logger.info(f"📈 Success rate: {n_successful}/{n_results} ({success_rate:.1f}%)")
+
+    if n_successful:
+        logger.info(f"   DRC passes: {drc_passes}/{n_successful} ({drc_passes/n_successful*100:.1f}%)")
+        logger.info(f"   LVS passes: {lvs_passes}/{n_successful} ({lvs_passes/n_successful*100:.1f}%)")
+        logger.info(f"   PEX passes: {pex_passes}/{n_successful} ({pex_passes/n_successful*100:.1f}%)")
+        logger.info(f"   Average time per sample: {sums['execution_time']/n_successful:.1f}s")
+        logger.info(f"   Average area: {sums['area_um2']/n_successful:.2f} μm²")
+        logger.info(f"   Average symmetry (H/V): {sums['symmetry_horizontal']/n_successful:.3f}/{sums['symmetry_vertical']/n_successful:.3f}")
+
+    if n_results:
+        logger.info(f"\n⏱️ Time per phase (total / mean per sample):")
+        for phase in TIMING_PHASES:
+            logger.info(f"   {phase:<10} {phase_totals[phase]:9.1f}s / {phase_totals[phase]/n_results:6.2f}s")
+
+    if error_counts:
+        logger.info(f"\n⚠️ Failed Samples Summary ({n_results - n_successful} total):")
         for error, count in sorted(error_counts.items(), key=lambda x: x[1], reverse=True):
             logger.info(f"   {count}x: {error}")
 
-    # Persist results/summary (same as before)
+    # Compact the journal into the usual results/summary files
     results_file = out_dir / "tg_results.json"
+    summary_file = out_dir / "tg_summary.csv"
     try:
-        serializable_results = make_json_serializable(results)
-        with open(results_file, 'w') as f:
-            json.dump(serializable_results, f, indent=2)
+        journal.compact(json_path=results_file, csv_path=summary_file)
         logger.info(f"📄 Results saved to: {results_file}")
+        logger.info(f"📄 Summary saved to: {summary_file}")
     except Exception as e:
-        logger.error(f"Failed to save JSON results: {e}")
-
-    df_results = pd.DataFrame(results)
-    summary_file = out_dir / "tg_summary.csv"
-    df_results.to_csv(summary_file, index=False)
-    logger.info(f"📄 Summary saved to: {summary_file}")
+        logger.error(f"Failed to compact the results journal {journal_path}: {e}")
+    journal.close()
 
     # Threshold as before
-    return success_rate >= 50, len(successful), len(results)
+    return success_rate >= 50, n_successful, n_results
 
 import argparse
 def main():
@@ -474,6 +648,18 @@ def main():
     parser.add_argument("--n_cores",    type=int, default=1,        help="Number of CPU cores to use") # Number of CPU cores to use, default=1
     parser.add_argument("--output_dir", type=str, default="result", help="Output directory for the generated dataset")
     parser.add_argument("-y", "--yes", action="store_true", help="Automatic yes to prompts")
+    parser.add_argument("--pool_mode", type=str, default="warm", choices=["warm", "cold"],
+                        help="warm: initialize each worker once and keep the PDK loaded; cold: reload the PDK for every sample")
+    parser.add_argument("--max_tasks_per_worker", type=int, default=None,
+                        help="Recycle warm workers after this many samples (default: never, needs Python >= 3.11)")
+    parser.add_argument("--persistent_eda", action="store_true",
+                        help="Keep one Magic and one Netgen interpreter alive per warm worker for DRC/LVS")
+    parser.add_argument("--gds_library", type=int, default=None, metavar="SHARD_SIZE",
+                        help="Bundle the per-sample GDS files into deduplicated libraries of SHARD_SIZE samples")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip the samples already recorded in <output_dir>/tg_results.jsonl")
+    parser.add_argument("--retry_failed", action="store_true",
+                        help="With --resume, run the samples recorded as failed again")
     args = parser.parse_args()
     json_file = Path(args.json_file).resolve()
     output_dir = args.output_dir
@@ -484,6 +670,7 @@ def main():
     print(f"Using {n_cores} CPU cores for parallel processing")
     print(f"Input file: {json_file}")
     print(f"Output will be saved to: {output_dir}")
+    print(f"Worker pool mode: {args.pool_mode}")
     print("="*70)
     
     # Load parameters from JSON
@@ -517,16 +704,22 @@ def main():
         print(f"   {i}. NMOS: {nmos_w:.2f}μm/{nmos_l:.3f}μm×{nmos_f}f×{nmos_m} | "
               f"PMOS: {pmos_w:.2f}μm/{pmos_l:.3f}μm×{pmos_f}f×{pmos_m}")
     
-    # Prompt user to continue
-    print(f"\nContinue with transmission gate dataset generation for {n_samples} samples? (y/n): ", end="")
-    response = input().lower().strip()
-    if response != 'y':
-        print("Stopping as requested.")
-        return True
+    # Prompt user to continue (-y skips the prompt, e.g. for nohup resumes)
+    if not args.yes:
+        print(f"\nContinue with transmission gate dataset generation for {n_samples} samples? (y/n): ", end="")
+        response = input().lower().strip()
+        if response != 'y':
+            print("Stopping as requested.")
+            return True
     
     # Generate dataset
     print(f"\nStarting generation of {n_samples} transmission gate samples...")
-    success, passed, total = run_dataset_generation(parameters, output_dir, max_workers=n_cores)
+    success, passed, total = run_dataset_generation(
+        parameters, output_dir, max_workers=n_cores,
+        pool_mode=args.pool_mode, max_tasks_per_worker=args.max_tasks_per_worker,
+        persistent_eda=args.persistent_eda, gds_library_shard_size=args.gds_library,
+        resume=args.resume, retry_failed=args.retry_failed
+    )
     
     if success:
         print(f"\n🎉 Transmission gate dataset generation completed successfully!")
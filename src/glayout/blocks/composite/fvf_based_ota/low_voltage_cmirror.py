@@ -8,7 +8,7 @@ from gdsfactory import Component
 from gdsfactory.components import text_freetype, rectangle
 from glayout.flow.primitives.fet import nmos, pmos, multiplier
 from glayout.flow.pdk.util.comp_utils import evaluate_bbox, prec_center, align_comp_to_port, prec_ref_center
-from glayout.flow.pdk.util.snap_to_grid import component_snap_to_grid
+from glayout.flow.pdk.util.snap_to_grid import component_snap_to_grid, finalize_component
 from glayout.flow.pdk.util.port_utils import rename_ports_by_orientation
 from glayout.flow.routing.straight_route import straight_route
 from glayout.flow.routing.c_route import c_route
@@ -55,8 +55,7 @@ def add_lvcm_labels(lvcm_in: Component,
         alignment = ('c','b') if alignment is None else alignment
         compref = align_comp_to_port(comp, prt, alignment=alignment)
         lvcm_in.add(compref)
-    # In GDSFactory v9, flatten() mutates in-place and returns None
-    lvcm_in.flatten()
+    finalize_component(lvcm_in)
     return lvcm_in
 def low_voltage_cmirr_netlist(bias_fvf: Component, cascode_fvf: Component, fet_1_ref: ComponentReference, fet_2_ref: ComponentReference, fet_3_ref: ComponentReference, fet_4_ref: ComponentReference) -> Netlist:
     
@@ -16,7 +16,7 @@ from glayout.flow.routing.c_route import c_route
 from glayout.flow.routing.straight_route import straight_route
 from glayout.flow.pdk.util.comp_utils import evaluate_bbox, prec_ref_center, prec_center, align_comp_to_port
 from glayout.flow.pdk.util.port_utils import rename_ports_by_orientation
-from glayout.flow.pdk.util.snap_to_grid import component_snap_to_grid
+from glayout.flow.pdk.util.snap_to_grid import component_snap_to_grid, finalize_component
 from gdsfactory.components import text_freetype, rectangle
 from glayout.flow.pdk.mappedpdk import MappedPDK
 from glayout.flow.primitives.via_gen import via_array, via_stack
@@ -171,8 +171,7 @@ def sky130_add_ota_labels(ota_in: Component) -> Component:
         alignment = ('c','b') if alignment is None else alignment
         compref = align_comp_to_port(comp, prt, alignment=alignment)
         ota_in.add(compref)
-    # In GDSFactory v9, flatten() mutates in-place and returns None
-    ota_in.flatten()
+    finalize_component(ota_in)
     return ota_in
 def sky130_add_ota_lvt_layer(ota_in: Component) -> Component:
     global __NO_LVT_GLOBAL_
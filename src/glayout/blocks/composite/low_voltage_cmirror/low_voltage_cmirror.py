@@ -9,7 +9,7 @@ from gdsfactory.cell import cell
 from gdsfactory import Component
 from gdsfactory.components import text_freetype, rectangle
 from glayout.util.comp_utils import evaluate_bbox, prec_center, align_comp_to_port, prec_ref_center
-from glayout.util.snap_to_grid import component_snap_to_grid
+from glayout.util.snap_to_grid import component_snap_to_grid, finalize_component
 from glayout.util.port_utils import rename_ports_by_orientation
 from glayout.util.port_utils import add_ports_perimeter
 from glayout.blocks.elementary.FVF import fvf_netlist, flipped_voltage_follower
@@ -53,8 +53,7 @@ def add_lvcm_labels(lvcm_in: Component,
         alignment = ('c','b') if alignment is None else alignment
         compref = align_comp_to_port(comp, prt, alignment=alignment)
         lvcm_in.add(compref)
-    # In GDSFactory v9, flatten() mutates in-place and returns None
-    lvcm_in.flatten()
+    finalize_component(lvcm_in)
     return lvcm_in
 def low_voltage_cmirr_netlist(bias_fvf: Component, cascode_fvf: Component, fet_1_ref: ComponentReference, fet_2_ref: ComponentReference, fet_3_ref: ComponentReference, fet_4_ref: ComponentReference) -> Netlist:
     
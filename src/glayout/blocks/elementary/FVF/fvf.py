@@ -7,7 +7,7 @@ from gdsfactory.component import Component
 from gdsfactory import Component
 from glayout.primitives.fet import nmos, pmos, multiplier
 from glayout.util.comp_utils import evaluate_bbox, prec_center, prec_ref_center, align_comp_to_port
-from glayout.util.snap_to_grid import component_snap_to_grid
+from glayout.util.snap_to_grid import component_snap_to_grid, finalize_component
 from glayout.util.port_utils import rename_ports_by_orientation
 from glayout.primitives.guardring import tapring
 from glayout.util.port_utils import add_ports_perimeter
@@ -60,8 +60,7 @@ def sky130_add_fvf_labels(fvf_in: Component) -> Component:
         alignment = ('c','b') if alignment is None else alignment
         compref = align_comp_to_port(comp, prt, alignment=alignment)
         fvf_in.add(compref)
-    # In GDSFactory v9, flatten() mutates in-place and returns None
-    fvf_in.flatten()
+    finalize_component(fvf_in)
     return fvf_in
 @cell
 def  flipped_voltage_follower(
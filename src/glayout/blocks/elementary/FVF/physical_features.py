@@ -6,6 +6,8 @@ import shutil
 from pathlib import Path
 from gdsfactory.typings import Component
 from gdsfactory.geometry.boolean import boolean
+from glayout.blocks.evaluator_box.symmetry import symmetry_report
+from glayout.spice.parasitics import total_parasitics
 
 def calculate_area(component: Component) -> float:
     """Calculates the area of a gdsfactory Component."""
@@ -31,6 +33,11 @@ def _mirror_and_xor(component: Component, axis: str) -> float:
 
 def calculate_symmetry_scores(component: Component) -> tuple[float, float]:
     """Calculates horizontal and vertical symmetry scores (1.0 = perfect symmetry)."""
+    report = symmetry_report(component)
+    return report["symmetry_score_horizontal"], report["symmetry_score_vertical"]
+
+def calculate_symmetry_scores_boolean(component: Component) -> tuple[float, float]:
+    """Reference implementation of calculate_symmetry_scores using gdsfactory boolean XOR (slow)."""
     original_area = calculate_area(component)
     if original_area == 0:
         return (1.0, 1.0)
@@ -43,35 +50,8 @@ def calculate_symmetry_scores(component: Component) -> tuple[float, float]:
     return symmetry_score_horizontal, symmetry_score_vertical
 
 def _parse_simple_parasitics(component_name: str) -> tuple[float, float]:
-    """Parses total parasitic R and C from a SPICE file by simple summation."""
-    total_resistance = 0.0
-    total_capacitance = 0.0
-    spice_file_path = f"{component_name}_pex.spice"
-    if not os.path.exists(spice_file_path):
-        return 0.0, 0.0
-    with open(spice_file_path, 'r') as f:
-        for line in f:
-            line = line.strip().upper()
-            parts = line.split()
-            if not parts: continue
-            
-            name = parts[0]
-            if name.startswith('R') and len(parts) >= 4:
-                try: total_resistance += float(parts[3])
-                except (ValueError): continue
-            elif name.startswith('C') and len(parts) >= 4:
-                try:
-                    cap_str = parts[3]
-                    unit = cap_str[-1]
-                    val_str = cap_str[:-1]
-                    if unit == 'F': cap_value = float(val_str) * 1e-15
-                    elif unit == 'P': cap_value = float(val_str) * 1e-12
-                    elif unit == 'N': cap_value = float(val_str) * 1e-9
-                    elif unit == 'U': cap_value = float(val_str) * 1e-6
-                    else: cap_value = float(cap_str)
-                    total_capacitance += cap_value
-                except (ValueError): continue
-    return total_resistance, total_capacitance
+    """Parses total parasitic R and C from {component_name}_pex.spice (see glayout.spice.parasitics)."""
+    return total_parasitics(f"{component_name}_pex.spice")
 
 def run_physical_feature_extraction(layout_path: str, component_name: str, top_level: Component) -> dict:
     """
@@ -102,9 +82,12 @@ def run_physical_feature_extraction(layout_path: str, component_name: str, top_l
     # Geometric Features
     try:
         physical_results["geometric"]["raw_area_um2"] = calculate_area(top_level)
-        sym_h, sym_v = calculate_symmetry_scores(top_level)
-        physical_results["geometric"]["symmetry_score_horizontal"] = sym_h
-        physical_results["geometric"]["symmetry_score_vertical"] = sym_v
+        report = symmetry_report(top_level)
+        physical_results["geometric"]["symmetry_score_horizontal"] = report["symmetry_score_horizontal"]
+        physical_results["geometric"]["symmetry_score_vertical"] = report["symmetry_score_vertical"]
+        physical_results["geometric"]["asymmetry_per_layer"] = {
+            str(layer): values for layer, values in report["layers"].items()
+        }
     except Exception as e:
         print(f"Warning: Could not calculate geometric features. Error: {e}")
 
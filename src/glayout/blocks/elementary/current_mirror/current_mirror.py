@@ -10,6 +10,7 @@ from glayout.util.port_utils import add_ports_perimeter,rename_ports_by_orientat
 from gdsfactory.component import Component
 from gdsfactory.cell import cell
 from glayout.util.comp_utils import evaluate_bbox, prec_center, prec_ref_center, align_comp_to_port
+from glayout.util.snap_to_grid import finalize_component
 from typing import Union 
 from glayout.primitives.via_gen import via_stack
 from gdsfactory.components import text_freetype, rectangle
@@ -57,8 +58,7 @@ def sky130_add_cm_labels(cm_in: Component) -> Component:
         alignment = ('c','b') if alignment is None else alignment
         compref = align_comp_to_port(comp, prt, alignment=alignment)
         cm_in.add(compref)
-    # In GDSFactory v9, flatten() mutates in-place and returns None
-    cm_in.flatten()
+    finalize_component(cm_in)
     return cm_in
 def current_mirror_netlist(
     pdk: MappedPDK, 
@@ -280,9 +280,7 @@ def sky130_add_current_mirror_labels(current_mirror_in: Component) -> Component:
             compref = comp
         current_mirror_in.add(compref)
     
-    # In GDSFactory v9, flatten() mutates in-place and returns None
-    
-    current_mirror_in.flatten()
+    finalize_component(current_mirror_in)
     
     return current_mirror_in
 # Create and evaluate a current mirror instance
@@ -19,7 +19,7 @@ from glayout.util.port_utils import (
     rename_ports_by_orientation,
     set_port_orientation,
 )
-from glayout.util.snap_to_grid import component_snap_to_grid
+from glayout.util.snap_to_grid import component_snap_to_grid, finalize_component
 from glayout.placement.common_centroid_ab_ba import common_centroid_ab_ba
 from glayout.primitives.fet import nmos, pmos
 from glayout.primitives.guardring import tapring
@@ -77,8 +77,7 @@ def sky130_add_df_labels(df_in: Component) -> Component:
         alignment = ('c','b') if alignment is None else alignment
         compref = align_comp_to_port(comp, prt, alignment=alignment)
         df_in.add(compref)
-    # In GDSFactory v9, flatten() mutates in-place and returns None
-    df_in.flatten()
+    finalize_component(df_in)
     return df_in
 def diff_pair_netlist(fetL: Component, fetR: Component) -> Netlist:
 	diff_pair_netlist = Netlist(circuit_name='DIFF_PAIR', nodes=['VP', 'VN', 'VDD1', 'VDD2', 'VTAIL', 'B'])
@@ -204,9 +203,7 @@ def sky130_add_diff_pair_labels(diff_pair_in: Component) -> Component:
             compref = comp
         diff_pair_in.add(compref)
     
-    # In GDSFactory v9, flatten() mutates in-place and returns None
-    
-    diff_pair_in.flatten()
+    finalize_component(diff_pair_in)
     
     return diff_pair_in
 @cell
@@ -4,7 +4,7 @@ from gdsfactory.component import Component
 from gdsfactory import Component
 from glayout.primitives.fet import nmos, pmos, multiplier
 from glayout.util.comp_utils import evaluate_bbox, prec_center, align_comp_to_port, movex, movey
-from glayout.util.snap_to_grid import component_snap_to_grid
+from glayout.util.snap_to_grid import component_snap_to_grid, finalize_component
 from glayout.util.port_utils import rename_ports_by_orientation
 from glayout.routing.straight_route import straight_route
 from glayout.routing.c_route import c_route
@@ -65,8 +65,7 @@ def add_tg_labels(tg_in: Component,
         alignment = ('c','b') if alignment is None else alignment
         compref = align_comp_to_port(comp, prt, alignment=alignment)
         tg_in.add(compref)
-    # In GDSFactory v9, flatten() mutates in-place and returns None
-    tg_in.flatten()
+    finalize_component(tg_in)
     return tg_in
 def get_component_netlist(component):
     """Helper function to get netlist object from component info, compatible with all gdsfactory versions"""
@@ -136,8 +135,7 @@ def sky130_add_tg_labels(tg_in: Component) -> Component:
         alignment = ('c','b') if alignment is None else alignment
         compref = align_comp_to_port(comp, prt, alignment=alignment)
         tg_in.add(compref)
-    # In GDSFactory v9, flatten() mutates in-place and returns None
-    tg_in.flatten()
+    finalize_component(tg_in)
     return tg_in
 def tg_netlist(nfet: Component, pfet: Component) -> Netlist:
 
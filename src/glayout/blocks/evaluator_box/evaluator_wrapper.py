@@ -38,7 +38,8 @@ def run_evaluation(layout_path: str, component_name: str, top_level: Component)
         f"{component_name}.nodes",
         f"{component_name}.sim",
         f"{component_name}.pex.spice",
-        f"{component_name}_pex.spice"
+        f"{component_name}_pex.spice",
+        f"{component_name}_extraction.json"
     ]
     
     for f_path in files_to_delete:
@@ -0,0 +1,207 @@
+# symmetry.py
+"""
+Fast layout symmetry scoring on flattened per-layer polygons.
+
+The layout of every layer is rasterized on the compressed grid of its own
+vertex coordinates, made symmetric about the mirror axes (x=0 and y=0), so
+the mirrored layer is the same raster flipped. The XOR of a layer with its
+mirror image is then a NumPy mask and its area an exact sum of cell areas
+(exact for manhattan geometry; around polygons with diagonal edges the grid
+is refined to diagonal_resolution database units and cells are classified by
+their center). The grid is rasterized in bands of rows paired with their mirror
+bands, so the memory stays bounded on large layouts whatever the number of
+distinct coordinates.
+
+Scores follow calculate_symmetry_scores in physical_features.py:
+    symmetry_score_horizontal = 1 - area(A xor mirror_x(A)) / area(A)   (mirror x -> -x)
+    symmetry_score_vertical   = 1 - area(A xor mirror_y(A)) / area(A)   (mirror y -> -y)
+"""
+from gdsfactory.component import Component
+import numpy as np
+
+# coordinates are snapped to this many database units per micron
+DBU_PER_UM = 1000
+# cells of one band of the raster (layer_asymmetry), bounds the memory used for large layouts
+MAX_BAND_CELLS = 2**22
+
+
+def layer_polygons(component: Component) -> dict[tuple[int, int], list[np.ndarray]]:
+    """Flattened polygons of every layer as (N, 2) int64 arrays in database units."""
+    polygons = component.get_polygons_points(by="tuple")
+    return {
+        tuple(layer): [np.rint(np.asarray(points, dtype=np.float64) * DBU_PER_UM).astype(np.int64) for points in layer_points]
+        for layer, layer_points in polygons.items()
+        if len(layer_points)
+    }
+
+
+def _symmetric_breakpoints(values: np.ndarray) -> np.ndarray:
+    values = np.unique(values)
+    return np.unique(np.concatenate((values, -values)))
+
+
+def _is_manhattan(points: np.ndarray) -> bool:
+    edges = np.roll(points, -1, axis=0) - points
+    return bool(np.all((edges[:, 0] == 0) | (edges[:, 1] == 0)))
+
+
+def _grid(polygons: list[np.ndarray], diagonal_resolution: int) -> tuple[np.ndarray, np.ndarray]:
+    """breakpoints of the compressed grid, symmetric about 0"""
+    all_points = np.concatenate(polygons)
+    xs, ys = [all_points[:, 0]], [all_points[:, 1]]
+    for points in polygons:
+        if len(points) >= 3 and not _is_manhattan(points):
+            # refine the grid over the bounding box of polygons with diagonal edges
+            (xmin, ymin), (xmax, ymax) = points.min(axis=0), points.max(axis=0)
+            xs.append(np.arange(xmin, xmax + 1, diagonal_resolution))
+            ys.append(np.arange(ymin, ymax + 1, diagonal_resolution))
+    return _symmetric_breakpoints(np.concatenate(xs)), _symmetric_breakpoints(np.concatenate(ys))
+
+
+class _LayerRaster:
+    """the polygons of one layer on the grid xs, ys, rasterized a band of rows at a time
+    manhattan polygons are kept as winding number steps: every vertical edge adds +-1 to the cells on
+    its right in the rows it spans (sorted by row, so a band only needs the steps below it summed up)
+    """
+
+    def __init__(self, polygons: list[np.ndarray], xs: np.ndarray, ys: np.ndarray):
+        self.xs, self.ys = xs, ys
+        self.general = list()
+        rows, cols, signs = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+        for points in polygons:
+            if len(points) < 3:
+                continue
+            if not _is_manhattan(points):
+                self.general.append(points)
+                continue
+            # orient counter clockwise so overlapping polygons never cancel
+            x, y = points[:, 0], points[:, 1]
+            signed_area2 = np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)
+            if signed_area2 == 0:
+                continue
+            if signed_area2 < 0:
+                points = points[::-1]
+            start, end = points, np.roll(points, -1, axis=0)
+            vertical = (start[:, 0] == end[:, 0]) & (start[:, 1] != end[:, 1])
+            if not np.any(vertical):
+                continue
+            col = np.searchsorted(xs, start[vertical, 0])
+            row_start = np.searchsorted(ys, start[vertical, 1])
+            row_end = np.searchsorted(ys, end[vertical, 1])
+            # counter clockwise: edges going down are on the left side of the polygon
+            sign = np.where(row_end < row_start, 1, -1)
+            rows += [np.minimum(row_start, row_end), np.maximum(row_start, row_end)]
+            cols += [col, col]
+            signs += [sign, -sign]
+        rows, cols, signs = np.concatenate(rows), np.concatenate(cols), np.concatenate(signs)
+        order = np.argsort(rows, kind="stable")
+        self.rows, self.cols, self.signs = rows[order], cols[order], signs[order]
+
+    def rows_mask(self, row0: int, row1: int) -> np.ndarray:
+        """covered cells of the rows [row0, row1), mask[i, j] is the cell [xs[j], xs[j+1]] x [ys[row0+i], ys[row0+i+1]]"""
+        first, below, last = np.searchsorted(self.rows, [0, row0, row1])
+        # winding of row0 from the steps below the band, then the steps inside it
+        winding = np.zeros((row1 - row0, len(self.xs)), dtype=np.int64)
+        winding[0] = np.bincount(self.cols[first:below], weights=self.signs[first:below], minlength=len(self.xs)).astype(np.int64)
+        np.add.at(winding, (self.rows[below:last] - row0, self.cols[below:last]), self.signs[below:last])
+        winding = np.cumsum(np.cumsum(winding, axis=0), axis=1)
+        covered = winding[:, :-1] > 0
+        for points in self.general:
+            covered |= _rasterize_general(points, self.xs, self.ys, row0, row1)
+        return covered
+
+
+def rasterize_layer(polygons: list[np.ndarray], diagonal_resolution: int = 5) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Union of the polygons on a grid whose breakpoints are symmetric about 0.
+
+    returns (xs, ys, mask) where mask[i, j] is True if the cell
+    [xs[j], xs[j+1]] x [ys[i], ys[i+1]] is covered.
+    the whole mask is held in memory, layer_asymmetry works on bands of rows instead.
+    """
+    xs, ys = _grid(polygons, diagonal_resolution)
+    return xs, ys, _LayerRaster(polygons, xs, ys).rows_mask(0, len(ys) - 1)
+
+
+def _rasterize_general(points: np.ndarray, xs: np.ndarray, ys: np.ndarray, row0: int, row1: int) -> np.ndarray:
+    """even-odd test of every grid cell center inside the polygon bounding box, in the rows [row0, row1)"""
+    mask = np.zeros((row1 - row0, len(xs) - 1), dtype=bool)
+    col0, col1 = np.searchsorted(xs, points[:, 0].min()), np.searchsorted(xs, points[:, 0].max())
+    first = max(np.searchsorted(ys, points[:, 1].min()), row0)
+    last = min(np.searchsorted(ys, points[:, 1].max()), row1)
+    if first >= last or col0 >= col1:
+        return mask
+    cx = (xs[col0:col1] + xs[col0 + 1:col1 + 1]) / 2
+    cy = (ys[first:last] + ys[first + 1:last + 1]) / 2
+    px, py = np.meshgrid(cx, cy)
+    inside = np.zeros(px.shape, dtype=bool)
+    x0, y0 = points[:, 0].astype(np.float64), points[:, 1].astype(np.float64)
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+    for ax, ay, bx, by in zip(x0, y0, x1, y1):
+        if ay == by:
+            continue
+        crosses = (ay > py) != (by > py)
+        x_cross = ax + (py - ay) * (bx - ax) / (by - ay)
+        inside ^= crosses & (px < x_cross)
+    mask[first - row0:last - row0, col0:col1] = inside
+    return mask
+
+
+def layer_asymmetry(polygons: list[np.ndarray], diagonal_resolution: int = 5, max_cells: int = MAX_BAND_CELLS) -> dict[str, float]:
+    """area, and XOR area against the mirror image about x=0 and y=0, of one layer (um^2)
+
+    the raster is built a band of rows at a time together with the mirrored band (rows i and n-1-i are
+    mirror images about y=0), so at most about 2 * max_cells cells are held in memory whatever the grid size
+    """
+    xs, ys = _grid(polygons, diagonal_resolution)
+    raster = _LayerRaster(polygons, xs, ys)
+    widths = np.diff(xs).astype(np.float64) / DBU_PER_UM
+    heights = np.diff(ys).astype(np.float64) / DBU_PER_UM
+    n = len(heights)
+    band = max(1, max_cells // max(len(widths), 1))
+    area = asymmetry_x = asymmetry_y = 0.0
+
+    def row_sums(mask: np.ndarray, row0: int) -> tuple[float, float]:
+        rows = heights[row0:row0 + len(mask)]
+        return float(rows @ (mask @ widths)), float(rows @ ((mask ^ mask[:, ::-1]) @ widths))
+
+    half = n // 2
+    for row0 in range(0, half, band):
+        row1 = min(row0 + band, half)
+        lower = raster.rows_mask(row0, row1)
+        upper = raster.rows_mask(n - row1, n - row0)
+        for mask, first in ((lower, row0), (upper, n - row1)):
+            mask_area, mask_asymmetry_x = row_sums(mask, first)
+            area += mask_area
+            asymmetry_x += mask_asymmetry_x
+        # row i and its mirror row n-1-i have the same height, both sides count the xor
+        asymmetry_y += 2 * float(heights[row0:row1] @ ((lower ^ upper[::-1]) @ widths))
+    if n % 2:
+        # the middle row is its own mirror image about y=0
+        mask_area, mask_asymmetry_x = row_sums(raster.rows_mask(half, half + 1), half)
+        area += mask_area
+        asymmetry_x += mask_asymmetry_x
+    return {"area": area, "asymmetry_x": asymmetry_x, "asymmetry_y": asymmetry_y}
+
+
+def symmetry_report(component_or_polygons: Component | dict, diagonal_resolution: int = 5, max_cells: int = MAX_BAND_CELLS) -> dict:
+    """Horizontal/vertical symmetry scores plus the asymmetry of every layer.
+
+    accepts a Component or the output of layer_polygons
+    diagonal_resolution = grid refinement (database units) around non-manhattan polygons
+    max_cells = cells of one band of the raster (see layer_asymmetry)
+    returns {"symmetry_score_horizontal", "symmetry_score_vertical", "layers": {layer: layer_asymmetry}}
+    """
+    polygons = component_or_polygons
+    if not isinstance(component_or_polygons, dict):
+        polygons = layer_polygons(component_or_polygons)
+    layers = {layer: layer_asymmetry(layer_polys, diagonal_resolution, max_cells) for layer, layer_polys in polygons.items()}
+    total_area = sum(layer["area"] for layer in layers.values())
+    if total_area == 0:
+        return {"symmetry_score_horizontal": 1.0, "symmetry_score_vertical": 1.0, "layers": layers}
+    asymmetry_x = sum(layer["asymmetry_x"] for layer in layers.values())
+    asymmetry_y = sum(layer["asymmetry_y"] for layer in layers.values())
+    return {
+        "symmetry_score_horizontal": 1.0 - asymmetry_x / total_area,
+        "symmetry_score_vertical": 1.0 - asymmetry_y / total_area,
+        "layers": layers,
+    }
@@ -0,0 +1,473 @@
+"""
+batch DRC/LVS using long lived magic and netgen interpreters
+
+usage:
+    from glayout.pdk.batch_verification import BatchVerifier
+    with sky130_mapped_pdk.batch_verifier(processes=4) as verifier:
+        results = verifier.drc_many([(gds_path, design_name, report_path), ...])
+
+MappedPDK.drc_magic/lvs_netgen start a new magic (and netgen) for every design, which means reloading the
+tech file every time. BatchVerifier keeps a pool of interpreters started once with the pdk magicrc and streams
+tcl commands to them over stdin. Every command block ends by printing a sentinel line, so the output of each
+job is read back from stdout without closing the process. Jobs that time out or crash the interpreter kill it,
+and the interpreter is restarted for the next job.
+The interpreter commands can be overridden (e.g. with a fake interpreter for testing).
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from queue import Queue
+from typing import Iterable, Sequence
+import os
+import re
+import selectors
+import shutil
+import subprocess
+import threading
+import time
+
+from glayout.pdk.extraction_artifacts import write_extraction_manifest
+from glayout.util.snap_to_grid import hierarchy_kept
+
+
+# defines custom_drc_save_report in magic, writes the same report format as MappedPDK.drc_magic
+MAGIC_DRC_REPORT_PROC = r"""
+proc custom_drc_save_report {{cellname ""} {outfile ""}} {
+    if {$outfile == ""} {set outfile "drc.out"}
+    set fout [open $outfile w]
+    set oscale [cif scale out]
+    if {$cellname == ""} {
+        select top cell
+        set cellname [cellname list self]
+    } else {
+        load $cellname
+        select top cell
+    }
+    drc check
+    set count [drc list count]
+    puts $fout "$cellname count: $count"
+    puts $fout "----------------------------------------"
+    set drcresult [drc listall why]
+    foreach {errtype coordlist} $drcresult {
+        puts $fout $errtype
+        puts $fout "----------------------------------------"
+        foreach coord $coordlist {
+            set bllx [expr {$oscale * [lindex $coord 0]}]
+            set blly [expr {$oscale * [lindex $coord 1]}]
+            set burx [expr {$oscale * [lindex $coord 2]}]
+            set bury [expr {$oscale * [lindex $coord 3]}]
+            set coords [format " %.3fum %.3fum %.3fum %.3fum" $bllx $blly $burx $bury]
+            puts $fout "$coords"
+        }
+        puts $fout "----------------------------------------"
+    }
+    puts $fout ""
+    close $fout
+}
+
+proc glayout_reset {} {
+    catch {load __glayout_scratch__ -silent}
+    foreach cell [cellname list allcells] {
+        if {$cell != "__glayout_scratch__"} {catch {cellname delete $cell -noprompt}}
+    }
+}
+"""
+
+
+class InterpreterError(RuntimeError):
+    """the interpreter exited (crashed) while running a job"""
+
+
+class InterpreterProcess:
+    """a tcl interpreter (magic or netgen) kept alive between jobs and driven through its stdin/stdout
+    args:
+    command = argv used to start the interpreter
+    startup_script = tcl run once after (re)starting
+    env, cwd = passed to subprocess.Popen
+    max_jobs = restart the interpreter after this many jobs (None = never), limits memory growth
+    """
+
+    def __init__(
+        self,
+        command: Sequence[str],
+        startup_script: str = "",
+        env: dict | None = None,
+        cwd: str | Path | None = None,
+        max_jobs: int | None = None,
+    ):
+        self.command = list(command)
+        self.startup_script = startup_script
+        self.env = env
+        self.cwd = cwd
+        self.max_jobs = max_jobs
+        self.jobs_run = 0
+        self.restarts = 0
+        self._proc: subprocess.Popen | None = None
+        self._buffer = b""
+        self._sentinel_id = 0
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self, timeout: float = 60) -> None:
+        """starts the interpreter (if not running) and runs the startup script"""
+        if self.alive:
+            return
+        if self._proc is not None:
+            self.restarts += 1
+        self._proc = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            env=self.env,
+            cwd=self.cwd,
+        )
+        self._buffer = b""
+        self.jobs_run = 0
+        self.run(self.startup_script, timeout=timeout, _count_job=False)
+
+    def run(self, script: str, timeout: float = 600, _count_job: bool = True) -> str:
+        """sends script to the interpreter and returns everything it printed until the script finished
+        raises TimeoutError or InterpreterError (in both cases the interpreter is killed)
+        """
+        if not self.alive:
+            self.start()
+        elif self.max_jobs and _count_job and self.jobs_run >= self.max_jobs:
+            self.close()
+            self.start()
+        self._sentinel_id += 1
+        marker = f"__glayout_done_{os.getpid()}_{self._sentinel_id}__"
+        # the interpreter prints the marker in upper case, so an interpreter echoing its input cannot match it early
+        sentinel = marker.upper().encode()
+        block = f"{script}\nputs stdout [string toupper {{{marker}}}]\nflush stdout\n"
+        try:
+            self._proc.stdin.write(block.encode())
+            self._proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            self.kill()
+            raise InterpreterError(f"{self.command[0]} is not accepting commands: {e}")
+        output = self._read_until(sentinel, timeout)
+        if _count_job:
+            self.jobs_run += 1
+        return output
+
+    def _read_until(self, sentinel: bytes, timeout: float) -> str:
+        deadline = time.monotonic() + timeout
+        stdout = self._proc.stdout
+        with selectors.DefaultSelector() as selector:
+            selector.register(stdout, selectors.EVENT_READ)
+            while True:
+                index = self._buffer.find(sentinel)
+                if index != -1:
+                    output = self._buffer[:index]
+                    self._buffer = self._buffer[index + len(sentinel):].lstrip(b"\r\n")
+                    return output.decode(errors="replace")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.kill()
+                    raise TimeoutError(f"{self.command[0]} did not finish within {timeout}s")
+                if not selector.select(remaining):
+                    continue
+                chunk = os.read(stdout.fileno(), 65536)
+                if not chunk:
+                    output = self._buffer.decode(errors="replace")
+                    self.kill()
+                    raise InterpreterError(f"{self.command[0]} exited unexpectedly, output:\n{output[-2000:]}")
+                self._buffer += chunk
+
+    def kill(self) -> None:
+        if self._proc is None:
+            return
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.wait()
+        for pipe in (self._proc.stdin, self._proc.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+    def close(self, timeout: float = 10) -> None:
+        """asks the interpreter to exit, kills it if it does not"""
+        if self.alive:
+            try:
+                self._proc.stdin.write(b"exit\n")
+                self._proc.stdin.close()
+                self._proc.wait(timeout=timeout)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        self.kill()
+
+
+class InterpreterPool:
+    """N interpreters of the same kind, a job checks out a free interpreter for its duration"""
+
+    def __init__(self, processes: int, **interpreter_kwargs):
+        if processes < 1:
+            raise ValueError("processes must be a positive int")
+        self.interpreters = [InterpreterProcess(**interpreter_kwargs) for _ in range(processes)]
+        self._free: Queue[InterpreterProcess] = Queue()
+        for interpreter in self.interpreters:
+            self._free.put(interpreter)
+
+    def run(self, script: str, timeout: float = 600, retries: int = 1) -> str:
+        """runs script on a free interpreter, a crashed interpreter is restarted and the job retried"""
+        interpreter = self._free.get()
+        try:
+            for attempt in range(retries + 1):
+                try:
+                    return interpreter.run(script, timeout=timeout)
+                except InterpreterError:
+                    if attempt == retries:
+                        raise
+        finally:
+            self._free.put(interpreter)
+
+    @property
+    def restarts(self) -> int:
+        return sum(interpreter.restarts for interpreter in self.interpreters)
+
+    def close(self) -> None:
+        for interpreter in self.interpreters:
+            interpreter.close()
+
+
+def write_lvs_schematic(
+    netlist: str,
+    design_name: str,
+    output_path: str | Path,
+    schematic_ref_file: str | Path | None = None,
+    add_micron_units: bool = False,
+) -> Path:
+    """writes the schematic spice netgen compares against (same preparation as MappedPDK.lvs_netgen)
+    the subckt closed by the last .ends is renamed to design_name, schematic_ref_file is included first
+    add_micron_units appends u to unitless w= and l= values (needed for gf180)
+    """
+    last_ends = re.findall(r"^\s*\.ends\s+(\S+)", netlist, flags=re.MULTILINE)
+    if last_ends and last_ends[-1] != design_name:
+        netlist = netlist.replace(last_ends[-1], design_name)
+    if add_micron_units:
+        netlist = re.sub(r"(w=)([0-9.]+)(\s|$)", r"\1\2u\3", netlist, flags=re.MULTILINE)
+        netlist = re.sub(r"(l=)([0-9.]+)(\s|$)", r"\1\2u\3", netlist, flags=re.MULTILINE)
+    output_path = Path(output_path)
+    with open(output_path, "w") as f:
+        if schematic_ref_file is not None:
+            f.write(f".include {Path(schematic_ref_file).resolve()}\n")
+        f.write(netlist)
+    return output_path
+
+
+def _tcl_path(path: str | Path) -> str:
+    """quotes a path for tcl"""
+    return "{" + str(Path(path).resolve()) + "}"
+
+
+class BatchVerifier:
+    """pool of persistent magic (DRC + extraction) and netgen (LVS) interpreters
+    args:
+    magicrc = pdk magicrc file (tech file is loaded once per interpreter)
+    lvs_setup_file = netgen setup tcl for the pdk (required for lvs)
+    processes = number of interpreters of each kind
+    timeout = default per job timeout in seconds
+    max_jobs_per_process = restart interpreters after this many jobs (None = never)
+    magic_command, netgen_command = override the interpreter argv (e.g. for a fake interpreter)
+    """
+
+    def __init__(
+        self,
+        magicrc: str | Path | None,
+        lvs_setup_file: str | Path | None = None,
+        processes: int = 1,
+        timeout: float = 600,
+        max_jobs_per_process: int | None = 200,
+        env: dict | None = None,
+        magic_command: Sequence[str] | None = None,
+        netgen_command: Sequence[str] | None = None,
+    ):
+        if magic_command is None:
+            if shutil.which("magic") is None:
+                raise RuntimeError("Magic not found in the system")
+            magic_command = ["magic", "-rcfile", str(magicrc), "-noconsole", "-dnull"]
+        self.lvs_setup_file = lvs_setup_file
+        self.timeout = timeout
+        self.processes = processes
+        self._env = dict(os.environ, **(env or {}))
+        self._magic = InterpreterPool(
+            processes,
+            command=magic_command,
+            startup_script=MAGIC_DRC_REPORT_PROC,
+            env=self._env,
+            max_jobs=max_jobs_per_process,
+        )
+        self._netgen_command = netgen_command
+        self._max_jobs = max_jobs_per_process
+        self._netgen: InterpreterPool | None = None
+        self._netgen_lock = threading.Lock()
+
+    def _netgen_pool(self) -> InterpreterPool:
+        """netgen interpreters are only started if lvs is used"""
+        with self._netgen_lock:
+            if self._netgen is None:
+                command = self._netgen_command
+                if command is None:
+                    if shutil.which("netgen") is None:
+                        raise RuntimeError("Netgen not found in the system")
+                    command = ["netgen", "-noconsole"]
+                self._netgen = InterpreterPool(
+                    self.processes, command=command, env=self._env, max_jobs=self._max_jobs
+                )
+            return self._netgen
+
+    def drc(self, gds_path: str | Path, design_name: str, report_path: str | Path, timeout: float | None = None) -> dict:
+        """runs magic DRC on one gds file and writes the report (same format as MappedPDK.drc_magic)
+        returns dict(design_name, report_path, is_pass, error_count, output, seconds)
+        """
+        start = time.perf_counter()
+        script = f"""
+gds flatglob *$$*
+gds flatglob *VIA*
+gds flatglob *CDNS*
+gds flatglob *capacitor_test_nf*
+gds read {_tcl_path(gds_path)}
+custom_drc_save_report {{{design_name}}} {_tcl_path(report_path)}
+glayout_reset
+"""
+        output = self._magic.run(script, timeout=timeout or self.timeout)
+        error_count = None
+        report_path = Path(report_path)
+        if report_path.is_file():
+            match = re.search(r"count:\s*(\d+)", report_path.read_text())
+            error_count = int(match.group(1)) if match else None
+        return {
+            "design_name": design_name,
+            "report_path": str(report_path),
+            "is_pass": error_count == 0,
+            "error_count": error_count,
+            "output": output,
+            "seconds": time.perf_counter() - start,
+        }
+
+    def extract(self, gds_path: str | Path, design_name: str, output_dir: str | Path, timeout: float | None = None, flatten: bool | None = None) -> dict:
+        """extracts the LVS (_lvsmag), sim (_sim) and PEX (_pex) spice netlists into output_dir
+        (same commands as MappedPDK.lvs_netgen), returns the paths of the netlists
+        flatten = flatten every cell on read (a layout written with its hierarchy kept), default: hierarchy_kept()
+        the extraction is recorded in output_dir for reuse by PEX, see glayout.pdk.extraction_artifacts
+        """
+        start = time.perf_counter()
+        output_dir = Path(output_dir).resolve()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = {
+            "lvsmag": output_dir / f"{design_name}_lvsmag.spice",
+            "sim": output_dir / f"{design_name}_sim.spice",
+            "pex": output_dir / f"{design_name}_pex.spice",
+        }
+        if flatten is None:
+            flatten = hierarchy_kept()
+        # magic writes .ext files to its working directory, the flatglob patterns are kept by the interpreter until
+        # cleared (after the read)
+        script = f"""
+set glayout_prev_dir [pwd]
+cd {_tcl_path(output_dir)}
+drc off
+gds flatglob *\\$\\$*
+{'gds flatglob *' if flatten else ''}
+gds read {_tcl_path(gds_path)}
+gds flatglob none
+load {{{design_name}}}
+select top cell
+extract all
+ext2resist all
+ext2spice lvs
+ext2spice extresist on
+ext2spice -o {_tcl_path(paths["lvsmag"])}
+load {{{design_name}}}
+extract all
+ext2sim cthresh 0
+ext2sim -o {_tcl_path(paths["sim"])}
+flatten {{{design_name}}}
+load {{{design_name}}}
+select top cell
+extract do local
+extract all
+ext2sim labels on
+ext2sim
+extresist tolerance 10
+extresist
+ext2spice lvs
+ext2spice cthresh 0
+ext2spice extresist on
+ext2spice -o {_tcl_path(paths["pex"])}
+drc on
+glayout_reset
+cd $glayout_prev_dir
+"""
+        output = self._magic.run(script, timeout=timeout or self.timeout)
+        manifest = write_extraction_manifest(output_dir, design_name, gds_path)
+        return {
+            "design_name": design_name,
+            **{name: str(path) for name, path in paths.items()},
+            "extraction": manifest,
+            "output": output,
+            "seconds": time.perf_counter() - start,
+        }
+
+    def lvs(
+        self,
+        layout_spice: str | Path,
+        schematic_spice: str | Path,
+        design_name: str,
+        report_path: str | Path,
+        timeout: float | None = None,
+    ) -> dict:
+        """runs netgen LVS between an extracted layout netlist and a schematic netlist"""
+        if self.lvs_setup_file is None:
+            raise ValueError("lvs_setup_file is required to run LVS")
+        start = time.perf_counter()
+        script = (
+            "catch {reinitialize}\n"
+            f"lvs {{{Path(layout_spice).resolve()} {design_name}}} {{{Path(schematic_spice).resolve()} {design_name}}} "
+            f"{_tcl_path(self.lvs_setup_file)} {_tcl_path(report_path)}"
+        )
+        output = self._netgen_pool().run(script, timeout=timeout or self.timeout)
+        report_path = Path(report_path)
+        report = report_path.read_text() if report_path.is_file() else ""
+        return {
+            "design_name": design_name,
+            "report_path": str(report_path),
+            "is_pass": "Circuits match uniquely" in report or "Netlists match uniquely" in report,
+            "output": output,
+            "seconds": time.perf_counter() - start,
+        }
+
+    def drc_many(self, jobs: Iterable[tuple[str | Path, str, str | Path]]) -> list[dict]:
+        """runs drc for (gds_path, design_name, report_path) jobs across the interpreter pool
+        results are returned in job order, failed jobs return dict(design_name, error)
+        """
+        def run_job(job):
+            gds_path, design_name, report_path = job
+            try:
+                return self.drc(gds_path, design_name, report_path)
+            except (TimeoutError, InterpreterError) as e:
+                return {"design_name": design_name, "report_path": str(report_path), "is_pass": False, "error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=self.processes) as executor:
+            return list(executor.map(run_job, list(jobs)))
+
+    @property
+    def restarts(self) -> int:
+        restarts = self._magic.restarts
+        if self._netgen is not None:
+            restarts += self._netgen.restarts
+        return restarts
+
+    def close(self) -> None:
+        self._magic.close()
+        if self._netgen is not None:
+            self._netgen.close()
+
+    def __enter__(self) -> "BatchVerifier":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
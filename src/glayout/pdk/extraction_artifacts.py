@@ -0,0 +1,91 @@
+"""
+handoff of magic extraction results from LVS to PEX and feature extraction
+
+usage:
+    pdk.lvs_netgen(layout=gds_path, design_name=name, netlist=netlist, extraction_dir=".")
+    artifacts = find_extraction_artifacts(".", name, gds_path)
+    if artifacts is not None:
+        total_res, total_cap = total_parasitics(artifacts["pex"])
+
+the LVS magic script (MappedPDK.lvs_netgen, BatchVerifier.extract) already runs the PEX extraction (flatten,
+extract, extresist, ext2spice -o <design>_pex.spice), the same commands as run_pex.sh. write_extraction_manifest
+records the files of that run next to them in <design>_extraction.json together with the sha256 of the GDS
+they were extracted from. find_extraction_artifacts returns them only if the GDS still has that hash, so a
+consumer either reuses the extraction of exactly this layout or falls back to extracting it again.
+"""
+from pathlib import Path
+import hashlib
+import json
+import shutil
+
+
+# artifact name -> file name suffix (after the design name) written by the LVS/PEX magic scripts
+EXTRACTION_ARTIFACTS = {
+    "lvsmag": "_lvsmag.spice",
+    "sim": "_sim.spice",
+    "pex": "_pex.spice",
+    "ext": ".ext",
+    "res_ext": ".res.ext",
+    "nodes": ".nodes",
+    "ext2sim": ".sim",
+}
+
+
+def gds_digest(gds_path: str | Path) -> str:
+    """sha256 of the GDS file"""
+    digest = hashlib.sha256()
+    with open(gds_path, "rb") as gds_file:
+        for chunk in iter(lambda: gds_file.read(2**20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_path(directory: str | Path, design_name: str) -> Path:
+    return Path(directory) / f"{design_name}_extraction.json"
+
+
+def write_extraction_manifest(
+    directory: str | Path,
+    design_name: str,
+    gds_path: str | Path,
+    source_dir: str | Path | None = None,
+) -> dict:
+    """records the extraction artifacts of design_name in directory, keyed by the hash of gds_path
+    if source_dir is given, the artifacts found there are copied to directory first
+    returns the manifest (artifact name -> file name of the artifacts that exist)
+    """
+    directory = Path(directory).resolve()
+    directory.mkdir(parents=True, exist_ok=True)
+    files = dict()
+    for name, suffix in EXTRACTION_ARTIFACTS.items():
+        file_name = f"{design_name}{suffix}"
+        if source_dir is not None and (Path(source_dir) / file_name).is_file():
+            if (Path(source_dir).resolve() / file_name) != directory / file_name:
+                shutil.copy(Path(source_dir) / file_name, directory / file_name)
+        if (directory / file_name).is_file():
+            files[name] = file_name
+    manifest = {"design_name": design_name, "gds_sha256": gds_digest(gds_path), "files": files}
+    with open(manifest_path(directory, design_name), "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
+
+
+def find_extraction_artifacts(directory: str | Path, design_name: str, gds_path: str | Path) -> dict[str, Path] | None:
+    """artifact name -> path of the extraction of design_name recorded in directory, None unless the recorded
+    extraction was made from a GDS with the same hash as gds_path and its PEX netlist exists
+    """
+    path = manifest_path(directory, design_name)
+    if not path.is_file() or not Path(gds_path).is_file():
+        return None
+    try:
+        with open(path) as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("gds_sha256") != gds_digest(gds_path):
+        return None
+    artifacts = {name: Path(directory) / file_name for name, file_name in manifest.get("files", dict()).items()}
+    artifacts = {name: artifact for name, artifact in artifacts.items() if artifact.is_file()}
+    if "pex" not in artifacts:
+        return None
+    return artifacts
@@ -5,8 +5,9 @@ import re
 from gdsfactory.pdk import Pdk
 from gdsfactory.component import Component
 from gdsfactory.typings import  PathType, Layer
-from pydantic import validator, StrictStr, ValidationError
-from typing import ClassVar, Any, Union, Literal, Iterable, TypedDict
+from pydantic import validator, StrictStr, ValidationError, PrivateAttr
+from typing import ClassVar, Any, Union, Literal, Iterable, TypedDict, Mapping
+from types import MappingProxyType
 from pathlib import Path
 from decimal import Decimal, ROUND_UP
 import tempfile
@@ -14,7 +15,11 @@ import subprocess
 from decimal import Decimal
 from pydantic import validate_arguments
 import xml.etree.ElementTree as ET
-import pathlib, shutil, os, sys
+import pathlib, shutil, os, sys, math
+import numpy as np
+
+from glayout.util.snap_to_grid import hierarchy_kept
+
 
 class SetupPDKFiles:
     """Class to setup the PDK files required for DRC and LVS checks.
@@ -234,6 +239,97 @@ X8    t4    A    VGND    VGND  sky130_fd_pr__nfet_01v8 m=1 mult=1 w=180000u l=15
         return pdk_files
         
 
+class _ObservedDict(dict):
+    """dict which counts its mutations in self.version (used to invalidate indexes built from it)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def _mutated(self):
+        self.version += 1
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._mutated()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._mutated()
+
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self._mutated()
+        return result
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._mutated()
+
+    def setdefault(self, key, default=None):
+        result = super().setdefault(key, default)
+        self._mutated()
+        return result
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self._mutated()
+        return result
+
+    def popitem(self):
+        result = super().popitem()
+        self._mutated()
+        return result
+
+    def clear(self):
+        super().clear()
+        self._mutated()
+
+
+# marks a pdk layer which exists but is not mapped to any glayer
+_NO_GLAYER = object()
+
+# snapped values are only exactly representable in the integer snapping below
+# if they have at most 15 significant digits (the decimal precision preserved by float64)
+_MAX_SNAP_DBU = 10**15
+
+
+def _snap_scalar_to_grid(dim: float, grid: int, scale: int) -> float:
+    """snap dim to a multiple of grid/scale, rounding away from zero (same as Decimal ROUND_UP)
+    the nearest multiple r is found in floating point, then dim is compared to the (correctly rounded)
+    float of r*grid/scale to decide if the exact decimal value of dim is below, on or above that multiple
+    """
+    if not math.isfinite(dim):
+        raise ValueError(f"cannot snap {dim} to grid")
+    nearest = round(dim * scale / grid)
+    if abs(nearest * grid) >= _MAX_SNAP_DBU:
+        raise ValueError(f"{dim} is too large to snap to grid")
+    boundary = (nearest * grid) / scale
+    if dim > boundary:
+        nearest = nearest + 1 if dim > 0 else nearest
+    elif dim < boundary:
+        nearest = nearest if dim > 0 else nearest - 1
+    # copysign keeps -0.0 as -0.0, like the Decimal implementation
+    return math.copysign((nearest * grid) / scale, dim)
+
+
+def _snap_array_to_grid(dims: np.ndarray, grid: int, scale: int) -> np.ndarray:
+    """vectorized version of _snap_scalar_to_grid"""
+    if not np.all(np.isfinite(dims)):
+        raise ValueError("cannot snap non finite values to grid")
+    nearest = np.rint(dims * scale / grid)
+    if nearest.size and np.max(np.abs(nearest)) * grid >= _MAX_SNAP_DBU:
+        raise ValueError("values are too large to snap to grid")
+    nearest = nearest.astype(np.int64)
+    boundary = (nearest * grid).astype(np.float64) / scale
+    above = dims > boundary
+    below = dims < boundary
+    positive = dims > 0
+    nearest += (above & positive).astype(np.int64)
+    nearest -= (below & ~positive).astype(np.int64)
+    return np.copysign((nearest * grid).astype(np.float64) / scale, dims)
+
+
 class MappedPDK(Pdk):
     """Inherits everything from the pdk class but also requires mapping to glayers
     glayers are generic layers which can be returned with get_glayer(name: str)
@@ -298,6 +394,30 @@ class MappedPDK(Pdk):
     pdk_files: dict[StrictStr, Union[PathType, None]]
 
     valid_bjt_sizes: dict[StrictStr,  list[tuple[float,float]]]
+
+    # precompiled (frozen) rule tables, (glayer1, glayer2) -> rules. built from grules on construction
+    _grule_table: dict = PrivateAttr(default_factory=dict)
+    _grule_table_decimal: dict = PrivateAttr(default_factory=dict)
+    # lazily built bidirectional layer index, see _get_layer_index
+    _layer_index: dict | None = PrivateAttr(default=None)
+    # lazily filled via geometry per ordered (glayer1, glayer2), see via_table
+    _via_table: dict = PrivateAttr(default_factory=dict)
+    _via_table_version: tuple | None = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self.compile_grules()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == "glayers" and not isinstance(value, _ObservedDict):
+            value = _ObservedDict(value)
+        super().__setattr__(name, value)
+        if name == "grules":
+            self.compile_grules()
+        elif name in ("glayers", "layers"):
+            self._layer_index = None
+            self._via_table = dict()
+
     @validator("models")
     def models_check(cls, models_obj: dict[StrictStr, StrictStr]):
         for model in models_obj.keys():
@@ -317,7 +437,7 @@ class MappedPDK(Pdk):
                 raise ValueError(
                     "glayers keys must be one of generic layers listed in class variable valid_glayers"
                 )
-        return glayers_obj
+        return _ObservedDict(glayers_obj)
 
     @validate_arguments(config=dict(arbitrary_types_allowed=True))
     def drc(
@@ -523,7 +643,6 @@ custom_drc_save_report $::env(DESIGN_NAME) $::env(REPORTS_DIR)/$::env(DESIGN_NAM
         self.pdk_files['pdk'] = self.name
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_dir_path = pathlib.Path(temp_dir).resolve()
-            self.pdk_files['temp_dir'] = temp_dir_path
             
             if pdk_root is None:
                 print("using default pdk_root")
@@ -537,7 +656,8 @@ custom_drc_save_report $::env(DESIGN_NAME) $::env(REPORTS_DIR)/$::env(DESIGN_NAM
                     'REPORTS_DIR': str(temp_dir_path),
                     'RESULTS_DIR': str(temp_dir_path)
                 }
-            os.environ.update(env_vars)
+            # per call environment (not os.environ), concurrent DRC/LVS runs must not see each other's design
+            magic_env = {**os.environ, **env_vars}
                     
             gds_path = str(temp_dir_path / f"{design_name}.gds")
             if isinstance(layout, Component):
@@ -553,7 +673,8 @@ custom_drc_save_report $::env(DESIGN_NAME) $::env(REPORTS_DIR)/$::env(DESIGN_NAM
                 cmd, 
                 shell=True, 
                 stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE
+                stderr=subprocess.PIPE,
+                env=magic_env
             )
             
             subp.wait()
@@ -614,6 +735,7 @@ custom_drc_save_report $::env(DESIGN_NAME) $::env(REPORTS_DIR)/$::env(DESIGN_NAM
         output_file_path: PathType | None  = None, 
         copy_intermediate_files: bool | None  = False,
         show_scripts: bool | None  = False,
+        extraction_dir: PathType | None = None,
     ) -> dict:
         """ Runs LVS using netgen on the either the component or the gds file path provided. Requires the design name and the pdk_root to be specified, handles importing the required magicrc and other setup files, if not specified. Accepts overriden lvs_setup_tcl_file, lvs_schematic_ref_file, and magic_drc_file.
 
@@ -644,6 +766,11 @@ custom_drc_save_report $::env(DESIGN_NAME) $::env(REPORTS_DIR)/$::env(DESIGN_NAM
             - copy_intermediate_files (Optional[bool], optional): 
                 - If True, copies intermediate files to the currenty working directory (lvsmag, pex spice, prepex spice).
                 - Defaults to False.
+            - extraction_dir (Optional[PathType], optional):
+                - If given, the extraction files of the magic run (.ext, lvsmag, sim and pex spice, ...) are copied to this directory
+                - together with a manifest of the GDS hash, so PEX of the same GDS reuses them (see glayout.pdk.extraction_artifacts).
+                - Pass the layout as a GDS file path to share the extraction with later steps on that file.
+                - Defaults to None.
 
         Raises:
             - NotImplementedError:
@@ -659,7 +786,7 @@ custom_drc_save_report $::env(DESIGN_NAME) $::env(REPORTS_DIR)/$::env(DESIGN_NAM
                 - If the path to the netlist file is not a file!
 
         Returns:
-            dict: a dictionary containing the result string and the subprocess code
+            dict: a dictionary containing the result string, the subprocess codes and the extraction manifest (None without extraction_dir)
         """
         if self.name == 'ihp130':
             raise NotImplementedError("LVS not implemented yet for IHP-130 PDK")
@@ -690,8 +817,7 @@ custom_drc_save_report $::env(DESIGN_NAME) $::env(REPORTS_DIR)/$::env(DESIGN_NAM
                 
         def check_command_exists(command: str):
             """ Check if a command exists in the system """
-            result = subprocess.run(f"command -v {command}", shell=True, capture_output=True, text=True)
-            return result.returncode == 0
+            return shutil.which(command) is not None
         
         def modify_design_name_in_cdl(netlist, design_name):
             design_name_from_cdl = extract_design_name_from_netlist(netlist)
@@ -745,13 +871,15 @@ custom_drc_save_report $::env(DESIGN_NAME) $::env(REPORTS_DIR)/$::env(DESIGN_NAM
             raise RuntimeError("Netgen not found in the system")
         if not check_command_exists("magic"):
             raise RuntimeError("Magic not found in the system")
-        os.environ['DESIGN_NAME'] = design_name
+        # per call environment (not os.environ), concurrent DRC/LVS runs must not see each other's design
+        tool_env = {**os.environ, 'DESIGN_NAME': design_name}
         # results go to a tempdirectory 
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_dir_path = Path(temp_dir).resolve()
-            self.pdk_files['temp_dir'] = temp_dir_path
-            print("using user specified pdk_root, will search for required files in the specified directory")
-            self.pdk_files['pdk_root'] = pdk_root 
+            if pdk_root is not None:
+                print("using user specified pdk_root, will search for required files in the specified directory")
+                self.pdk_files['pdk_root'] = pdk_root
+                tool_env['PDK_ROOT'] = str(pdk_root)
             
             lvsmag_path = temp_dir_path / f"{design_name}_lvsmag.spice"
             pex_path = temp_dir_path / f"{design_name}_pex.spice"
@@ -766,9 +894,8 @@ custom_drc_save_report $::env(DESIGN_NAME) $::env(REPORTS_DIR)/$::env(DESIGN_NAM
                 layout.write_gds(str(gds_path))
                 
                 if netlist is None:
-                    netlist = layout.info['netlist'].generate_netlist()
                     with open(str(netlist_from_comp), 'w') as f:
-                        f.write(netlist)
+                        layout.info['netlist'].write_netlist(f)
                 else: 
                     if check_if_path_or_net_string(netlist):
                         shutil.copy(netlist, str(netlist_from_comp))
@@ -792,9 +919,12 @@ custom_drc_save_report $::env(DESIGN_NAME) $::env(REPORTS_DIR)/$::env(DESIGN_NAM
         
             write_spice(str(netlist_from_comp), str(spice_path), lvsschemref_file)
             
+            # cells kept by keep_hierarchy are flattened on read, so the layout is extracted flat as in the default mode
+            flatglob = "gds flatglob *" if hierarchy_kept() else ""
             magic_script_content = f"""
 drc off            
 gds flatglob *\\$\\$*
+{flatglob}
 gds read {gds_path}
 
 # LVS Netlist
@@ -847,20 +977,28 @@ exit
                 magic_script_file.write(magic_script_content)
                 magic_script_path = magic_script_file.name
             
+            extraction = None
             try:
                 
                 magicrc_file = self.pdk_files['magic_drc_file'] if magic_drc_file is None else magic_drc_file
-                magic_cmd = f"bash -c 'magic -rcfile {magicrc_file} -noconsole -dnull < {magic_script_path}'",
+                magic_cmd = f"bash -c 'magic -rcfile {Path(magicrc_file).resolve()} -noconsole -dnull < {magic_script_path}'",
+                # magic writes the .ext/.sim/.nodes files to its working directory, keep them in the temp directory
                 magic_subproc = subprocess.run(
                     magic_cmd, 
                     shell=True,
                     check=True,
-                    capture_output=True
+                    capture_output=True,
+                    cwd=temp_dir_path,
+                    env=tool_env
                 )
                 
                 magic_subproc_code = magic_subproc.returncode
                 magic_subproc_out = magic_subproc.stdout.decode('utf-8')
                 print(magic_subproc_out)
+
+                if extraction_dir is not None:
+                    from glayout.pdk.extraction_artifacts import write_extraction_manifest
+                    extraction = write_extraction_manifest(extraction_dir, design_name, gds_path, source_dir=temp_dir_path)
                 
                 if show_scripts:
                     with open(lvsmag_path, 'r') as f:
@@ -882,7 +1020,8 @@ exit
                     netgen_command,
                     shell=True,
                     check=True, 
-                    capture_output=True
+                    capture_output=True,
+                    env=tool_env
                 )
                 netgen_subproc_code = netgen_subproc.returncode
                 netgen_subproc_out = netgen_subproc.stdout.decode('utf-8')
@@ -908,12 +1047,7 @@ exit
             
             finally: 
                 os.remove(magic_script_path)
-                if os.path.exists(f'{design_name}.ext'):
-                    os.remove(f'{design_name}.ext')
-                # remove all files with suffix .ext
-                for file in os.listdir(temp_dir_path):
-                    if file.endswith(".ext"):
-                        os.remove(file)
+                # the .ext files are in the temp directory and are removed with it
                 # copy the report from the temp directory to the specified location
                 
                 if output_file_path is not None:
@@ -942,10 +1076,25 @@ exit
                         # shutil.copy(lvsmag_path, str(Path.cwd() / f"{design_name}_lvsmag.spice"))  
                         # shutil.copy(sim_path, str(Path.cwd() / f"{design_name}_sim.spice"))
             
-        return {'magic_subproc_code': magic_subproc_code, 'netgen_subproc_code': netgen_subproc_code, 'result_str': result_str}
+        return {'magic_subproc_code': magic_subproc_code, 'netgen_subproc_code': netgen_subproc_code, 'result_str': result_str, 'extraction': extraction}
                     
     
     @validate_arguments(config=dict(arbitrary_types_allowed=True))
+    def batch_verifier(self, processes: int = 1, **kwargs):
+        """returns a BatchVerifier (see glayout.pdk.batch_verification) which keeps magic/netgen
+        interpreters loaded with this pdk's magicrc and netgen setup for DRC/LVS of many designs
+        kwargs are passed to BatchVerifier (timeout, max_jobs_per_process, ...)"""
+        from glayout.pdk.batch_verification import BatchVerifier
+        if self.name == 'ihp130':
+            raise NotImplementedError("magic/netgen verification not implemented yet for IHP-130 PDK")
+        return BatchVerifier(
+            self.pdk_files['magic_drc_file'],
+            self.pdk_files.get('lvs_setup_tcl_file'),
+            processes=processes,
+            env={'PDK_ROOT': str(self.pdk_files['pdk_root'])} if self.pdk_files.get('pdk_root') else None,
+            **kwargs,
+        )
+
     def has_required_glayers(self, layers_required: list[str]):
         """Raises ValueError if any of the generic layers in layers_required: list[str]
         are not mapped to anything in the pdk.glayers dictionary
@@ -966,101 +1115,160 @@ exit
 
 
 
+    def _get_layer_index(self) -> dict:
+        """returns the layer index, (re)building it if glayers or layers changed since the last build
+        by_tuple: (layer, datatype) -> glayer
+        by_number: layer number -> glayer (first pdk layer with that number)
+        glayer_to_layer: glayer -> pdk layer (filled by get_glayer)
+        """
+        glayers_version = (id(self.glayers), getattr(self.glayers, "version", None))
+        if self._layer_index is not None and self._layer_index["glayers_version"] == glayers_version:
+            return self._layer_index
+        # later keys overwrite earlier ones, so the last glayer mapped to a layer wins
+        direct = dict()
+        by_name = dict()
+        for glayer, mapped_layer in self.glayers.items():
+            if isinstance(mapped_layer, tuple):
+                direct[tuple(mapped_layer)] = glayer
+            else:
+                by_name[mapped_layer] = glayer
+        by_tuple = dict()
+        by_number = dict()
+        if self.layers is not None:
+            # In v9, self.layers is a LayerEnum, use tuple() to convert members to (layer, datatype)
+            if hasattr(self.layers, '__members__'):
+                named_layers = [(member.name, tuple(member)) for member in self.layers.__members__.values()]
+            else:
+                last_name = dict((value, name) for name, value in self.layers.items())
+                named_layers = [(last_name[value], value) for value in self.layers.values()]
+            # the first pdk layer matching a tuple/number is used
+            for layer_name, layer_value in named_layers:
+                glayer = by_name.get(layer_name, _NO_GLAYER)
+                by_tuple.setdefault(layer_value, glayer)
+                if isinstance(layer_value, tuple) and len(layer_value) >= 1:
+                    by_number.setdefault(layer_value[0], glayer)
+        by_tuple.update(direct)
+        self._layer_index = {
+            "glayers_version": glayers_version,
+            "by_tuple": by_tuple,
+            "by_number": by_number,
+            "glayer_to_layer": dict(),
+        }
+        return self._layer_index
+
+    def layer_to_glayer_fast(self, layer: tuple[int, int] | int) -> str:
+        """constant time version of layer_to_glayer (no pydantic validation)
+        raises ValueError if layer is malformed or does not correspond to a glayer"""
+        # In GDSFactory v9, port.layer may return just an integer
+        # If integer, try the default datatype first, then any layer tuple with that layer number
+        try:
+            if isinstance(layer, int):
+                layer_as_int = int(layer)
+                key = (layer_as_int, 0)
+            else:
+                layer_as_int = None
+                key = tuple(int(num) for num in layer)
+        except (TypeError, ValueError):
+            raise ValueError(f"layer {layer!r} should be a tuple[int,int] or int")
+        index = self._get_layer_index()
+        glayer = index["by_tuple"].get(key)
+        if glayer is None and layer_as_int is not None:
+            glayer = index["by_number"].get(layer_as_int)
+        if glayer is None:
+            if self.layers is None:
+                raise ValueError("layer might not be a layer present in the pdk")
+            raise ValueError("layer is not a layer present in the pdk")
+        if glayer is _NO_GLAYER:
+            raise ValueError("layer does not correspond to a glayer")
+        return glayer
+
     @validate_arguments(config=dict(arbitrary_types_allowed=True))
     def layer_to_glayer(self, layer: tuple[int, int] | int) -> str:
         """if layer provided corresponds to a glayer, will return a glayer
         else will raise an exception
-        takes layer as a tuple(int,int) or int (in which case we search for any matching layer number)"""
-        # In GDSFactory v9, port.layer may return just an integer
-        # If integer, search for any layer tuple with that layer number
-        layer_as_int = None
-        if isinstance(layer, int):
-            layer_as_int = layer
-            layer = (layer, 0)  # Try default datatype first
-        # lambda for finding last matching key in dict from val
-        find_last = lambda val, d: [x for x, y in d.items() if y == val].pop()
-        if layer in self.glayers.values():
-            return find_last(layer, self.glayers)
-
-        elif self.layers is not None:
-            # find glayer verfying presence along the way
-            # In v9, self.layers is a LayerEnum, get the tuple values
-            pdk_real_layers = list(self.layers.__members__.values()) if hasattr(self.layers, '__members__') else self.layers.values()
-            # First try exact match with the layer tuple
-            layer_found = False
-            for enum_member in pdk_real_layers:
-                # In v9 LayerMap, use tuple() to convert enum to (layer, datatype)
-                enum_value = tuple(enum_member) if hasattr(self.layers, '__members__') else enum_member
-                if enum_value == layer:
-                    layer_name = enum_member.name if hasattr(enum_member, 'name') else find_last(layer, self.layers)
-                    if layer_name in self.glayers.values():
-                        glayer_name = find_last(layer_name, self.glayers)
-                    else:
-                        raise ValueError("layer does not correspond to a glayer")
-                    layer_found = True
-                    break
-            # If not found and we have an integer layer, search by layer number
-            if not layer_found and layer_as_int is not None:
-                for enum_member in pdk_real_layers:
-                    # In v9 LayerMap, use tuple() to convert enum to (layer, datatype)
-                    enum_value = tuple(enum_member) if hasattr(self.layers, '__members__') else enum_member
-                    # Match by layer number (first element of tuple)
-                    match = False
-                    if isinstance(enum_value, tuple) and len(enum_value) >= 1 and enum_value[0] == layer_as_int:
-                        match = True
-
-                    if match:
-                        layer_name = enum_member.name if hasattr(enum_member, 'name') else find_last(enum_value, self.layers)
-                        if layer_name in self.glayers.values():
-                            glayer_name = find_last(layer_name, self.glayers)
-                        else:
-                            raise ValueError("layer does not correspond to a glayer")
-                        layer_found = True
-                        break
-            if not layer_found:
-                raise ValueError("layer is not a layer present in the pdk")
-            return glayer_name
-        else:
-            raise ValueError("layer might not be a layer present in the pdk")
+        takes layer as a tuple(int,int) or int (in which case we search for any matching layer number)
+        ****NOTE: generators should use layer_to_glayer_fast, which skips argument validation"""
+        return self.layer_to_glayer_fast(layer)
 
     # TODO: implement LayerSpec type
     @validate_arguments(config=dict(arbitrary_types_allowed=True))
     def get_glayer(self, layer: str) -> Layer:
         """Returns the pdk layer from the generic layer name"""
+        glayer_to_layer = self._get_layer_index()["glayer_to_layer"]
+        if layer in glayer_to_layer:
+            return glayer_to_layer[layer]
         direct_mapping = self.glayers[layer]
         if isinstance(direct_mapping, tuple):
-            return direct_mapping
+            pdk_layer = direct_mapping
         else:
-            return self.get_layer(direct_mapping)
+            pdk_layer = self.get_layer(direct_mapping)
+        glayer_to_layer[layer] = pdk_layer
+        return pdk_layer
+
+    def compile_grules(self) -> None:
+        """builds the frozen rule lookup tables from self.grules
+        every (glayer1, glayer2) pair of valid_glayers which has rules is resolved once
+        (including the glayer2->glayer1 fallback) and stored as float and Decimal read only mappings.
+        This is called automatically on construction and when grules is reassigned,
+        call it manually if you mutate the grules dictionary in place
+        """
+        float_table = dict()
+        decimal_table = dict()
+        for glayer1 in MappedPDK.valid_glayers:
+            for glayer2 in MappedPDK.valid_glayers:
+                rules_dict = self.grules.get(glayer1, dict()).get(glayer2)
+                if (rules_dict is None or rules_dict == {}) and glayer1 != glayer2:
+                    rules_dict = self.grules.get(glayer2, dict()).get(glayer1)
+                if rules_dict is None or rules_dict == {}:
+                    continue
+                float_table[(glayer1, glayer2)] = MappingProxyType(dict(rules_dict))
+                decimal_table[(glayer1, glayer2)] = MappingProxyType({
+                    rule: (Decimal(str(val)) if isinstance(val, (int, float)) and not isinstance(val, bool) else val)
+                    for rule, val in rules_dict.items()
+                })
+        self._grule_table = MappingProxyType(float_table)
+        self._grule_table_decimal = MappingProxyType(decimal_table)
+        self._via_table = dict()
+
+    def via_table(self) -> dict:
+        """returns the via table of this pdk, a cache (ordered (glayer1, glayer2) -> via geometry) filled by
+        glayout.primitives.via_gen.via_pitch. the table is emptied whenever grules or glayers change
+        """
+        glayers_version = (id(self.glayers), getattr(self.glayers, "version", None))
+        if self._via_table_version != glayers_version:
+            self._via_table = dict()
+            self._via_table_version = glayers_version
+        return self._via_table
+
+    def get_grule_fast(
+        self, glayer1: str, glayer2: str | None = None, return_decimal: bool = False
+    ) -> Mapping[str, Union[float, Decimal]]:
+        """O(1) version of get_grule for use inside generators (no argument validation)
+        returns a read only mapping from the precompiled rule table, do not try to modify it
+        raises the same errors as get_grule if glayers are invalid or no rules exist
+        """
+        table = self._grule_table_decimal if return_decimal else self._grule_table
+        try:
+            return table[(glayer1, glayer2 if glayer2 is not None else glayer1)]
+        except KeyError:
+            pass
+        if glayer1 not in MappedPDK.valid_glayers:
+            raise ValueError("get_grule, " + str(glayer1) + " not valid glayer")
+        if glayer2 is not None and glayer2 not in MappedPDK.valid_glayers:
+            raise ValueError("get_grule, " + str(glayer2) + " not valid glayer")
+        raise NotImplementedError(
+            "no rules found between " + str(glayer1) + " and " + str(glayer2 if glayer2 is not None else glayer1)
+        )
 
     @validate_arguments(config=dict(arbitrary_types_allowed=True))
     def get_grule(
         self, glayer1: str, glayer2: str | None = None, return_decimal = False
     ) -> dict[StrictStr, Union[float,Decimal]]:
         """Returns a dictionary describing the relationship between two layers
-        If one layer is specified, returns a dictionary with all intra layer rules"""
-        if glayer1 not in MappedPDK.valid_glayers:
-            raise ValueError("get_grule, " + str(glayer1) + " not valid glayer")
-        # decide if two or one inputs and set rules_dict accordingly
-        rules_dict = None
-        if glayer2 is not None:
-            if glayer2 not in MappedPDK.valid_glayers:
-                raise ValueError("get_grule, " + str(glayer2) + " not valid glayer")
-            rules_dict = self.grules.get(glayer1, dict()).get(glayer2)
-            if rules_dict is None or rules_dict == {}:
-                rules_dict = self.grules.get(glayer2, dict()).get(glayer1)
-        else:
-            glayer2 = glayer1
-            rules_dict = self.grules.get(glayer1, dict()).get(glayer1)
-        # error check, convert type, and return
-        if rules_dict is None or rules_dict == {}:
-            raise NotImplementedError(
-                "no rules found between " + str(glayer1) + " and " + str(glayer2)
-            )
-        for rule in rules_dict:
-            if type(rule) == float and return_decimal:
-                rules_dict[rule] = Decimal(str(rule))
-        return rules_dict
+        If one layer is specified, returns a dictionary with all intra layer rules
+        if return_decimal, numeric rules are returned as Decimal
+        ****NOTE: generators should use get_grule_fast, which skips argument validation"""
+        return dict(self.get_grule_fast(glayer1, glayer2, return_decimal=return_decimal))
 
     @classmethod
     def is_routable_glayer(cls, glayer: StrictStr):
@@ -1130,7 +1338,7 @@ exit
             metal_levels = [f"met{i}" for i in metal_levels]
         sep_rules = list()
         for met in metal_levels:
-            sep_rules.append(self.get_grule(met)["min_separation"])
+            sep_rules.append(self.get_grule_fast(met)["min_separation"])
         return self.snap_to_2xgrid(max(sep_rules))
 
     @validate_arguments(config=dict(arbitrary_types_allowed=True))
@@ -1160,6 +1368,37 @@ exit
         # correctly return list or single element
         return snapped_dims[0] if len(snapped_dims)==1 else snapped_dims
 
+    def _snap_grid_dbu(self, snap4: bool = False) -> tuple[int, int]:
+        """returns (grid, scale) such that the snapping grid used by snap_to_2xgrid is exactly grid / 10**scale"""
+        grid = 2 * Decimal(str(self.grid_size))
+        grid = grid if grid else Decimal('0.001')
+        grid = 2*grid if snap4 else grid
+        _, digits, exponent = grid.normalize().as_tuple()
+        grid_int = int("".join(str(digit) for digit in digits))
+        if exponent >= 0:
+            return grid_int * 10**exponent, 0
+        return grid_int, -exponent
+
+    def snap_to_2xgrid_fast(self, dims: Union[float, int, list, tuple, np.ndarray], snap4: bool = False) -> Union[float, list[float], np.ndarray]:
+        """vectorized version of snap_to_2xgrid (no pydantic validation, always returns floats)
+        results are bit identical to snap_to_2xgrid(dims, return_type="float", snap4=snap4)
+        dims may be a single number (returns float), a list/tuple (returns list) or an ndarray (returns ndarray of the same shape)
+        values are snapped in integer multiples of the grid, rounding away from zero like the Decimal implementation
+        """
+        if isinstance(dims, Decimal) or (isinstance(dims, (list, tuple)) and any(isinstance(dim, Decimal) for dim in dims)):
+            # the Decimal digits may not survive conversion to float, use the exact implementation
+            snapped = self.snap_to_2xgrid(list(dims) if isinstance(dims, (list, tuple)) else dims, return_type="float", snap4=snap4)
+            if isinstance(dims, (list, tuple)):
+                return snapped if isinstance(snapped, list) else [snapped]
+            return snapped
+        grid, scale = self._snap_grid_dbu(snap4)
+        if isinstance(dims, (int, float, np.floating, np.integer)):
+            return _snap_scalar_to_grid(float(dims), grid, 10**scale)
+        snapped = _snap_array_to_grid(np.asarray(dims, dtype=np.float64), grid, 10**scale)
+        if isinstance(dims, np.ndarray):
+            return snapped
+        return snapped.tolist()
+
     def __hash__(self):
         """Make this object usable as part of GDSFactory cache keys."""
         return hash(self.name)
@@ -2,6 +2,77 @@ from gdsfactory.component import Component
 import gdsfactory as gf
 
 
+# npc enclosure of licon on each side
+NPC_PADDING = 0.1
+# padded npc boxes with centers closer than this (in x and y) are merged, 0.27 (npc spacing) + 0.37 (npc width)
+NPC_MERGE_DISTANCE = 0.64
+
+
+def _find(parent: list[int], i: int) -> int:
+	"""union-find root of i (with path halving)"""
+	while parent[i] != i:
+		parent[i] = parent[parent[i]]
+		i = parent[i]
+	return i
+
+
+def npc_close_pairs(boxes: list[tuple[float, float, float, float]], distance: float = NPC_MERGE_DISTANCE) -> list[tuple[int, int]]:
+	"""returns every pair (i, j), i < j, of boxes (xmin, ymin, xmax, ymax) whose centers are closer than distance in x and y
+	boxes are bucketed on a grid with pitch distance, so only the 3x3 neighbouring buckets of each box are compared"""
+	buckets = dict()
+	centers = list()
+	for i, (xmin, ymin, xmax, ymax) in enumerate(boxes):
+		center = ((xmin + xmax) / 2, (ymin + ymax) / 2)
+		centers.append(center)
+		buckets.setdefault((int(center[0] // distance), int(center[1] // distance)), list()).append(i)
+	pairs = list()
+	for (bx, by), members in buckets.items():
+		for dx in (-1, 0, 1):
+			for dy in (-1, 0, 1):
+				others = buckets.get((bx + dx, by + dy))
+				if others is None:
+					continue
+				for i in members:
+					xi, yi = centers[i]
+					for j in others:
+						if j <= i:
+							continue
+						xj, yj = centers[j]
+						if abs(xi - xj) < distance and abs(yi - yj) < distance:
+							pairs.append((i, j))
+	return pairs
+
+
+def npc_regions(boxes: list[tuple[float, float, float, float]], dbu: float = 0.001) -> list[gf.kdb.Region]:
+	"""merges padded npc boxes (xmin, ymin, xmax, ymax) into one region per group of close boxes.
+	every close pair also gets its bounding box (which fills the spacing between them), and close pairs are joined
+	with union-find so each group is merged once. The union of the result is the same as adding every box and
+	every pairwise bounding box individually."""
+	parent = list(range(len(boxes)))
+	pairs = npc_close_pairs(boxes)
+	for i, j in pairs:
+		root_i, root_j = _find(parent, i), _find(parent, j)
+		if root_i != root_j:
+			parent[root_j] = root_i
+	groups = dict()
+	for i, box in enumerate(boxes):
+		groups.setdefault(_find(parent, i), list()).append(box)
+	for i, j in pairs:
+		groups[_find(parent, i)].append((
+			min(boxes[i][0], boxes[j][0]),
+			min(boxes[i][1], boxes[j][1]),
+			max(boxes[i][2], boxes[j][2]),
+			max(boxes[i][3], boxes[j][3]),
+		))
+	regions = list()
+	for group_boxes in groups.values():
+		region = gf.kdb.Region()
+		for xmin, ymin, xmax, ymax in group_boxes:
+			region.insert(gf.kdb.DBox(xmin, ymin, xmax, ymax).to_itype(dbu))
+		regions.append(region.merged())
+	return regions
+
+
 def sky130_add_npc(comp: Component) -> Component:
 	"""To keep with the generic generator structure,
 	we do NOT add nitride poly cut layer in the generic generators (npc is specfic to sky130).
@@ -19,50 +90,18 @@ def sky130_add_npc(comp: Component) -> Component:
 	if len(existing_npc.get_polygons()) > 1:
 		liconANDpoly = gf.boolean(liconANDpoly, existing_npc, layer=(1,2), operation="A-B")
 	licon_polygons = liconANDpoly.get_polygons(as_array=False)
-	# iterate through all licon and create npc (ignore merges for now)
-	npc_polygons = list()
+	# pad every licon over poly and merge the close ones
+	npc_boxes = list()
 	for licon_polygon in licon_polygons:
 		bbox = licon_polygon.bounding_box()
-		licon_polygonxmin = bbox[0][0]
-		licon_polygonymin = bbox[0][1]
-		licon_polygonxmax = bbox[1][0]
-		licon_polygonymax = bbox[1][1]
-		padding_points = [
-			[licon_polygonxmin - 0.1, licon_polygonymin - 0.1],
-			[licon_polygonxmax + 0.1, licon_polygonymin - 0.1],
-			[licon_polygonxmax + 0.1, licon_polygonymax + 0.1],
-			[licon_polygonxmin - 0.1, licon_polygonymax + 0.1],
-		]
-		npc_polygons.append(gf.kdb.DPolygon(padding_points))
-	# determine which npc polygons should be merged
-	# also merge them by adding a polygon over them
-	# naive approach, n^2 complexity
-	npc_merged_polygons = list()
-	for i, npc_polygon in enumerate(npc_polygons):
-		for j, other_polygon in enumerate(npc_polygons):
-			# use the fact that all npc polys have the same width (at this point)
-			bbox_i = npc_polygon.bbox()
-			bbox_j = other_polygon.bbox()
-			center_i = ((bbox_i.left + bbox_i.right) / 2, (bbox_i.bottom + bbox_i.top) / 2)
-			center_j = ((bbox_j.left + bbox_j.right) / 2, (bbox_j.bottom + bbox_j.top) / 2)
-			yviolation = abs(center_i[1] - center_j[1]) < 0.64#0.27+0.37
-			xviolation = abs(center_i[0] - center_j[0]) < 0.64
-			if i==j:#skip same polygon
-				continue
-			elif (xviolation and yviolation):
-				nxmax = max(bbox_i.right, bbox_j.right)
-				nxmin = min(bbox_i.left, bbox_j.left)
-				nymax = max(bbox_i.top, bbox_j.top)
-				nymin = min(bbox_i.bottom, bbox_j.bottom)
-				points = [
-					[nxmin,nymin],
-					[nxmax,nymin],
-					[nxmax,nymax],
-					[nxmin,nymax],
-				]
-				npc_merged_polygons.append(gf.kdb.DPolygon(points))
+		npc_boxes.append((
+			bbox[0][0] - NPC_PADDING,
+			bbox[0][1] - NPC_PADDING,
+			bbox[1][0] + NPC_PADDING,
+			bbox[1][1] + NPC_PADDING,
+		))
 	# add npc and return
-	npc_polygons_to_add = npc_polygons + npc_merged_polygons
-	for poly in npc_polygons_to_add:
-		comp.add_polygon(poly, layer=(95, 20))
+	for region in npc_regions(npc_boxes, comp.kcl.dbu):
+		for poly in region.each():
+			comp.add_polygon(poly, layer=(95, 20))
 	return comp
@@ -66,22 +66,22 @@ def common_centroid_ab_ba(
     prec_ref_center(a_botr, snapmov2grid=True)
     prec_ref_center(b_botl, snapmov2grid=True)
     # setup for routing (need viadims to know how far to seperate transistors)
-    glayer1 = pdk.layer_to_glayer(a_topl.ports["multiplier_0_drain_E"].layer)
+    glayer1 = pdk.layer_to_glayer_fast(a_topl.ports["multiplier_0_drain_E"].layer)
     glayer2 = glayer1[0:-1] + str(int(glayer1[-1])+1)
     glayer0 = glayer1[0:-1] + str(int(glayer1[-1])-1)
     # Create individual via instances to avoid reuse conflicts
     g1g2via_sizing = via_stack(pdk,glayer1,glayer2)
     g0g1via_sizing = via_stack(pdk,glayer0,glayer1)
     # move transistors into position
-    min_spacing_y = pdk.snap_to_2xgrid(1*(g1g2via_sizing.ysize - pdk.get_grule(glayer1)["min_width"])+pdk.get_grule(glayer1)["min_separation"])
-    extra_g1g2_spacing = pdk.snap_to_2xgrid(max(pdk.get_grule(glayer2)["min_separation"]-pdk.get_grule(glayer1)["min_separation"],0))
+    min_spacing_y = pdk.snap_to_2xgrid_fast(1*(g1g2via_sizing.ysize - pdk.get_grule_fast(glayer1)["min_width"])+pdk.get_grule_fast(glayer1)["min_separation"])
+    extra_g1g2_spacing = pdk.snap_to_2xgrid_fast(max(pdk.get_grule_fast(glayer2)["min_separation"]-pdk.get_grule_fast(glayer1)["min_separation"],0))
     min_spacing_y += extra_g1g2_spacing
-    min_spacing_x = 3*pdk.get_grule(glayer1)["min_separation"] + 2*g0g1via_sizing.xsize - 2*pdk.get_grule("active_diff",sdglayer)["min_enclosure"]
-    min_spacing_x = pdk.snap_to_2xgrid(max(min_spacing_x, pdk.get_grule(sdglayer)["min_separation"]))
-    a_topl.movex(0-fetLdims[0]/2-min_spacing_x/2).movey(pdk.snap_to_2xgrid(fetRdims[1]/2+min_spacing_y/2))
-    b_topr.movex(fetLdims[0]/2+min_spacing_x/2).movey(pdk.snap_to_2xgrid(fetLdims[1]/2+min_spacing_y/2))
-    a_botr.movex(fetLdims[0]/2+min_spacing_x/2).movey(pdk.snap_to_2xgrid(-fetLdims[1]/2-min_spacing_y/2))
-    b_botl.movex(0-fetLdims[0]/2-min_spacing_x/2).movey(pdk.snap_to_2xgrid(-fetLdims[1]/2-min_spacing_y/2))
+    min_spacing_x = 3*pdk.get_grule_fast(glayer1)["min_separation"] + 2*g0g1via_sizing.xsize - 2*pdk.get_grule_fast("active_diff",sdglayer)["min_enclosure"]
+    min_spacing_x = pdk.snap_to_2xgrid_fast(max(min_spacing_x, pdk.get_grule_fast(sdglayer)["min_separation"]))
+    a_topl.movex(0-fetLdims[0]/2-min_spacing_x/2).movey(pdk.snap_to_2xgrid_fast(fetRdims[1]/2+min_spacing_y/2))
+    b_topr.movex(fetLdims[0]/2+min_spacing_x/2).movey(pdk.snap_to_2xgrid_fast(fetLdims[1]/2+min_spacing_y/2))
+    a_botr.movex(fetLdims[0]/2+min_spacing_x/2).movey(pdk.snap_to_2xgrid_fast(-fetLdims[1]/2-min_spacing_y/2))
+    b_botl.movex(0-fetLdims[0]/2-min_spacing_x/2).movey(pdk.snap_to_2xgrid_fast(-fetLdims[1]/2-min_spacing_y/2))
     comcentroid.add_padding(default=0,layers=[pdk.get_glayer(well)])
     # if substrate tap place substrate tap, and route dummy to substrate tap
     if substrate_tap:
@@ -120,45 +120,45 @@ def common_centroid_ab_ba(
     align_comp_to_port(vsrcb1,comcentroid.ports["tr_multiplier_0_drain_E"],alignment=("left","bottom"))
     align_comp_to_port(vsrcb2,comcentroid.ports["bl_multiplier_0_drain_E"],alignment=("left","top"))
     intermediate_port = comcentroid.ports["bl_multiplier_0_source_E"].copy()
-    intermediate_port.layer = pdk.get_glayer(pdk.layer_to_glayer(vsrcb1.ports["top_met_E"].layer))
+    intermediate_port.layer = pdk.get_glayer(pdk.layer_to_glayer_fast(vsrcb1.ports["top_met_E"].layer))
     comcentroid << L_route(pdk, vsrcb1.ports["top_met_S"], intermediate_port)
     comcentroid << L_route(pdk,intermediate_port, vsrcb2.ports["top_met_S"])
     # route adrain to adrain
     vdraina1 = comcentroid << via_stack(pdk,glayer0,glayer1) # first via
     align_comp_to_port(vdraina1, comcentroid.ports[f"tl_multiplier_0_row0_col{fingers-1}_rightsd_top_met_N"],alignment=("right","top"))
     align_comp_to_port(vdraina1, comcentroid.ports["tl_multiplier_0_drain_E"],alignment=("right","none"))
-    vdraina1.movex(pdk.get_grule(glayer1)["min_separation"])
+    vdraina1.movex(pdk.get_grule_fast(glayer1)["min_separation"])
     comcentroid << straight_route(pdk, vdraina1.ports["top_met_W"],comcentroid.ports["tr_multiplier_0_leftsd_top_met_E"],glayer2=glayer1)
     vdraina2 = comcentroid << via_stack(pdk,glayer0,glayer1) # second via
     align_comp_to_port(vdraina2, comcentroid.ports["tl_multiplier_0_drain_E"],alignment=("right","c"))
-    vdraina2.movex(pdk.get_grule(glayer1)["min_separation"])
-    vdraina2_mdprt = movex(vdraina2.ports["bottom_met_S"],pdk.get_grule("met2","via1")["min_enclosure"])
-    vdraina2_mdprt.width = vdraina2_mdprt.width + 2*pdk.get_grule("met2","via1")["min_enclosure"]
+    vdraina2.movex(pdk.get_grule_fast(glayer1)["min_separation"])
+    vdraina2_mdprt = movex(vdraina2.ports["bottom_met_S"],pdk.get_grule_fast("met2","via1")["min_enclosure"])
+    vdraina2_mdprt.width = vdraina2_mdprt.width + 2*pdk.get_grule_fast("met2","via1")["min_enclosure"]
     comcentroid << straight_route(pdk, vdraina2_mdprt, vdraina1.ports["bottom_met_N"])
     comcentroid << L_route(pdk, vdraina2.ports["top_met_N"],comcentroid.ports["bl_multiplier_0_source_E"])
     # route bdrain to bdrain
     vdrainb1 = comcentroid << via_stack(pdk,glayer0,glayer1) # first via
     align_comp_to_port(vdrainb1, comcentroid.ports["br_multiplier_0_leftsd_top_met_N"],alignment=("left","bottom"))
     align_comp_to_port(vdrainb1, comcentroid.ports["br_multiplier_0_drain_W"],alignment=("left","none"))
-    vdrainb1.movex(-pdk.get_grule(glayer1)["min_separation"])
+    vdrainb1.movex(-pdk.get_grule_fast(glayer1)["min_separation"])
     # TODO: fix slight overhang (both this one and the adrain->bdrain)
     comcentroid << straight_route(pdk, vdrainb1.ports["top_met_W"],comcentroid.ports["br_multiplier_0_leftsd_top_met_E"],glayer2=glayer1)
     vdrainb2 = comcentroid << via_stack(pdk,glayer0,glayer1) # second via
     align_comp_to_port(vdrainb2, comcentroid.ports["br_multiplier_0_drain_W"],alignment=("left","c"))
-    vdrainb2.movex(-pdk.get_grule(glayer1)["min_separation"])
-    vdrainb2_mdprt = movex(vdrainb2.ports["bottom_met_N"],-pdk.get_grule("met2","via1")["min_enclosure"])
-    vdrainb2_mdprt.width = vdrainb2_mdprt.width + 2*pdk.get_grule("met2","via1")["min_enclosure"]
+    vdrainb2.movex(-pdk.get_grule_fast(glayer1)["min_separation"])
+    vdrainb2_mdprt = movex(vdrainb2.ports["bottom_met_N"],-pdk.get_grule_fast("met2","via1")["min_enclosure"])
+    vdrainb2_mdprt.width = vdrainb2_mdprt.width + 2*pdk.get_grule_fast("met2","via1")["min_enclosure"]
     comcentroid << straight_route(pdk, vdrainb2_mdprt, vdrainb1.ports["bottom_met_S"])
     comcentroid << L_route(pdk, vdrainb2.ports["top_met_N"],comcentroid.ports["tl_multiplier_0_source_E"])
     # agate to agate
-    gate2rt_sep = pdk.get_grule(glayer2)["min_separation"]
+    gate2rt_sep = pdk.get_grule_fast(glayer2)["min_separation"]
     vgatea1 = comcentroid << via_stack(pdk,glayer1,glayer2)# first via
     align_comp_to_port(vgatea1,comcentroid.ports["tl_multiplier_0_gate_E"],alignment=("right","bottom"))
     vgatea2 = comcentroid << via_stack(pdk,glayer1,glayer2)# second via
     align_comp_to_port(vgatea2,comcentroid.ports["br_multiplier_0_gate_S"],alignment=("right","bottom"))
     vgatea2.movey(-gate2rt_sep)
     comcentroid << straight_route(pdk, vgatea2.ports["bottom_met_S"], comcentroid.ports["br_multiplier_0_gate_N"])
-    g1extension = pdk.util_max_metal_seperation()+pdk.snap_to_2xgrid(comcentroid.ports["tr_multiplier_0_plusdoped_E"].center[0] - vgatea2.ports["top_met_E"].center[0])
+    g1extension = pdk.util_max_metal_seperation()+pdk.snap_to_2xgrid_fast(comcentroid.ports["tr_multiplier_0_plusdoped_E"].center[0] - vgatea2.ports["top_met_E"].center[0])
     cext1 = comcentroid << c_route(pdk, vgatea2.ports["top_met_E"], vgatea1.ports["top_met_E"], cglayer=glayer2, extension=g1extension)
     comcentroid.add_ports(ports=cext1.ports,prefix="A_gate_route_")
     # bgate to bgate
@@ -168,7 +168,7 @@ def common_centroid_ab_ba(
     align_comp_to_port(vgateb2,comcentroid.ports["tr_multiplier_0_gate_S"],alignment=("right","top"))
     vgateb2.movey(gate2rt_sep)
     comcentroid << straight_route(pdk, vgateb2.ports["bottom_met_N"], comcentroid.ports["tr_multiplier_0_gate_S"])
-    g2extension = pdk.util_max_metal_seperation()+pdk.snap_to_2xgrid(abs(comcentroid.ports["tl_multiplier_0_plusdoped_W"].center[0] - vgateb1.ports["top_met_W"].center[0]))
+    g2extension = pdk.util_max_metal_seperation()+pdk.snap_to_2xgrid_fast(abs(comcentroid.ports["tl_multiplier_0_plusdoped_W"].center[0] - vgateb1.ports["top_met_W"].center[0]))
     cext2 = comcentroid << c_route(pdk, vgateb2.ports["top_met_W"], vgateb1.ports["top_met_W"], cglayer=glayer2, extension=g2extension)
     comcentroid.add_ports(ports=cext2.ports,prefix="B_gate_route_")
     # create better toplevel ports
@@ -182,9 +182,9 @@ def common_centroid_ab_ba(
     a_sourceW = comcentroid << straight_route(pdk, comcentroid.ports["tl_multiplier_0_source_W"], movex(cext2.ports["con_N"],-cext2.ports["con_N"].width/2-pdk.util_max_metal_seperation()), glayer2=glayer1)
     # add the ports
     def makeNorS(portin, direction: str):
-        mdprt = set_port_orientation(movex(portin.copy(),(-1 if portin.name.endswith("E") else 1)*pdk.snap_to_2xgrid(portin.width/2)),direction)
+        mdprt = set_port_orientation(movex(portin.copy(),(-1 if portin.name.endswith("E") else 1)*pdk.snap_to_2xgrid_fast(portin.width/2)),direction)
         mdprt.name = (mdprt.name.strip("EW") + direction.strip().capitalize()).removeprefix("route_")
-        return movey(mdprt,(1 if direction.endswith("N") else -1)*pdk.snap_to_2xgrid(mdprt.width/2))
+        return movey(mdprt,(1 if direction.endswith("N") else -1)*pdk.snap_to_2xgrid_fast(mdprt.width/2))
     def addENS(topcomp: Component, straightrouteref, device: str, pin: str):
         # device is A or B and pin is source drain or gate
         eastport = straightrouteref.ports["route_E"].copy()
@@ -8,6 +8,7 @@ from typing import Literal
 from gdsfactory import Component
 from gdsfactory.component import ComponentReference
 from glayout.util.comp_utils import evaluate_bbox, movey, align_comp_to_port
+from glayout.util.snap_to_grid import finalize_component
 from glayout.primitives.guardring import tapring
 from glayout.spice.netlist import Netlist
 from gdsfactory.components import text_freetype, rectangle
@@ -88,8 +89,7 @@ def add_four_int_labels1(four_int_in: Component,
         alignment = ('c','b') if alignment is None else alignment
         compref = align_comp_to_port(comp, prt, alignment=alignment)
         four_int_in.add(compref)
-    # In GDSFactory v9, flatten() mutates in-place and returns None
-    four_int_in.flatten()
+    finalize_component(four_int_in)
     return four_int_in
 # one common bulk node
 def add_four_int_labels2(four_int_in: Component,
@@ -161,8 +161,7 @@ def add_four_int_labels2(four_int_in: Component,
         alignment = ('c','b') if alignment is None else alignment
         compref = align_comp_to_port(comp, prt, alignment=alignment)
         four_int_in.add(compref)
-    # In GDSFactory v9, flatten() mutates in-place and returns None
-    four_int_in.flatten()
+    finalize_component(four_int_in)
     return four_int_in
 def four_tran_interdigitized_netlist(toprow: ComponentReference, bottomrow: ComponentReference, same_bulk: bool) -> Netlist:
 
@@ -202,15 +201,15 @@ def generic_4T_interdigitzed(
     else:
         bottomrow = toplvl << two_pfet_interdigitized(pdk,numcols,with_substrate_tap=False,length=length,**bottom_kwargs)
     # move
-    toprow.movey(pdk.snap_to_2xgrid((evaluate_bbox(bottomrow)[1]/2 + evaluate_bbox(toprow)[1]/2 + pdk.util_max_metal_seperation())))
+    toprow.movey(pdk.snap_to_2xgrid_fast((evaluate_bbox(bottomrow)[1]/2 + evaluate_bbox(toprow)[1]/2 + pdk.util_max_metal_seperation())))
     # add substrate tap
     if with_substrate_tap:
         # In GDSFactory v9, flatten() mutates in-place and returns None
         # Create a temporary copy for getting bbox and center
         toplvl_temp = toplvl.copy()
         toplvl_temp.flatten()
-        substrate_tap = tapring(pdk, enclosed_rectangle=pdk.snap_to_2xgrid(evaluate_bbox(toplvl_temp,padding=0.34)))
-        substrate_tap_ref = toplvl << movey(substrate_tap,destination=pdk.snap_to_2xgrid(toplvl_temp.center[1],snap4=True))
+        substrate_tap = tapring(pdk, enclosed_rectangle=pdk.snap_to_2xgrid_fast(evaluate_bbox(toplvl_temp,padding=0.34)))
+        substrate_tap_ref = toplvl << movey(substrate_tap,destination=pdk.snap_to_2xgrid_fast(toplvl_temp.center[1],snap4=True))
     # add ports
     toplvl.add_ports(substrate_tap_ref.ports,prefix="substratetap_")
     toplvl.add_ports(toprow.ports,prefix="top_")
@@ -4,6 +4,7 @@ from gdsfactory.component import Component
 from gdsfactory.components import rectangle
 from glayout.primitives.fet import nmos, pmos, multiplier
 from glayout.util.comp_utils import evaluate_bbox, prec_ref_center, transformed, align_comp_to_port
+from glayout.util.snap_to_grid import finalize_component
 from typing import Literal, Union
 from glayout.util.port_utils import rename_ports_by_orientation, rename_ports_by_list, create_private_ports
 from glayout.routing.straight_route import straight_route
@@ -58,8 +59,7 @@ def add_two_int_labels(two_int_in: Component,
         alignment = ('c','b') if alignment is None else alignment
         compref = align_comp_to_port(comp, prt, alignment=alignment)
         two_int_in.add(compref)
-    # In GDSFactory v9, flatten() mutates in-place and returns None
-    two_int_in.flatten()
+    finalize_component(two_int_in)
     return two_int_in
 @validate_arguments(config=dict(arbitrary_types_allowed=True))
 def macro_two_transistor_interdigitized(
@@ -94,8 +94,8 @@ def macro_two_transistor_interdigitized(
     center_devA = multiplier(**kwargs)
     devB_sd_extension = pdk.util_max_metal_seperation() + abs(center_devA.ports["drain_N"].center[1]-center_devA.ports["diff_N"].center[1])
     devB_gate_extension = pdk.util_max_metal_seperation() + abs(center_devA.ports["row0_col0_gate_S"].center[1]-center_devA.ports["gate_S"].center[1])
-    kwargs["sd_route_extension"] = pdk.snap_to_2xgrid(devB_sd_extension)
-    kwargs["gate_route_extension"] = pdk.snap_to_2xgrid(devB_gate_extension)
+    kwargs["sd_route_extension"] = pdk.snap_to_2xgrid_fast(devB_sd_extension)
+    kwargs["gate_route_extension"] = pdk.snap_to_2xgrid_fast(devB_gate_extension)
     center_devB = multiplier(**kwargs)
     kwargs["dummy"] = (False,True) if dummy[1] else False
     rightmost_devB = multiplier(**kwargs)
@@ -103,7 +103,7 @@ def macro_two_transistor_interdigitized(
     basename = "idplace"
     idplace = Component(name=f"{basename}_{uuid.uuid4().hex[:6]}")
     dims = evaluate_bbox(center_devA)
-    xdisp = pdk.snap_to_2xgrid(dims[0]+pdk.get_grule("active_diff")["min_separation"])
+    xdisp = pdk.snap_to_2xgrid_fast(dims[0]+pdk.get_grule_fast("active_diff")["min_separation"])
     refs = list()
     for i in range(2*numcols):
         if i==0:
@@ -120,7 +120,7 @@ def macro_two_transistor_interdigitized(
         idplace.add_ports(refs[-1].ports, prefix=prefix)
     # extend poly layer for equal parasitics
     for i in range(2*numcols):
-        desired_end_layer = pdk.layer_to_glayer(refs[i].ports["row0_col0_rightsd_top_met_N"].layer)
+        desired_end_layer = pdk.layer_to_glayer_fast(refs[i].ports["row0_col0_rightsd_top_met_N"].layer)
         idplace << straight_route(pdk, refs[i].ports["row0_col0_rightsd_top_met_N"],refs[-1].ports["drain_E"],glayer2=desired_end_layer)
         idplace << straight_route(pdk, refs[i].ports["leftsd_top_met_N"],refs[-1].ports["drain_E"],glayer2=desired_end_layer)
         if not i%2:
@@ -170,9 +170,9 @@ def two_nfet_interdigitized(
     if with_tie:
         tap_separation = max(
             pdk.util_max_metal_seperation(),
-            pdk.get_grule("active_diff", "active_tap")["min_separation"],
+            pdk.get_grule_fast("active_diff", "active_tap")["min_separation"],
         )
-        tap_separation += pdk.get_grule("p+s/d", "active_tap")["min_enclosure"]
+        tap_separation += pdk.get_grule_fast("p+s/d", "active_tap")["min_enclosure"]
         tap_encloses = (
             2 * (tap_separation + base_multiplier.xmax),
             2 * (tap_separation + base_multiplier.ymax),
@@ -196,13 +196,13 @@ def two_nfet_interdigitized(
     # add pwell
     base_multiplier.add_padding(
         layers=(pdk.get_glayer("pwell"),),
-        default=pdk.get_grule("pwell", "active_tap")["min_enclosure"],
+        default=pdk.get_grule_fast("pwell", "active_tap")["min_enclosure"],
     )
     # add substrate tap
     base_multiplier = add_ports_perimeter(base_multiplier,layer=pdk.get_glayer("pwell"),prefix="well_")
     # add substrate tap if with_substrate_tap
     if with_substrate_tap:
-        substrate_tap_separation = pdk.get_grule("dnwell", "active_tap")[
+        substrate_tap_separation = pdk.get_grule_fast("dnwell", "active_tap")[
             "min_separation"
         ]
         substrate_tap_encloses = (
@@ -256,9 +256,9 @@ def two_pfet_interdigitized(
     if with_tie:
         tap_separation = max(
             pdk.util_max_metal_seperation(),
-            pdk.get_grule("active_diff", "active_tap")["min_separation"],
+            pdk.get_grule_fast("active_diff", "active_tap")["min_separation"],
         )
-        tap_separation += pdk.get_grule("n+s/d", "active_tap")["min_enclosure"] 
+        tap_separation += pdk.get_grule_fast("n+s/d", "active_tap")["min_enclosure"] 
         tap_encloses = (
             2 * (tap_separation + base_multiplier.xmax),
             2 * (tap_separation + base_multiplier.ymax),
@@ -282,13 +282,13 @@ def two_pfet_interdigitized(
     # add pwell
     base_multiplier.add_padding(
         layers=(pdk.get_glayer("nwell"),),
-        default=pdk.get_grule("nwell", "active_tap")["min_enclosure"],
+        default=pdk.get_grule_fast("nwell", "active_tap")["min_enclosure"],
     )
     # add substrate tap
     base_multiplier = add_ports_perimeter(base_multiplier,layer=pdk.get_glayer("nwell"),prefix="well_")
     # add substrate tap if with_substrate_tap
     if with_substrate_tap:
-        substrate_tap_separation = pdk.get_grule("dnwell", "active_tap")[
+        substrate_tap_separation = pdk.get_grule_fast("dnwell", "active_tap")[
             "min_separation"
         ]
         substrate_tap_encloses = (
@@ -2,7 +2,7 @@
 Glayout primitives module for basic circuit components.
 """
 
-from .via_gen import via_stack, via_array
+from .via_gen import via_stack, via_array, via_pitch
 from .fet import nmos, pmos, multiplier, fet_netlist
 from .guardring import tapring
 from .mimcap import mimcap, mimcap_array
@@ -11,6 +11,7 @@ from .resistor import resistor
 __all__ = [
     'via_stack',
     'via_array',
+    'via_pitch',
     'nmos',
     'pmos',
     'multiplier',
@@ -6,7 +6,7 @@ from glayout import MappedPDK, sky130 , gf180
 from glayout.primitives.guardring import tapring
 from glayout.routing import c_route
 from glayout.util.pattern import check_pattern_level, check_pattern_size, get_cols_positions, transpose_pattern
-from glayout.util.snap_to_grid import component_snap_to_grid
+from glayout.util.snap_to_grid import component_snap_to_grid, finalize_component
 from glayout.util.port_utils import add_ports_perimeter, rename_ports_by_list, rename_ports_by_orientation
 from glayout.util.comp_utils import prec_center, prec_array, prec_ref_center, to_float, move, align_comp_to_port, evaluate_bbox, to_decimal
 from glayout.primitives.via_gen import via_array, via_stack
@@ -131,11 +131,11 @@ def fill_ring_with_contacts(pdk: MappedPDK,ring_dims:dict[str,np.ndarray[Any]],
 
 def get_bjt_dimensions (pdk: MappedPDK, active_area: tuple[float, float], bjt_type:
                         str, draw_dnwell: bool =False)-> dict[str,Any]:
-    min_enclosure_tap_ncomp = float(pdk.get_grule("p+s/d","active_tap")["min_enclosure"])
-    min_enclosure_tap_pcomp = float(pdk.get_grule("n+s/d","active_tap")["min_enclosure"])
-    min_enclosure_dnwell_pwell = float(pdk.get_grule("dnwell",
+    min_enclosure_tap_ncomp = float(pdk.get_grule_fast("p+s/d","active_tap")["min_enclosure"])
+    min_enclosure_tap_pcomp = float(pdk.get_grule_fast("n+s/d","active_tap")["min_enclosure"])
+    min_enclosure_dnwell_pwell = float(pdk.get_grule_fast("dnwell",
                                                      "pwell")["min_enclosure"])
-    contact_size= float(pdk.get_grule("mcon","mcon")["width"])
+    contact_size= float(pdk.get_grule_fast("mcon","mcon")["width"])
     min_enclosure_contact_tap = 0.1
     tap_width= contact_size+2*min_enclosure_contact_tap
     ndiff_width = tap_width+2*min_enclosure_tap_ncomp
@@ -374,7 +374,7 @@ def multiplier(
     # tested with 5x5 size, need to test with smaller sizes
     if routing:
 
-        bcroute_minsep = pdk.get_grule(bc_route_topmet)["min_separation"]
+        bcroute_minsep = pdk.get_grule_fast(bc_route_topmet)["min_separation"]
 
         # place via for base
         b_N_port = multiplier.ports["B_metal_W_N"]
@@ -453,7 +453,7 @@ def multiplier(
                          bjt_type, with_labels=False)
         dummy << straight_route(pdk,dummy.ports["E_S"],dummy.ports["B_metal_S_N"])
         dummy << straight_route(pdk,dummy.ports["B_metal_S_S"],dummy.ports["C_metal_S_N"])
-        dummy_separation = max(pdk.get_grule("n+s/d")["min_separation"],pdk.get_grule("p+s/d")["min_separation"])
+        dummy_separation = max(pdk.get_grule_fast("n+s/d")["min_separation"],pdk.get_grule_fast("p+s/d")["min_separation"])
         dummy_space = dummy_separation  + (dummy.xmax-dummy.xmin)/2 + dummy_sep
         sides = list()
         if dummyl:
@@ -517,8 +517,8 @@ def __mult_array_macro(
         dummy_routes=dummy_routes,
         dummy_separation_rmult=dummy_separation_rmult
     )
-    _max_metal_separation_ps = max([pdk.get_grule("met"+str(i))["min_separation"] for i in range(1,5)])
-    min_diff_separation = max(pdk.get_grule("n+s/d")["min_separation"],pdk.get_grule("p+s/d")["min_separation"])
+    _max_metal_separation_ps = max([pdk.get_grule_fast("met"+str(i))["min_separation"] for i in range(1,5)])
+    min_diff_separation = max(pdk.get_grule_fast("n+s/d")["min_separation"],pdk.get_grule_fast("p+s/d")["min_separation"])
     routing_separation = max([ _max_metal_separation_ps, min_diff_separation])
     multiplier_separation = to_decimal(
         float(routing_separation) + evaluate_bbox(multiplier_comp)[1]
@@ -540,7 +540,7 @@ def __mult_array_macro(
     sample_collector_port="multiplier_0_collector_W"
     base_port_width= multiplier_arr[sample_base_port].width
     collector_port_width = multiplier_arr[sample_collector_port].width
-    distance = base_port_width/2 + collector_port_width/2 + 2*pdk.get_grule("met4")["min_separation"]
+    distance = base_port_width/2 + collector_port_width/2 + 2*pdk.get_grule_fast("met4")["min_separation"]
 
     c_extension= to_decimal(to_float(b_extension)+ distance )
 
@@ -854,8 +854,8 @@ def __mult_2dim_array_macro(
         l_cols[-1]=dummy_R
 
 
-    _max_metal_separation_ps = max([pdk.get_grule("met"+str(i))["min_separation"] for i in range(1,5)])
-    min_diff_separation = max(pdk.get_grule("n+s/d")["min_separation"],pdk.get_grule("p+s/d")["min_separation"])
+    _max_metal_separation_ps = max([pdk.get_grule_fast("met"+str(i))["min_separation"] for i in range(1,5)])
+    min_diff_separation = max(pdk.get_grule_fast("n+s/d")["min_separation"],pdk.get_grule_fast("p+s/d")["min_separation"])
     routing_separation = max([ _max_metal_separation_ps, min_diff_separation])
     multiplier_separation = to_decimal(
         float(routing_separation) + max_width
@@ -891,7 +891,7 @@ def __mult_2dim_array_macro(
 
     base_port_width= multiplier_2dim_arr[sample_base_port].width
     collector_port_width = multiplier_2dim_arr[sample_collector_port].width
-    bc_distance = base_port_width/2 + collector_port_width/2 + 2*pdk.get_grule("met4")["min_separation"]
+    bc_distance = base_port_width/2 + collector_port_width/2 + 2*pdk.get_grule_fast("met4")["min_separation"]
 
     print(sample_base_port)
     print(sample_collector_port)
@@ -1042,9 +1042,9 @@ def pnp(
     if with_substrate_tap:
         tap_separation = max(
             pdk.util_max_metal_seperation(),
-            pdk.get_grule("active_diff", "active_tap")["min_separation"],
+            pdk.get_grule_fast("active_diff", "active_tap")["min_separation"],
         )
-        tap_separation += pdk.get_grule("n+s/d", "active_tap")["min_enclosure"]
+        tap_separation += pdk.get_grule_fast("n+s/d", "active_tap")["min_enclosure"]
         tap_encloses = (
             2 * (tap_separation + pnp.xmax),
             2 * (tap_separation + pnp.ymax),
@@ -1076,9 +1076,8 @@ def pnp(
                     dummy_port_name = "col_" + str(multipliers[0]-1) + "_" + dummy_port_name
                 pnp<<straight_route(pdk,pnp.ports[dummy_port_name],pnp.ports[f"substrate_E_top_met_E"],glayer2="met1")
 
-    # In GDSFactory v9, flatten() mutates in-place and returns None
     component = rename_ports_by_orientation(pnp)
-    component.flatten()
+    finalize_component(component)
 
     #component.info['netlist'] = fet_netlist(
     #    pdk,
@@ -1157,7 +1156,7 @@ def npn(
     nwell_glayer = "dnwell" if with_dnwell else "nwell"
     npn.add_padding(
         layers=(pdk.get_glayer(nwell_glayer),),
-        default=pdk.get_grule("dnwell", "pwell")["min_enclosure"],
+        default=pdk.get_grule_fast("dnwell", "pwell")["min_enclosure"],
     )
     npn = add_ports_perimeter(npn,layer=pdk.get_glayer(nwell_glayer),prefix="well_")
 
@@ -1169,7 +1168,7 @@ def npn(
 
     # add substrate tap if with_substrate_tap
     if with_substrate_tap:
-        substrate_tap_separation = pdk.get_grule("dnwell", "active_tap")[
+        substrate_tap_separation = pdk.get_grule_fast("dnwell", "active_tap")[
             "min_separation"
         ]
         substrate_tap_encloses = (
@@ -1198,9 +1197,8 @@ def npn(
                 npn<<straight_route(pdk,npn.ports[f"multiplier_{row}_dummy_R_C_metal_E_E"],npn.ports[f"substrate_E_top_met_E"],glayer2="met1")
 
 
-    # In GDSFactory v9, flatten() mutates in-place and returns None
     component = rename_ports_by_orientation(npn)
-    component.flatten()
+    finalize_component(component)
 
     #component.info['netlist'] = fet_netlist(
     #    pdk,
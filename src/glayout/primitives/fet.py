@@ -8,8 +8,10 @@ from pydantic import validate_arguments
 from glayout.util.comp_utils import evaluate_bbox, to_float, to_decimal, prec_array, prec_center, prec_ref_center, movey, align_comp_to_port
 from glayout.util.port_utils import rename_ports_by_orientation, rename_ports_by_list, add_ports_perimeter, print_ports
 from glayout.routing.c_route import c_route
-from glayout.routing.L_route import L_route
-from glayout.util.snap_to_grid import component_snap_to_grid
+from glayout.routing.route_plan import RoutePlan
+from glayout.util.snap_to_grid import component_snap_to_grid, finalize_component
+from glayout.util.cell_cache import cached_cell, cell_name
+from glayout.util.disk_cache import disk_cached_cell
 from decimal import Decimal
 from glayout.routing.straight_route import straight_route
 from glayout.spice import Netlist
@@ -59,15 +61,15 @@ def netlist_to_dict(netlist: Netlist) -> dict:
 @validate_arguments(config=dict(arbitrary_types_allowed=True))
 def __gen_fingers_macro(pdk: MappedPDK, rmult: int, fingers: int, length: float, width: float, poly_height: float, sdlayer: str, inter_finger_topmet: str) -> Component:
     """internal use: returns an array of fingers"""
-    length = pdk.snap_to_2xgrid(length)
-    width = pdk.snap_to_2xgrid(width)
-    poly_height = pdk.snap_to_2xgrid(poly_height)
+    length = pdk.snap_to_2xgrid_fast(length)
+    width = pdk.snap_to_2xgrid_fast(width)
+    poly_height = pdk.snap_to_2xgrid_fast(poly_height)
     sizing_ref_viastack = via_stack(pdk, "active_diff", "met1")
     # figure out poly (gate) spacing: s/d metal doesnt overlap transistor, s/d min seperation criteria is met
     sd_viaxdim = rmult*evaluate_bbox(via_stack(pdk, "active_diff", "met1"))[0]
-    poly_spacing = 2 * pdk.get_grule("poly", "mcon")["min_separation"] + pdk.get_grule("mcon")["width"]
+    poly_spacing = 2 * pdk.get_grule_fast("poly", "mcon")["min_separation"] + pdk.get_grule_fast("mcon")["width"]
     poly_spacing = max(sd_viaxdim, poly_spacing)
-    met1_minsep = pdk.get_grule("met1")["min_separation"]
+    met1_minsep = pdk.get_grule_fast("met1")["min_separation"]
     poly_spacing += met1_minsep if length < met1_minsep else 0
     # create a single finger
     finger = Component(name=f"finger_{uuid.uuid4().hex[:6]}")
@@ -95,10 +97,10 @@ def __gen_fingers_macro(pdk: MappedPDK, rmult: int, fingers: int, length: float,
     centered_farray.add_ports(fingerarray_ref_center.ports)
     # create diffusion and +doped region
     multiplier = rename_ports_by_orientation(centered_farray)
-    diff_extra_enc = 2 * pdk.get_grule("mcon", "active_diff")["min_enclosure"]
+    diff_extra_enc = 2 * pdk.get_grule_fast("mcon", "active_diff")["min_enclosure"]
     diff_dims =(diff_extra_enc + evaluate_bbox(multiplier)[0], width)
     diff = multiplier << rectangle(size=diff_dims,layer=pdk.get_glayer("active_diff"),centered=True)
-    sd_diff_ovhg = pdk.get_grule(sdlayer, "active_diff")["min_enclosure"]
+    sd_diff_ovhg = pdk.get_grule_fast(sdlayer, "active_diff")["min_enclosure"]
     sdlayer_dims = [dim + 2*sd_diff_ovhg for dim in diff_dims]
     sdlayer_ref = multiplier << rectangle(size=sdlayer_dims, layer=pdk.get_glayer(sdlayer),centered=True)
     multiplier.add_ports(sdlayer_ref.ports,prefix="plusdoped_")
@@ -125,7 +127,7 @@ def fet_netlist(
         num_dummies = 2
 
     if length is None:
-        length = pdk.get_grule('poly')['min_width']
+        length = pdk.get_grule_fast('poly')['min_width']
         
     ltop = length
     wtop = width
@@ -155,6 +157,7 @@ XMAIN   D G S B {model} l={{l}} w={{w}} m={{m}}"""
     )
 
 # drain is above source
+@cached_cell
 def multiplier(
     pdk: MappedPDK,
     sdlayer: str,
@@ -219,13 +222,13 @@ def multiplier(
     if fingers < 1:
         raise ValueError("number of fingers must be positive int")
     # argument parsing and rule setup
-    min_length = pdk.get_grule("poly")["min_width"]
+    min_length = pdk.get_grule_fast("poly")["min_width"]
     length = min_length if (length or min_length) <= min_length else length
-    length = pdk.snap_to_2xgrid(length)
-    min_width = max(min_length, pdk.get_grule("active_diff")["min_width"])
+    length = pdk.snap_to_2xgrid_fast(length)
+    min_width = max(min_length, pdk.get_grule_fast("active_diff")["min_width"])
     width = min_width if (width or min_width) <= min_width else width
-    width = pdk.snap_to_2xgrid(width)
-    poly_height = width + 2 * pdk.get_grule("poly", "active_diff")["overhang"]
+    width = pdk.snap_to_2xgrid_fast(width)
+    poly_height = width + 2 * pdk.get_grule_fast("poly", "active_diff")["overhang"]
     # call finger array
     multiplier = __gen_fingers_macro(pdk, interfinger_rmult, fingers, length, width, poly_height, sdlayer, inter_finger_topmet)
     # route all drains/ gates/ sources
@@ -234,16 +237,18 @@ def multiplier(
         sd_N_port = multiplier.ports["leftsd_top_met_N"]
         sdvia = via_stack(pdk, "met1", sd_route_topmet)
         sdmet_hieght = sd_rmult*evaluate_bbox(sdvia)[1]
-        sdroute_minsep = pdk.get_grule(sd_route_topmet)["min_separation"]
+        sdroute_minsep = pdk.get_grule_fast(sd_route_topmet)["min_separation"]
         sdvia_ports = list()
+        # the routes of every finger are written into one cell
+        routes = RoutePlan(pdk)
         for finger in range(fingers+1):
             diff_top_port = movey(sd_N_port,destination=width/2)
             # place sdvia such that metal does not overlap diffusion
             big_extension = sdroute_minsep + sdroute_minsep + sdmet_hieght/2 + sdmet_hieght
             sdvia_extension = big_extension if finger % 2 else sdroute_minsep + (sdmet_hieght)/2
             sdvia_ref = align_comp_to_port(sdvia,diff_top_port,alignment=('c','t'))
-            multiplier.add(sdvia_ref.movey(sdvia_extension + pdk.snap_to_2xgrid(sd_route_extension)))
-            multiplier << straight_route(pdk, diff_top_port, sdvia_ref.ports["bottom_met_N"])
+            multiplier.add(sdvia_ref.movey(sdvia_extension + pdk.snap_to_2xgrid_fast(sd_route_extension)))
+            routes.straight_route(diff_top_port, sdvia_ref.ports["bottom_met_N"])
             sdvia_ports += [sdvia_ref.ports["top_met_W"], sdvia_ref.ports["top_met_E"]]
             # get the next port (break before this if last iteration because port D.N.E. and num gates=fingers)
             if finger==fingers:
@@ -253,8 +258,9 @@ def multiplier(
             gate_S_port = multiplier.ports[f"row0_col{finger}_gate_S"]
             metal_seperation = pdk.util_max_metal_seperation()
             psuedo_Ngateroute = movey(gate_S_port.copy(),0-metal_seperation-gate_route_extension)
-            psuedo_Ngateroute.y = pdk.snap_to_2xgrid(psuedo_Ngateroute.y)
-            multiplier << straight_route(pdk,gate_S_port,psuedo_Ngateroute)
+            psuedo_Ngateroute.y = pdk.snap_to_2xgrid_fast(psuedo_Ngateroute.y)
+            routes.straight_route(gate_S_port,psuedo_Ngateroute)
+        routes.commit(multiplier)
         # place route met: gate
         gate_width = gate_S_port.center[0] - multiplier.ports["row0_col0_gate_S"].center[0] + gate_S_port.width
         gate = rename_ports_by_list(via_array(pdk,"poly",gate_route_topmet, size=(gate_width,None),num_vias=(None,gate_rmult), no_exception=True, fullbottom=True),[("top_met_","gate_")])
@@ -280,10 +286,12 @@ def multiplier(
         dummy = __gen_fingers_macro(pdk,rmult=interfinger_rmult,fingers=1,length=length,width=width,poly_height=poly_height,sdlayer=sdlayer,inter_finger_topmet="met1")
         dummyvia = dummy << via_stack(pdk,"poly","met1",fullbottom=True)
         align_comp_to_port(dummyvia,dummy.ports["row0_col0_gate_S"],layer=pdk.get_glayer("poly"))
-        dummy << L_route(pdk,dummyvia.ports["top_met_W"],dummy.ports["leftsd_top_met_S"])
-        dummy << L_route(pdk,dummyvia.ports["top_met_E"],dummy.ports["row0_col0_rightsd_top_met_S"])
+        dummy_routes = RoutePlan(pdk)
+        dummy_routes.L_route(dummyvia.ports["top_met_W"],dummy.ports["leftsd_top_met_S"])
+        dummy_routes.L_route(dummyvia.ports["top_met_E"],dummy.ports["row0_col0_rightsd_top_met_S"])
+        dummy_routes.commit(dummy)
         dummy.add_ports(dummyvia.ports,prefix="gsdcon_")
-        dummy_space = pdk.get_grule(sdlayer)["min_separation"] + dummy.xmax
+        dummy_space = pdk.get_grule_fast(sdlayer)["min_separation"] + dummy.xmax
         sides = list()
         if dummyl:
             sides.append((-1,"dummy_L_"))
@@ -294,7 +302,9 @@ def multiplier(
             dummy_ref.movex(side * (dummy_space + multiplier.xmax))
             multiplier.add_ports(dummy_ref.ports,prefix=name)
     # ensure correct port names and return
-    return component_snap_to_grid(rename_ports_by_orientation(multiplier))
+    multiplier = component_snap_to_grid(rename_ports_by_orientation(multiplier))
+    multiplier.name = cell_name("multiplier")
+    return multiplier
 
 
 @validate_arguments(config=dict(arbitrary_types_allowed=True))
@@ -337,7 +347,7 @@ def __mult_array_macro(
         interfinger_rmult=interfinger_rmult,
         dummy_routes=dummy_routes
     )
-    _max_metal_seperation_ps = max([pdk.get_grule("met"+str(i))["min_separation"] for i in range(1,5)])
+    _max_metal_seperation_ps = max([pdk.get_grule_fast("met"+str(i))["min_separation"] for i in range(1,5)])
     multiplier_separation = (
         to_decimal(_max_metal_seperation_ps)
         + evaluate_bbox(multiplier_comp, True)[1]
@@ -351,7 +361,7 @@ def __mult_array_macro(
         )
     # TODO: fix extension (both extension are broken. IDK src extension and drain extension IDK metal layer)
     src_extension = to_decimal(0.6)
-    drain_extension = src_extension + 3*to_decimal(pdk.get_grule("met4")["min_separation"])
+    drain_extension = src_extension + 3*to_decimal(pdk.get_grule_fast("met4")["min_separation"])
     sd_side = "W" if sd_route_left else "E"
     gate_side = "E" if sd_route_left else "W"
     if routing and multipliers > 1:
@@ -395,6 +405,8 @@ def __mult_array_macro(
     final_arr.add_ports(marrref.ports)
     return component_snap_to_grid(rename_ports_by_orientation(final_arr))
 
+@cached_cell
+@disk_cached_cell
 @gf.cell
 def nmos(
     pdk,
@@ -471,9 +483,9 @@ def nmos(
     if with_tie:
         tap_separation = max(
             pdk.util_max_metal_seperation(),
-            pdk.get_grule("active_diff", "active_tap")["min_separation"],
+            pdk.get_grule_fast("active_diff", "active_tap")["min_separation"],
         )
-        tap_separation += pdk.get_grule("p+s/d", "active_tap")["min_enclosure"]
+        tap_separation += pdk.get_grule_fast("p+s/d", "active_tap")["min_enclosure"]
         tap_encloses = (
             2 * (tap_separation + nfet.xmax),
             2 * (tap_separation + nfet.ymax),
@@ -493,16 +505,16 @@ def nmos(
                 except KeyError:
                     pass
     # add pwell
-    pwell_enc = pdk.get_grule("pwell", "active_tap")["min_enclosure"]
+    pwell_enc = pdk.get_grule_fast("pwell", "active_tap")["min_enclosure"]
     add_padding(nfet, pdk.get_glayer("pwell"), pwell_enc)
     nfet = add_ports_perimeter(nfet,layer=pdk.get_glayer("pwell"),prefix="well_")
     # add dnwell if dnwell
     if with_dnwell:
-        dnwell_enc = pdk.get_grule("pwell", "dnwell")["min_enclosure"]
+        dnwell_enc = pdk.get_grule_fast("pwell", "dnwell")["min_enclosure"]
         add_padding(nfet, pdk.get_glayer("dnwell"), dnwell_enc)
     # add substrate tap if with_substrate_tap
     if with_substrate_tap:
-        substrate_tap_separation = pdk.get_grule("dnwell", "active_tap")[
+        substrate_tap_separation = pdk.get_grule_fast("dnwell", "active_tap")[
             "min_separation"
         ]
         substrate_tap_encloses = (
@@ -519,9 +531,8 @@ def nmos(
         tapring_ref = nfet << ringtoadd
         nfet.add_ports(tapring_ref.ports,prefix="guardring_")
 
-    # In GDSFactory v9, flatten() mutates in-place and returns None
     component = rename_ports_by_orientation(nfet)
-    component.flatten()
+    finalize_component(component)
 
     component.info['netlist'] = netlist_to_dict(fet_netlist(
         pdk,
@@ -536,6 +547,8 @@ def nmos(
 
     return component
 
+@cached_cell
+@disk_cached_cell
 @gf.cell
 def pmos(
     pdk,
@@ -611,11 +624,11 @@ def pmos(
     # add tie if tie
     if with_tie:
         tap_separation = max(
-            pdk.get_grule("met2")["min_separation"],
-            pdk.get_grule("met1")["min_separation"],
-            pdk.get_grule("active_diff", "active_tap")["min_separation"],
+            pdk.get_grule_fast("met2")["min_separation"],
+            pdk.get_grule_fast("met1")["min_separation"],
+            pdk.get_grule_fast("active_diff", "active_tap")["min_separation"],
         )
-        tap_separation += pdk.get_grule("n+s/d", "active_tap")["min_enclosure"]
+        tap_separation += pdk.get_grule_fast("n+s/d", "active_tap")["min_enclosure"]
         tap_encloses = (
             2 * (tap_separation + pfet.xmax),
             2 * (tap_separation + pfet.ymax),
@@ -636,12 +649,12 @@ def pmos(
                     pass
     # add nwell
     nwell_glayer = "dnwell" if dnwell else "nwell"
-    nwell_enc = pdk.get_grule("active_tap", nwell_glayer)["min_enclosure"]
+    nwell_enc = pdk.get_grule_fast("active_tap", nwell_glayer)["min_enclosure"]
     add_padding(pfet, pdk.get_glayer(nwell_glayer), nwell_enc)
     pfet = add_ports_perimeter(pfet,layer=pdk.get_glayer(nwell_glayer),prefix="well_")
     # add substrate tap if with_substrate_tap
     if with_substrate_tap:
-        substrate_tap_separation = pdk.get_grule("dnwell", "active_tap")[
+        substrate_tap_separation = pdk.get_grule_fast("dnwell", "active_tap")[
             "min_separation"
         ]
         substrate_tap_encloses = (
@@ -655,9 +668,8 @@ def pmos(
             horizontal_glayer=substrate_tap_layers[0],
             vertical_glayer=substrate_tap_layers[1],
         )
-    # In GDSFactory v9, flatten() mutates in-place and returns None
     component = rename_ports_by_orientation(pfet)
-    component.flatten()
+    finalize_component(component)
 
     component.info['netlist'] = netlist_to_dict(fet_netlist(
         pdk,
@@ -6,10 +6,12 @@ from glayout.primitives.via_gen import via_array, via_stack
 from glayout.util.comp_utils import evaluate_bbox
 from glayout.util.snap_to_grid import component_snap_to_grid
 from glayout.routing.L_route import L_route
+from glayout.util.cell_cache import cached_cell, cell_name
+from glayout.util.disk_cache import disk_cached_cell
 from gdsfactory.typings import LayerSpec
-import uuid
 import gdsfactory as gf
 
+@cached_cell
 @gf.cell
 def rectangular_ring(
 	enclosed_size = (4.0,2.0),
@@ -25,8 +27,7 @@ def rectangular_ring(
 		layer = Specific layer to put polygon geometry on.
 		centered: True sets center to (0,0), False sets south-west to (0,0).
 	"""
-	basename = "rect_ring"
-	c = Component(name=f"{basename}_{uuid.uuid4().hex[:6]}")
+	c = Component(name=cell_name("rect_ring"))
 	# Create inner and outer rectangles
 	rect_in_comp = rectangle(size=enclosed_size, centered=centered, layer=layer)
 	rect_out_comp = rectangle(size=[dim+2*width for dim in enclosed_size], centered=centered, layer=layer)
@@ -43,6 +44,8 @@ def rectangular_ring(
 	c << ring
 	return c
 
+@cached_cell
+@disk_cached_cell
 @gf.cell
 def tapring(
     pdk: MappedPDK,
@@ -68,25 +71,24 @@ def tapring(
     Warr_... all ports in left via array
     bl_corner_...all ports in bottom left L route
     """
-    enclosed_rectangle = pdk.snap_to_2xgrid(enclosed_rectangle,return_type="float")
+    enclosed_rectangle = pdk.snap_to_2xgrid_fast(enclosed_rectangle)
     # check layers, activate pdk, create top cell
     pdk.has_required_glayers(
         [sdlayer, "active_tap", "mcon", horizontal_glayer, vertical_glayer]
     )
     pdk.activate()
-    basename = f"tapring_{sdlayer}"
-    ptapring = Component(name=f"{basename}_{uuid.uuid4().hex[:6]}")
+    ptapring = Component(name=cell_name(f"tapring_{sdlayer}"))
     if not "met" in horizontal_glayer or not "met" in vertical_glayer:
         raise ValueError("both horizontal and vertical glayers should be metals")
     # check that ring is not too small
-    min_gap_tap = pdk.get_grule("active_tap")["min_separation"]
+    min_gap_tap = pdk.get_grule_fast("active_tap")["min_separation"]
     if enclosed_rectangle[0] < min_gap_tap:
         raise ValueError("ptapring must be larger than " + str(min_gap_tap))
     # create active tap
     tap_width = max(
-        pdk.get_grule("active_tap")["min_width"],
-        2 * pdk.get_grule("active_tap", "mcon")["min_enclosure"]
-        + pdk.get_grule("mcon")["width"],
+        pdk.get_grule_fast("active_tap")["min_width"],
+        2 * pdk.get_grule_fast("active_tap", "mcon")["min_enclosure"]
+        + pdk.get_grule_fast("mcon")["width"],
     )
     ptapring << rectangular_ring(
         enclosed_size=enclosed_rectangle,
@@ -95,7 +97,7 @@ def tapring(
         layer=pdk.get_glayer("active_tap"),
     )
     # create p plus area
-    pp_enclosure = pdk.get_grule("active_tap", sdlayer)["min_enclosure"]
+    pp_enclosure = pdk.get_grule_fast("active_tap", sdlayer)["min_enclosure"]
     pp_width = 2 * pp_enclosure + tap_width
     pp_enclosed_rectangle = [dim - 2 * pp_enclosure for dim in enclosed_rectangle]
     ptapring << rectangular_ring(
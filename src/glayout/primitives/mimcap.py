@@ -3,11 +3,14 @@ from gdsfactory.components import rectangle
 from glayout.pdk.mappedpdk import MappedPDK
 from glayout.primitives.via_gen import via_array
 from glayout.util.comp_utils import prec_array, to_decimal, to_float
+from glayout.util.snap_to_grid import finalize_component
 from glayout.util.port_utils import rename_ports_by_orientation, add_ports_perimeter, print_ports
 from pydantic import validate_arguments
 from glayout.routing.straight_route import straight_route
 from decimal import ROUND_UP, Decimal
 from glayout.spice import Netlist
+from glayout.util.cell_cache import cached_cell, cell_name
+from glayout.util.disk_cache import disk_cached_cell
 import uuid
 
 @validate_arguments(config=dict(arbitrary_types_allowed=True))
@@ -15,8 +18,8 @@ def __get_mimcap_layerconstruction_info(pdk: MappedPDK) -> tuple[str,str]:
 	"""returns the glayer metal below and glayer metal above capmet
 	args: pdk
 	"""
-	capmettop = pdk.layer_to_glayer(pdk.get_grule("capmet")["capmettop"])
-	capmetbottom = pdk.layer_to_glayer(pdk.get_grule("capmet")["capmetbottom"])
+	capmettop = pdk.layer_to_glayer_fast(pdk.get_grule_fast("capmet")["capmettop"])
+	capmetbottom = pdk.layer_to_glayer_fast(pdk.get_grule_fast("capmet")["capmetbottom"])
 	pdk.has_required_glayers(["capmet",capmettop,capmetbottom])
 	pdk.activate()
 	return capmettop, capmetbottom
@@ -50,6 +53,8 @@ def __generate_mimcap_array_netlist(mimcap_netlist: Netlist, num_caps: int) -> N
 
 	return arr_netlist
 
+@cached_cell
+@disk_cached_cell
 def mimcap(
     pdk: MappedPDK, size: tuple[float,float]=(5.0, 5.0)
 ) -> Component:
@@ -65,23 +70,20 @@ def mimcap(
     size = pdk.snap_to_2xgrid(size)
     # error checking and
     capmettop, capmetbottom = __get_mimcap_layerconstruction_info(pdk)
-    # create top component with unique name based on parameters plus UUID
-    basename = f"mimcap_{size[0]}x{size[1]}"
-    name = f"{basename}_{uuid.uuid4().hex[:6]}"
-    mim_cap = Component(name=name)
+    # create top component with a name based on parameters plus the cache suffix
+    mim_cap = Component(name=cell_name(f"mimcap_{size[0]}x{size[1]}"))
     mim_cap << rectangle(size=size, layer=pdk.get_glayer("capmet"), centered=True)
     top_met_ref = mim_cap << via_array(
         pdk, capmetbottom, capmettop, size=size, minus1=True, lay_bottom=False
     )
-    bottom_met_enclosure = pdk.get_grule(capmetbottom,"capmet")["min_enclosure"]
+    bottom_met_enclosure = pdk.get_grule_fast(capmetbottom,"capmet")["min_enclosure"]
     mim_cap.add_padding(layers=(pdk.get_glayer(capmetbottom),),default=bottom_met_enclosure)
     # flatten and create ports
     mim_cap = add_ports_perimeter(mim_cap, layer=pdk.get_glayer(capmetbottom), prefix="bottom_met_")
     mim_cap.add_ports(top_met_ref.ports)
 
-    # In GDSFactory v9, flatten() mutates in-place and returns None
     component = rename_ports_by_orientation(mim_cap)
-    component.flatten()
+    finalize_component(component)
 
     # netlist generation
     component.info['netlist'] = __generate_mimcap_netlist(pdk, size)
@@ -105,7 +107,7 @@ def mimcap_array(pdk: MappedPDK, rows: int, columns: int, size: tuple[float,floa
 	mimcap_arr = Component(name=name)
 	# create the mimcap array
 	mimcap_single = mimcap(pdk, size)
-	mimcap_space = pdk.get_grule("capmet")["min_separation"] #+ evaluate_bbox(mimcap_single)[0]
+	mimcap_space = pdk.get_grule_fast("capmet")["min_separation"] #+ evaluate_bbox(mimcap_single)[0]
 	array_ref = mimcap_arr << prec_array(mimcap_single, rows, columns, spacing=2*[mimcap_space])
 	mimcap_arr.add_ports(array_ref.ports)
 	# create a list of ports that should be routed to connect the array
@@ -130,13 +132,11 @@ def mimcap_array(pdk: MappedPDK, rows: int, columns: int, size: tuple[float,floa
 					port_pairs.append((bl_east_port,r_west_port,layer))
 					port_pairs.append((bl_north_port,top_south_port,layer))
 	for port_pair in port_pairs:
-		mimcap_arr << straight_route(pdk,port_pair[0],port_pair[1],width=rmult*pdk.get_grule(port_pair[2])["min_width"])
+		mimcap_arr << straight_route(pdk,port_pair[0],port_pair[1],width=rmult*pdk.get_grule_fast(port_pair[2])["min_width"])
 
 	# add netlist
 	mimcap_arr.info['netlist'] = __generate_mimcap_array_netlist(mimcap_single.info['netlist'], rows * columns)
 
-	# In GDSFactory v9, flatten() mutates in-place and returns None
-
-	mimcap_arr.flatten()
+	finalize_component(mimcap_arr)
 
 	return mimcap_arr
\ No newline at end of file
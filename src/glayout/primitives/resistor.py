@@ -78,11 +78,11 @@ def resistor(
         # add tie if tie
         if with_tie:
             tap_separation = max(
-                pdk.get_grule("met2")["min_separation"],
-                pdk.get_grule("met1")["min_separation"],
-                pdk.get_grule("active_diff", "active_tap")["min_separation"],
+                pdk.get_grule_fast("met2")["min_separation"],
+                pdk.get_grule_fast("met1")["min_separation"],
+                pdk.get_grule_fast("active_diff", "active_tap")["min_separation"],
             )
-            tap_separation += pdk.get_grule("n+s/d", "active_tap")["min_enclosure"]
+            tap_separation += pdk.get_grule_fast("n+s/d", "active_tap")["min_enclosure"]
             tap_encloses = (
                 (evaluate_bbox(toplvl)[0] + max_sep),
                 (evaluate_bbox(toplvl)[1] + max_sep),
@@ -107,13 +107,13 @@ def resistor(
         nwell_glayer = "dnwell" if with_dnwell else "nwell"
         toplvl.add_padding(
             layers=(pdk.get_glayer(nwell_glayer),),
-            default=pdk.get_grule("active_tap", nwell_glayer)["min_enclosure"],
+            default=pdk.get_grule_fast("active_tap", nwell_glayer)["min_enclosure"],
         )
         toplvl = add_ports_perimeter(toplvl, layer=pdk.get_glayer(nwell_glayer),prefix="well_")
         
         # add substrate tap if needed
         if with_substrate_tap:
-            substrate_tap_separation = pdk.get_grule("dnwell", "active_tap")[
+            substrate_tap_separation = pdk.get_grule_fast("dnwell", "active_tap")[
                 "min_separation"
             ]
             substrate_tap_encloses = (
@@ -8,9 +8,13 @@ from typing import Union
 from glayout.util.comp_utils import evaluate_bbox, prec_array, to_float, move, prec_ref_center, to_decimal
 from glayout.util.port_utils import rename_ports_by_orientation, print_ports
 from glayout.util.snap_to_grid import component_snap_to_grid
+from glayout.util.rect_array import RectArray
+from glayout.util.cell_cache import cached_cell, cell_name
+from glayout.util.disk_cache import disk_cached_cell
 from decimal import Decimal
-from typing import Literal
-import uuid
+import klayout.db as kdb
+from typing import Any, Literal, Mapping
+from types import MappingProxyType
 
 
 @validate_arguments(config=dict(arbitrary_types_allowed=True))
@@ -58,11 +62,11 @@ def __get_layer_dim(pdk: MappedPDK, glayer: str, mode: Literal["both","above","b
 	layer_dim=0
 	if consider_below and not is_lvl0:
 		via_below = "mcon" if glayer=="met1" else "via"+str(int(glayer[-1])-1)
-		layer_dim = pdk.get_grule(via_below)["width"] + 2*pdk.get_grule(via_below,glayer)["min_enclosure"]
+		layer_dim = pdk.get_grule_fast(via_below)["width"] + 2*pdk.get_grule_fast(via_below,glayer)["min_enclosure"]
 	if consider_above:
 		via_above = "mcon" if is_lvl0 else "via"+str(glayer[-1])
-		layer_dim = max(layer_dim, pdk.get_grule(via_above)["width"] + 2*pdk.get_grule(via_above,glayer)["min_enclosure"])
-	layer_dim = max(layer_dim, pdk.get_grule(glayer)["min_width"])
+		layer_dim = max(layer_dim, pdk.get_grule_fast(via_above)["width"] + 2*pdk.get_grule_fast(via_above,glayer)["min_enclosure"])
+	layer_dim = max(layer_dim, pdk.get_grule_fast(glayer)["min_width"])
 	return layer_dim
 
 
@@ -72,23 +76,24 @@ def __get_viastack_minseperation(pdk: MappedPDK, viastack: Component, ordered_la
     get_sep = lambda _pdk, rule, _lay_, comp : (rule+2*comp.extract(layers=[_pdk.get_glayer(_lay_)]).xmax)
     level1, level2 = ordered_layer_info[0]
     glayer1, glayer2 = ordered_layer_info[1]
-    mcon_rule = pdk.get_grule("mcon")["min_separation"]
+    mcon_rule = pdk.get_grule_fast("mcon")["min_separation"]
     via_spacing = [] if level1 else [get_sep(pdk,mcon_rule,"mcon",viastack)]
     level1_met = level1 if level1 else level1 + 1
     top_enclosure = 0
     for level in range(level1_met, level2):
         met_glayer = "met" + str(level)
         via_glayer = "via" + str(level)
-        mrule = pdk.get_grule(met_glayer)["min_separation"]
-        vrule = pdk.get_grule(via_glayer)["min_separation"]
+        mrule = pdk.get_grule_fast(met_glayer)["min_separation"]
+        vrule = pdk.get_grule_fast(via_glayer)["min_separation"]
         via_spacing.append(get_sep(pdk, mrule,met_glayer,viastack))
         via_spacing.append(get_sep(pdk, vrule,via_glayer,viastack))
         if level == (level2-1):
-            top_enclosure = pdk.get_grule(glayer2,via_glayer)["min_enclosure"]
-    via_spacing = pdk.snap_to_2xgrid(max(via_spacing),return_type="float")
-    top_enclosure = pdk.snap_to_2xgrid(top_enclosure,return_type="float")
-    return pdk.snap_to_2xgrid([via_spacing, 2*top_enclosure], return_type="float")
+            top_enclosure = pdk.get_grule_fast(glayer2,via_glayer)["min_enclosure"]
+    via_spacing = pdk.snap_to_2xgrid_fast(max(via_spacing))
+    top_enclosure = pdk.snap_to_2xgrid_fast(top_enclosure)
+    return pdk.snap_to_2xgrid_fast([via_spacing, 2*top_enclosure])
 
+@cached_cell
 @gf.cell
 def via_stack(
     pdk: MappedPDK,
@@ -126,14 +131,13 @@ def via_stack(
     ordered_layer_info = __error_check_order_layers(pdk, glayer1, glayer2)
     level1, level2 = ordered_layer_info[0]
     glayer1, glayer2 = ordered_layer_info[1]
-    # Create unique name based on all parameters to avoid conflicts
-    basename = f"viastack_{glayer1}_{glayer2}_"
-    viastack = Component(name=f"{basename}_{uuid.uuid4().hex[:6]}")
+    # content addressed name (identical calls share one cell, see glayout.util.cell_cache)
+    viastack = Component(name=cell_name(f"viastack_{glayer1}_{glayer2}"))
     # if same level return component with min_width rectangle on that layer
     if level1 == level2:
         if same_layer_behavior=="lay_nothing":
             return viastack
-        min_square = viastack << rectangle(size=2*[pdk.get_grule(glayer1)["min_width"]],layer=pdk.get_glayer(glayer1), centered=centered)
+        min_square = viastack << rectangle(size=2*[pdk.get_grule_fast(glayer1)["min_width"]],layer=pdk.get_glayer(glayer1), centered=centered)
         # update ports
         if level1==0:# both poly or active
             
@@ -152,7 +156,7 @@ def via_stack(
             layer_dim = __get_layer_dim(pdk, layer_name, mode=mode)
             # place met/via, do not place via if on top layer
             if level != level2:
-                via_dim = pdk.get_grule(via_name)["width"]
+                via_dim = pdk.get_grule_fast(via_name)["width"]
                 via_ref = viastack << rectangle(size=[via_dim,via_dim],layer=pdk.get_glayer(via_name), centered=True)
             lay_ref = viastack << rectangle(size=[layer_dim,layer_dim],layer=pdk.get_glayer(layer_name), centered=True)
             # update ports
@@ -179,6 +183,39 @@ def via_stack(
             viastack = move(viastack,(viastack.xmax,viastack.ymax))
     return rename_ports_by_orientation(viastack)
 
+def via_pitch(pdk: MappedPDK, glayer1: str, glayer2: str) -> Mapping[str, Any]:
+    """returns the via array geometry between two routable glayers on different levels
+    entries are computed once per layer pair and kept in the via table of the pdk (see MappedPDK.via_table)
+    ****NOTE it does not matter what order you pass layers
+
+    viadim: width (=height) of the via stack
+    pitch: distance between the origins of neighbouring via stacks in a via array
+    top_enclosure: 2 * the top via to top met enclosure
+    rects: RectArray of the via stack (centered), do not modify it
+    """
+    table = pdk.via_table()
+    # entries are stored under the ordered pair, look up both orders before validating the layers
+    entry = table.get((glayer1, glayer2)) or table.get((glayer2, glayer1))
+    if entry is not None:
+        return entry
+    ordered_layer_info = __error_check_order_layers(pdk, glayer1, glayer2)
+    level1, level2 = ordered_layer_info[0]
+    if level1 == level2:
+        raise ValueError(f"via_pitch: {glayer1} and {glayer2} are on the same level")
+    viastack = via_stack(pdk, *ordered_layer_info[1])
+    via_abs_spacing, top_enclosure = __get_viastack_minseperation(pdk, viastack, ordered_layer_info)
+    rects = RectArray.from_component(viastack)
+    entry = MappingProxyType({
+        "viadim": rects.size()[0],
+        "pitch": via_abs_spacing,
+        "top_enclosure": top_enclosure,
+        "rects": rects,
+    })
+    table[ordered_layer_info[1]] = entry
+    return entry
+
+@cached_cell
+@disk_cached_cell
 @gf.cell
 def via_array(
     pdk: MappedPDK,
@@ -222,23 +259,23 @@ def via_array(
     ordered_layer_info = __error_check_order_layers(pdk, glayer1, glayer2)
     level1, level2 = ordered_layer_info[0]
     glayer1, glayer2 = ordered_layer_info[1]
-    # Create unique name based on all parameters to avoid conflicts
-    basename = f"viaarray_{glayer1}_{glayer2}"
-    viaarray = Component(name=f"{basename}_{uuid.uuid4().hex[:6]}")
+    # content addressed name (identical calls share one cell, see glayout.util.cell_cache)
+    viaarray = Component(name=cell_name(f"viaarray_{glayer1}_{glayer2}"))
     # if same level return empty component
     if level1 == level2:
         return viaarray
-    # figure out min space between via stacks
+    # figure out min space between via stacks (from the via table of the pdk)
     viastack = via_stack(pdk, glayer1, glayer2)
-    viadim = evaluate_bbox(viastack)[0]
-    via_abs_spacing, top_enclosure = __get_viastack_minseperation(pdk, viastack, ordered_layer_info)
+    viapitch = via_pitch(pdk, glayer1, glayer2)
+    viadim = viapitch["viadim"]
+    via_abs_spacing, top_enclosure = viapitch["pitch"], viapitch["top_enclosure"]
     # error check size and determine num_vias, cnum_vias[0]=x, cnum_vias[1]=y
     cnum_vias = 2*[None]
     for i in range(2):
         if (num_vias[i] if num_vias else False):
             cnum_vias[i] = num_vias[i]
         elif (size[i] if size else False):
-            dim = pdk.snap_to_2xgrid(size[i],return_type="float")
+            dim = pdk.snap_to_2xgrid_fast(size[i])
             fltnum = floor((dim - top_enclosure) / (via_abs_spacing)) or 1
             fltnum = 1 if fltnum < 1 else fltnum
             cnum_vias[i] = ((fltnum - 1) or 1) if minus1 else fltnum
@@ -246,20 +283,25 @@ def via_array(
                 raise ValueError(f"via_array,size:dim#{i}={dim} < {viadim}")
         else:
             raise ValueError("give at least 1: num_vias or size for each dim")
-    # create array
-    viaarray_ref = prec_ref_center(prec_array(viastack, columns=cnum_vias[0], rows=cnum_vias[1], spacing=2*[via_abs_spacing],absolute_spacing=True))
-    # In GDSFactory v9, use add() for ComponentReference, not add_ref()
-    viaarray.add(viaarray_ref)
-    viaarray.add_ports(viaarray_ref.ports,prefix="array_")
+    # create array, the via stacks are arrayed as rectangles (see glayout.util.rect_array) and committed at the end
+    pitch = viapitch["rects"].to_dbu(via_abs_spacing)
+    viarects = viapitch["rects"].array(cnum_vias[0], cnum_vias[1], (pitch, pitch))
+    xmin, ymin, xmax, ymax = viarects.bbox()
+    xcor, ycor = -(xmin + xmax) // 2, -(ymin + ymax) // 2
+    viarects = viarects.translate(xcor, ycor)
+    for colnum in range(cnum_vias[0]):
+        for rownum in range(cnum_vias[1]):
+            disp = kdb.Trans(xcor + colnum * pitch, ycor + rownum * pitch)
+            viaarray.add_ports([port.copy(disp) for port in viastack.ports], prefix=f"array_row{rownum}_col{colnum}_")
     # find the what should be used as full dims
-    viadims = evaluate_bbox(viaarray)
+    viadims = viarects.size()
     if not size:
         size = 2*[None]
     size = [size[i] if size[i] else viadims[i] for i in range(2)]
     size = [viadims[i] if viadims[i]>size[i] else size[i] for i in range(2)]
     # place bottom layer and add bot_lay_ ports
     if lay_bottom or fullbottom or lay_every_layer:
-        bdims = evaluate_bbox(viaarray.extract(layers=[pdk.get_glayer(glayer1)]))
+        bdims = viarects.size(layers=[pdk.get_glayer(glayer1)])
         bref = viaarray << rectangle(size=(size if fullbottom else bdims), layer=pdk.get_glayer(glayer1), centered=True)
         viaarray.add_ports(bref.ports, prefix="bottom_lay_")
     else:
@@ -270,8 +312,8 @@ def via_array(
     # place every layer in between if lay_every_layer
     if lay_every_layer:
         for i in range(level1+1,level2):
-            bdims = evaluate_bbox(viaarray.extract(layers=[pdk.get_glayer(f"met{i}")]))
+            bdims = viarects.size(layers=[pdk.get_glayer(f"met{i}")])
             viaarray << rectangle(size=bdims, layer=pdk.get_glayer(f"met{i}"), centered=True)
-    return component_snap_to_grid(rename_ports_by_orientation(viaarray))
+    return component_snap_to_grid(rename_ports_by_orientation(viarects.commit(viaarray)))
 
 
@@ -5,6 +5,7 @@ from typing import Union
 from glayout.primitives.via_gen import via_stack, via_array
 from glayout.util.comp_utils import evaluate_bbox, align_comp_to_port, to_decimal, to_float, prec_ref_center, get_primitive_rectangle
 from glayout.util.port_utils import rename_ports_by_orientation, rename_ports_by_list, print_ports, assert_port_manhattan, assert_ports_perpindicular, get_layer_from_port
+from glayout.util.snap_to_grid import finalize_route
 import uuid
 
 
@@ -90,7 +91,6 @@ def L_route(
 	if not use_stack:
 		hv_via = via_array(pdk, hglayer, vglayer, size=to_float((hwidth,vwidth)), lay_bottom=True)
 	h_to_v_via_ref = prec_ref_center(hv_via)
-	Lroute.add(h_to_v_via_ref)
 	# In GDSFactory v9, move() signature changed - use movex/movey for absolute positioning
 	target = (hport.center[0], vport.center[1])
 	h_to_v_via_ref.movex(target[0] - h_to_v_via_ref.center[0]).movey(target[1] - h_to_v_via_ref.center[1])
@@ -104,10 +104,10 @@ def L_route(
 		viayofs = to_float(viayofs if vdim_center > 0 else -1*viayofs)
 		viayofs = viayofs if viaoffset[1] else 0
 		h_to_v_via_ref.movex(viaxofs).movey(viayofs)
+	# In GDSFactory v9, add() copies the reference, so add the via after it is in place
+	Lroute.add(h_to_v_via_ref)
 	# add ports and return
 	Lroute.add_ports(h_to_v_via_ref.ports)
-	# In GDSFactory v9, flatten() mutates in-place and returns None
-	Lroute.flatten()
-	return rename_ports_by_orientation(Lroute)
+	return rename_ports_by_orientation(finalize_route(Lroute))
 
 
@@ -2,14 +2,20 @@
 Glayout routing module for basic circuit components.
 """
 
+# the primitives import the routers (fet uses c_route, L_route and straight_route) and the routers import
+# via_gen from the primitives, load the primitives package first so neither sees the other half initialized
+import glayout.primitives
+
 from .c_route import c_route
 from .L_route import L_route
 from .straight_route import straight_route
 from .smart_route import smart_route
+from .route_plan import RoutePlan
 
 __all__ = [
     'c_route',
     'L_route',
     'straight_route',
-    'smart_route'   
+    'smart_route',
+    'RoutePlan'
 ] 
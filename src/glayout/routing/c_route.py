@@ -7,7 +7,8 @@ from glayout.primitives.via_gen import via_stack, via_array
 from glayout.routing.straight_route import straight_route
 from gdsfactory.components import rectangle
 from glayout.util.comp_utils import evaluate_bbox, get_primitive_rectangle, to_float, prec_ref_center
-from glayout.util.port_utils import add_ports_perimeter, rename_ports_by_orientation, rename_ports_by_list, print_ports, set_port_width, set_port_orientation, get_orientation, get_layer_from_port
+from glayout.util.snap_to_grid import finalize_route
+from glayout.util.port_utils import add_ports_perimeter, rename_ports_by_orientation, rename_ports_by_list, print_ports, set_port_width, set_port_layer, set_port_orientation, get_orientation, get_layer_from_port
 from pydantic import validate_arguments
 from gdsfactory.snap import snap_to_grid
 import uuid
@@ -18,7 +19,7 @@ def __fill_empty_viastack__macro(pdk: MappedPDK, glayer: str, size: tuple[float,
     """returns a rectangle with ports that pretend to be viastack ports
     by default creates a rectangle with size double the min width of the glayer"""
     if size is None:
-        size = pdk.snap_to_2xgrid([2*pdk.get_grule(glayer)["min_width"],2*pdk.get_grule(glayer)["min_width"]])
+        size = pdk.snap_to_2xgrid([2*pdk.get_grule_fast(glayer)["min_width"],2*pdk.get_grule_fast(glayer)["min_width"]])
     comp = rectangle(size=size,layer=pdk.get_glayer(glayer),centered=True)
     comp = rename_ports_by_orientation(rename_ports_by_list(comp,replace_list=[("e","top_met_")]))
     # In GDSFactory v9, flatten() mutates in-place and returns None
@@ -171,8 +172,9 @@ def c_route(
     e1_extension = e1_extension_comp << rect_c1
     e2_extension = e2_extension_comp << rect_c2
     # In GDSFactory v9, move() signature changed - use movex/movey for absolute positioning
-    e1_extension.movex(edge1.center[0] - e1_extension.center[0]).movey(edge1.center[1] - e1_extension.center[1])
-    e2_extension.movex(edge2.center[0] - e2_extension.center[0]).movey(edge2.center[1] - e2_extension.center[1])
+    # the moves below expect the lower left corner of the extension on the edge (the origin of the old rectangles)
+    e1_extension.movex(edge1.center[0] - e1_extension.xmin).movey(edge1.center[1] - e1_extension.ymin)
+    e2_extension.movex(edge2.center[0] - e2_extension.xmin).movey(edge2.center[1] - e2_extension.ymin)
     if round(edge1.orientation) == 0:# facing east
         e1_extension.movey(0-evaluate_bbox(e1_extension)[1]/2)
         e2_extension.movey(0-evaluate_bbox(e2_extension)[1]/2)
@@ -192,10 +194,9 @@ def c_route(
     # place viastacks
     e1_extension_comp.add_ports(e1_extension.ports)
     e2_extension_comp.add_ports(e2_extension.ports)
-    me1 = prec_ref_center(viastack1)
-    e1_extension_comp.add(me1)
-    me2 = prec_ref_center(viastack2)
-    e2_extension_comp.add(me2)
+    # In GDSFactory v9, add() copies the reference, so create the via references in place before moving them
+    me1 = prec_ref_center(e1_extension_comp << viastack1)
+    me2 = prec_ref_center(e2_extension_comp << viastack2)
     route_ports = [None,None]
     if round(edge2.orientation) == 0 or round(edge2.orientation) == 180:
         via_flush1 = snap_to_grid(abs((width1 - evaluate_bbox(viastack1)[1])/2) if viaoffset else 0)
@@ -221,7 +222,7 @@ def c_route(
         via_flush2 *= 1 if me2.ymax > me1.ymax else -1
         me1.movex(0-viastack1.xmax).movey(0-via_flush1)
         me2.movex(0-viastack2.xmax).movey(via_flush2)
-        me1, me2 = (me1, me2) if (me1.origin[1] > me2.origin[1]) else (me2, me1)
+        me1, me2 = (me1, me2) if (me1.dcplx_trans.disp.y > me2.dcplx_trans.disp.y) else (me2, me1)
         route_ports = [me1.ports["top_met_N"],me2.ports["top_met_S"]]
         fix_connection_direction = "E"
         fix_ports = [me1.ports["top_met_E"],me2.ports["top_met_E"]]
@@ -235,7 +236,7 @@ def c_route(
         via_flush2 *= 1 if me2.ymax > me1.ymax else -1
         me1.movex(viastack1.xmax).movey(0-via_flush1)
         me2.movex(viastack2.xmax).movey(via_flush2)
-        me1, me2 = (me1, me2) if (me1.origin[1] > me2.origin[1]) else (me2, me1)
+        me1, me2 = (me1, me2) if (me1.dcplx_trans.disp.y > me2.dcplx_trans.disp.y) else (me2, me1)
         route_ports = [me1.ports["top_met_N"],me2.ports["top_met_S"]]
         fix_connection_direction = "E"
         fix_ports = [me1.ports["top_met_E"],me2.ports["top_met_E"]]
@@ -249,7 +250,7 @@ def c_route(
         via_flush2 *= 1 if me2.xmax > me1.xmax else -1
         me1.movey(viastack1.xmax).movex(0-via_flush1)
         me2.movey(viastack2.xmax).movex(via_flush2)
-        me1, me2 = (me1, me2) if (me1.origin[0] > me2.origin[0]) else (me2, me1)
+        me1, me2 = (me1, me2) if (me1.dcplx_trans.disp.x > me2.dcplx_trans.disp.x) else (me2, me1)
         route_ports = [me1.ports["top_met_E"],me2.ports["top_met_W"]]
         fix_connection_direction = "N"
         fix_ports = [me1.ports["top_met_N"],me2.ports["top_met_N"]]
@@ -263,7 +264,7 @@ def c_route(
         via_flush2 *= 1 if me2.xmax > me1.xmax else -1
         me1.movey(0-viastack1.xmax).movex(0-via_flush1)
         me2.movey(0-viastack2.xmax).movex(via_flush2)
-        me1, me2 = (me1, me2) if (me1.origin[0] > me2.origin[0]) else (me2, me1)
+        me1, me2 = (me1, me2) if (me1.dcplx_trans.disp.x > me2.dcplx_trans.disp.x) else (me2, me1)
         route_ports = [me1.ports["top_met_E"],me2.ports["top_met_W"]]
         fix_connection_direction = "N"
         fix_ports = [me1.ports["top_met_N"],me2.ports["top_met_N"]]
@@ -272,20 +273,20 @@ def c_route(
     croute << e2_extension_comp
     if cwidth:
         route_ports = [set_port_width(port_,cwidth) for port_ in route_ports]
-    route_ports[0].width = route_ports[1].width = max(route_ports[0].width, route_ports[1].width)
-    route_port0 = route_ports[0].copy()
-    route_port1 = route_ports[1].copy()
-    route_port0.layer = route_port1.layer = pdk.get_glayer(cglayer)
+    # In GDSFactory v9, port width has no setter
+    route_width = max(route_ports[0].width, route_ports[1].width)
+    route_ports = [set_port_width(port_, route_width) for port_ in route_ports]
+    # In GDSFactory v9, port layer has no setter
+    route_port0 = set_port_layer(route_ports[0], pdk.get_glayer(cglayer))
+    route_port1 = set_port_layer(route_ports[1], pdk.get_glayer(cglayer))
     cconnection = croute << straight_route(pdk, route_port0,route_port1,glayer1=cglayer,glayer2=cglayer)
     for _port in fix_ports:
-        port2 = cconnection.ports["route_"+fix_connection_direction]
-        port2.layer = _port.layer = pdk.get_glayer(cglayer)
+        port2 = set_port_layer(cconnection.ports["route_"+fix_connection_direction], pdk.get_glayer(cglayer))
+        _port = set_port_layer(_port, pdk.get_glayer(cglayer))
         croute << straight_route(pdk, _port, port2, glayer1=cglayer,glayer2=cglayer)
     for i,port_to_add in enumerate(route_ports):
         orta = get_orientation(port_to_add.orientation)
         route_ports[i] = set_port_orientation(port_to_add, orta)
     croute.add_ports(route_ports,prefix="con_")
-    # In GDSFactory v9, flatten() mutates in-place and returns None
-    croute.flatten()
-    return rename_ports_by_orientation(rename_ports_by_list(croute, [("con_","con_")]))
+    return rename_ports_by_orientation(rename_ports_by_list(finalize_route(croute), [("con_","con_")]))
 
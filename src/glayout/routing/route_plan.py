@@ -0,0 +1,576 @@
+"""
+batched routing: straight_route, L_route and c_route connections of a component written as one flat cell
+
+usage:
+	routes = RoutePlan(pdk)
+	routes.straight_route(ref1.ports["drain_E"], ref2.ports["source_W"], glayer1="met2")
+	con = routes.c_route(ref1.ports["gate_N"], ref2.ports["gate_N"])
+	routes.L_route(con["con_W"], ref3.ports["gate_S"])
+	routes.commit(top_level)
+
+every router call makes its own uuid named cells, references its via stacks, activates the pdk, looks up the layers
+of its ports and flattens the route. a RoutePlan places the same rectangles without any cell: the via stacks and
+via arrays are read once per layer pair and options (rectangles, bboxes and ports), the port layers once per layer,
+and every wire is recorded as a rectangle and every via as an offset of its via cell. commit writes all of them
+with one RectArray (one Region per layer) into a single cell and adds it to the component as one reference.
+the placements use the routers' own arithmetic (align_comp_to_port, prec_ref_center, evaluate_bbox, moves rounded
+to the database unit as references round them), so the geometry and the ports are those of the routers.
+route methods take the router arguments (without pdk) and return the ports of the route by name, so routes can
+be planned from the ports of planned routes. c_route with extra_vias and zero length straight routes are made by
+their router and flattened with the plan.
+"""
+from math import floor, isclose
+from typing import Union
+import uuid
+
+from gdsfactory import ComponentReference
+from gdsfactory.component import Component
+from gdsfactory.port import Port
+from gdsfactory.snap import snap_to_grid
+import gdsfactory as gf
+import klayout.db as kdb
+import numpy as np
+
+from glayout.pdk.mappedpdk import MappedPDK
+from glayout.primitives.via_gen import via_array, via_stack
+from glayout.routing.c_route import c_route, __fill_empty_viastack__macro as fill_empty_viastack
+from glayout.routing.L_route import L_route
+from glayout.routing.straight_route import straight_route
+from glayout.util.bbox_cache import BoxValues, ibox_values
+from glayout.util.comp_utils import alignment_offset, to_decimal, to_float
+from glayout.util.port_utils import (
+	assert_port_manhattan,
+	assert_ports_perpindicular,
+	get_layer_from_port,
+	get_orientation,
+	rename_ports_by_orientation__call,
+	set_port_layer,
+	set_port_orientation,
+	set_port_width,
+)
+from glayout.util.rect_array import RectArray
+from glayout.util.snap_to_grid import defer_route_flatten
+
+
+def _moved(disp: int, distance: float, dbu: float) -> int:
+	"""displacement (database units) of a reference at disp after moving it by distance um (rounded by klayout)"""
+	value = disp + float(distance) * (1 / dbu)
+	return floor(value + 0.5) if value >= 0 else -floor(-value + 0.5)
+
+
+def _perimeter_ports(dbbox: kdb.DBox, layer: tuple[int, int], prefix: str) -> dict[str, Port]:
+	"""the ports add_ports_perimeter adds to a cell with the bbox dbbox (on layer)"""
+	width = round((dbbox.p2.x - dbbox.p1.x) / 0.002) * 0.002
+	height = round((dbbox.p2.y - dbbox.p1.y) / 0.002) * 0.002
+	ports = dict()
+	for suffix, port_width, orientation, x, y in (
+		("W", height, 180, dbbox.p1.x, dbbox.p1.y + height / 2),
+		("N", width, 90, dbbox.p1.x + width / 2, dbbox.p2.y),
+		("E", height, 0, dbbox.p2.x, dbbox.p1.y + height / 2),
+		("S", width, 270, dbbox.p1.x + width / 2, dbbox.p1.y),
+	):
+		trans = kdb.DCplxTrans(1, float(orientation), False, float(x), float(y))
+		ports[prefix + suffix] = Port(name=prefix + suffix, dcplx_trans=trans, width=port_width, layer=layer, port_type="electrical")
+	return ports
+
+
+def _renamed(port: Port, name: str) -> Port:
+	renamed = port.copy()
+	renamed.name = name
+	return renamed
+
+
+class _Cell:
+	"""rectangles, bboxes and ports of a cell, as the routers read them from its Component
+	rects = RectArray of the (flattened) cell, ports = ports by name, shared = the cell is placed many times (vias)
+	"""
+	__slots__ = ("rects", "ports", "shared", "dbu", "_bboxes", "_values")
+
+	def __init__(self, rects: RectArray, ports: dict[str, Port], shared: bool):
+		self.rects = rects
+		self.ports = ports
+		self.shared = shared
+		self.dbu = rects.dbu
+		self._bboxes = dict()
+		self._values = None
+
+	@classmethod
+	def from_component(cls, comp: Component) -> "_Cell":
+		return cls(RectArray.from_component(comp), {port.name: port for port in comp.ports}, True)
+
+	@classmethod
+	def rectangle(cls, box: kdb.Box, layer: tuple[int, int], dbu: float) -> "_Cell":
+		"""a single rectangle, without ports"""
+		return cls(RectArray(dbu).add(layer, (box.left, box.bottom, box.right, box.top)), dict(), False)
+
+	def bbox(self, layer: tuple[int, int] | None = None) -> kdb.Box:
+		"""bbox (database units) of the cell or of its shapes on layer, empty box if none"""
+		box = self._bboxes.get(layer)
+		if box is None:
+			values = self.rects.bbox(None if layer is None else [layer])
+			box = self._bboxes[layer] = kdb.Box() if values is None else kdb.Box(*values)
+		return box
+
+	@property
+	def values(self) -> BoxValues:
+		if self._values is None:
+			self._values = ibox_values(self.bbox(), self.dbu)
+		return self._values
+
+	@property
+	def size(self) -> tuple[float, float]:
+		"""evaluate_bbox of the cell"""
+		return tuple(float(dim) for dim in self.values.size)
+
+	@property
+	def xmax(self) -> float:
+		return self.values.dbbox.right
+
+
+class _Reference:
+	"""a placed cell: the displacement (database units) a ComponentReference of cell has after the same moves"""
+	__slots__ = ("cell", "x", "y")
+
+	def __init__(self, cell: _Cell):
+		self.cell = cell
+		self.x = 0
+		self.y = 0
+
+	def movex(self, distance: float) -> "_Reference":
+		self.x = _moved(self.x, distance, self.cell.dbu)
+		return self
+
+	def movey(self, distance: float) -> "_Reference":
+		self.y = _moved(self.y, distance, self.cell.dbu)
+		return self
+
+	def ibbox(self, layer: tuple[int, int] | None = None) -> kdb.Box:
+		return self.cell.bbox(layer).moved(self.x, self.y)
+
+	def dbbox(self, layer: tuple[int, int] | None = None) -> kdb.DBox:
+		return self.ibbox(layer).to_dtype(self.cell.dbu)
+
+	@property
+	def values(self) -> BoxValues:
+		return ibox_values(self.ibbox(), self.cell.dbu)
+
+	@property
+	def center(self) -> tuple[float, float]:
+		return self.values.center
+
+	def align(self, align_to: Port, alignment: tuple[str | None, str | None] | None = None, layer: tuple[int, int] | None = None) -> "_Reference":
+		"""moves the reference as align_comp_to_port moves a reference"""
+		xmov, ymov = alignment_offset(self.dbbox(layer if layer else None), align_to, alignment)
+		return self.movex(xmov).movey(ymov)
+
+	def center_at_origin(self) -> "_Reference":
+		"""moves the reference as prec_ref_center moves a reference"""
+		xcor, ycor = self.values.float_correction
+		return self.movex(xcor).movey(ycor)
+
+	def port(self, name: str) -> Port:
+		return self.cell.ports[name].copy(kdb.Trans(self.x, self.y))
+
+	def ports(self) -> dict[str, Port]:
+		return {name: self.port(name) for name in self.cell.ports}
+
+
+class RoutePlan:
+	"""routes of one component, placed with the geometry of the routers and written together by build / commit
+	pdk = the pdk of every route
+	"""
+
+	def __init__(self, pdk: MappedPDK):
+		self.pdk = pdk
+		self.pdk.activate()
+		self.dbu = gf.kcl.dbu
+		self.planned = 0
+		# rectangles of the wires, by layer, and via offsets, by via cell
+		self._wires: dict[tuple[int, int], list[tuple[int, int, int, int]]] = dict()
+		self._vias: dict[int, tuple[_Cell, list[tuple[int, int]]]] = dict()
+		# routes made by their router (see the module docstring)
+		self._routes: list[Component] = list()
+		# (generator, args, kwargs) -> _Cell, port layer -> glayer
+		self._cells: dict[tuple, _Cell] = dict()
+		self._glayers: dict = dict()
+
+	def __len__(self) -> int:
+		return self.planned
+
+	def _glayer(self, port: Port) -> str:
+		"""get_layer_from_port(port, pdk), looked up once per port layer"""
+		glayer = self._glayers.get(port.layer)
+		if glayer is None:
+			try:
+				glayer = self._glayers[port.layer] = self.pdk.layer_to_glayer_fast(port.layer)
+			except (ValueError, KeyError):
+				return get_layer_from_port(port, self.pdk)
+		return glayer
+
+	def _via(self, generator, *args, **kwargs) -> _Cell:
+		"""the cell generator(pdk, *args, **kwargs) makes, read once per plan"""
+		key = (generator, args, tuple(sorted(kwargs.items())))
+		cell = self._cells.get(key)
+		if cell is None:
+			cell = self._cells[key] = _Cell.from_component(generator(self.pdk, *args, **kwargs))
+		return cell
+
+	def _rectangle(self, dbox: kdb.DBox, glayer: str) -> _Cell:
+		return _Cell.rectangle(dbox.to_itype(self.dbu), self.pdk.get_glayer(glayer), self.dbu)
+
+	def _place(self, references: list[_Reference]) -> None:
+		for ref in references:
+			cell = ref.cell
+			if cell.shared:
+				self._vias.setdefault(id(cell), (cell, list()))[1].append((ref.x, ref.y))
+				continue
+			for layer, boxes in cell.rects.rects.items():
+				for box in boxes.tolist():
+					self._wires.setdefault(layer, list()).append((box[0] + ref.x, box[1] + ref.y, box[2] + ref.x, box[3] + ref.y))
+
+	def _route(self, router, *args, **kwargs) -> dict[str, Port]:
+		"""routes with the router itself, the route is flattened with the plan"""
+		with defer_route_flatten():
+			route = router(self.pdk, *args, **kwargs)
+		self._routes.append(route)
+		self.planned += 1
+		return {port.name: port for port in route.ports}
+
+	def _straight(
+		self,
+		edge1: Port,
+		edge2: Port,
+		glayer1: str | None = None,
+		width: float | None = None,
+		glayer2: str | None = None,
+		via1_alignment: tuple[str, str] | None = None,
+		via1_alignment_layer: str | None = None,
+		via2_alignment: tuple[str, str] | None = None,
+		via2_alignment_layer: str | None = None,
+		fullbottom: bool | None = False
+	) -> tuple[dict[str, Port], list[_Reference]] | None:
+		"""ports and placed cells of straight_route, None for a zero length route"""
+		width = width if width else edge1.width
+		if not glayer1:
+			glayer1 = self._glayer(edge1)
+		if not glayer2:
+			glayer2 = self._glayer(edge2)
+		front_via = None
+		try:
+			edge1_glayer = self.pdk.layer_to_glayer_fast(edge1.layer)
+			if glayer1 != edge1_glayer:
+				front_via = self._via(via_stack, glayer1, edge1_glayer, fullbottom=fullbottom)
+		except (ValueError, KeyError):
+			pass
+		assert_port_manhattan([edge1, edge2])
+		if edge1.orientation == edge2.orientation:
+			edge2 = set_port_orientation(edge2, edge2.orientation, flip180=True)
+		edge1_is_EW = bool(round(edge1.orientation + 90) % 180)
+		if edge1_is_EW:
+			extension = edge2.center[0] - edge1.center[0]
+			viaport_name = "route_E" if extension > 0 else "route_W"
+			alignment = ("r", "c") if extension > 0 else ("l", "c")
+			size = (abs(extension), width)
+		else:
+			extension = edge2.center[1] - edge1.center[1]
+			viaport_name = "route_N" if extension > 0 else "route_S"
+			alignment = ("c", "t") if extension > 0 else ("c", "b")
+			size = (width, abs(extension))
+		route = self._rectangle(kdb.DBox(0, 0, size[0], size[1]), glayer1)
+		if route.bbox().empty() or route.bbox().width() == 0 or route.bbox().height() == 0:
+			return None
+		route.ports = _perimeter_ports(route.values.dbbox, self.pdk.get_glayer(glayer1), "route_")
+		out_via = self._via(via_stack, glayer1, glayer2, fullbottom=fullbottom) if glayer1 != glayer2 else None
+		for i, edge in enumerate([edge1, edge2]):
+			temp = via1_alignment if i == 0 else via2_alignment
+			if temp is None:
+				if round(edge.orientation) == 0:# facing east
+					temp = ("l", "c")
+				elif round(edge.orientation) == 180:# facing west
+					temp = ("r", "c")
+				elif round(edge.orientation) == 270:# facing south
+					temp = ("c", "t")
+				elif round(edge.orientation) == 90:#facing north
+					temp = ("c", "b")
+				else:
+					raise ValueError("port must be vertical or horizontal")
+			via1_alignment = temp if i == 0 else via1_alignment
+			via2_alignment = temp if i == 1 else via2_alignment
+		route_ref = _Reference(route).align(edge1, alignment)
+		route_ports = route_ref.ports()
+		placed = [route_ref]
+		if out_via is not None:
+			alignlayer2 = self.pdk.get_glayer(glayer1) if via2_alignment_layer is None else self.pdk.get_glayer(via2_alignment_layer)
+			placed.append(_Reference(out_via).align(route_ports[viaport_name], via2_alignment, alignlayer2))
+		if front_via is not None:
+			alignlayer1 = self.pdk.get_glayer(glayer1) if via1_alignment_layer is None else self.pdk.get_glayer(via1_alignment_layer)
+			placed.append(_Reference(front_via).align(edge1, via1_alignment, alignlayer1))
+		return route_ports, placed
+
+	def straight_route(self, edge1: Port, edge2: Port, **kwargs) -> dict[str, Port]:
+		"""plans straight_route(pdk, edge1, edge2, **kwargs), returns the ports of the route"""
+		route = self._straight(edge1, edge2, **kwargs)
+		if route is None:
+			return self._route(straight_route, edge1, edge2, **kwargs)
+		ports, placed = route
+		self._place(placed)
+		self.planned += 1
+		return ports
+
+	def L_route(
+		self,
+		edge1: Port,
+		edge2: Port,
+		vwidth: float | None = None,
+		hwidth: float | None = None,
+		hglayer: str | None = None,
+		vglayer: str | None = None,
+		viaoffset: Union[tuple[bool,bool],bool] | None=True,
+		fullbottom: bool = True
+	) -> dict[str, Port]:
+		"""plans L_route(pdk, edge1, edge2, ...), returns the ports of the route"""
+		assert_port_manhattan([edge1,edge2])
+		assert_ports_perpindicular(edge1,edge2)
+		edge1_is_EW = bool(round(edge1.orientation + 90) % 180)
+		if edge1_is_EW:
+			vport, hport = edge1, edge2
+		else:
+			hport, vport = edge1, edge2
+		vwidth = to_decimal(vwidth if vwidth else vport.width)
+		hwidth = to_decimal(hwidth if hwidth else hport.width)
+		hglayer = hglayer if hglayer else self._glayer(vport)
+		vglayer = vglayer if vglayer else self._glayer(hport)
+		if isinstance(viaoffset,bool):
+			viaoffset = (True,True) if viaoffset else (False,False)
+		hdim_center = to_decimal(vport.center[0]) - to_decimal(hport.center[0])
+		vdim_center = to_decimal(hport.center[1]) - to_decimal(vport.center[1])
+		hdim = abs(hdim_center) + hwidth/2
+		vdim = abs(vdim_center) + vwidth/2
+		# get_primitive_rectangle: a rectangle centered on the origin
+		hsize = to_float((hdim,vwidth))
+		vsize = to_float((hwidth,vdim))
+		hconnect = self._rectangle(kdb.DBox(-hsize[0] / 2.0, -hsize[1] / 2.0, hsize[0] / 2, hsize[1] / 2), hglayer)
+		vconnect = self._rectangle(kdb.DBox(-vsize[0] / 2.0, -vsize[1] / 2.0, vsize[0] / 2, vsize[1] / 2), vglayer)
+		valign = ("l","c") if hdim_center > 0 else ("r","c")
+		halign = ("c","b") if vdim_center > 0 else ("c","t")
+		hconnect_ref = _Reference(hconnect).align(vport, valign)
+		vconnect_ref = _Reference(vconnect).align(hport, halign)
+		hv_via = self._via(via_stack, hglayer, vglayer, fullbottom=fullbottom, fulltop=True)
+		hv_via_dims = hv_via.values.size
+		use_stack = hv_via_dims[0] > hwidth or hv_via_dims[1] > vwidth
+		if not use_stack:
+			hv_via = self._via(via_array, hglayer, vglayer, size=tuple(to_float((hwidth,vwidth))), lay_bottom=True)
+		h_to_v_via_ref = _Reference(hv_via).center_at_origin()
+		target = (hport.center[0], vport.center[1])
+		h_to_v_via_ref.movex(target[0] - h_to_v_via_ref.center[0]).movey(target[1] - h_to_v_via_ref.center[1])
+		if viaoffset[0] or viaoffset[1]:
+			viadim_osx = h_to_v_via_ref.values.size[0]/2
+			viaxofs = abs(hwidth/2-viadim_osx)
+			viaxofs = to_float(viaxofs if hdim_center > 0 else -1*viaxofs)
+			viaxofs = viaxofs if viaoffset[0] else 0
+			viadim_osy = h_to_v_via_ref.values.size[1]/2
+			viayofs = abs(vwidth/2-viadim_osy)
+			viayofs = to_float(viayofs if vdim_center > 0 else -1*viayofs)
+			viayofs = viayofs if viaoffset[1] else 0
+			h_to_v_via_ref.movex(viaxofs).movey(viayofs)
+		self._place([hconnect_ref, vconnect_ref, h_to_v_via_ref])
+		self.planned += 1
+		ports = dict()
+		for port in h_to_v_via_ref.ports().values():
+			name = rename_ports_by_orientation__call(port.name, port)
+			ports[name] = _renamed(port, name)
+		return ports
+
+	def c_route(
+		self,
+		edge1: Port,
+		edge2: Port,
+		extension: float | None=0.5,
+		width1: float | None = None,
+		width2: float | None = None,
+		cwidth: float | None = None,
+		e1glayer: str | None = None,
+		e2glayer: str | None = None,
+		cglayer: str | None = None,
+		viaoffset: Union[bool,tuple[bool | None,bool | None]] | None=(True,True),
+		fullbottom: bool | None = False,
+		extra_vias: bool | None = False,
+		debug=False
+	) -> dict[str, Port]:
+		"""plans c_route(pdk, edge1, edge2, ...), returns the ports of the route"""
+		if extra_vias:
+			return self._route(
+				c_route, edge1, edge2, extension=extension, width1=width1, width2=width2, cwidth=cwidth, e1glayer=e1glayer,
+				e2glayer=e2glayer, cglayer=cglayer, viaoffset=viaoffset, fullbottom=fullbottom, extra_vias=extra_vias
+			)
+		if round(edge1.orientation) % 90 or round(edge2.orientation) % 90:
+			raise ValueError("Ports must be vertical or horizontal")
+		if not isclose(edge1.orientation,edge2.orientation):
+			raise ValueError("Ports must be parralel and have same orientation")
+		width1 = width1 if width1 else edge1.width
+		width2 = width2 if width2 else edge1.width
+		cwidth = cwidth if cwidth else min(width1,width2)
+		e1glayer = e1glayer if e1glayer else self._glayer(edge1)
+		e2glayer = e2glayer if e2glayer else self._glayer(edge2)
+		eglayer_plusone = "met" + str(int(e1glayer[-1])+1)
+		cglayer = cglayer if cglayer else eglayer_plusone
+		if not "met" in e1glayer or not "met" in e2glayer or not "met" in cglayer:
+			raise ValueError("given layers must be metals")
+		viaoffset = (None, None) if viaoffset is None else viaoffset
+		if isinstance(viaoffset,bool):
+			viaoffset = (True,True) if viaoffset else (False,False)
+		self.pdk.has_required_glayers([e1glayer,e2glayer,cglayer])
+		extension = snap_to_grid(extension)
+		viastack1 = self._via(via_stack, e1glayer, cglayer, fullbottom=fullbottom, assume_bottom_via=True, fulltop=True)
+		viastack2 = self._via(via_stack, e2glayer, cglayer, fullbottom=fullbottom, assume_bottom_via=True, fulltop=True)
+		if e1glayer==cglayer and e2glayer==cglayer:
+			viastack1 = self._via(fill_empty_viastack, e1glayer)
+			viastack2 = self._via(fill_empty_viastack, e2glayer)
+		elif e1glayer == cglayer:
+			viastack1 = self._via(fill_empty_viastack, e1glayer, size=viastack2.size)
+		elif e2glayer == cglayer:
+			viastack2 = self._via(fill_empty_viastack, e2glayer, size=viastack1.size)
+		# find extension
+		e1_length = snap_to_grid(extension + viastack1.size[0])
+		e2_length = snap_to_grid(extension + viastack2.size[0])
+		xdiff = snap_to_grid(abs(edge1.center[0] - edge2.center[0]))
+		ydiff = snap_to_grid(abs(edge1.center[1] - edge2.center[1]))
+		if not isclose(edge1.center[0],edge2.center[0]):
+			if round(edge1.orientation) == 0:# facing east
+				if edge1.center[0] > edge2.center[0]:
+					e2_length += xdiff
+				else:
+					e1_length += xdiff
+			elif round(edge1.orientation) == 180:# facing west
+				if edge1.center[0] < edge2.center[0]:
+					e2_length += xdiff
+				else:
+					e1_length += xdiff
+		if not isclose(edge1.center[1],edge2.center[1]):
+			if round(edge1.orientation) == 270:# facing south
+				if edge1.center[1] < edge2.center[1]:
+					e2_length += ydiff
+				else:
+					e1_length += ydiff
+			elif round(edge1.orientation) == 90:#facing north
+				if edge1.center[1] > edge2.center[1]:
+					e2_length += ydiff
+				else:
+					e1_length += ydiff
+		# extensions (get_primitive_rectangle, ports e_W, e_N, e_E, e_S) with the lower left corner on the edge
+		box_dims = [(e1_length, width1),(e2_length, width2)]
+		if round(edge1.orientation) == 90 or round(edge1.orientation) == 270:
+			box_dims = [(width1, e1_length),(width2, e2_length)]
+		extensions = list()
+		for (dx, dy), glayer, edge in zip(box_dims, (e1glayer, e2glayer), (edge1, edge2)):
+			dx, dy = float(dx), float(dy)
+			rect = self._rectangle(kdb.DBox(-dx / 2.0, -dy / 2.0, dx / 2, dy / 2), glayer)
+			rect.ports = {"e_" + name[-1]: _renamed(port, "e_" + name[-1]) for name, port in _perimeter_ports(rect.values.dbbox, self.pdk.get_glayer(glayer), "route_").items()}
+			ref = _Reference(rect)
+			ref.movex(edge.center[0] - ref.values.dbbox.left).movey(edge.center[1] - ref.values.dbbox.bottom)
+			extensions.append(ref)
+		e1_extension, e2_extension = extensions
+		for ext in extensions:
+			if round(edge1.orientation) == 0:# facing east
+				ext.movey(0-float(ext.values.size[1])/2)
+			elif round(edge1.orientation) == 180:# facing west
+				ext.movex(0-float(ext.values.size[0]))
+				ext.movey(0-float(ext.values.size[1])/2)
+			elif round(edge1.orientation) == 270:# facing south
+				ext.movex(0-float(ext.values.size[0])/2)
+				ext.movey(0-float(ext.values.size[1]))
+			else:#facing north
+				ext.movex(0-float(ext.values.size[0])/2)
+		# place viastacks
+		me1 = _Reference(viastack1).center_at_origin()
+		me2 = _Reference(viastack2).center_at_origin()
+		if round(edge2.orientation) == 0 or round(edge2.orientation) == 180:
+			via_flush1 = snap_to_grid(abs((width1 - viastack1.size[1])/2) if viaoffset else 0)
+			via_flush2 = snap_to_grid(abs((width2 - viastack2.size[1])/2) if viaoffset else 0)
+		if round(edge2.orientation) == 90 or round(edge2.orientation) == 270:
+			via_flush1 = snap_to_grid(abs((width1 - viastack1.size[0])/2) if viaoffset else 0)
+			via_flush2 = snap_to_grid(abs((width2 - viastack2.size[0])/2) if viaoffset else 0)
+		via_flush1 = via_flush1 if viaoffset[0] else 0-via_flush1
+		via_flush1 = 0 if viaoffset[0] is None else via_flush1
+		via_flush2 = via_flush2 if viaoffset[1] else 0-via_flush2
+		via_flush2 = 0 if viaoffset[1] is None else via_flush2
+		orientation = round(edge1.orientation)
+		side = {0: "E", 180: "W", 270: "S"}.get(orientation, "N")
+		target1 = e1_extension.port("e_" + side).center
+		me1.movex(target1[0] - me1.center[0]).movey(target1[1] - me1.center[1])
+		target2 = e2_extension.port("e_" + side).center
+		me2.movex(target2[0] - me2.center[0]).movey(target2[1] - me2.center[1])
+		if orientation in (0, 180):
+			via_flush1 *= 1 if me2.values.dbbox.top > me1.values.dbbox.top else -1
+			via_flush2 *= 1 if me2.values.dbbox.top > me1.values.dbbox.top else -1
+			sign = -1 if orientation == 0 else 1
+			me1.movex(sign*viastack1.xmax).movey(0-via_flush1)
+			me2.movex(sign*viastack2.xmax).movey(via_flush2)
+			me1, me2 = (me1, me2) if me1.y > me2.y else (me2, me1)
+			route_ports = [me1.port("top_met_N"),me2.port("top_met_S")]
+			fix_connection_direction = "E"
+			fix_ports = [me1.port("top_met_E"),me2.port("top_met_E")]
+		else:
+			via_flush1 *= 1 if me2.values.dbbox.right > me1.values.dbbox.right else -1
+			via_flush2 *= 1 if me2.values.dbbox.right > me1.values.dbbox.right else -1
+			sign = 1 if orientation == 270 else -1
+			me1.movey(sign*viastack1.xmax).movex(0-via_flush1)
+			me2.movey(sign*viastack2.xmax).movex(via_flush2)
+			me1, me2 = (me1, me2) if me1.x > me2.x else (me2, me1)
+			route_ports = [me1.port("top_met_E"),me2.port("top_met_W")]
+			fix_connection_direction = "N"
+			fix_ports = [me1.port("top_met_N"),me2.port("top_met_N")]
+		placed = [e1_extension, e2_extension, me1, me2]
+		# connect extensions, add ports, return
+		if cwidth:
+			route_ports = [set_port_width(port_,cwidth) for port_ in route_ports]
+		route_width = max(route_ports[0].width, route_ports[1].width)
+		route_ports = [set_port_width(port_, route_width) for port_ in route_ports]
+		route_port0 = set_port_layer(route_ports[0], self.pdk.get_glayer(cglayer))
+		route_port1 = set_port_layer(route_ports[1], self.pdk.get_glayer(cglayer))
+		cconnection = self._straight(route_port0, route_port1, glayer1=cglayer, glayer2=cglayer)
+		fixes = list()
+		if cconnection is not None:
+			for _port in fix_ports:
+				port2 = set_port_layer(cconnection[0]["route_"+fix_connection_direction], self.pdk.get_glayer(cglayer))
+				_port = set_port_layer(_port, self.pdk.get_glayer(cglayer))
+				fixes.append(self._straight(_port, port2, glayer1=cglayer, glayer2=cglayer))
+		if cconnection is None or None in fixes:
+			# zero length straight routes are left to c_route
+			return self._route(
+				c_route, edge1, edge2, extension=extension, width1=width1, width2=width2, cwidth=cwidth, e1glayer=e1glayer,
+				e2glayer=e2glayer, cglayer=cglayer, viaoffset=viaoffset, fullbottom=fullbottom
+			)
+		for _, fix_placed in [cconnection] + fixes:
+			placed += fix_placed
+		self._place(placed)
+		self.planned += 1
+		ports = dict()
+		for port_to_add in route_ports:
+			port_to_add = set_port_orientation(port_to_add, get_orientation(port_to_add.orientation))
+			# c_route names its ports con_ + the orientation
+			name = rename_ports_by_orientation__call("con_", port_to_add)
+			ports[name] = _renamed(port_to_add, name)
+		return ports
+
+	def build(self) -> Component:
+		"""one flat Component holding all planned routes"""
+		routes = Component(name=f"route_plan_{uuid.uuid4().hex[:6]}")
+		arrays = list()
+		wires = RectArray(self.dbu)
+		for layer, boxes in self._wires.items():
+			wires.add(layer, np.array(boxes, dtype=np.int64))
+		arrays.append(wires)
+		for cell, offsets in self._vias.values():
+			arrays.append(cell.rects.place(np.array(offsets, dtype=np.int64)))
+		RectArray.concatenate(arrays, self.dbu).commit(routes)
+		if self._routes:
+			for route in self._routes:
+				routes << route
+			# In GDSFactory v9, flatten() mutates in-place and returns None
+			routes.flatten()
+		return routes
+
+	def commit(self, comp: Component) -> ComponentReference:
+		"""adds the planned routes to comp as one reference and returns it"""
+		return comp << self.build()
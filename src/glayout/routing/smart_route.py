@@ -323,11 +323,11 @@ def generic_route_ab_ba_common_centroid(
     if check_route(name1,name2,"A_drain","B_source"):
         portmv1 = get_top_port("tl_multiplier_0_drain_E").copy()
         # In GDSFactory v9, use get_layer_from_port() for reliable layer extraction
-        return straight_route(pdk, get_top_port("tl_multiplier_0_drain_E"),movex(portmv1,2*pdk.get_grule(get_layer_from_port(portmv1, pdk))["min_separation"]))
+        return straight_route(pdk, get_top_port("tl_multiplier_0_drain_E"),movex(portmv1,2*pdk.get_grule_fast(get_layer_from_port(portmv1, pdk))["min_separation"]))
     if check_route(name1,name2,"A_source","B_drain"):
         portmv1 = get_top_port("tr_multiplier_0_drain_W").copy()
         # In GDSFactory v9, use get_layer_from_port() for reliable layer extraction
-        return straight_route(pdk, get_top_port("tr_multiplier_0_drain_W"),movex(portmv1,-2*pdk.get_grule(get_layer_from_port(portmv1, pdk))["min_separation"]))
+        return straight_route(pdk, get_top_port("tr_multiplier_0_drain_W"),movex(portmv1,-2*pdk.get_grule_fast(get_layer_from_port(portmv1, pdk))["min_separation"]))
     if check_route(name1,name2,"A_drain","B_drain"):
         portmv1 = get_top_port("bl_mutliplier_0_drain_N").copy()
         portmv2 = get_top_port("br_multiplier_0_drain_N").copy()
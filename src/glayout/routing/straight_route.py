@@ -5,6 +5,7 @@ from glayout.primitives.via_gen import via_stack, via_array
 from gdsfactory.components import rectangle
 from glayout.util.comp_utils import evaluate_bbox, align_comp_to_port
 from glayout.util.port_utils import assert_port_manhattan, set_port_orientation, add_ports_perimeter, get_layer_from_port
+from glayout.util.snap_to_grid import finalize_route
 from gdstk import rectangle as primitive_rectangle
 import uuid
 
@@ -59,7 +60,7 @@ def straight_route(
 	# Determine if we need a via at the start
 	front_via = None
 	try:
-		edge1_glayer = pdk.layer_to_glayer(edge1.layer)
+		edge1_glayer = pdk.layer_to_glayer_fast(edge1.layer)
 		if glayer1 != edge1_glayer:
 			front_via = via_stack(pdk,glayer1,edge1_glayer,fullbottom=fullbottom)
 	except (ValueError, KeyError):
@@ -121,8 +122,6 @@ def straight_route(
 	if front_via is not None:
 		alignlayer1 = pdk.get_glayer(glayer1) if via1_alignment_layer is None else pdk.get_glayer(via1_alignment_layer)
 		straightroute.add(align_comp_to_port(front_via,edge1,layer=alignlayer1,alignment=via1_alignment))
-	# In GDSFactory v9, flatten() mutates in-place and returns None
-	straightroute.flatten()
-	return straightroute
+	return finalize_route(straightroute)
 
 
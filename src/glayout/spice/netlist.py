@@ -1,8 +1,6 @@
 from os.path import join, dirname
-from typing import Union
-from copy import deepcopy
-
-import re
+from typing import Iterator, TextIO, Union
+from copy import copy
 
 class Netlist:
 	"""Represents a SPICE netlist/subcircuit."""
@@ -26,11 +24,18 @@ class Netlist:
 
 	sub_netlists: list['Netlist']
 	"""List of the sub-netlists."""
-	netlist_connections: list[list[str]]
-	"""2D matrix of interconnections of the sub-netlists.
 
-	The row and column number in the matrix represent the indices of the connected sub-netlists. The value represents the name of the wire connecting the nodes.
-	"""
+	# Connectivity of the sub-netlists' nodes ("endpoints"), kept as a union-find forest.
+	# The endpoints of sub-netlist i are numbered from _endpoint_offsets[i] in node order;
+	# the name of a net (and whether it is a generated wire) is stored at its root endpoint.
+	_net_parent: list[int]
+	_net_name: list[str]
+	_net_is_wire: list[bool]
+	_endpoint_offsets: list[int]
+	_sub_netlist_index: dict[int, int]
+	_connections_cache: Union[list[list[str]], None]
+	# (nodes list, its length, node name -> first index), rebuilt when self.nodes changes
+	_node_positions: Union[tuple[list[str], int, dict[str, int]], None] = None
 
 	# Variable to determine how many wires were created
 	wire_index: int = 0
@@ -50,7 +55,12 @@ class Netlist:
 		self.parameters = {**self.parameters, **parameters}
 
 		self.sub_netlists = []
-		self.netlist_connections = []
+		self._net_parent = []
+		self._net_name = []
+		self._net_is_wire = []
+		self._endpoint_offsets = []
+		self._sub_netlist_index = {}
+		self._connections_cache = None
 		self.source_netlist = source_netlist
 		self.nodes = nodes
 
@@ -98,6 +108,51 @@ class Netlist:
 		self.source_netlist = open(join(self.designs_dir, netlist_src)).read()
 		return self.source_netlist
 
+	@property
+	def netlist_connections(self) -> list[list[str]]:
+		"""2D matrix of interconnections of the sub-netlists.
+
+		The row and column number in the matrix represent the indices of the connected sub-netlists. The value represents the name of the wire connecting the nodes.
+		"""
+		if self._connections_cache is None:
+			self._connections_cache = [
+				[self._net_name[self._find_net(offset + i)] for i in range(len(netlist.nodes))]
+				for netlist, offset in zip(self.sub_netlists, self._endpoint_offsets)
+			]
+		return self._connections_cache
+
+	def node_index(self, node: str) -> int:
+		"""Returns the index of `node` in `self.nodes` (first occurrence), raises ValueError if it is not a node."""
+		cache = self._node_positions
+		if cache is None or cache[0] is not self.nodes or cache[1] != len(self.nodes):
+			positions = dict()
+			for i, name in enumerate(self.nodes):
+				positions.setdefault(name, i)
+			cache = self._node_positions = (self.nodes, len(self.nodes), positions)
+		try:
+			return cache[2][node]
+		except KeyError:
+			raise ValueError(f"{node!r} is not a node of {self.circuit_name}") from None
+
+	def _sub_netlist_position(self, net: Union[int, 'Netlist']) -> int:
+		if type(net) == int:
+			return net
+		try:
+			return self._sub_netlist_index[id(net)]
+		except KeyError:
+			raise ValueError(f"{net.circuit_name} is not a sub-netlist of {self.circuit_name}") from None
+
+	def _find_net(self, endpoint: int) -> int:
+		"""Returns the root endpoint of the net `endpoint` belongs to."""
+		parent = self._net_parent
+		while parent[endpoint] != endpoint:
+			parent[endpoint] = parent[parent[endpoint]]
+			endpoint = parent[endpoint]
+		return endpoint
+
+	def _endpoint(self, net_index: int, node: str) -> int:
+		return self._endpoint_offsets[net_index] + self.sub_netlists[net_index].node_index(node)
+
 	def connect_subnets(
 		self,
 		net1: Union[int, 'Netlist'],
@@ -111,33 +166,31 @@ class Netlist:
 			- `net2`: The netlist to connect to. Either a reference to the Netlist object or it's index in the `sub_netlists` list.
 			- `node_mapping`: A list of 2-element tuples representing the connections between nodes of the netlists. The first element in the tuple is the name of the node of `net1` and the second value is the name of the node in `net2` to connect to.
 		"""
+		net1_index = self._sub_netlist_position(net1)
+		net2_index = self._sub_netlist_position(net2)
+
 		for mapping in node_mapping:
 			node1, node2 = mapping
 
-			net1_index = net1 if type(net1) == int else self.sub_netlists.index(net1)
-			net2_index = net2 if type(net2) == int else self.sub_netlists.index(net2)
-
-			netlist1 = self.sub_netlists[net1_index]
-			netlist2 = self.sub_netlists[net2_index]
+			root1 = self._find_net(self._endpoint(net1_index, node1))
+			root2 = self._find_net(self._endpoint(net2_index, node2))
 
-			node1_index = netlist1.nodes.index(node1)
-			node2_index = netlist2.nodes.index(node2)
-
-			connection_wire = ""
 			# if one of the nodes is already connected, then use that wire instead of creating a new wire
-			if re.match("^wire[\d]+$", self.netlist_connections[net1_index][node1_index]):
-				connection_wire = self.netlist_connections[net1_index][node1_index]
+			if self._net_is_wire[root1]:
+				connection_wire = self._net_name[root1]
 
-			elif re.match("^wire[\d]+$", self.netlist_connections[net2_index][node2_index]):
-				connection_wire = self.netlist_connections[net2_index][node2_index]
+			elif self._net_is_wire[root2]:
+				connection_wire = self._net_name[root2]
 
 			else:
 				connection_wire = f"wire{self.wire_index}"
 				self.wire_index += 1
 
-			self.netlist_connections[net1_index][node1_index] = connection_wire
-			self.netlist_connections[net2_index][node2_index] = connection_wire
+			self._net_parent[root2] = root1
+			self._net_name[root1] = connection_wire
+			self._net_is_wire[root1] = True
 
+		self._connections_cache = None
 
 	def connect_node(
 		self,
@@ -150,15 +203,16 @@ class Netlist:
 		- `net`: The sub-netlist to connect. Either a reference to the Netlist object or it's index in the `sub_netlists` list.
 		- `node_mapping`: A list of 2-element tuples representing the connections between the netlist nodes and the top-level nodes. The first element in the tuple is the name of the node of `net` and the second value is the name of the top-level to connect to.
 		"""
-		net_index = net if type(net) == int else self.sub_netlists.index(net)
+		net_index = self._sub_netlist_position(net)
 
 		for mapping in node_mapping:
 			net_node, top_level_node = mapping
 
-			net = self.sub_netlists[net_index]
-			node_index = net.nodes.index(net_node)
+			root = self._find_net(self._endpoint(net_index, net_node))
+			self._net_name[root] = top_level_node
+			self._net_is_wire[root] = False
 
-			self.netlist_connections[net_index][node_index] = top_level_node
+		self._connections_cache = None
 
 	def add_netlists(self, netlists: list['Netlist']):
 		"""Adds sub-netlists.
@@ -167,17 +221,42 @@ class Netlist:
 		- `netlists`: A list of Netlist objects to add.
 		"""
 		for netlist in netlists:
+			self._sub_netlist_index.setdefault(id(netlist), len(self.sub_netlists))
 			self.sub_netlists.append(netlist)
-			self.netlist_connections.append(netlist.nodes.copy())
+			# every node starts as its own net, named after the node
+			offset = len(self._net_parent)
+			self._endpoint_offsets.append(offset)
+			self._net_parent.extend(range(offset, offset + len(netlist.nodes)))
+			self._net_name.extend(netlist.nodes)
+			self._net_is_wire.extend([False] * len(netlist.nodes))
+
+		self._connections_cache = None
+
+	def share(self) -> 'Netlist':
+		"""Returns a snapshot of the netlist which shares its sub-netlists instead of copying them.
+
+		Only the lists and dicts the connection methods mutate are copied, so later changes to `self` do not affect the snapshot. Sub-netlists are never mutated once added (see `generate_netlist`), so sharing them is safe and a snapshot costs O(number of direct sub-netlists) instead of a deep copy of the hierarchy.
+		"""
+		snapshot = copy(self)
+		snapshot.nodes = list(self.nodes)
+		snapshot.parameters = dict(self.parameters)
+		snapshot.sub_netlists = list(self.sub_netlists)
+		snapshot._net_parent = list(self._net_parent)
+		snapshot._net_name = list(self._net_name)
+		snapshot._net_is_wire = list(self._net_is_wire)
+		snapshot._endpoint_offsets = list(self._endpoint_offsets)
+		snapshot._sub_netlist_index = dict(self._sub_netlist_index)
+		snapshot._connections_cache = None
+		return snapshot
 
 	def connect_netlist(self, netlist: 'Netlist', node_mapping: list[tuple[str, str]]) -> int:
 		"""Adds a sub-netlist and connects it to top-level nodes.
 
 		Parameters:
-		- `netlist`: The netlist object to add.
+		- `netlist`: The netlist object to add. A snapshot (see `share`) is added, so later changes to `netlist` are not seen by this netlist.
 		- `node_mapping`: A list of 2-element tuples representing the connections between the netlist nodes and the top-level nodes. The first element in the tuple is the name of the node of `netlist` and the second value is the name of the top-level to connect to.
 		"""
-		self.add_netlists([deepcopy(netlist)])
+		self.add_netlists([netlist.share()])
 		netlist_index = len(self.sub_netlists) - 1
 
 		self.connect_node(net=netlist_index, node_mapping=node_mapping)
@@ -203,47 +282,52 @@ class Netlist:
 
 		elif len(self.sub_netlists) > 0:
 			if with_pins:
-				main_circuit = f".subckt {generated_circuit_name} {' '.join(self.nodes)}\n"
+				lines = [f".subckt {generated_circuit_name} {' '.join(self.nodes)}"]
 			else:
-				main_circuit = f".subckt {generated_circuit_name}\n"
-    
+				lines = [f".subckt {generated_circuit_name}"]
+
 			for i, netlist in enumerate(self.sub_netlists):
-				main_circuit += netlist.generate_instance(str(i), self.netlist_connections[i]) + "\n"
+				lines.append(netlist.generate_instance(str(i), self.netlist_connections[i]))
 
-			main_circuit += f".ends {generated_circuit_name}"
+			lines.append(f".ends {generated_circuit_name}")
 
-			return main_circuit
+			return '\n'.join(lines)
 
 		else:
 			return ""
 
-	def get_subcircuits_netlist_map(self, sub_netlists_only = False) -> dict[str, list['Netlist']]:
-		"""Generates a list of all the unique SPICE subcircuits directives used in the netlist."""
-		subcircuits = dict()
+	def __collect_subcircuits(self, groups: list[tuple[str, list['Netlist']]], keys: dict[tuple, int], group_index: dict[int, int], include_self: bool = True):
+		"""Adds the unique subcircuits of the hierarchy to `groups` as (rendered subcircuit, netlists), children first.
 
-		# Get sub netlists' subcircuits
+		Subcircuits are hashed structurally: the key is the rendered subcircuit together with the groups of its sub-netlists, so two subcircuits only share a group if their whole hierarchies are equal. `keys` maps each key to its position in `groups` and `group_index` maps the id of every visited netlist to the position of its group; netlists shared by several parents are rendered and visited once.
+		"""
 		for netlist in self.sub_netlists:
-			subnetlist_subcircuits = netlist.get_subcircuits_netlist_map()
-
-			# For each subnetlists' subcircuit
-			for subckt in subnetlist_subcircuits:
-				subckt_netlists = subnetlist_subcircuits[subckt]
-
-				if subckt not in subcircuits:
-					# If it is unique, create an entry in the dict
-					subcircuits[subckt] = [*subckt_netlists]
-				else:
-					# If it is not unique, append the netlists to the dict
-					subcircuits[subckt] += subckt_netlists
-
-
-		if not sub_netlists_only:
-			self_subckt = self.__generate_self_subcircuit()
-			if self_subckt not in subcircuits:
-				subcircuits[self_subckt] = [self]
+			if id(netlist) not in group_index:
+				netlist.__collect_subcircuits(groups, keys, group_index)
+
+		if include_self:
+			subckt = self.__generate_self_subcircuit()
+			key = (subckt, tuple(group_index[id(netlist)] for netlist in self.sub_netlists))
+			position = keys.get(key)
+			if position is None:
+				position = keys[key] = len(groups)
+				groups.append((subckt, []))
+			groups[position][1].append(self)
+			group_index[id(self)] = position
 
+	def get_subcircuits_netlist_map(self, sub_netlists_only = False) -> dict[str, list['Netlist']]:
+		"""Generates a list of all the unique SPICE subcircuits directives used in the netlist."""
+		subcircuits = dict()
+		for subckt, netlists in self.__get_subcircuit_groups(sub_netlists_only):
+			subcircuits.setdefault(subckt, []).extend(netlists)
 		return subcircuits
 
+	def __get_subcircuit_groups(self, sub_netlists_only = False) -> list[tuple[str, list['Netlist']]]:
+		"""Unique subcircuits of the hierarchy (see `__collect_subcircuits`)."""
+		groups = []
+		self.__collect_subcircuits(groups, dict(), dict(), include_self=not sub_netlists_only)
+		return groups
+
 	def get_global_nodes_list(self) -> set[str]:
 		"""Generates a list of unique global nodes used in the netlist."""
 		global_nodes = set()
@@ -255,53 +339,71 @@ class Netlist:
 
 		return global_nodes
 
-	def generate_netlist(self, only_subcircuits: bool = False, with_pins: bool = True) -> str:
-		"""Generates the final SPICE netlist for the design.
-
-		The final netlist is a set of SPICE subcircuit directives and global directives. The top-level subcircuit is set by `self.circuit_name`.
+	def iter_netlist(self, only_subcircuits: bool = False, with_pins: bool = True) -> Iterator[str]:
+		"""Generates the final SPICE netlist for the design in chunks (see `generate_netlist`).
 
-		Parameters:
-		- `only_subcircuits`: Only generates the subcircuit directives if set to `True`. (Default: `False`)
+		Each unique subcircuit is rendered once to find duplicates and its text is reused unless a name suffix changed it. Subcircuits which share a name but differ get a `_{n}` suffix while the netlist is generated; the names of the sub-netlists are restored afterwards since they may be shared with other netlists.
 		"""
-
 		# GENERATE UNIQUE SUBCIRCUIT DiRECTIVES
-		subcircuits_netlist_map = self.get_subcircuits_netlist_map(sub_netlists_only=True)
+		subcircuit_groups = self.__get_subcircuit_groups(sub_netlists_only=True)
 
 		subcircuit_suffixes = dict()
+		original_names = dict()
 		# Get the unique netlists' list and set their suffixes
-		for subckt in subcircuits_netlist_map:
-			netlists = subcircuits_netlist_map[subckt]
+		for _, netlists in subcircuit_groups:
 			# All of these subcircuits will have the same name, so use any one
 			subckt_name = netlists[0].circuit_name
 
 			if subckt_name in subcircuit_suffixes:
 				# If a suffix exists, use it and increment it
-				for netlist in netlists: netlist.circuit_name = f"{netlist.circuit_name}_{subcircuit_suffixes[subckt_name]}"
+				for netlist in netlists:
+					original_names[id(netlist)] = (netlist, netlist.circuit_name)
+					netlist.circuit_name = f"{netlist.circuit_name}_{subcircuit_suffixes[subckt_name]}"
 				subcircuit_suffixes[subckt_name] += 1
 			else:
 				# If a suffix doesn't exist, create it.
 				subcircuit_suffixes[subckt_name] = 1
-
-		unique_subcircuits_list = []
-		# Generate all the unique subcircuits (generation is done again since suffixes were updated)
-		for subckt in subcircuits_netlist_map:
-			unique_subcircuits_list.append(
-				# Use any one since all will be equal
-				subcircuits_netlist_map[subckt][0].__generate_self_subcircuit()
-			)
 		# /GENERATE UNIQUE SUBCIRCUIT DiRECTIVES
 
 		# GENERATE THE FINAL NETLIST
-		subcircuits = '\n\n'.join(unique_subcircuits_list)
-		main_circuit = self.__generate_self_subcircuit(with_pins=with_pins)
-		global_nodes = ' '.join(self.get_global_nodes_list())
+		try:
+			global_nodes = ' '.join(self.get_global_nodes_list())
+			if len(global_nodes) > 0 and not only_subcircuits:
+				yield f".global {global_nodes}\n\n"
 
-		self.spice_netlist = "" 
+			for i, (subckt, netlists) in enumerate(subcircuit_groups):
+				# Use any one since all will be equal
+				netlist = netlists[0]
+				renamed = id(netlist) in original_names or any(id(sub_netlist) in original_names for sub_netlist in netlist.sub_netlists)
+				if i > 0:
+					yield "\n\n"
+				# only subcircuits whose name or instances were renamed have to be generated again
+				yield netlist.__generate_self_subcircuit() if renamed else subckt
+			yield "\n\n"
+			yield self.__generate_self_subcircuit(with_pins=with_pins)
+		finally:
+			for netlist, circuit_name in original_names.values():
+				netlist.circuit_name = circuit_name
+		# /GENERATE THE FINAL NETLIST
 
-		if len(global_nodes) > 0 and not only_subcircuits: self.spice_netlist += f".global {global_nodes}\n\n"
+	def write_netlist(self, output: TextIO, only_subcircuits: bool = False, with_pins: bool = True):
+		"""Writes the final SPICE netlist for the design to a file-like object without building it in memory.
 
-		self.spice_netlist += subcircuits + "\n\n"
-		self.spice_netlist += main_circuit
-		# /GENERATE THE FINAL NETLIST
+		Parameters:
+		- `output`: Text stream to write to (e.g. an open file).
+		- `only_subcircuits`: Only generates the subcircuit directives if set to `True`. (Default: `False`)
+		"""
+		for chunk in self.iter_netlist(only_subcircuits=only_subcircuits, with_pins=with_pins):
+			output.write(chunk)
+
+	def generate_netlist(self, only_subcircuits: bool = False, with_pins: bool = True) -> str:
+		"""Generates the final SPICE netlist for the design.
+
+		The final netlist is a set of SPICE subcircuit directives and global directives. The top-level subcircuit is set by `self.circuit_name`.
+
+		Parameters:
+		- `only_subcircuits`: Only generates the subcircuit directives if set to `True`. (Default: `False`)
+		"""
+		self.spice_netlist = ''.join(self.iter_netlist(only_subcircuits=only_subcircuits, with_pins=with_pins))
 
 		return self.spice_netlist
@@ -0,0 +1,244 @@
+"""
+streaming parser for extracted (PEX) SPICE netlists
+
+reads R and C element lines of a Magic ext2spice (or any flat SPICE) netlist one line at a time,
+so memory use depends on the number of nodes and coupled net pairs, not on the size of the file.
+values may use SPICE engineering suffixes (1.2e-15, 0.3fF, 2.1meg, 10k), element cards may span
+several lines with "+" continuations, and "*" / ";" / "$ " comments are ignored.
+
+usage:
+	from glayout.spice.parasitics import parse_parasitics
+	parasitics = parse_parasitics("opamp_pex.spice")
+	parasitics.total_resistance, parasitics.total_capacitance
+	parasitics.nets, parasitics.net_capacitance, parasitics.coupling_pairs, parasitics.coupling_capacitance
+"""
+from os import PathLike
+from typing import Iterable, Optional
+import re
+
+import numpy as np
+
+
+SPICE_SUFFIXES = {
+	"t": 1e12,
+	"g": 1e9,
+	"meg": 1e6,
+	"k": 1e3,
+	"mil": 25.4e-6,
+	"m": 1e-3,
+	"u": 1e-6,
+	"n": 1e-9,
+	"p": 1e-12,
+	"f": 1e-15,
+	"a": 1e-18,
+}
+"""SPICE scale factors (case insensitive). Letters following a scale factor (units such as F or Ohm) are ignored."""
+
+# single letter scale factors without a unit, the common case in magic output (e.g. 0.123f)
+_SHORT_SUFFIXES = {letter: scale for suffix, scale in SPICE_SUFFIXES.items() if len(suffix) == 1 for letter in (suffix, suffix.upper())}
+
+_VALUE_RE = re.compile(r"([+-]?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)(meg|mil|[tgkmunpfa])?[a-z]*", re.IGNORECASE)
+
+# extresist splits a net into subnodes named <net>.n<i> / <net>.t<i> / <net>.<i>
+_SUBNODE_RE = re.compile(r"^(.+)\.[nt]?\d+$")
+
+DEFAULT_GROUND_NETS = ("0", "gnd", "vsubs")
+
+
+def parse_spice_value(token: str) -> float:
+	"""converts a SPICE number (with optional engineering suffix and unit) to float, raises ValueError if token is not a number"""
+	if "=" in token:
+		# parameter form, e.g. r=10 or c=1.2f
+		token = token.split("=", 1)[1]
+	match = _VALUE_RE.fullmatch(token)
+	if match is None:
+		raise ValueError(f"not a SPICE number: {token!r}")
+	value = float(match.group(1))
+	if match.group(2):
+		value *= SPICE_SUFFIXES[match.group(2).lower()]
+	return value
+
+
+def net_of_node(node: str) -> str:
+	"""name of the net a (possibly extresist split) node belongs to"""
+	match = _SUBNODE_RE.match(node)
+	return match.group(1) if match else node
+
+
+def _strip_comment(line: str) -> str:
+	if ";" not in line and "$" not in line:
+		return line
+	for marker in (";", "$ "):
+		index = line.find(marker)
+		if index >= 0:
+			line = line[:index]
+	return line
+
+
+class Parasitics:
+	"""Totals and per net tables of an extracted netlist."""
+
+	total_resistance: float
+	"""Sum of all resistor values (Ohms)."""
+	total_capacitance: float
+	"""Sum of all capacitor values, ground and coupling (Farads)."""
+	nets: np.ndarray
+	"""Net names, the index into every per net array."""
+	net_resistance: np.ndarray
+	"""Sum of the resistors between subnodes of each net (Ohms)."""
+	net_ground_capacitance: np.ndarray
+	"""Capacitance from each net to ground (Farads)."""
+	net_coupling_capacitance: np.ndarray
+	"""Capacitance from each net to all other (non ground) nets (Farads)."""
+	coupling_pairs: np.ndarray
+	"""(M, 2) int array of net indices, i < j, of every coupled net pair."""
+	coupling_capacitance: np.ndarray
+	"""(M,) capacitance of every coupled net pair (Farads)."""
+	skipped: int
+	"""Number of R/C cards which could not be parsed."""
+
+	@property
+	def net_capacitance(self) -> np.ndarray:
+		"""Total capacitance seen by each net (ground + coupling)."""
+		return self.net_ground_capacitance + self.net_coupling_capacitance
+
+	def net_index(self, net: str) -> int:
+		return int(np.flatnonzero(self.nets == net)[0])
+
+	def as_dict(self) -> dict:
+		"""json friendly per net summary"""
+		return {
+			"total_resistance_ohms": self.total_resistance,
+			"total_capacitance_farads": self.total_capacitance,
+			"nets": {
+				str(net): {
+					"resistance_ohms": float(self.net_resistance[i]),
+					"ground_capacitance_farads": float(self.net_ground_capacitance[i]),
+					"coupling_capacitance_farads": float(self.net_coupling_capacitance[i]),
+				}
+				for i, net in enumerate(self.nets)
+			},
+		}
+
+
+def parse_parasitics_lines(lines: Iterable[str], ground_nets: Iterable[str] = DEFAULT_GROUND_NETS) -> Parasitics:
+	"""builds the Parasitics of the R and C cards in lines (any iterable of str, e.g. an open file)"""
+	ground = set(net.lower() for net in ground_nets)
+	net_ids: dict[str, int] = dict()
+	# node name -> net index (-1 for ground), extracted netlists reuse every node many times
+	node_ids: dict[str, int] = dict()
+	net_resistance: list[float] = []
+	net_ground_capacitance: list[float] = []
+	# (lower net index << 32) | higher net index -> capacitance, int keys are smaller and faster than tuples
+	coupling: dict[int, float] = dict()
+	total_resistance = 0.0
+	total_capacitance = 0.0
+	skipped = 0
+
+	def node_id(node: str) -> int:
+		net = net_of_node(node)
+		if net.lower() in ground:
+			index = -1
+		else:
+			index = net_ids.get(net)
+			if index is None:
+				index = net_ids[net] = len(net_ids)
+				net_resistance.append(0.0)
+				net_ground_capacitance.append(0.0)
+		node_ids[node] = index
+		return index
+
+	# an R/C card whose value is not on its first line, waiting for "+" continuation lines
+	pending: Optional[list[str]] = None
+	for line in lines:
+		first = line[:1]
+		if first in " \t":
+			line = line.lstrip()
+			first = line[:1]
+		if first == "+":
+			if pending is None:
+				continue
+			pending.extend(_strip_comment(line[1:]).split())
+			if len(pending) < 4:
+				continue
+			tokens, pending = pending, None
+		elif first and first in "RrCc":
+			if pending is not None:
+				skipped += 1
+			# only name, two nodes and value are needed, trailing parameters are not split
+			tokens = _strip_comment(line).split(None, 4)
+			pending = None
+			if len(tokens) < 4:
+				pending = tokens
+				continue
+		else:
+			# blank and comment lines may sit between a card and its continuations
+			if first and first not in "*\r\n" and pending is not None:
+				skipped += 1
+				pending = None
+			continue
+		token = tokens[3]
+		try:
+			value = float(token)
+		except ValueError:
+			try:
+				value = float(token[:-1]) * _SHORT_SUFFIXES[token[-1]]
+			except (ValueError, KeyError):
+				try:
+					value = parse_spice_value(token)
+				except ValueError:
+					skipped += 1
+					continue
+		index_a = node_ids.get(tokens[1])
+		if index_a is None:
+			index_a = node_id(tokens[1])
+		index_b = node_ids.get(tokens[2])
+		if index_b is None:
+			index_b = node_id(tokens[2])
+		if tokens[0][0] in "Rr":
+			total_resistance += value
+			if index_a == index_b and index_a >= 0:
+				net_resistance[index_a] += value
+			continue
+		total_capacitance += value
+		if index_a == index_b:
+			# ground to ground or within one net
+			continue
+		if index_a < 0 or index_b < 0:
+			net_ground_capacitance[index_a if index_b < 0 else index_b] += value
+			continue
+		pair = (index_a << 32) | index_b if index_a < index_b else (index_b << 32) | index_a
+		coupling[pair] = coupling.get(pair, 0.0) + value
+
+	if pending is not None:
+		skipped += 1
+
+	parasitics = Parasitics()
+	parasitics.total_resistance = total_resistance
+	parasitics.total_capacitance = total_capacitance
+	parasitics.skipped = skipped
+	parasitics.nets = np.array(list(net_ids), dtype=object)
+	parasitics.net_resistance = np.array(net_resistance, dtype=np.float64)
+	parasitics.net_ground_capacitance = np.array(net_ground_capacitance, dtype=np.float64)
+	pairs = np.fromiter(coupling.keys(), dtype=np.int64, count=len(coupling))
+	parasitics.coupling_pairs = np.stack((pairs >> 32, pairs & 0xFFFFFFFF), axis=1)
+	parasitics.coupling_capacitance = np.fromiter(coupling.values(), dtype=np.float64, count=len(coupling))
+	parasitics.net_coupling_capacitance = np.zeros(len(net_ids), dtype=np.float64)
+	for column in (0, 1):
+		np.add.at(parasitics.net_coupling_capacitance, parasitics.coupling_pairs[:, column], parasitics.coupling_capacitance)
+	return parasitics
+
+
+def parse_parasitics(spice_path: str | PathLike, ground_nets: Iterable[str] = DEFAULT_GROUND_NETS) -> Parasitics:
+	"""streams an extracted netlist from disk, see parse_parasitics_lines"""
+	with open(spice_path, "r", errors="replace", buffering=2**20) as spice_file:
+		return parse_parasitics_lines(spice_file, ground_nets)
+
+
+def total_parasitics(spice_path: str | PathLike) -> tuple[float, float]:
+	"""(total resistance, total capacitance) of an extracted netlist, (0.0, 0.0) if the file does not exist"""
+	try:
+		parasitics = parse_parasitics(spice_path)
+	except FileNotFoundError:
+		return 0.0, 0.0
+	return parasitics.total_resistance, parasitics.total_capacitance
@@ -5,10 +5,12 @@ removing initial imports to avoid circular imports
 everythong is imported in top the __init__.py file
 
 from .comp_utils import evaluate_bbox, center_to_edge_distance, move, movex, movey, to_float, to_decimal, prec_array, prec_center, prec_ref_center, get_padding_points_cc, get_primitive_rectangle
-from .port_utils import PortTree, parse_direction, proc_angle, ports_inline, ports_parallel, rename_component_ports, rename_ports_by_list, rename_ports_by_orientation, remove_ports_with_prefix, add_ports_perimeter, get_orientation, assert_port_manhattan, assert_ports_perpindicular, set_port_orientation, set_port_width, print_ports, create_private_ports, print_port_tree_all_cells
+from .port_utils import PortTree, PortIndex, port_index, parse_direction, proc_angle, ports_inline, ports_parallel, rename_component_ports, rename_ports_by_list, rename_ports_by_orientation, remove_ports_with_prefix, add_ports_perimeter, get_orientation, assert_port_manhattan, assert_ports_perpindicular, set_port_orientation, set_port_width, print_ports, create_private_ports, print_port_tree_all_cells
 from .geometry import rectangle, rename_ports_by_orientation, prec_array, prec_ref_center
 from .snap_to_grid import component_snap_to_grid
+from .rect_array import RectArray
 from .component_array_create import get_files_with_extension, write_component_matrix
+from .gds_library import GDSLibraryWriter, read_library_index, read_library_sample
 from .print_rules import split_rule, create_ruledeck_python_dictionary_definition, visualize_ruleset
 
 
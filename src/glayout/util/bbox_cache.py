@@ -0,0 +1,179 @@
+"""
+per cell, per layer bounding box table
+
+the placement helpers (align_comp_to_port, evaluate_bbox, prec_center, ...) need the bbox of a Component or of
+a ComponentReference, often of a single layer. flattening the reference into a new cell (transformed) and
+extracting the layer copies every polygon just to read four numbers. the bbox of a reference is the bbox of its
+cell moved by the reference transformation, so the table holds the integer (database unit) bbox of each cell
+and of each of its layers and the reference transformation is applied to the cell bbox.
+generators ask for the size and center of the same child cells again and again, the Decimal values
+evaluate_bbox and prec_center derive from a bbox are computed once per distinct bbox (see box_values).
+
+usage:
+	dbbox = component_dbbox(ref, layer=pdk.get_glayer("met2"))
+	width, height = box_values(ref).size
+
+cells are identified by layout, cell index and name. only locked cells (cells finished by a cell decorator,
+which kfactory does not allow to change) are kept in the table, the bbox of an unlocked cell is read from
+klayout (which keeps the per layer bboxes of every cell up to date) on every call. entries are kept until
+clear_bbox_cache(), call it when cells are deleted (gf.clear_cache, clear_cell_cache) or a cell is unlocked,
+changed and locked again. the BoxValues table is keyed on the bbox itself and never goes stale.
+"""
+from decimal import Decimal
+from typing import Optional, Union
+
+from gdsfactory import ComponentReference
+from gdsfactory.component import Component
+from gdsfactory.pdk import get_layer_tuple
+from gdsfactory.snap import snap_to_grid
+from gdsfactory.typings import LayerSpec
+import klayout.db as kdb
+
+
+# (layout id, cell index, cell name) -> layer index (None for all layers) -> bbox in database units
+_cell_bboxes: dict[tuple[int, int, str], dict[Optional[int], kdb.Box]] = dict()
+# (bbox in database units, dbu) -> BoxValues
+_box_values: dict[tuple, "BoxValues"] = dict()
+# both tables are cleared when they grow past this many entries (e.g. during long dataset sweeps)
+MAX_ENTRIES = 2**16
+
+
+def clear_bbox_cache() -> None:
+	_cell_bboxes.clear()
+	_box_values.clear()
+
+
+def _layer_index(layout: kdb.Layout, layer: LayerSpec) -> int:
+	"""layout layer index of layer, -1 if the layout has no such layer"""
+	layer_tuple = get_layer_tuple(layer)
+	index = layout.find_layer(layer_tuple[0], layer_tuple[1])
+	return -1 if index is None else index
+
+
+def cell_ibbox(cell: kdb.Cell, layer: Optional[LayerSpec] = None) -> kdb.Box:
+	"""bbox (database units) of cell or of its shapes on layer (including all child cells), empty box if none"""
+	layout = cell.layout()
+	layer_index = None if layer is None else _layer_index(layout, layer)
+	if not cell.is_locked():
+		return _read_ibbox(cell, layer_index)
+	key = (id(layout), cell.cell_index(), cell.name)
+	boxes = _cell_bboxes.get(key)
+	if boxes is None:
+		if len(_cell_bboxes) >= MAX_ENTRIES:
+			_cell_bboxes.clear()
+		boxes = _cell_bboxes[key] = dict()
+	if layer_index not in boxes:
+		boxes[layer_index] = _read_ibbox(cell, layer_index)
+	return boxes[layer_index]
+
+
+def _read_ibbox(cell: kdb.Cell, layer_index: Optional[int]) -> kdb.Box:
+	if layer_index is None:
+		return cell.bbox()
+	if layer_index < 0:
+		return kdb.Box()
+	return cell.bbox(layer_index)
+
+
+def reference_ibbox(ref: ComponentReference, layer: Optional[LayerSpec] = None) -> Optional[kdb.Box]:
+	"""bbox (database units) of the flattened ref (of its shapes on layer)
+	returns None if ref has a complex (magnified or non manhattan) transformation
+	"""
+	instance = ref.instance
+	if instance.is_complex():
+		return None
+	box = cell_ibbox(instance.cell, layer)
+	if box.empty():
+		return box
+	trans = instance.trans
+	bbox = box.transformed(trans)
+	if instance.is_regular_array():
+		# an array covers the bboxes of its first and last element
+		last = kdb.Trans(instance.a * (instance.na - 1) + instance.b * (instance.nb - 1)) * trans
+		bbox += box.transformed(last)
+	return bbox
+
+
+def component_dbbox(custom_comp: Union[Component, ComponentReference], layer: Optional[LayerSpec] = None) -> Optional[kdb.DBox]:
+	"""um bbox of the Component or of the flattened ComponentReference (of its shapes on layer), as
+	transformed(custom_comp).extract([layer]).bbox() would return it
+	returns None if the bbox cannot be computed from the transformation of a reference
+	"""
+	if isinstance(custom_comp, ComponentReference):
+		box = reference_ibbox(custom_comp, layer)
+	else:
+		box = cell_ibbox(custom_comp.kdb_cell, layer)
+	if box is None:
+		return None
+	return box.to_dtype(custom_comp.kcl.dbu)
+
+
+class BoxValues:
+	"""a bbox and the values the placement helpers derive from it, each computed on first use
+	dbbox = um bbox (as Component.bbox() / ComponentReference.bbox() returns it)
+	size = (width, height) Decimals, as evaluate_bbox(return_decimal=True) computes them
+	correction = (x, y) Decimals, as prec_center(return_decimal=True) computes them
+	edge_distances = center_to_edge_distance by (parsed) direction
+	"""
+	__slots__ = ("dbbox", "_size", "_correction", "_float_correction", "_center", "edge_distances")
+
+	def __init__(self, dbbox: kdb.DBox):
+		self.dbbox = dbbox
+		self._size = None
+		self._correction = None
+		self._float_correction = None
+		self._center = None
+		# direction -> center_to_edge_distance
+		self.edge_distances = dict()
+
+	@property
+	def size(self) -> tuple[Decimal, Decimal]:
+		if self._size is None:
+			width = abs(Decimal(str(self.dbbox.p2.x)) - Decimal(str(self.dbbox.p1.x)))
+			height = abs(Decimal(str(self.dbbox.p2.y)) - Decimal(str(self.dbbox.p1.y)))
+			self._size = (width, height)
+		return self._size
+
+	@property
+	def correction(self) -> tuple[Decimal, Decimal]:
+		if self._correction is None:
+			correctmax = [dim/2 for dim in self.size]
+			currentmax = (Decimal(str(self.dbbox.right)), Decimal(str(self.dbbox.top)))
+			self._correction = tuple(correctmax[i] - currentmax[i] for i in range(2))
+		return self._correction
+
+	@property
+	def float_correction(self) -> tuple[float, float]:
+		"""correction as to_float returns it (floats snapped to grid)"""
+		if self._float_correction is None:
+			self._float_correction = tuple(snap_to_grid(float(value)) for value in self.correction)
+		return self._float_correction
+
+	@property
+	def center(self) -> tuple[float, float]:
+		if self._center is None:
+			center = self.dbbox.center()
+			self._center = (center.x, center.y)
+		return self._center
+
+
+def box_values(custom_comp: Union[Component, ComponentReference]) -> Optional[BoxValues]:
+	"""BoxValues of the bbox of custom_comp, None for other component like objects
+	the integer bbox comes from klayout, which keeps the bbox of every cell and applies the reference
+	transformation (and array) to it, the values are looked up by that bbox
+	"""
+	if not isinstance(custom_comp, (Component, ComponentReference)):
+		return None
+	return ibox_values(custom_comp.ibbox(), custom_comp.kcl.dbu)
+
+
+def ibox_values(ibbox: kdb.Box, dbu: float) -> BoxValues:
+	"""BoxValues of the bbox ibbox (database units dbu), for placements which are computed without a reference"""
+	key = (ibbox, dbu)
+	values = _box_values.get(key)
+	if values is None:
+		if len(_box_values) >= MAX_ENTRIES:
+			_box_values.clear()
+		values = BoxValues(key[0].to_dtype(key[1]))
+		_box_values[key] = values
+	return values
@@ -0,0 +1,191 @@
+"""
+content-addressed cache for glayout cell generators
+
+usage:
+	from glayout.util.cell_cache import cached_cell, cell_name
+
+	@cached_cell
+	def my_generator(pdk: MappedPDK, glayer: str, size: float = 1.0) -> Component:
+		comp = Component(name=cell_name("mygen"))
+		...
+
+identical calls (same pdk name, same generator, same normalized arguments) return the
+same shared Component. it is locked, so it cannot be changed by a caller (use .copy() for a mutable copy).
+"""
+from collections import OrderedDict, namedtuple
+from contextvars import ContextVar
+from decimal import Decimal
+from functools import wraps
+from typing import Any, Callable, Hashable
+import hashlib
+import inspect
+import threading
+import uuid
+
+from gdsfactory.component import Component
+from glayout.pdk.mappedpdk import MappedPDK
+from glayout.util.snap_to_grid import hierarchy_kept
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+# name suffix issued by cached_cell for the generator call currently running
+_current_cell_suffix: ContextVar[str | None] = ContextVar("glayout_cell_suffix", default=None)
+
+
+def normalize_arg(value: Any) -> Hashable:
+	"""converts a generator argument into a hashable, repr stable value
+	pdks are reduced to their name, floats/decimals are rounded to 1e-9 (well below any grid),
+	lists/tuples become tuples and dicts become sorted tuples of items
+	raises TypeError if the argument cannot be used as part of a cache key (e.g. Component, Port)
+	"""
+	if value is None or isinstance(value, (bool, int, str)):
+		return value
+	if isinstance(value, MappedPDK):
+		return ("MappedPDK", value.name)
+	if isinstance(value, (float, Decimal)):
+		return round(float(value), 9)
+	if isinstance(value, (list, tuple)):
+		return tuple(normalize_arg(element) for element in value)
+	if isinstance(value, dict):
+		return tuple(sorted((str(k), normalize_arg(v)) for k, v in value.items()))
+	raise TypeError(f"cannot build a cache key from argument of type {type(value).__name__}")
+
+
+def make_cache_key(func: Callable, signature: inspect.Signature, args: tuple, kwargs: dict) -> tuple:
+	"""returns (generator name, normalized bound arguments) for a generator call
+	defaults are applied so that f(pdk) and f(pdk, x=default) produce the same key
+	cells generated with the hierarchy kept (see snap_to_grid.keep_hierarchy) get their own keys
+	"""
+	bound = signature.bind(*args, **kwargs)
+	bound.apply_defaults()
+	normalized = tuple((name, normalize_arg(val)) for name, val in bound.arguments.items())
+	if hierarchy_kept():
+		return (f"{func.__module__}.{func.__qualname__}", normalized, "keep_hierarchy")
+	return (f"{func.__module__}.{func.__qualname__}", normalized)
+
+
+class CellCache:
+	"""size bounded LRU cache of generated Components with hit/miss counters
+	maxsize = max number of cells held (0 disables caching)
+	"""
+
+	def __init__(self, maxsize: int = 2048):
+		if maxsize < 0:
+			raise ValueError("maxsize must be a non negative int")
+		self.maxsize = maxsize
+		self.hits = 0
+		self.misses = 0
+		self._cells: OrderedDict[tuple, Component] = OrderedDict()
+		# number of times a name was handed out for a key, so regenerated (evicted) cells never reuse a name
+		self._issued: dict[str, int] = dict()
+		self._lock = threading.RLock()
+
+	@property
+	def enabled(self) -> bool:
+		return self.maxsize > 0
+
+	def get(self, key: tuple) -> Component | None:
+		with self._lock:
+			comp = self._cells.get(key)
+			if comp is None:
+				self.misses += 1
+				return None
+			self._cells.move_to_end(key)
+			self.hits += 1
+			return comp
+
+	def put(self, key: tuple, comp: Component) -> None:
+		with self._lock:
+			self._cells[key] = comp
+			self._cells.move_to_end(key)
+			while len(self._cells) > self.maxsize:
+				self._cells.popitem(last=False)
+
+	def issue_suffix(self, key: tuple) -> str:
+		"""returns a deterministic name suffix for key (a short content hash)
+		if a cell for this key was already generated and then evicted, a counter is appended
+		"""
+		digest = hashlib.sha1(repr(key).encode()).hexdigest()[:8]
+		with self._lock:
+			count = self._issued.get(digest, 0)
+			self._issued[digest] = count + 1
+		return digest if not count else f"{digest}_{count}"
+
+	def cache_info(self) -> CacheInfo:
+		with self._lock:
+			return CacheInfo(self.hits, self.misses, self.maxsize, len(self._cells))
+
+	def clear(self) -> None:
+		"""drops all cached cells and resets counters (issued names are remembered)"""
+		with self._lock:
+			self._cells.clear()
+			self.hits = 0
+			self.misses = 0
+
+
+glayout_cell_cache = CellCache()
+
+
+def _run_with_suffix(generator: Callable[..., Component], suffix: str | None, args: tuple, kwargs: dict) -> Component:
+	"""runs generator with the name suffix cell_name hands out set to suffix
+	uncached calls (suffix None) made inside a cached generator must not reuse the suffix of that generator
+	"""
+	token = _current_cell_suffix.set(suffix)
+	try:
+		return generator(*args, **kwargs)
+	finally:
+		_current_cell_suffix.reset(token)
+
+
+def cached_cell(func: Callable[..., Component] | None = None, *, cache: CellCache | None = None):
+	"""decorator which adds content-addressed caching to a cell generator
+	calls with arguments that cannot be normalized (Ports, Components, etc.) bypass the cache
+	can be used as @cached_cell or @cached_cell(cache=CellCache(maxsize=...))
+	"""
+	def decorator(generator: Callable[..., Component]) -> Callable[..., Component]:
+		signature = inspect.signature(generator)
+
+		@wraps(generator)
+		def wrapper(*args, **kwargs) -> Component:
+			_cache = cache if cache is not None else glayout_cell_cache
+			if not _cache.enabled:
+				return _run_with_suffix(generator, None, args, kwargs)
+			try:
+				key = make_cache_key(generator, signature, args, kwargs)
+			except TypeError:
+				return _run_with_suffix(generator, None, args, kwargs)
+			comp = _cache.get(key)
+			if comp is not None:
+				return comp
+			comp = _run_with_suffix(generator, _cache.issue_suffix(key), args, kwargs)
+			# the cell is shared by every caller with the same arguments
+			comp.lock()
+			_cache.put(key, comp)
+			return comp
+
+		return wrapper
+
+	if func is not None:
+		return decorator(func)
+	return decorator
+
+
+def cell_name(basename: str) -> str:
+	"""returns the name to use for the top Component of a generator
+	inside a cached_cell call this is basename + content hash, otherwise a unique uuid suffix is used
+	"""
+	suffix = _current_cell_suffix.get()
+	if suffix is None:
+		suffix = uuid.uuid4().hex[:6]
+	return f"{basename}_{suffix}"
+
+
+def cell_cache_info() -> CacheInfo:
+	"""hits, misses, maxsize, currsize of the default glayout cell cache"""
+	return glayout_cell_cache.cache_info()
+
+
+def clear_cell_cache() -> None:
+	"""clears the default glayout cell cache (call this wherever gf.clear_cache() is called)"""
+	glayout_cell_cache.clear()
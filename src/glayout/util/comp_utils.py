@@ -8,10 +8,12 @@ from gdsfactory.typings import Port, LayerSpec
 from gdsfactory.port import move_copy
 from typing import Callable, Union, Iterable
 from decimal import Decimal
+import klayout.db as kdb
 # from gdsfactory.functions import transformed
 # from gdsfactory.functions import move as __gf_move
 from glayout.pdk.mappedpdk import MappedPDK
 from .port_utils import add_ports_perimeter, rename_ports_by_list, parse_direction
+from .bbox_cache import box_values, component_dbbox
 import uuid
 
 def transformed(ref: ComponentReference) -> Component:
@@ -35,9 +37,16 @@ def transformed(ref: ComponentReference) -> Component:
 #@validate_arguments
 def evaluate_bbox(custom_comp: Union[Component, ComponentReference], return_decimal: bool | None = False, padding: float=0) -> tuple[Union[float,Decimal],Union[float,Decimal]]:
 	"""returns the length and height of a component like object"""
-	compbbox = custom_comp.bbox()
-	width = abs(Decimal(str(compbbox.p2.x)) - Decimal(str(compbbox.p1.x))) + 2*Decimal(str(padding))
-	height = abs(Decimal(str(compbbox.p2.y)) - Decimal(str(compbbox.p1.y))) + 2*Decimal(str(padding))
+	values = box_values(custom_comp)
+	if values is not None:
+		# Decimal size of this bbox from the bbox cache
+		width, height = values.size
+		width += 2*Decimal(str(padding))
+		height += 2*Decimal(str(padding))
+	else:
+		compbbox = custom_comp.bbox()
+		width = abs(Decimal(str(compbbox.p2.x)) - Decimal(str(compbbox.p1.x))) + 2*Decimal(str(padding))
+		height = abs(Decimal(str(compbbox.p2.y)) - Decimal(str(compbbox.p1.y))) + 2*Decimal(str(padding))
 	if return_decimal:
 		return (width,height)
 	return (float(width),float(height))
@@ -53,10 +62,13 @@ def center_to_edge_distance(custom_comp: Union[Component, ComponentReference], d
 	Returns:
 		float: absolute distance between custom_comp center and N,S,E, or W edge
 	"""
-	compbbox = custom_comp.bbox()
-	#center = prec_center(custom_comp)
-	center = custom_comp.center
+	values = box_values(custom_comp)
 	direction = parse_direction(direction)
+	if values is not None and direction in values.edge_distances:
+		return values.edge_distances[direction]
+	compbbox = values.dbbox if values is not None else custom_comp.bbox()
+	#center = prec_center(custom_comp)
+	center = values.center if values is not None else custom_comp.center
 	if direction==1:# West edge
 		distance = center[0] - compbbox.p1.x
 	elif direction==2:# North edge
@@ -67,7 +79,10 @@ def center_to_edge_distance(custom_comp: Union[Component, ComponentReference], d
 		distance = center[1] - compbbox.p1.y
 	else:
 		raise ValueError("unknown error with direction in function center_to_edge_distance (comp_utils)")
-	return snap_to_grid(abs(distance),2)
+	distance = snap_to_grid(abs(distance),2)
+	if values is not None:
+		values.edge_distances[direction] = distance
+	return distance
 
 #@validate_arguments
 def move(custom_comp: Union[Port, ComponentReference, Component], offsetxy: tuple[float,float] = (0,0), destination: tuple[float,float] | None = None, layer: tuple[int,int] | None = None) -> Union[Port, ComponentReference, Component]:
@@ -149,15 +164,32 @@ def align_comp_to_port(
 	layer = extract this layer from the component and aligns to this layer.
 	rtr_comp_ref = will return a component reference if set true, else return component
 	"""
-	# find center and bbox
-	if isinstance(custom_comp, ComponentReference):
+	# find center and bbox (from the cell bbox table and the reference transformation, without flattening)
+	cbbox = component_dbbox(custom_comp, layer if layer else None)
+	if cbbox is None:
 		comp_type = transformed(custom_comp)
+		if layer:
+			comp_type = comp_type.extract([layer])
+		cbbox = comp_type.bbox()
+	xmov, ymov = alignment_offset(cbbox, align_to, alignment)
+	# make reference type, execute move
+	if isinstance(custom_comp, Component):
+		# In GDSFactory v9, use << operator to create ComponentReference
+		_temp = Component(name=f"temp_{uuid.uuid4().hex[:6]}")
+		comp_ref = _temp << custom_comp
+	else:
+		comp_ref = custom_comp
+	comp_ref.movex(xmov).movey(ymov)
+	# make correct type and return
+	if rtr_comp_ref:
+		return comp_ref
 	else:
-		comp_type = custom_comp
-	if layer:
-		comp_type = comp_type.extract([layer])
-	cbbox = comp_type.bbox()
-	ccenter = comp_type.center
+		return transformed(comp_ref)
+
+
+def alignment_offset(cbbox: kdb.DBox, align_to: Port, alignment: tuple[str | None, str | None] | None = None) -> tuple[float, float]:
+	"""(x, y) move which aligns a component with the um bbox cbbox to align_to, see align_comp_to_port"""
+	ccenter = (cbbox.center().x, cbbox.center().y)
 	# setup
 	# xdim = abs(cbbox[1][0] - cbbox[0][0])
 	# ydim = abs(cbbox[1][1] - cbbox[0][1])
@@ -210,19 +242,7 @@ def align_comp_to_port(
 		ymov = y_movcenter
 	else:
 		raise ValueError("please specify valid y alignment of t/b/c/None")
-	# make reference type, execute move
-	if isinstance(custom_comp, Component):
-		# In GDSFactory v9, use << operator to create ComponentReference
-		_temp = Component(name=f"temp_{uuid.uuid4().hex[:6]}")
-		comp_ref = _temp << custom_comp
-	else:
-		comp_ref = custom_comp
-	comp_ref.movex(xmov).movey(ymov)
-	# make correct type and return
-	if rtr_comp_ref:
-		return comp_ref
-	else:
-		return transformed(comp_ref)
+	return xmov, ymov
 
 
 #@validate_arguments
@@ -289,6 +309,10 @@ def prec_center(custom_comp: Union[Component,ComponentReference], return_decimal
 	use this function which will return the correct offset to center a component
 	returns (x,y) corrections
 	if return_decimal=True, return in Decimal, otherwise return float"""
+	values = box_values(custom_comp)
+	if values is not None:
+		# corrections of this bbox from the bbox cache
+		return list(values.correction) if return_decimal else list(values.float_correction)
 	correctmax = [dim/2 for dim in evaluate_bbox(custom_comp, True)]
 	currentmax = to_decimal((custom_comp.xmax,custom_comp.ymax))
 	correctionxy = [correctmax[i] - currentmax[i] for i in range(2)]
@@ -0,0 +1,301 @@
+"""
+opt-in persistent (on disk) cache for glayout primitive generators
+
+the cache is a directory of GDS files, each with a JSON sidecar holding the top cell name, ports and info.
+it is disabled unless the GLAYOUT_DISK_CACHE environment variable is set to a directory or enable_disk_cache() is called
+GLAYOUT_DISK_CACHE_MAX_MB sets the size cap (default 1024), least recently used entries are evicted above the cap
+only generators of leaf cells can be cached: a Netlist with sub netlists in component.info is rejected (ValueError)
+
+usage:
+	from glayout.util.disk_cache import disk_cached_cell
+
+	@disk_cached_cell
+	@gf.cell
+	def my_generator(pdk: MappedPDK, size: float = 1.0) -> Component:
+		...
+
+entries are keyed on glayout version, pdk name and content (see pdk_digest), generator name, the normalized arguments
+(see cell_cache.normalize_arg) and the hierarchy mode (see snap_to_grid.keep_hierarchy). Several processes can
+share a cache directory: files are written to a temporary name and renamed into place, and the sidecar is renamed
+last so readers never see a partial entry.
+"""
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable
+import hashlib
+import importlib.metadata
+import inspect
+import json
+import os
+import threading
+import uuid
+
+from gdsfactory.component import Component
+from gdsfactory.read.import_gds import import_gds
+from glayout.pdk.mappedpdk import MappedPDK
+from glayout.spice import Netlist
+from glayout.util.cell_cache import CacheInfo, make_cache_key
+
+
+# bump when the sidecar format changes
+_SIDECAR_FORMAT = 1
+
+
+def _glayout_version() -> str:
+	"""version of the installed glayout distribution (glayout.__version__ when running from a source tree)"""
+	try:
+		return importlib.metadata.version("glayout")
+	except importlib.metadata.PackageNotFoundError:
+		pass
+	try:
+		from glayout import __version__
+		return str(__version__)
+	except ImportError:
+		return "unknown"
+
+
+def _info_to_json(info: Any) -> dict:
+	"""converts component.info into json, Netlist objects are stored as tagged dicts
+	raises ValueError for a Netlist with sub netlists, only leaf netlists can be stored
+	"""
+	serialized = dict()
+	for key, value in dict(info).items():
+		if isinstance(value, Netlist):
+			if value.sub_netlists:
+				raise ValueError(
+					f"cannot store netlist {value.circuit_name} with sub netlists in the disk cache, "
+					"only generators of leaf cells (whose netlist has no sub netlists) can use disk_cached_cell"
+				)
+			value = {
+				"__netlist__": True,
+				"circuit_name": value.circuit_name,
+				"nodes": value.nodes,
+				"source_netlist": value.source_netlist,
+				"instance_format": value.instance_format,
+				"parameters": value.parameters,
+			}
+		serialized[key] = value
+	return serialized
+
+
+def _info_from_json(serialized: dict) -> dict:
+	info = dict()
+	for key, value in serialized.items():
+		if isinstance(value, dict) and value.get("__netlist__"):
+			value = Netlist(
+				source_netlist=value["source_netlist"],
+				nodes=value["nodes"],
+				circuit_name=value["circuit_name"],
+				instance_format=value["instance_format"],
+				parameters=value["parameters"],
+			)
+		info[key] = value
+	return info
+
+
+def _port_to_json(port) -> dict:
+	layer_info = port.layer_info
+	return {
+		"name": port.name,
+		"center": [float(port.center[0]), float(port.center[1])],
+		"width": float(port.width),
+		"orientation": float(port.orientation),
+		"layer": [int(layer_info.layer), int(layer_info.datatype)],
+		"port_type": port.port_type,
+	}
+
+
+# (id(pdk), id(rule table), id(glayers), glayers version) -> digest, see pdk_digest
+_pdk_digests: dict[tuple, str] = dict()
+
+
+def pdk_digest(pdk: MappedPDK) -> str:
+	"""hash of the content of pdk which generators read: the compiled rule table, the glayers mapping (and the
+	layers it resolves to) and the grid. the digest is recomputed when grules or glayers are reassigned or changed
+	(call pdk.compile_grules() after mutating grules in place)
+	"""
+	version = (id(pdk), id(pdk._grule_table), id(pdk.glayers), getattr(pdk.glayers, "version", None))
+	digest = _pdk_digests.get(version)
+	if digest is None:
+		rules = sorted((pair, sorted((rule, repr(value)) for rule, value in table.items())) for pair, table in pdk._grule_table.items())
+		glayers = sorted((glayer, repr(mapping), repr(tuple(pdk.get_glayer(glayer)))) for glayer, mapping in pdk.glayers.items())
+		digest = hashlib.sha256(repr((rules, glayers, pdk.grid_size)).encode()).hexdigest()
+		_pdk_digests[version] = digest
+	return digest
+
+
+class DiskCellCache:
+	"""size capped directory of GDS + JSON entries with LRU eviction (by sidecar mtime)
+	path = cache directory (created if it does not exist)
+	max_bytes = total size cap of the directory
+	"""
+
+	def __init__(self, path: str | Path, max_bytes: int = 1024 * 2**20):
+		if max_bytes <= 0:
+			raise ValueError("max_bytes must be a positive int")
+		self.path = Path(path).expanduser().resolve()
+		self.path.mkdir(parents=True, exist_ok=True)
+		self.max_bytes = max_bytes
+		self.hits = 0
+		self.misses = 0
+		self._lock = threading.Lock()
+
+	def make_key(self, generator: Callable, signature: inspect.Signature, args: tuple, kwargs: dict) -> str:
+		"""returns a stable hex digest for a generator call, raises TypeError if arguments cannot be normalized"""
+		bound = signature.bind(*args, **kwargs)
+		pdks = [value for value in bound.arguments.values() if isinstance(value, MappedPDK)]
+		pdk_ids = [(pdk.name, pdk_digest(pdk)) for pdk in pdks]
+		key = (_SIDECAR_FORMAT, _glayout_version(), pdk_ids, make_cache_key(generator, signature, args, kwargs))
+		return hashlib.sha256(repr(key).encode()).hexdigest()
+
+	def _entry_paths(self, key: str) -> tuple[Path, Path]:
+		return self.path / f"{key}.gds", self.path / f"{key}.json"
+
+	def get(self, key: str) -> Component | None:
+		"""loads the cached component for key, returns None on a miss (or unreadable entry)"""
+		gds_path, json_path = self._entry_paths(key)
+		try:
+			sidecar = json.loads(json_path.read_text())
+			component = import_gds(gds_path, cellname=sidecar["cellname"])
+		except (OSError, ValueError, KeyError):
+			with self._lock:
+				self.misses += 1
+			return None
+		# gds metadata may already have restored some ports
+		existing_ports = set(port.name for port in component.ports)
+		for port in sidecar["ports"]:
+			if port["name"] in existing_ports:
+				continue
+			component.add_port(
+				name=port["name"],
+				center=tuple(port["center"]),
+				width=port["width"],
+				orientation=port["orientation"],
+				layer=tuple(port["layer"]),
+				port_type=port["port_type"],
+			)
+		for info_key, value in _info_from_json(sidecar["info"]).items():
+			component.info[info_key] = value
+		# mark entry as recently used
+		try:
+			os.utime(json_path)
+		except OSError:
+			pass
+		with self._lock:
+			self.hits += 1
+		return component
+
+	def put(self, key: str, component: Component) -> None:
+		"""writes component to the cache (gds first, then sidecar) and evicts old entries if over the size cap
+		raises ValueError if the component info cannot be stored without losing data (see _info_to_json)
+		"""
+		gds_path, json_path = self._entry_paths(key)
+		sidecar = {
+			"format": _SIDECAR_FORMAT,
+			"cellname": component.name,
+			"ports": [_port_to_json(port) for port in component.ports],
+			"info": _info_to_json(component.info),
+		}
+		tmp_tag = f"{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+		tmp_gds = self.path / f"{key}.{tmp_tag}.gds"
+		tmp_json = self.path / f"{key}.{tmp_tag}.json"
+		try:
+			component.write_gds(tmp_gds)
+			os.replace(tmp_gds, gds_path)
+			tmp_json.write_text(json.dumps(sidecar))
+			os.replace(tmp_json, json_path)
+		except (OSError, TypeError, ValueError):
+			# the cache is best effort, a failed write only costs a regeneration later
+			for tmp_path in (tmp_gds, tmp_json):
+				tmp_path.unlink(missing_ok=True)
+			return
+		self.evict()
+
+	def evict(self) -> None:
+		"""removes least recently used entries until the directory is below max_bytes"""
+		entries = dict()
+		total = 0
+		for entry in self.path.iterdir():
+			try:
+				stat = entry.stat()
+			except FileNotFoundError:
+				continue
+			total += stat.st_size
+			if entry.name.endswith(".tmp.gds") or entry.name.endswith(".tmp.json"):
+				continue
+			key = entry.name.rsplit(".", 1)[0]
+			size, mtime = entries.get(key, (0, 0.0))
+			# sidecars are touched on every hit, so they carry the last use time
+			entries[key] = (size + stat.st_size, stat.st_mtime if entry.suffix == ".json" else mtime)
+		if total <= self.max_bytes:
+			return
+		for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+			gds_path, json_path = self._entry_paths(key)
+			# remove the sidecar first so readers never find a sidecar without its gds
+			json_path.unlink(missing_ok=True)
+			gds_path.unlink(missing_ok=True)
+			total -= size
+			if total <= self.max_bytes:
+				break
+
+	def cache_info(self) -> CacheInfo:
+		currsize = len(list(self.path.glob("*.json")))
+		with self._lock:
+			return CacheInfo(self.hits, self.misses, self.max_bytes, currsize)
+
+	def clear(self) -> None:
+		"""removes every entry in the cache directory"""
+		for entry in self.path.iterdir():
+			if entry.suffix in (".gds", ".json"):
+				entry.unlink(missing_ok=True)
+		with self._lock:
+			self.hits = 0
+			self.misses = 0
+
+
+def _cache_from_environment() -> DiskCellCache | None:
+	path = os.environ.get("GLAYOUT_DISK_CACHE")
+	if not path:
+		return None
+	max_mb = int(os.environ.get("GLAYOUT_DISK_CACHE_MAX_MB", "1024"))
+	return DiskCellCache(path, max_bytes=max_mb * 2**20)
+
+
+glayout_disk_cache: DiskCellCache | None = _cache_from_environment()
+
+
+def enable_disk_cache(path: str | Path, max_bytes: int = 1024 * 2**20) -> DiskCellCache:
+	"""turns on the persistent cache for all disk_cached_cell generators in this process"""
+	global glayout_disk_cache
+	glayout_disk_cache = DiskCellCache(path, max_bytes=max_bytes)
+	return glayout_disk_cache
+
+
+def disable_disk_cache() -> None:
+	global glayout_disk_cache
+	glayout_disk_cache = None
+
+
+def disk_cached_cell(generator: Callable[..., Component]) -> Callable[..., Component]:
+	"""decorator which loads a generator result from the persistent cache if it is enabled
+	calls with arguments that cannot be normalized (Ports, Components, etc.) bypass the cache
+	"""
+	signature = inspect.signature(generator)
+
+	@wraps(generator)
+	def wrapper(*args, **kwargs) -> Component:
+		cache = glayout_disk_cache
+		if cache is None:
+			return generator(*args, **kwargs)
+		try:
+			key = cache.make_key(generator, signature, args, kwargs)
+		except TypeError:
+			return generator(*args, **kwargs)
+		component = cache.get(key)
+		if component is not None:
+			return component
+		component = generator(*args, **kwargs)
+		cache.put(key, component)
+		return component
+
+	return wrapper
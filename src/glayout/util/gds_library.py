@@ -0,0 +1,180 @@
+"""
+bulk GDS writer for datasets of many generated components (e.g. ATLAS sweeps)
+
+samples are copied into one GDS library, or into shards of shard_size samples each. identical cells (same content
+hash of shapes and instances, whatever their names) are stored once per library, so the primitives all samples
+share are written once instead of once per sample. each written sample is appended to an index next to the
+libraries (JSON lines: sample_id, gds, top_cell), see read_library_index and read_library_sample.
+the library holds geometry only, gdsfactory meta data (ports, info) of the samples is not written.
+
+usage:
+	with GDSLibraryWriter("dataset/library.gds", shard_size=1000) as writer:
+		for sample_id, comp in samples:
+			writer.add(sample_id, comp)
+"""
+from pathlib import Path
+from typing import Any, Optional, Union
+import hashlib
+import json
+
+from gdsfactory.component import Component
+from gdsfactory.read.import_gds import import_gds
+import klayout.db as kdb
+
+
+class GDSLibraryWriter:
+	"""writes samples (Components, KLayout cells or GDS files) into deduplicated GDS libraries
+	path: the library file, with shard_size the shards are written to <stem>_0000<suffix>, <stem>_0001<suffix>, ...
+	shard_size: number of samples per library (None writes a single library)
+	the index is written to <stem>_index.jsonl, a shard and its index entries are written when the shard is full
+	or on flush/close
+	"""
+
+	def __init__(self, path: Union[str, Path], shard_size: Optional[int] = None):
+		if shard_size is not None and shard_size < 1:
+			raise ValueError("shard_size must be at least 1")
+		self.path = Path(path)
+		self.shard_size = shard_size
+		self.index_path = self.path.with_name(f"{self.path.stem}_index.jsonl")
+		self.shard = 0
+		self.samples_written = 0
+		self.cells_written = 0
+		self.cells_deduplicated = 0
+		# continue after the shards already written (e.g. by an earlier run of a resumed sweep)
+		while self.shard_size is not None and self.library_path().exists():
+			self.shard += 1
+		self._new_library()
+
+	def _new_library(self) -> None:
+		self.layout = None
+		self._entries = list()
+		self._cells_by_hash = dict()
+		self._layers = dict()
+
+	def library_path(self) -> Path:
+		"""path of the library samples are currently added to"""
+		if self.shard_size is None:
+			return self.path
+		return self.path.with_name(f"{self.path.stem}_{self.shard:04d}{self.path.suffix}")
+
+	def _layer(self, info: kdb.LayerInfo) -> int:
+		key = (info.layer, info.datatype, info.name)
+		if key not in self._layers:
+			self._layers[key] = self.layout.layer(info)
+		return self._layers[key]
+
+	@staticmethod
+	def _cell_hash(cell: kdb.Cell, hashes: dict[int, str]) -> str:
+		"""content hash of cell: shapes per layer and the (hashes of the) instantiated cells with their placement"""
+		if cell.cell_index() in hashes:
+			return hashes[cell.cell_index()]
+		layout = cell.layout()
+		digest = hashlib.blake2b(digest_size=16)
+		for layer_index in layout.layer_indexes():
+			shapes = cell.shapes(layer_index)
+			if shapes.is_empty():
+				continue
+			info = layout.get_info(layer_index)
+			digest.update(f"layer {info.layer}/{info.datatype}\n".encode())
+			# sorted so the hash does not depend on the insertion order of the shapes
+			digest.update("\n".join(sorted(str(shape) for shape in shapes.each())).encode())
+		children = list()
+		for inst in cell.each_inst():
+			child = GDSLibraryWriter._cell_hash(inst.cell, hashes)
+			children.append(f"{child} {inst.dcplx_trans} {inst.a} {inst.b} {inst.na} {inst.nb}")
+		digest.update("\n".join(sorted(children)).encode())
+		hashes[cell.cell_index()] = digest.hexdigest()
+		return hashes[cell.cell_index()]
+
+	def _copy_cell(self, cell: kdb.Cell, hashes: dict[int, str]) -> int:
+		"""library cell index of cell, copies cell (and its children) unless an identical cell is in the library"""
+		content = self._cell_hash(cell, hashes)
+		if content in self._cells_by_hash:
+			self.cells_deduplicated += 1
+			return self._cells_by_hash[content]
+		target = self.layout.cell(self.layout.add_cell(self.layout.unique_cell_name(cell.name)))
+		layout = cell.layout()
+		for layer_index in layout.layer_indexes():
+			if not cell.shapes(layer_index).is_empty():
+				target.shapes(self._layer(layout.get_info(layer_index))).insert(cell.shapes(layer_index))
+		for inst in cell.each_inst():
+			array = inst.cell_inst
+			array.cell_index = self._copy_cell(inst.cell, hashes)
+			target.insert(array)
+		self._cells_by_hash[content] = target.cell_index()
+		self.cells_written += 1
+		return target.cell_index()
+
+	def add(self, sample_id: Any, cell: Union[Component, kdb.Cell]) -> str:
+		"""copies the sample (a Component or a KLayout cell) into the library, returns its top cell name in the library
+		sample_id must be JSON serializable, it is written to the index as is
+		"""
+		if isinstance(cell, Component):
+			cell.insert_vinsts()
+			cell = cell.kdb_cell
+		if self.layout is None:
+			self.layout = kdb.Layout()
+			self.layout.dbu = cell.layout().dbu
+		elif cell.layout().dbu != self.layout.dbu:
+			raise ValueError(f"sample {sample_id} has dbu {cell.layout().dbu}, the library has dbu {self.layout.dbu}")
+		top_cell = self.layout.cell(self._copy_cell(cell, dict())).name
+		self._entries.append({"sample_id": sample_id, "gds": self.library_path().name, "top_cell": top_cell})
+		if self.shard_size is not None and len(self._entries) >= self.shard_size:
+			self.flush()
+		return top_cell
+
+	def add_gds(self, sample_id: Any, gdspath: Union[str, Path]) -> str:
+		"""reads the GDS file gdspath and adds its top cell as the sample, see add"""
+		layout = kdb.Layout()
+		layout.read(str(gdspath))
+		top_cells = layout.top_cells()
+		if len(top_cells) != 1:
+			raise ValueError(f"{gdspath} has {len(top_cells)} top cells, expected 1")
+		return self.add(sample_id, top_cells[0])
+
+	def flush(self) -> None:
+		"""writes the current library and appends its new samples to the index, with shards the next sample starts a new shard"""
+		if not self._entries:
+			return
+		self.library_path().parent.mkdir(parents=True, exist_ok=True)
+		self.layout.write(str(self.library_path()))
+		with open(self.index_path, "a") as index_file:
+			for entry in self._entries:
+				index_file.write(json.dumps(entry) + "\n")
+		self.samples_written += len(self._entries)
+		if self.shard_size is not None:
+			self.shard += 1
+			self._new_library()
+		else:
+			# a single library keeps its cells, the next flush rewrites it including the samples added since
+			self._entries = list()
+
+	def close(self) -> None:
+		self.flush()
+
+	def __enter__(self) -> "GDSLibraryWriter":
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback) -> None:
+		self.close()
+
+
+def read_library_index(index_path: Union[str, Path]) -> dict[Any, dict]:
+	"""sample_id -> {"gds": absolute library path, "top_cell": top cell name} from an index written by GDSLibraryWriter
+	later entries of a sample_id overwrite earlier ones
+	"""
+	index_path = Path(index_path)
+	index = dict()
+	with open(index_path) as index_file:
+		for line in index_file:
+			if not line.strip():
+				continue
+			entry = json.loads(line)
+			index[entry["sample_id"]] = {"gds": index_path.parent / entry["gds"], "top_cell": entry["top_cell"]}
+	return index
+
+
+def read_library_sample(index_path: Union[str, Path], sample_id: Any) -> Component:
+	"""imports the top cell of sample_id from its library as a Component"""
+	entry = read_library_index(index_path)[sample_id]
+	return import_gds(entry["gds"], cellname=entry["top_cell"])
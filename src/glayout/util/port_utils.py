@@ -103,6 +103,204 @@ def ports_inline(edge1: Port, edge2: Port, abstolerance: float=0.1) -> bool:
 
 
 
+def _port_names(custom_comp: Union[Component, ComponentReference]) -> list[str]:
+	"""names of all ports in port order, read from the port bases when possible (no Port objects are created)"""
+	ports = custom_comp.ports
+	bases = getattr(ports, "bases", None)
+	if bases is not None:
+		return [base.name for base in bases]
+	return [port.name for port in ports]
+
+
+class PortIndex:
+	"""prefix index (trie) over the port names of a component
+	like PortTree, \"_\" separates the levels of the trie, e.g. "A_source_W" is stored as A -> source -> W
+	prefix queries walk the trie instead of testing every port name, and renames / removals are applied to the
+	component in place (no copy) while the trie is updated incrementally
+
+	use port_index(custom_comp) to get the index attached to a component, it is rebuilt only when the
+	port names changed since it was built
+	lazy = only store names and positions, Port objects are created when they are first accessed
+	"""
+
+	#@validate_arguments
+	def __init__(self, custom_comp: Union[Component, ComponentReference], lazy: bool = False):
+		self.component = custom_comp
+		self.lazy = lazy
+		self.names = _port_names(custom_comp)
+		# trie with the same layout as PortTree.tree, a path is a port if its joined name is in self.positions
+		self.tree = dict()
+		self.positions = dict()
+		self._index_positions()
+		for name in self.positions:
+			self._insert(name)
+		self._ports = dict()
+		if not lazy:
+			self._materialize()
+
+	def _index_positions(self) -> None:
+		# first port wins for duplicate names, like Component.ports[name]
+		self.positions = dict()
+		for position, name in enumerate(self.names):
+			self.positions.setdefault(name, position)
+
+	def _materialize(self) -> None:
+		ports = list(self.component.ports)
+		self._ports = {name: ports[position] for name, position in self.positions.items()}
+
+	def _insert(self, name: str) -> None:
+		node = self.tree
+		for segment in name.split("_"):
+			node = node.setdefault(segment, {})
+
+	def _discard(self, name: str) -> None:
+		"""removes the trie path of name, keeping the nodes other ports still go through"""
+		segments = name.split("_")
+		nodes = [self.tree]
+		for segment in segments:
+			node = nodes[-1].get(segment)
+			if node is None:
+				# already pruned together with a longer name
+				return
+			nodes.append(node)
+		for depth in range(len(segments), 0, -1):
+			if nodes[depth] or "_".join(segments[:depth]) in self.positions:
+				break
+			del nodes[depth - 1][segments[depth - 1]]
+
+	def __len__(self) -> int:
+		return len(self.names)
+
+	def __contains__(self, name: str) -> bool:
+		return name in self.positions
+
+	def __iter__(self):
+		return iter(self.names)
+
+	def __getitem__(self, name: str) -> Port:
+		port = self._ports.get(name)
+		if port is None:
+			try:
+				port = self.component.ports[self.positions[name]]
+			except KeyError:
+				raise KeyError("name "+str(name)+" not in component ports") from None
+			self._ports[name] = port
+		return port
+
+	def items(self):
+		"""(name, Port) for every uniquely named port in port order"""
+		return ((name, self[name]) for name in self.positions)
+
+	def is_valid(self) -> bool:
+		"""True if the ports of the component still have the names this index was built with"""
+		return _port_names(self.component) == self.names
+
+	def names_with_prefix(self, prefix: str) -> list[str]:
+		"""names of all ports which begin with prefix, in port order
+		O(length of prefix + number of matches) trie walk, only the children of the last (partial) level are scanned
+		"""
+		if not prefix:
+			return list(self.positions)
+		segments = prefix.split("_")
+		node = self.tree
+		for segment in segments[:-1]:
+			node = node.get(segment)
+			if node is None:
+				return []
+		base = "_".join(segments[:-1])
+		base = base + "_" if len(segments) > 1 else ""
+		matches = list()
+		stack = [(base + segment, child) for segment, child in node.items() if segment.startswith(segments[-1])]
+		while stack:
+			name, node = stack.pop()
+			if name in self.positions:
+				matches.append(name)
+			stack.extend((name + "_" + segment, child) for segment, child in node.items())
+		return sorted(matches, key=self.positions.__getitem__)
+
+	def ports_with_prefix(self, prefix: str) -> list[Port]:
+		"""Port objects of names_with_prefix(prefix)"""
+		return [self[name] for name in self.names_with_prefix(prefix)]
+
+	def rename(self, rename_map: dict[str, str]) -> None:
+		"""renames ports of the component in place, rename_map = old name -> new name (all ports named old are renamed)
+		raises KeyError if an old name is not a port
+		"""
+		for old_name in rename_map:
+			if old_name not in self.positions:
+				raise KeyError("name "+str(old_name)+" not in component ports")
+		ports = self.component.ports
+		bases = getattr(ports, "bases", None)
+		for position, name in enumerate(self.names):
+			new_name = rename_map.get(name, name)
+			if new_name == name:
+				continue
+			if bases is not None:
+				bases[position].name = new_name
+			else:
+				ports[position].name = new_name
+			self.names[position] = new_name
+		# update the trie: drop the old names first, new names may reuse them
+		renamed = [old_name for old_name, new_name in rename_map.items() if old_name != new_name]
+		if not renamed:
+			return
+		for old_name in renamed:
+			del self.positions[old_name]
+		for old_name in renamed:
+			self._discard(old_name)
+		for new_name in set(rename_map[old_name] for old_name in renamed) - self.positions.keys():
+			self._insert(new_name)
+		self._index_positions()
+		self._ports = dict()
+		if not self.lazy:
+			self._materialize()
+
+	def remove(self, names: list[str]) -> None:
+		"""removes all ports with one of names from the component in place"""
+		names = set(names)
+		if not names:
+			return
+		self._keep([position for position, name in enumerate(self.names) if name not in names])
+
+	def remove_duplicates(self) -> None:
+		"""removes every port whose name is already used by an earlier port"""
+		if len(self.positions) != len(self.names):
+			self._keep(sorted(self.positions.values()))
+
+	def _keep(self, keep: list[int]) -> None:
+		removed = set(self.names) - set(self.names[position] for position in keep)
+		ports = list(self.component.ports)
+		self.component.ports = [ports[position] for position in keep]
+		for name in removed:
+			if self.positions.pop(name, None) is not None:
+				self._discard(name)
+		self.names = [self.names[position] for position in keep]
+		self._index_positions()
+		self._ports = dict()
+		if not self.lazy:
+			self._materialize()
+
+
+def port_index(custom_comp: Union[Component, ComponentReference], lazy: bool = False) -> PortIndex:
+	"""returns the PortIndex attached to custom_comp, (re)building it if there is none or the port names changed
+	the port names are compared on every call (one pass over the port names, no Port objects are created)
+	"""
+	index = getattr(custom_comp, "_glayout_port_index", None)
+	if index is not None and index.lazy == lazy and index.component is custom_comp and index.is_valid():
+		return index
+	index = PortIndex(custom_comp, lazy=lazy)
+	try:
+		custom_comp._glayout_port_index = index
+	except AttributeError:
+		pass
+	return index
+
+
+def _renamable_in_place(custom_comp: Union[Component, ComponentReference]) -> bool:
+	"""unlocked Components are renamed in place, locked (cached) cells and references need a copy"""
+	return isinstance(custom_comp, Component) and not getattr(custom_comp, "locked", False)
+
+
 #@validate_arguments
 def rename_component_ports(custom_comp: Union[Component, ComponentReference], rename_function: Callable[[str, Port], str]) -> Union[Component, ComponentReference]:
 	"""uses rename_function(str, Port) -> str to decide which ports to rename.
@@ -111,29 +309,21 @@ def rename_component_ports(custom_comp: Union[Component, ComponentReference], re
 	rename_function should raise error if custom requirments for rename are not met
 	if you want to pass additional args to rename_function, implement a functor
 	custom_comp is the components to modify. the modified component is returned
+	unlocked Components are modified in place (and returned), locked cells are copied first
 	"""
-	names_to_modify = list()
-	ports = custom_comp.ports.get_all_named()
-	renamed_comp = custom_comp.copy()
-	renamed_comp.ports.clear() 
+	renamed_comp = custom_comp if _renamable_in_place(custom_comp) else custom_comp.copy()
+	index = port_index(renamed_comp, lazy=True)
+	# a renamed component has one port per name
+	index.remove_duplicates()
 	# find ports and get new names
-	# for pname, pobj in custom_comp.ports.items():
-	for pname in ports.keys():
-		# pname, pobj 
+	rename_map = dict()
+	for pname, pobj in index.items():
 		# error checking
-		pobj = ports[pname]
 		if not pname == pobj.name:
 			raise ValueError("component may have an invalid ports dict")
-		new_name = rename_function(pname, pobj)
-		names_to_modify.append((pname,new_name))
+		rename_map[pname] = rename_function(pname, pobj)
 	# modify names
-	for namepair in names_to_modify:
-		if namepair[0] in ports.keys():
-			portobj =  custom_comp.ports[namepair[0]]
-			portobj.name = namepair[1]
-			renamed_comp.ports.add_port(name= namepair[1], port=portobj)
-		else:
-			raise KeyError("name "+str(namepair[0])+" not in component ports")
+	index.rename(rename_map)
 	# returns modified component/component ref
 	return renamed_comp
 
@@ -200,15 +390,12 @@ def rename_ports_by_list(custom_comp: Component, replace_list: list[tuple[str,st
     return rename_component_ports(custom_comp, rename_func)
 
 def remove_ports_with_prefix(custom_comp: Component, prefix: str) -> Component:
-	"""remove all ports in custom_comp which begin with prefix"""
-	# determine which ports to remove
-	remove_list = list()
-	for prt in custom_comp.ports.keys():
-		if prt.startswith(prefix):
-			remove_list.append(prt)
-	# remove the ports
-	for prt in remove_list:
-		custom_comp.ports.pop(prt)
+	"""remove all ports in custom_comp which begin with prefix
+	unlocked Components are modified in place (and returned), locked cells are copied first
+	"""
+	custom_comp = custom_comp if _renamable_in_place(custom_comp) else custom_comp.copy()
+	index = port_index(custom_comp, lazy=True)
+	index.remove(index.names_with_prefix(prefix))
 	return custom_comp
 
 #@validate_arguments
@@ -321,16 +508,28 @@ def set_port_orientation(custom_comp: Port, orientation: Union[float, int, str],
 #@validate_arguments
 def set_port_width(custom_comp: Port, width: float) -> Port:
 	"""creates a new port with the desired width and returns the new port"""
+	# In GDSFactory v9, ports have no parent or shear_angle and the cross_section is made from width and layer
 	newport = Port(
 		name = custom_comp.name,
-		center = custom_comp.center,
-		orientation = custom_comp.orientation,
-		parent = custom_comp.parent,
+		dcplx_trans = custom_comp.dcplx_trans,
 		port_type = custom_comp.port_type,
-		cross_section = custom_comp.cross_section,
-		shear_angle = custom_comp.shear_angle,
 		layer = custom_comp.layer,
 		width = width,
+		info = custom_comp.info.model_dump(),
+	)
+	return newport
+
+
+def set_port_layer(custom_comp: Port, layer) -> Port:
+	"""creates a new port on the desired layer and returns the new port"""
+	# In GDSFactory v9, port layer has no setter
+	newport = Port(
+		name = custom_comp.name,
+		dcplx_trans = custom_comp.dcplx_trans,
+		port_type = custom_comp.port_type,
+		layer = layer,
+		width = custom_comp.width,
+		info = custom_comp.info.model_dump(),
 	)
 	return newport
 
@@ -366,11 +565,12 @@ def create_private_ports(custom_comp: Union[Component, ComponentReference], port
 		if isinstance(port_paths, str):
 			port_paths = [port_paths]
 	# find all matching ports
-	ports_to_add = list()
-	for port in custom_comp.ports:
-		if any([port.name.startswith(port_path) for port_path in port_paths]) or bypass:
-			ports_to_add.append(port.copy(name=port.name+"_private"))
-	return ports_to_add
+	index = port_index(custom_comp, lazy=True)
+	if bypass:
+		names = list(index.positions)
+	else:
+		names = sorted(set(name for port_path in port_paths for name in index.names_with_prefix(port_path)), key=index.positions.__getitem__)
+	return [index[name].copy(name=name+"_private") for name in names]
 
 class PortTree:
 	"""PortTree helps a glayout.flow.programmer visualize the ports in a component
@@ -387,18 +587,9 @@ class PortTree:
 	#@validate_arguments
 	def __init__(self, custom_comp: Union[Component, ComponentReference], name: str | None = None):
 		"""creates the tree structure from the ports where _ represent subdirectories
-		credit -> chatGPT
+		the tree is the trie of a (new, not attached) lazy PortIndex, so no Port objects are created
 		"""
-		file_list = custom_comp.ports.keys()
-		directory_tree = {}
-		for file_path in file_list:
-			path_components = file_path.split('_')
-			current_dir = directory_tree
-			for path_component in path_components:
-				if path_component not in current_dir:
-					current_dir[path_component] = {}
-				current_dir = current_dir[path_component]
-		self.tree = directory_tree
+		self.tree = PortIndex(custom_comp, lazy=True).tree
 		self.name = name if name else custom_comp.name
 	
 	#@validate_arguments
@@ -526,7 +717,7 @@ def get_layer_from_port(port: Port, pdk) -> str:
 	"""
 	# Method 1: Try port.layer directly
 	try:
-		return pdk.layer_to_glayer(port.layer)
+		return pdk.layer_to_glayer_fast(port.layer)
 	except (ValueError, KeyError):
 		pass
 
@@ -544,7 +735,7 @@ def get_layer_from_port(port: Port, pdk) -> str:
 				else:
 					# Try tuple() conversion for LayerEnum
 					layer_tuple = tuple(xs.layer)
-				return pdk.layer_to_glayer(layer_tuple)
+				return pdk.layer_to_glayer_fast(layer_tuple)
 		except (ValueError, KeyError, AttributeError, TypeError):
 			pass
 
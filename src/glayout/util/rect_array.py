@@ -0,0 +1,143 @@
+"""
+array backed rectangle geometry for primitives
+
+primitives such as via_array build their geometry from many small rectangle Components and references which are
+then flattened (see glayout.util.snap_to_grid). a RectArray instead holds the rectangles of every layer as an
+integer database unit numpy array (one xmin, ymin, xmax, ymax row per rectangle), translates, mirrors and arrays
+them with vectorized operations and writes them to a Component once with RectArray.commit.
+"""
+from typing import Iterable, Optional
+
+import gdsfactory as gf
+from gdsfactory.component import Component
+from gdsfactory.typings import Layer
+import klayout.db as kdb
+import numpy as np
+
+
+def _layer_index(layer: Layer) -> int:
+	"""layout layer index of a gdsfactory layer (LayerEnum, (layer, datatype) tuple or index)"""
+	return int(gf.get_layer(layer))
+
+
+class RectArray:
+	"""per layer rectangles as (N, 4) int64 arrays of xmin, ymin, xmax, ymax in database units
+	transformations return a new RectArray, add and extend modify the RectArray in place
+	"""
+
+	def __init__(self, dbu: float = 0.001):
+		self.dbu = dbu
+		self.rects: dict[int, np.ndarray] = dict()
+
+	def __len__(self) -> int:
+		return sum(len(boxes) for boxes in self.rects.values())
+
+	def _new(self, rects: dict[int, np.ndarray]) -> "RectArray":
+		result = RectArray(self.dbu)
+		result.rects = rects
+		return result
+
+	def to_dbu(self, value: float) -> int:
+		return int(round(value / self.dbu))
+
+	def add(self, layer: Layer, boxes: np.ndarray) -> "RectArray":
+		"""add rectangles given in database units (array of shape (N, 4) or a single xmin, ymin, xmax, ymax row)"""
+		boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+		index = _layer_index(layer)
+		if index in self.rects:
+			self.rects[index] = np.concatenate((self.rects[index], boxes))
+		else:
+			self.rects[index] = boxes
+		return self
+
+	def add_rectangle(self, layer: Layer, size: tuple[float, float], center: tuple[float, float] = (0, 0)) -> "RectArray":
+		"""add a rectangle of size (width, height) um centered at center (um), same geometry as rectangle(centered=True)"""
+		halfwidth, halfheight = (self.to_dbu(dim) // 2 for dim in size)
+		x, y = (self.to_dbu(coord) for coord in center)
+		return self.add(layer, (x - halfwidth, y - halfheight, x + halfwidth, y + halfheight))
+
+	def extend(self, other: "RectArray") -> "RectArray":
+		"""add all rectangles of other"""
+		for index, boxes in other.rects.items():
+			self.add(index, boxes)
+		return self
+
+	@classmethod
+	def concatenate(cls, arrays: Iterable["RectArray"], dbu: float = 0.001) -> "RectArray":
+		"""one RectArray with the rectangles of all arrays (one concatenation per layer instead of one per extend)"""
+		boxes = dict()
+		for array in arrays:
+			for index, layer_boxes in array.rects.items():
+				boxes.setdefault(index, list()).append(layer_boxes)
+		result = cls(dbu)
+		result.rects = {index: np.concatenate(layer_boxes) for index, layer_boxes in boxes.items()}
+		return result
+
+	def copy(self) -> "RectArray":
+		return self._new({index: boxes.copy() for index, boxes in self.rects.items()})
+
+	def translate(self, dx: int, dy: int) -> "RectArray":
+		"""move all rectangles by dx, dy database units"""
+		offset = np.array((dx, dy, dx, dy), dtype=np.int64)
+		return self._new({index: boxes + offset for index, boxes in self.rects.items()})
+
+	def mirror(self, axis: str = "y") -> "RectArray":
+		"""mirror about the y axis (x -> -x) or the x axis (y -> -y)"""
+		if axis not in ("x", "y"):
+			raise ValueError("axis must be x or y")
+		# mirrored min becomes the new max, swap the columns so the rows stay ordered
+		columns = [2, 1, 0, 3] if axis == "y" else [0, 3, 2, 1]
+		sign = np.array([-1, 1, -1, 1] if axis == "y" else [1, -1, 1, -1], dtype=np.int64)
+		return self._new({index: boxes[:, columns] * sign for index, boxes in self.rects.items()})
+
+	def array(self, columns: int, rows: int, pitch: tuple[int, int]) -> "RectArray":
+		"""columns x rows copies with origins pitch (x, y) database units apart, the copy in column 0 row 0 is not moved"""
+		colnums, rownums = np.meshgrid(np.arange(columns), np.arange(rows), indexing="ij")
+		return self.place(np.stack((colnums.ravel() * pitch[0], rownums.ravel() * pitch[1]), axis=1))
+
+	def place(self, offsets: np.ndarray) -> "RectArray":
+		"""one copy moved by each (dx, dy) row of offsets (database units)"""
+		offsets = np.tile(np.asarray(offsets, dtype=np.int64).reshape(-1, 2), 2)
+		placed = dict()
+		for index, boxes in self.rects.items():
+			placed[index] = (offsets[:, None, :] + boxes[None, :, :]).reshape(-1, 4)
+		return self._new(placed)
+
+	def bbox(self, layers: Optional[Iterable[Layer]] = None) -> Optional[tuple[int, int, int, int]]:
+		"""xmin, ymin, xmax, ymax (database units) of all rectangles or of the rectangles on layers, None if empty"""
+		indexes = self.rects.keys() if layers is None else [_layer_index(layer) for layer in layers]
+		boxes = [self.rects[index] for index in indexes if index in self.rects and len(self.rects[index])]
+		if not boxes:
+			return None
+		boxes = np.concatenate(boxes)
+		return tuple(np.concatenate((boxes[:, :2].min(axis=0), boxes[:, 2:].max(axis=0))).tolist())
+
+	def size(self, layers: Optional[Iterable[Layer]] = None) -> tuple[float, float]:
+		"""(width, height) um of bbox, like evaluate_bbox"""
+		bbox = self.bbox(layers)
+		if bbox is None:
+			return (0.0, 0.0)
+		return (round(float(bbox[2] - bbox[0]) * self.dbu, 6), round(float(bbox[3] - bbox[1]) * self.dbu, 6))
+
+	@classmethod
+	def from_component(cls, comp: Component) -> "RectArray":
+		"""read the (flattened) geometry of comp, all polygons must be rectangles"""
+		rects = cls(comp.kcl.dbu)
+		for index in comp.kcl.layer_indexes():
+			boxes = list()
+			for polygon in kdb.Region(comp.begin_shapes_rec(index)).each():
+				if not polygon.is_box():
+					raise ValueError(f"{comp.name} has a polygon which is not a rectangle on layer {comp.kcl.get_info(index)}")
+				box = polygon.bbox()
+				boxes.append((box.left, box.bottom, box.right, box.top))
+			if boxes:
+				rects.add(index, boxes)
+		return rects
+
+	def commit(self, comp: Component) -> Component:
+		"""insert all rectangles into comp at once (one Region per layer), returns comp
+		the rectangles are not merged, flattening comp (see glayout.util.snap_to_grid) merges them
+		"""
+		for index, boxes in self.rects.items():
+			comp.shapes(index).insert(kdb.Region([kdb.Box(*box) for box in boxes.tolist()]))
+		return comp
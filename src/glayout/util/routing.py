@@ -19,7 +19,7 @@ def straight_route(pdk: MappedPDK, port1: Port, port2: Port, glayer: str | None
     width = abs(y2 - y1) if abs(y2 - y1) > abs(x2 - x1) else abs(x2 - x1)
     length = ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5
     # Draw a rectangle between the two ports
-    c << rectangle(size=(length, pdk.get_grule(glayer)["width"]), layer=pdk.get_glayer(glayer), centered=True)
+    c << rectangle(size=(length, pdk.get_grule_fast(glayer)["width"]), layer=pdk.get_glayer(glayer), centered=True)
     return c
 
 
@@ -1,18 +1,152 @@
+"""
+finalization of generated components
+
+generators finish their component with component_snap_to_grid (primitives) or finalize_component (placements and
+blocks). by default the component is flattened: the polygons of every child cell are copied into it, merged and
+snapped to the database unit grid, so every transistor of an opamp holds its own copy of all its polygons.
+with the hierarchy kept only the geometry which is not on the grid is flattened: virtual instances and instances
+with a complex (magnified, non manhattan or off grid) transformation. the component's own shapes are merged and
+its repeated child cells (multipliers, via arrays, taprings, ...) stay instanced. cells which do not pay for their
+instance (placed once, or a single shape) are flattened into the component, one level at a time. every cell is
+finalized once, when its generator returns it, so a cell used many times is snapped once. the flattened geometry
+is the same in both modes.
+
+the hierarchy is kept if the GLAYOUT_KEEP_HIERARCHY environment variable is set (to anything but 0), inside
+keep_hierarchy() or with keep_hierarchy=True:
+	with keep_hierarchy():
+		amp = opamp_twostage(pdk)
+
+cached_cell (and the disk cache) keep the cells of both modes apart, cells cached by gf.cell are returned as
+built, whatever the mode of the later call.
+
+the routers (straight_route, L_route, c_route) finish their route with finalize_route, which flattens it. inside
+defer_route_flatten() the routes keep their child cells and the caller flattens them, RoutePlan places all routes
+of a component in one cell and flattens that cell once.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+import os
+
 from gdsfactory.component import Component
 from pydantic import validate_arguments
+import klayout.db as kdb
+
+
+# None outside keep_hierarchy(): the mode of GLAYOUT_KEEP_HIERARCHY at the time of the call
+_keep_hierarchy: ContextVar[bool | None] = ContextVar("glayout_keep_hierarchy", default=None)
+
+
+@contextmanager
+def keep_hierarchy(enabled: bool = True) -> Iterator[None]:
+	"""components finalized inside the with block keep (enabled=True) or lose (enabled=False) their hierarchy
+	the mode is not part of the gf.cell cache key: a generator decorated with gf.cell (not cached_cell) returns the
+	cell it first built for the same arguments, in whichever mode that was. use cached_cell or gf.clear_cache()
+	when building the same component in both modes
+	"""
+	token = _keep_hierarchy.set(enabled)
+	try:
+		yield
+	finally:
+		_keep_hierarchy.reset(token)
+
+
+def hierarchy_kept() -> bool:
+	"""True if components are currently finalized with their hierarchy kept
+	outside keep_hierarchy() GLAYOUT_KEEP_HIERARCHY is read on every call, so it can be set after import
+	"""
+	enabled = _keep_hierarchy.get()
+	if enabled is None:
+		return os.environ.get("GLAYOUT_KEEP_HIERARCHY", "0") not in ("", "0")
+	return enabled
+
+
+_defer_route_flatten: ContextVar[bool] = ContextVar("glayout_defer_route_flatten", default=False)
+
+
+@contextmanager
+def defer_route_flatten() -> Iterator[None]:
+	"""routes made inside the with block are not flattened by their router, the caller must flatten them"""
+	token = _defer_route_flatten.set(True)
+	try:
+		yield
+	finally:
+		_defer_route_flatten.reset(token)
+
+
+def finalize_route(route: Component) -> Component:
+	"""flattens route unless route flattening is deferred (see defer_route_flatten). modifies route, returns it"""
+	if not _defer_route_flatten.get():
+		# In GDSFactory v9, flatten() mutates in-place and returns None
+		route.flatten()
+	return route
+
+
+def _flatten_instance(inst: kdb.Instance, placements: dict[int, int]) -> bool:
+	"""True if inst has a complex transformation or its cell is not worth a cell of its own"""
+	if inst.is_complex():
+		return True
+	cell = inst.cell
+	if placements[inst.cell_index] == 1 and cell.parent_cells() == 1:
+		return True
+	if cell.child_instances() == 0:
+		return sum(cell.shapes(layer).size() for layer in cell.layout().layer_indexes()) <= 1
+	return False
+
+
+def snap_instances(comp: Component) -> Component:
+	"""flattens the virtual instances, the instances with a complex transformation and the instances of cells placed
+	once or holding a single shape of comp into it and merges its own shapes (as flatten does), the other instances
+	of child cells are kept. modifies comp, returns it
+	"""
+	for vinst in list(comp.vinsts):
+		vinst.insert_into_flat(comp)
+	comp.vinsts.clear()
+	flattened = True
+	while flattened:
+		# flattening one level may place the children of the flattened cell in comp
+		instances = list(comp.kdb_cell.each_inst())
+		placements = dict()
+		for inst in instances:
+			placements[inst.cell_index] = placements.get(inst.cell_index, 0) + inst.size()
+		flattened = False
+		for inst in instances:
+			if _flatten_instance(inst, placements):
+				inst.flatten(1)
+				flattened = True
+	for layer in comp.kcl.layout.layer_indexes():
+		shapes = comp.shapes(layer)
+		if shapes.is_empty():
+			continue
+		region = kdb.Region(shapes).merge()
+		texts = kdb.Texts(shapes)
+		comp.kdb_cell.clear(layer)
+		shapes.insert(region)
+		shapes.insert(texts)
+	return comp
+
+
+def finalize_component(comp: Component, keep_hierarchy: bool | None = None) -> Component:
+	"""flattens comp, or with the hierarchy kept snaps it with snap_instances. modifies comp, returns it
+	keep_hierarchy = None uses the current mode (see hierarchy_kept)
+	"""
+	keep_hierarchy = hierarchy_kept() if keep_hierarchy is None else keep_hierarchy
+	if keep_hierarchy:
+		return snap_instances(comp)
+	# In GDSFactory v9, flatten() mutates in-place and returns None
+	comp.flatten()
+	return comp
 
 
 @validate_arguments(config=dict(arbitrary_types_allowed=True))
-def component_snap_to_grid(comp: Component) -> Component:
+def component_snap_to_grid(comp: Component, keep_hierarchy: bool | None = None) -> Component:
 	"""snaps all polygons and ports in component to grid
 	comp = the component to snap to grid
-	NOTE this function will flatten the component
+	keep_hierarchy = keep the child cells instanced (see finalize_component), None uses the current mode
+	NOTE this function will flatten the component unless the hierarchy is kept
 	"""
-	# In GDSFactory v9, flatten() mutates in-place and returns None
 	name = comp.name
-	comp.flatten()  # Mutates comp in-place
-	comp = comp.copy()  # Now copy the flattened component
+	finalize_component(comp, keep_hierarchy)  # Mutates comp in-place
+	comp = comp.copy()  # Now copy the finalized component
 	comp.name = name
 	return comp
-
-
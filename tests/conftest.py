@@ -0,0 +1,13 @@
+"""
+unit tests for the pure python parts of glayout (no PDK or EDA tools needed)
+tests which build sky130 geometry (test_routing) are skipped unless PDK_ROOT is set
+
+usage: python -m pytest tests
+"""
+from pathlib import Path
+import sys
+
+# run against the source tree without installing glayout
+_SRC = Path(__file__).resolve().parent.parent / "src"
+if str(_SRC) not in sys.path:
+	sys.path.insert(0, str(_SRC))
@@ -0,0 +1,172 @@
+"""
+align_comp_to_port (bbox of the reference from its transformation and the cell bbox table) against the previous
+implementation, which flattens the reference (transformed) and extracts the layer
+needs the sky130 mapped pdk, skipped unless PDK_ROOT is set
+"""
+import itertools
+import os
+import uuid
+
+from gdsfactory import ComponentReference
+from gdsfactory.component import Component
+from gdsfactory.port import Port
+import pytest
+
+from glayout.util.comp_utils import align_comp_to_port, transformed
+
+pytestmark = pytest.mark.skipif("PDK_ROOT" not in os.environ, reason="the sky130 mapped pdk needs PDK_ROOT")
+
+
+def legacy_align_comp_to_port(
+	custom_comp: Component | ComponentReference,
+	align_to: Port,
+	alignment: tuple[str | None, str | None] | None = None,
+	layer: tuple[int,int] | None = None,
+	rtr_comp_ref = True
+) -> Component | ComponentReference:
+	"""align_comp_to_port before the cell bbox table"""
+	if isinstance(custom_comp, ComponentReference):
+		comp_type = transformed(custom_comp)
+	else:
+		comp_type = custom_comp
+	if layer:
+		comp_type = comp_type.extract([layer])
+	cbbox = comp_type.bbox()
+	ccenter = comp_type.center
+	xdim = abs(cbbox.p2.x - cbbox.p1.x)
+	ydim = abs(cbbox.p2.y - cbbox.p1.y)
+	width = align_to.width
+	is_EW = bool(round(align_to.orientation + 90) % 180)
+	if alignment is None:
+		if round(align_to.orientation) == 0:
+			xalign, yalign = "r", "c"
+		elif round(align_to.orientation) == 180:
+			xalign, yalign = "l", "c"
+		elif round(align_to.orientation) == 270:
+			xalign, yalign = "c", "b"
+		elif round(align_to.orientation) == 90:
+			xalign, yalign = "c", "t"
+		else:
+			raise ValueError("port must be vertical or horizontal")
+	else:
+		xalign = (alignment[0] or "none").lower().strip()
+		yalign = (alignment[1] or "none").lower().strip()
+	x_movcenter = align_to.center[0] - ccenter[0]
+	x_mov_lr = abs(xdim/2 if is_EW else (width-xdim)/2)
+	if "none" in xalign:
+		xmov = 0
+	elif "l" in xalign[0]:
+		xmov = x_movcenter - x_mov_lr
+	elif "c" in xalign[0]:
+		xmov = x_movcenter
+	elif "r" in xalign[0]:
+		xmov = x_movcenter + x_mov_lr
+	else:
+		raise ValueError("please specify valid x alignment of l/r/c/None")
+	y_movcenter = align_to.center[1] - ccenter[1]
+	y_move_updown = abs((width-ydim)/2 if is_EW else ydim/2)
+	if "none" in yalign:
+		ymov = 0
+	elif "b" in yalign[0]:
+		ymov = y_movcenter - y_move_updown
+	elif "t" in yalign[0]:
+		ymov = y_movcenter + y_move_updown
+	elif "c" in yalign[0]:
+		ymov = y_movcenter
+	else:
+		raise ValueError("please specify valid y alignment of t/b/c/None")
+	if isinstance(custom_comp, Component):
+		_temp = Component(name=f"temp_{uuid.uuid4().hex[:6]}")
+		comp_ref = _temp << custom_comp
+	else:
+		comp_ref = custom_comp
+	comp_ref.movex(xmov).movey(ymov)
+	if rtr_comp_ref:
+		return comp_ref
+	return transformed(comp_ref)
+
+
+# every x and y alignment, None aligns by the orientation of the port
+ALIGNMENTS = [None] + list(itertools.product(("l", "c", "r", None), ("t", "c", "b", None))) + [("left", "top"), ("Right", "bottom")]
+
+
+@pytest.fixture(scope="module")
+def pdk():
+	from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+	sky130_mapped_pdk.activate()
+	return sky130_mapped_pdk
+
+
+@pytest.fixture(scope="module")
+def cells(pdk):
+	from glayout.primitives.via_gen import via_array, via_stack
+	return [via_stack(pdk, "met1", "met3"), via_array(pdk, "active_diff", "met2", size=(1, 4))]
+
+
+@pytest.fixture(scope="module")
+def ports(pdk):
+	from glayout.primitives.via_gen import via_array
+	pad = Component() << via_array(pdk, "met1", "met2", size=(3, 3))
+	pad.movex(10.005).movey(-4.5)
+	return {side: pad.ports["top_met_" + side] for side in "NESW"}
+
+
+def cases(ports: dict[str, Port]) -> list[tuple]:
+	"""(port, alignment, glayer): every alignment to a north and an east port, the default alignment to all ports"""
+	aligned = list(itertools.product((ports["N"], ports["E"]), ALIGNMENTS, (None, "met2")))
+	return aligned + list(itertools.product(ports.values(), [None], ("met1",)))
+
+
+def place(top: Component, cell: Component, placement: str) -> ComponentReference:
+	if placement == "array":
+		ref = top.add_ref(cell, columns=3, rows=2, column_pitch=7.5, row_pitch=9.0)
+	else:
+		ref = top << cell
+	if placement.startswith("rotated"):
+		ref.rotate(int(placement[len("rotated"):]))
+	if placement == "mirrored_x":
+		ref.mirror_x()
+	if placement == "mirrored_y":
+		ref.mirror_y()
+	if placement == "mirrored_rotated":
+		ref.rotate(90)
+		ref.mirror_x()
+	ref.movex(1.237).movey(-2.019)
+	return ref
+
+
+PLACEMENTS = ["moved", "rotated90", "rotated180", "rotated270", "mirrored_x", "mirrored_y", "mirrored_rotated", "array"]
+
+
+def check_alignments(pdk, ref: ComponentReference, cases: list[tuple]) -> None:
+	start = ref.dcplx_trans
+	for port, alignment, glayer in cases:
+		layer = pdk.get_glayer(glayer) if glayer else None
+		ref.dcplx_trans = start
+		expected = str(legacy_align_comp_to_port(ref, port, alignment, layer).dcplx_trans)
+		ref.dcplx_trans = start
+		assert str(align_comp_to_port(ref, port, alignment, layer).dcplx_trans) == expected, (ref.cell.name, port.name, alignment, glayer)
+
+
+@pytest.mark.parametrize("placement", PLACEMENTS)
+def test_aligned_references_match_the_legacy_alignment(pdk, cells, ports, placement):
+	top = Component()
+	for cell in cells:
+		check_alignments(pdk, place(top, cell, placement), cases(ports))
+
+
+@pytest.mark.parametrize("placement", PLACEMENTS[:-1])
+def test_aligned_transistors_match_the_legacy_alignment(pdk, ports, placement):
+	from glayout.primitives.fet import nmos
+	# flattening a transistor is slow, a few alignments per placement
+	ref = place(Component(), nmos(pdk, width=2, fingers=3), placement)
+	check_alignments(pdk, ref, [(ports["N"], None, "met2"), (ports["E"], ("l", "t"), None), (ports["W"], ("r", None), "met1")])
+
+
+def test_aligned_components_match_the_legacy_alignment(pdk, cells, ports):
+	for cell, port, alignment in itertools.product(cells, ports.values(), (None, ("c", "c"), ("r", "b"))):
+		assert str(align_comp_to_port(cell, port, alignment).dcplx_trans) == str(legacy_align_comp_to_port(cell, port, alignment).dcplx_trans)
+		# rtr_comp_ref=False returns the aligned component
+		aligned = align_comp_to_port(cell, port, alignment, layer=pdk.get_glayer("met2"), rtr_comp_ref=False)
+		legacy = legacy_align_comp_to_port(cell, port, alignment, layer=pdk.get_glayer("met2"), rtr_comp_ref=False)
+		assert aligned.dbbox() == legacy.dbbox()
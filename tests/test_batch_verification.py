@@ -0,0 +1,144 @@
+"""
+worker protocol of the persistent magic/netgen interpreters, driven with a fake interpreter
+the fake echoes every line it reads, answers the sentinel and understands a few test commands
+"""
+import re
+import sys
+
+import pytest
+
+from glayout.pdk.batch_verification import BatchVerifier, InterpreterError, InterpreterPool, InterpreterProcess
+
+
+FAKE_INTERPRETER = r'''
+import os, re, sys, time
+for line in sys.stdin:
+	line = line.strip()
+	sentinel = re.fullmatch(r"puts stdout \[string toupper \{(.*)\}\]", line)
+	drc = re.fullmatch(r"custom_drc_save_report \{(.*)\} \{(.*)\}", line)
+	lvs = re.fullmatch(r"lvs \{.*\} \{.*\} \{.*\} \{(.*)\}", line)
+	if sentinel:
+		# echo the command first, like an interpreter echoing its input
+		print(f"echo: {line}", flush=True)
+		print(sentinel.group(1).upper(), flush=True)
+	elif drc:
+		with open(drc.group(2), "w") as report:
+			report.write(f"{drc.group(1)} count: {os.environ.get('FAKE_DRC_COUNT', '0')}\n")
+	elif lvs:
+		with open(lvs.group(1), "w") as report:
+			report.write("Circuits match uniquely.\n")
+	elif line == "pid":
+		print(f"pid {os.getpid()}", flush=True)
+	elif line == "hang":
+		time.sleep(60)
+	elif line == "crash":
+		sys.exit(1)
+	elif line.startswith("crash_once "):
+		flag = line.split(" ", 1)[1]
+		if not os.path.exists(flag):
+			open(flag, "w").close()
+			sys.exit(1)
+	elif line == "exit":
+		sys.exit(0)
+	elif line:
+		print(f"echo: {line}", flush=True)
+'''
+
+
+@pytest.fixture
+def fake_command(tmp_path) -> list[str]:
+	path = tmp_path / "fake_interpreter.py"
+	path.write_text(FAKE_INTERPRETER)
+	return [sys.executable, str(path)]
+
+
+def pid(interpreter: InterpreterProcess | InterpreterPool) -> int:
+	return int(re.search(r"pid (\d+)", interpreter.run("pid")).group(1))
+
+
+def test_jobs_share_one_process(fake_command):
+	interpreter = InterpreterProcess(fake_command, startup_script="startup")
+	try:
+		first = pid(interpreter)
+		output = interpreter.run("hello\nworld")
+		assert "echo: hello" in output and "echo: world" in output
+		# the echoed sentinel command (lower case marker) must not end the job early
+		assert "echo: puts stdout" in output
+		assert "startup" not in output
+		assert pid(interpreter) == first
+		assert interpreter.jobs_run == 3
+	finally:
+		interpreter.close()
+
+
+def test_timeout_kills_and_restarts(fake_command):
+	interpreter = InterpreterProcess(fake_command)
+	try:
+		first = pid(interpreter)
+		with pytest.raises(TimeoutError):
+			interpreter.run("hang", timeout=0.5)
+		assert not interpreter.alive
+		assert pid(interpreter) != first
+		assert interpreter.restarts == 1
+	finally:
+		interpreter.close()
+
+
+def test_crash_raises_interpreter_error(fake_command):
+	interpreter = InterpreterProcess(fake_command)
+	try:
+		with pytest.raises(InterpreterError):
+			interpreter.run("crash")
+		assert "echo: again" in interpreter.run("again")
+	finally:
+		interpreter.close()
+
+
+def test_recycled_after_max_jobs(fake_command):
+	interpreter = InterpreterProcess(fake_command, max_jobs=2)
+	try:
+		first = pid(interpreter)
+		assert pid(interpreter) == first
+		assert pid(interpreter) != first
+	finally:
+		interpreter.close()
+
+
+def test_pool_retries_a_crashed_job_once(fake_command, tmp_path):
+	pool = InterpreterPool(2, command=fake_command)
+	try:
+		output = pool.run(f"crash_once {tmp_path / 'crashed'}\nafter")
+		assert "echo: after" in output
+		assert pool.restarts == 1
+		with pytest.raises(InterpreterError):
+			pool.run("crash", retries=1)
+	finally:
+		pool.close()
+
+
+def test_batch_verifier_drc_and_lvs(fake_command, tmp_path):
+	with BatchVerifier(
+		None,
+		lvs_setup_file=tmp_path / "setup.tcl",
+		processes=2,
+		env={"FAKE_DRC_COUNT": "0"},
+		magic_command=fake_command,
+		netgen_command=fake_command,
+	) as verifier:
+		jobs = [(tmp_path / f"cell{i}.gds", f"cell{i}", tmp_path / f"cell{i}.rpt") for i in range(5)]
+		results = verifier.drc_many(jobs)
+		assert [result["design_name"] for result in results] == [f"cell{i}" for i in range(5)]
+		assert all(result["is_pass"] and result["error_count"] == 0 for result in results)
+		lvs = verifier.lvs(tmp_path / "layout.spice", tmp_path / "schematic.spice", "cell0", tmp_path / "lvs.rpt")
+		assert lvs["is_pass"]
+		assert verifier.restarts == 0
+
+
+def test_batch_verifier_drc_errors_and_timeouts(fake_command, tmp_path):
+	with BatchVerifier(None, env={"FAKE_DRC_COUNT": "3"}, magic_command=fake_command, timeout=5) as verifier:
+		result = verifier.drc(tmp_path / "a.gds", "a", tmp_path / "a.rpt")
+		assert not result["is_pass"] and result["error_count"] == 3
+		with pytest.raises(TimeoutError):
+			verifier._magic.run("hang", timeout=0.5)
+		assert verifier.drc(tmp_path / "b.gds", "b", tmp_path / "b.rpt")["error_count"] == 3
+		assert verifier.restarts == 1
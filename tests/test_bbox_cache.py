@@ -0,0 +1,71 @@
+"""
+bbox table and BoxValues memo against the bboxes klayout reports for the flattened references
+"""
+from gdsfactory.component import Component
+import klayout.db as kdb
+import pytest
+
+from glayout.util import bbox_cache
+from glayout.util.bbox_cache import box_values, clear_bbox_cache, component_dbbox
+
+
+def cell(name: str) -> Component:
+	comp = Component(name=name)
+	comp.add_polygon([(0, 0), (3, 0), (3, 1), (0, 1)], layer=(1, 0))
+	comp.add_polygon([(-1, -2), (1, -2), (1, 4), (-1, 4)], layer=(2, 0))
+	comp.lock()
+	return comp
+
+
+def flat_dbbox(ref, layer=None) -> kdb.DBox:
+	"""bbox of the flattened reference (of its shapes on layer)"""
+	region = kdb.Region()
+	indexes = ref.cell.kcl.layer_indexes() if layer is None else [ref.cell.kcl.layer(*layer)]
+	for index in indexes:
+		region += kdb.Region(ref.cell.kdb_cell.begin_shapes_rec(index)).transformed(ref.instance.trans)
+	return region.bbox().to_dtype(ref.cell.kcl.dbu)
+
+
+@pytest.mark.parametrize("rotation", [0, 90, 180, 270])
+@pytest.mark.parametrize("mirror", [False, True])
+def test_reference_bbox_matches_the_flattened_reference(rotation, mirror):
+	clear_bbox_cache()
+	child = cell(f"bbox_child_{rotation}_{mirror}")
+	top = Component()
+	ref = top << child
+	if mirror:
+		ref.dmirror_x()
+	ref.drotate(rotation)
+	ref.dmove((2.5, -7))
+	for layer in (None, (1, 0), (2, 0)):
+		assert component_dbbox(ref, layer) == flat_dbbox(ref, layer)
+	assert component_dbbox(child) == child.dbbox()
+	assert component_dbbox(ref, (3, 0)).empty()
+
+
+def test_locked_cells_are_looked_up_once():
+	clear_bbox_cache()
+	child = cell("bbox_locked")
+	first, second = Component() << child, Component() << child
+	second.dmovex(10)
+	component_dbbox(first, (1, 0))
+	component_dbbox(second, (1, 0))
+	assert len(bbox_cache._cell_bboxes) == 1
+	unlocked = Component()
+	unlocked.add_polygon([(0, 0), (1, 0), (1, 1), (0, 1)], layer=(1, 0))
+	component_dbbox(unlocked)
+	assert len(bbox_cache._cell_bboxes) == 1
+
+
+def test_box_values_are_shared_per_bbox_and_cleared():
+	clear_bbox_cache()
+	child = cell("bbox_values")
+	top = Component()
+	refs = [top << child, top << child]
+	assert box_values(refs[0]) is box_values(refs[1])
+	refs[1].dmovex(1)
+	assert box_values(refs[0]) is not box_values(refs[1])
+	assert box_values(refs[1]).size == box_values(refs[0]).size
+	assert box_values("not a component") is None
+	clear_bbox_cache()
+	assert not bbox_cache._cell_bboxes and not bbox_cache._box_values
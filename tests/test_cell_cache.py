@@ -0,0 +1,78 @@
+from decimal import Decimal
+import inspect
+
+from gdsfactory.component import Component
+import pytest
+
+from glayout.util.cell_cache import CellCache, cached_cell, cell_name, make_cache_key, normalize_arg
+from glayout.util.snap_to_grid import keep_hierarchy
+
+
+def generator(glayer: str, size: float = 1.0, extra: tuple = ()) -> Component:
+	return Component(name=cell_name(f"gen_{glayer}"))
+
+
+SIGNATURE = inspect.signature(generator)
+
+
+def test_normalize_arg():
+	assert normalize_arg(0.1 + 0.2) == normalize_arg(Decimal("0.3"))
+	assert normalize_arg([1, [2.0, "a"]]) == (1, (2.0, "a"))
+	assert normalize_arg({"b": 1, "a": 2}) == (("a", 2), ("b", 1))
+	with pytest.raises(TypeError):
+		normalize_arg(object())
+
+
+def test_make_cache_key_applies_defaults():
+	key = make_cache_key(generator, SIGNATURE, ("met1",), {})
+	assert key == make_cache_key(generator, SIGNATURE, ("met1", 1.0), {})
+	assert key == make_cache_key(generator, SIGNATURE, (), {"glayer": "met1", "extra": []})
+	assert key != make_cache_key(generator, SIGNATURE, ("met1", 2.0), {})
+
+
+def test_make_cache_key_hierarchy_mode():
+	flat = make_cache_key(generator, SIGNATURE, ("met1",), {})
+	with keep_hierarchy():
+		kept = make_cache_key(generator, SIGNATURE, ("met1",), {})
+	assert flat != kept
+
+
+def test_issue_suffix_is_deterministic_and_never_reused():
+	key = ("gen", (("glayer", "met1"),))
+	first = CellCache().issue_suffix(key)
+	cache = CellCache()
+	assert cache.issue_suffix(key) == first
+	assert cache.issue_suffix(key) == f"{first}_1"
+
+
+def test_lru_eviction():
+	cache = CellCache(maxsize=2)
+	for i in range(3):
+		cache.put((i,), Component(name=f"lru_{i}"))
+	assert cache.get((0,)) is None
+	assert cache.get((2,)) is not None
+	assert cache.cache_info().currsize == 2
+
+
+def test_cached_cell_shares_and_locks():
+	cached = cached_cell(generator, cache=CellCache())
+	comp = cached("met2")
+	assert cached("met2", 1.0) is comp
+	assert comp.locked
+	assert cached("met3") is not comp
+
+
+def test_uncached_call_inside_cached_generator_gets_own_name():
+	cache = CellCache()
+	inner = cached_cell(generator, cache=cache)
+
+	@cached_cell(cache=cache)
+	def outer(glayer: str) -> Component:
+		comp = Component(name=cell_name("outer"))
+		# a Component argument cannot be part of a key, the call is not cached
+		nested = inner(glayer, extra=(comp,))
+		comp.info["nested"] = nested.name
+		return comp
+
+	comp = outer("met1")
+	assert comp.info["nested"].split("_")[-1] != comp.name.split("_")[-1]
@@ -0,0 +1,78 @@
+import copy
+import os
+
+import pytest
+
+from glayout.spice import Netlist
+from glayout.util.disk_cache import _glayout_version, _info_from_json, _info_to_json, pdk_digest
+
+
+def leaf(name: str) -> Netlist:
+	return Netlist(circuit_name=name, nodes=["A", "B"], source_netlist=f".subckt {name} A B\n.ends {name}")
+
+
+def test_leaf_netlist_round_trip():
+	info = {"netlist": leaf("R1"), "width": 1.5}
+	restored = _info_from_json(_info_to_json(info))
+	assert restored["width"] == 1.5
+	assert restored["netlist"].circuit_name == "R1"
+	assert restored["netlist"].nodes == ["A", "B"]
+
+
+def test_netlist_with_sub_netlists_is_rejected():
+	top = Netlist(circuit_name="TOP", nodes=["A"], sub_netlists=[leaf("R1"), leaf("R2")])
+	with pytest.raises(ValueError, match="sub netlists"):
+		_info_to_json({"netlist": top})
+
+
+def test_version_is_known():
+	assert _glayout_version() != "unknown"
+
+
+def test_repeated_calls_read_the_disk_once(tmp_path):
+	import gdsfactory as gf
+	from gdsfactory.component import Component
+	from glayout.util.cell_cache import cached_cell, clear_cell_cache
+	from glayout.util.disk_cache import disable_disk_cache, enable_disk_cache, disk_cached_cell
+
+	built = list()
+
+	@cached_cell
+	@disk_cached_cell
+	@gf.cell
+	def square(size: float = 1.0) -> Component:
+		built.append(size)
+		comp = Component()
+		comp.add_polygon([(0, 0), (size, 0), (size, size), (0, size)], layer=(1, 0))
+		return comp
+
+	cache = enable_disk_cache(tmp_path)
+	try:
+		clear_cell_cache()
+		assert square(2.0) is square(2.0)
+		assert (cache.hits, cache.misses, built) == (0, 1, [2.0])
+		# a new process (empty memory caches) reads the entry once
+		clear_cell_cache()
+		gf.clear_cache()
+		assert square(2.0) is square(2.0)
+		assert (cache.hits, cache.misses, built) == (1, 1, [2.0])
+	finally:
+		disable_disk_cache()
+		clear_cell_cache()
+
+
+@pytest.mark.skipif("PDK_ROOT" not in os.environ, reason="the sky130 mapped pdk needs PDK_ROOT")
+def test_pdk_digest_follows_the_rules_and_layers():
+	from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+	pdk = sky130_mapped_pdk.model_copy()
+	pdk.glayers = dict(pdk.glayers)
+	digest = pdk_digest(pdk)
+	assert pdk_digest(pdk) == digest
+	grules = copy.deepcopy(pdk.grules)
+	grules["met2"]["met2"]["min_separation"] += 0.01
+	pdk.grules = grules
+	assert pdk_digest(pdk) not in (digest, pdk_digest(sky130_mapped_pdk))
+	changed = pdk_digest(pdk)
+	pdk.glayers["met2"] = pdk.glayers["met3"]
+	assert pdk_digest(pdk) != changed
+	assert pdk_digest(sky130_mapped_pdk) == digest
@@ -0,0 +1,52 @@
+"""
+incremental maximin swap optimizer of the ATLAS LHS sampler against recomputing every pairwise distance
+"""
+import random
+
+import numpy as np
+import pytest
+
+from glayout.blocks.ATLAS.elhs import _maximin_swaps, lhs_maximin, min_pairwise_distance
+
+
+def maximin_swaps_reference(points, patience, rng):
+	"""the swap loop before the nearest neighbour bookkeeping, same random draws"""
+	n, d = points.shape
+	best_min = min_pairwise_distance(points)
+	no_improve = 0
+	while no_improve < patience:
+		i, j = rng.sample(range(n), 2)
+		axis = rng.randrange(d)
+		points[i, axis], points[j, axis] = points[j, axis], points[i, axis]
+		new_min = min_pairwise_distance(points)
+		if new_min > best_min:
+			best_min = new_min
+			no_improve = 0
+		else:
+			points[i, axis], points[j, axis] = points[j, axis], points[i, axis]
+			no_improve += 1
+	return float(best_min)
+
+
+@pytest.mark.parametrize("n, d", [(2, 1), (8, 2), (40, 3), (120, 5)])
+def test_same_swaps_as_recomputing_all_distances(n, d):
+	start = np.random.default_rng(n * d).random((n, d))
+	fast, slow = start.copy(), start.copy()
+	fast_min = _maximin_swaps(fast, 200, random.Random(7))
+	slow_min = maximin_swaps_reference(slow, 200, random.Random(7))
+	assert fast_min == slow_min
+	np.testing.assert_array_equal(fast, slow)
+	assert fast_min == min_pairwise_distance(fast)
+
+
+def test_single_point():
+	assert _maximin_swaps(np.zeros((1, 3)), 10, random.Random(0)) == 0.0
+
+
+def test_restarts_depend_on_seed_only():
+	serial = lhs_maximin(3, 30, patience=50, seed=11, restarts=3)
+	parallel = lhs_maximin(3, 30, patience=50, seed=11, restarts=3, processes=2)
+	np.testing.assert_array_equal(serial, parallel)
+	# still a latin hypercube: one point in every one of the n strata of every axis
+	for axis in range(3):
+		assert sorted(np.floor(serial[:, axis] * 30).astype(int)) == list(range(30))
@@ -0,0 +1,53 @@
+"""
+DRC and LVS parity of the flat and the hierarchy kept (keep_hierarchy) builds of the fets
+needs the sky130 mapped pdk and magic and netgen, skipped unless PDK_ROOT is set and both are on PATH
+"""
+import os
+import shutil
+
+import gdsfactory as gf
+import pytest
+
+from glayout.util.bbox_cache import clear_bbox_cache
+from glayout.util.cell_cache import clear_cell_cache
+from glayout.util.snap_to_grid import keep_hierarchy
+
+pytestmark = pytest.mark.skipif(
+	"PDK_ROOT" not in os.environ or shutil.which("magic") is None or shutil.which("netgen") is None,
+	reason="DRC/LVS parity needs PDK_ROOT, magic and netgen",
+)
+
+
+def verify(pdk, generator, kept: bool, out_dir, **kwargs) -> dict:
+	"""DRC and LVS of generator(pdk, **kwargs) built (and extracted) with or without the hierarchy kept
+	the reports are written below out_dir
+	"""
+	# the fets are cell cached, rebuild them in this mode
+	clear_cell_cache()
+	gf.clear_cache()
+	clear_bbox_cache()
+	design_name = f"{generator.__name__}_parity"
+	with keep_hierarchy(kept):
+		comp = generator(pdk, **kwargs)
+		drc = pdk.drc_magic(comp, design_name, output_file=out_dir)
+		lvs = pdk.lvs_netgen(comp, design_name, output_file_path=out_dir)
+	drc_report = next((out_dir / "drc" / design_name).iterdir()).read_text()
+	lvs_report = next((out_dir / "lvs" / design_name).iterdir()).read_text()
+	return {
+		"drc_ran": drc["subproc_code"] == 0,
+		"drc_report_lines": len(drc_report.splitlines()),
+		"lvs_ran": lvs["magic_subproc_code"] == 0 and lvs["netgen_subproc_code"] == 0,
+		"lvs_match": "match uniquely" in lvs_report,
+	}
+
+
+@pytest.mark.parametrize("name", ["nmos", "pmos"])
+@pytest.mark.parametrize("fingers", [1, 4])
+def test_kept_hierarchy_verifies_as_the_flat_build(tmp_path, name, fingers):
+	from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+	from glayout.primitives import fet
+	generator = getattr(fet, name)
+	flat = verify(sky130_mapped_pdk, generator, False, tmp_path / "flat", fingers=fingers)
+	kept = verify(sky130_mapped_pdk, generator, True, tmp_path / "kept", fingers=fingers)
+	assert flat["drc_ran"] and flat["lvs_ran"]
+	assert kept == flat
@@ -0,0 +1,96 @@
+"""
+Netlist connectivity (union-find over sub-netlist nodes) and structural subcircuit sharing
+"""
+import io
+
+import pytest
+
+from glayout.spice import Netlist
+
+
+def fet(name: str = "nfet") -> Netlist:
+	return Netlist(
+		circuit_name=name,
+		nodes=["D", "G", "S", "B"],
+		source_netlist=".subckt {circuit_name} {nodes} l=1 w=1\n.ends {circuit_name}",
+		instance_format="X{name} {nodes} {circuit_name} l=1 w=1",
+	)
+
+
+def test_connections_merge_nets_and_reuse_wires():
+	top = Netlist(circuit_name="top", nodes=["IN", "OUT", "VSS"])
+	m1, m2, m3 = (top.connect_netlist(fet(), []) for _ in range(3))
+	top.connect_subnets(m1, m2, [("D", "S")])
+	# m2.S is already on wire0, connecting m3 to it must reuse the wire
+	top.connect_subnets(m3, m2, [("D", "S")])
+	top.connect_node(m1, [("G", "IN"), ("B", "VSS")])
+	top.connect_node(m2, [("D", "OUT")])
+	assert top.netlist_connections == [
+		["wire0", "IN", "S", "VSS"],
+		["OUT", "G", "wire0", "B"],
+		["wire0", "G", "S", "B"],
+	]
+	assert top.wire_index == 1
+	# naming a net after a top level node renames every endpoint of the net
+	top.connect_node(m3, [("D", "MID")])
+	assert [row[0] for row in top.netlist_connections] == ["MID", "OUT", "MID"]
+	assert top.netlist_connections[1][2] == "MID"
+
+
+def test_connect_by_reference_and_unknown_nodes():
+	m1, m2 = fet(), fet()
+	top = Netlist(circuit_name="top", nodes=["X"], sub_netlists=[m1, m2])
+	top.connect_subnets(m1, m2, [("G", "G")])
+	assert top.netlist_connections[0][1] == top.netlist_connections[1][1] == "wire0"
+	with pytest.raises(ValueError):
+		top.connect_subnets(m1, m2, [("nope", "G")])
+	with pytest.raises(ValueError):
+		top.connect_node(fet(), [("G", "X")])
+
+
+def test_node_index_follows_node_changes():
+	netlist = fet()
+	assert netlist.node_index("S") == 2
+	netlist.nodes = ["B", "S"]
+	assert netlist.node_index("S") == 1
+	netlist.nodes.append("G")
+	assert netlist.node_index("G") == 2
+	with pytest.raises(ValueError):
+		netlist.node_index("D")
+
+
+def test_share_is_an_independent_snapshot():
+	inner = Netlist(circuit_name="inner", nodes=["A", "B"])
+	m1 = inner.connect_netlist(fet(), [("D", "A")])
+	snapshot = inner.share()
+	inner.connect_node(m1, [("S", "B")])
+	inner.nodes.append("C")
+	assert snapshot.netlist_connections == [["A", "G", "S", "B"]]
+	assert snapshot.nodes == ["A", "B"]
+	assert snapshot.sub_netlists[0] is inner.sub_netlists[0]
+
+
+def test_identical_subcircuits_are_written_once():
+	def stage() -> Netlist:
+		netlist = Netlist(circuit_name="stage", nodes=["A", "B"])
+		netlist.connect_netlist(fet(), [("D", "A"), ("S", "B")])
+		return netlist
+
+	top = Netlist(circuit_name="top", nodes=["A", "B"])
+	for _ in range(3):
+		top.connect_netlist(stage(), [("A", "A"), ("B", "B")])
+	spice = top.generate_netlist()
+	assert spice.count(".subckt stage ") == 1
+	assert spice.count(".subckt nfet ") == 1
+	assert "X0 A B stage\nX1 A B stage\nX2 A B stage\n.ends top" in spice
+
+	# a different hierarchy with the same name gets a suffix while writing, names are restored afterwards
+	other = Netlist(circuit_name="stage", nodes=["A", "B"])
+	other.connect_netlist(fet("pfet"), [("D", "A"), ("S", "B")])
+	top.connect_netlist(other, [("A", "A"), ("B", "B")])
+	spice = top.generate_netlist()
+	assert ".subckt stage " in spice and ".subckt stage_1 " in spice
+	assert all(netlist.circuit_name == "stage" for netlist in top.sub_netlists)
+	stream = io.StringIO()
+	top.write_netlist(stream)
+	assert stream.getvalue() == spice
@@ -0,0 +1,109 @@
+"""
+npc_close_pairs (grid buckets) and npc_regions (union-find) of sky130_add_npc against brute force references
+importing sky130_mapped needs PDK_ROOT, skipped unless it is set
+"""
+import itertools
+import os
+
+import gdsfactory as gf
+import numpy as np
+import pytest
+
+pytestmark = pytest.mark.skipif("PDK_ROOT" not in os.environ, reason="importing sky130_mapped needs PDK_ROOT")
+
+DISTANCE = 0.64
+
+
+@pytest.fixture(scope="module")
+def npc():
+	from glayout.pdk.sky130_mapped import sky130_add_npc
+	return sky130_add_npc
+
+
+def brute_force_pairs(boxes: list[tuple], distance: float = DISTANCE) -> list[tuple[int, int]]:
+	"""every pair i < j of boxes whose centers are closer than distance in x and y, O(n^2)"""
+	centers = [((xmin + xmax) / 2, (ymin + ymax) / 2) for xmin, ymin, xmax, ymax in boxes]
+	return [
+		(i, j) for i, j in itertools.combinations(range(len(boxes)), 2)
+		if abs(centers[i][0] - centers[j][0]) < distance and abs(centers[i][1] - centers[j][1]) < distance
+	]
+
+
+def boxes_around(centers: np.ndarray, rng: np.random.Generator) -> list[tuple]:
+	"""padded licon like boxes (symmetric about the centers, so the centers are kept exactly)"""
+	half = rng.uniform(0.1, 0.4, centers.shape)
+	return [(x - w, y - h, x + w, y + h) for (x, y), (w, h) in zip(centers.tolist(), half.tolist())]
+
+
+def random_boxes(count: int, seed: int) -> list[tuple]:
+	rng = np.random.default_rng(seed)
+	# a dense cluster around the origin (negative coordinates, many close pairs) and a sparse spread
+	dense = rng.uniform(-2, 2, (count // 2, 2))
+	sparse = rng.uniform(-50, 50, (count - count // 2, 2))
+	return boxes_around(np.concatenate([dense, sparse]), rng)
+
+
+def boundary_boxes(seed: int) -> list[tuple]:
+	"""centers exactly on (and next to) the bucket boundaries, multiples of the merge distance"""
+	rng = np.random.default_rng(seed)
+	steps = rng.integers(-6, 7, (120, 2)) * DISTANCE
+	# the centers at half and one distance apart, across a boundary, and at the 0.005 grid of the layouts
+	offsets = rng.choice([0.0, 0.0, 0.32, -0.32, 0.005, -0.005, 0.635, -0.635, DISTANCE], (120, 2))
+	centers = np.concatenate([steps, steps + offsets, np.nextafter(steps, np.inf), np.nextafter(steps, -np.inf)])
+	return boxes_around(centers, rng)
+
+
+def grid_boxes() -> list[tuple]:
+	"""centers on the 0.005 manufacturing grid, as in the layouts, spaced about the merge distance"""
+	centers = np.array([(x * 0.005, y * 0.005) for x in range(-260, 261, 64) for y in range(-260, 261, 127)] + [(x * 0.005, 0.0) for x in range(-200, 201, 128)])
+	return boxes_around(centers, np.random.default_rng(0))
+
+
+def case_boxes() -> list[list[tuple]]:
+	return [random_boxes(count, seed) for count, seed in [(2, 0), (50, 1), (400, 2), (1500, 3)]] + [boundary_boxes(seed) for seed in range(3)] + [grid_boxes()]
+
+
+CASES = range(len(case_boxes()))
+# merging the dense cluster of the 1500 boxes takes seconds, the regions are checked on the others
+REGION_CASES = [case for case in CASES if len(case_boxes()[case]) < 1500]
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_close_pairs_match_the_brute_force_pairs(npc, case):
+	boxes = case_boxes()[case]
+	pairs = npc.npc_close_pairs(boxes)
+	# every pair once, lower index first
+	assert len(pairs) == len(set(pairs))
+	assert all(i < j for i, j in pairs)
+	assert sorted(pairs) == brute_force_pairs(boxes)
+
+
+def test_close_pairs_are_strictly_closer(npc):
+	boxes = [(-0.1, -0.1, 0.1, 0.1), (0.54, -0.1, 0.74, 0.1), (-0.74, 0.53, -0.54, 0.73), (0.1, -1.0, 0.3, -0.4)]
+	# centers (0, 0), (0.64, 0), (-0.64, 0.63), (0.2, -0.7)
+	assert npc.npc_close_pairs(boxes) == []
+	assert sorted(npc.npc_close_pairs(boxes, distance=0.65)) == [(0, 1), (0, 2)]
+	assert npc.npc_close_pairs([]) == []
+
+
+def reference_region(boxes: list[tuple], dbu: float = 0.001) -> gf.kdb.Region:
+	"""every box and the bounding box of every close pair, added one by one"""
+	region = gf.kdb.Region()
+	for xmin, ymin, xmax, ymax in boxes:
+		region.insert(gf.kdb.DBox(xmin, ymin, xmax, ymax).to_itype(dbu))
+	for i, j in brute_force_pairs(boxes):
+		region.insert(gf.kdb.DBox(
+			min(boxes[i][0], boxes[j][0]), min(boxes[i][1], boxes[j][1]),
+			max(boxes[i][2], boxes[j][2]), max(boxes[i][3], boxes[j][3]),
+		).to_itype(dbu))
+	return region.merged()
+
+
+@pytest.mark.parametrize("case", REGION_CASES)
+def test_regions_cover_the_boxes_and_pair_bounding_boxes(npc, case):
+	boxes = case_boxes()[case]
+	regions = npc.npc_regions(boxes)
+	union = gf.kdb.Region()
+	for region in regions:
+		union += region
+	assert (union.merged() ^ reference_region(boxes)).is_empty()
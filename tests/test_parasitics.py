@@ -0,0 +1,243 @@
+"""
+streaming PEX parser (glayout.spice.parasitics): SPICE numbers, card syntax, ground nets, the per net and coupling
+tables and the totals the evaluators read through total_parasitics
+"""
+import numpy as np
+import pytest
+
+from glayout.spice.parasitics import (
+	net_of_node,
+	parse_parasitics,
+	parse_parasitics_lines,
+	parse_spice_value,
+	total_parasitics,
+)
+
+
+def legacy_parse(lines: list[str]) -> tuple[float, float]:
+	"""_parse_simple_parasitics of the evaluators before glayout.spice.parasitics (single line cards, f/p/n/u suffixes)"""
+	total_resistance = 0.0
+	total_capacitance = 0.0
+	for line in lines:
+		parts = line.strip().split()
+		if not parts: continue
+		if parts[0].upper().startswith('R') and len(parts) >= 4:
+			try: total_resistance += float(parts[3])
+			except (ValueError): continue
+		elif parts[0].upper().startswith('C') and len(parts) >= 4:
+			try:
+				cap_str = parts[3]
+				scale = {"F": 1e-15, "P": 1e-12, "N": 1e-9, "U": 1e-6, "f": 1e-15}
+				if cap_str[-1] in scale: total_capacitance += float(cap_str[:-1]) * scale[cap_str[-1]]
+				else: total_capacitance += float(cap_str)
+			except (ValueError): continue
+	return total_resistance, total_capacitance
+
+
+@pytest.mark.parametrize("token, value", [
+	("1.2e-15", 1.2e-15),
+	("1.2E-15", 1.2e-15),
+	("-3.5e+2", -350.0),
+	(".5", 0.5),
+	("12", 12.0),
+	("0.3fF", 0.3e-15),
+	("0.3f", 0.3e-15),
+	("0.3F", 0.3e-15),
+	("4.7p", 4.7e-12),
+	("2.2nF", 2.2e-9),
+	("1u", 1e-6),
+	("5m", 5e-3),
+	("5M", 5e-3),
+	("2.1meg", 2.1e6),
+	("2.1MEG", 2.1e6),
+	("10k", 1e4),
+	("10kOhm", 1e4),
+	("3Ohm", 3.0),
+	("3g", 3e9),
+	("1t", 1e12),
+	("7a", 7e-18),
+	("2mil", 50.8e-6),
+	("1e3p", 1e-9),
+	("r=10k", 1e4),
+	("c=1.2f", 1.2e-15),
+])
+def test_spice_values(token, value):
+	assert parse_spice_value(token) == pytest.approx(value, rel=1e-12)
+
+
+@pytest.mark.parametrize("token", ["", "f", "abc", "1.2.3", "--1", "e5", "1.5 f"])
+def test_invalid_spice_values(token):
+	with pytest.raises(ValueError):
+		parse_spice_value(token)
+
+
+def test_subnodes_belong_to_their_net():
+	assert net_of_node("out.n3") == "out"
+	assert net_of_node("out.t12") == "out"
+	assert net_of_node("a.b.7") == "a.b"
+	assert net_of_node("out") == "out"
+	assert net_of_node("net.name") == "net.name"
+
+
+def test_continuations_and_comments():
+	lines = [
+		"* extracted by magic",
+		"R0 out.n1 out.n2 10 ; trailing comment",
+		"C0 out 0",
+		"+ 2f",
+		"C1",
+		"+ in",
+		"* a comment between a card and its continuation",
+		"",
+		"+ out 3f $ coupling",
+		"R1 in.n1",
+		"+ in.n2 1k",
+		"  c2 in VSUBS 0.5fF",
+		".ends",
+		"+ out 0 100f",
+	]
+	parasitics = parse_parasitics_lines(lines)
+	assert parasitics.skipped == 0
+	assert parasitics.total_resistance == pytest.approx(1010.0)
+	assert parasitics.total_capacitance == pytest.approx(5.5e-15)
+	assert parasitics.net_resistance[parasitics.net_index("out")] == pytest.approx(10.0)
+	assert parasitics.net_resistance[parasitics.net_index("in")] == pytest.approx(1000.0)
+
+
+def test_unparsable_cards_are_skipped():
+	lines = [
+		"R0 a b",
+		".subckt x a b",
+		"C0 a b bad",
+		"R1 a b 5",
+		"C1 a",
+	]
+	parasitics = parse_parasitics_lines(lines)
+	# R0 is interrupted by .subckt, C0 has no number, C1 is never completed
+	assert parasitics.skipped == 3
+	assert parasitics.total_resistance == 5.0
+	assert parasitics.total_capacitance == 0.0
+
+
+def test_ground_nets():
+	lines = [
+		"C0 a 0 1f",
+		"C1 a GND 2f",
+		"C2 VSUBS b 4f",
+		"C3 0 gnd 8f",
+		"C4 a b 16f",
+		"R0 gnd.n1 gnd.n2 5",
+	]
+	parasitics = parse_parasitics_lines(lines)
+	assert sorted(parasitics.nets) == ["a", "b"]
+	a, b = parasitics.net_index("a"), parasitics.net_index("b")
+	assert parasitics.net_ground_capacitance[a] == pytest.approx(3e-15)
+	assert parasitics.net_ground_capacitance[b] == pytest.approx(4e-15)
+	# ground to ground capacitance and resistance count towards the totals only
+	assert parasitics.total_capacitance == pytest.approx(31e-15)
+	assert parasitics.total_resistance == 5.0
+	assert parasitics.net_resistance.tolist() == [0.0, 0.0]
+	# custom ground nets, vsubs is a signal net now
+	custom = parse_parasitics_lines(lines, ground_nets=("0", "gnd"))
+	assert sorted(custom.nets) == ["VSUBS", "a", "b"]
+	assert custom.net_ground_capacitance[custom.net_index("VSUBS")] == 0.0
+	assert custom.net_coupling_capacitance[custom.net_index("VSUBS")] == pytest.approx(4e-15)
+
+
+def coupling_table(parasitics) -> dict[tuple[str, str], float]:
+	nets = parasitics.nets
+	return {tuple(sorted((nets[i], nets[j]))): c for (i, j), c in zip(parasitics.coupling_pairs.tolist(), parasitics.coupling_capacitance)}
+
+
+def test_coupling_capacitance_table():
+	lines = [
+		"C0 a.n1 b 1f",
+		"C1 b a.n2 2f",
+		"C2 a c 4f",
+		"C3 c.t1 b.3 8f",
+		"C4 a.n1 a.n2 16f",
+		"C5 c 0 32f",
+	]
+	parasitics = parse_parasitics_lines(lines)
+	pairs = parasitics.coupling_pairs
+	assert pairs.shape == (3, 2)
+	assert (pairs[:, 0] < pairs[:, 1]).all()
+	table = coupling_table(parasitics)
+	assert table.keys() == {("a", "b"), ("a", "c"), ("b", "c")}
+	assert table[("a", "b")] == pytest.approx(3e-15)
+	assert table[("a", "c")] == pytest.approx(4e-15)
+	assert table[("b", "c")] == pytest.approx(8e-15)
+	coupling = {net: parasitics.net_coupling_capacitance[parasitics.net_index(net)] for net in "abc"}
+	assert coupling == pytest.approx({"a": 7e-15, "b": 11e-15, "c": 12e-15})
+	# capacitance within a net counts towards the total only
+	assert parasitics.total_capacitance == pytest.approx(63e-15)
+	assert parasitics.net_capacitance[parasitics.net_index("c")] == pytest.approx(44e-15)
+	summary = parasitics.as_dict()
+	assert summary["nets"]["c"]["ground_capacitance_farads"] == pytest.approx(32e-15)
+
+
+def test_no_coupling():
+	parasitics = parse_parasitics_lines(["R0 a.n1 a.n2 1", "C0 a 0 1f"])
+	assert parasitics.coupling_pairs.shape == (0, 2)
+	assert parasitics.coupling_capacitance.shape == (0,)
+	assert parasitics.net_coupling_capacitance.tolist() == [0.0]
+
+
+def test_random_netlist_matches_a_brute_force_sum():
+	rng = np.random.default_rng(0)
+	nets = ["0", "gnd", "vsubs"] + [f"n{i}" for i in range(20)]
+	formats = [lambda v: repr(v), lambda v: f"{v * 1e15!r}f", lambda v: f"{v * 1e15!r}fF", lambda v: f"{v * 1e12!r}p"]
+	lines = list()
+	expected = dict()
+	total = 0.0
+	for index in range(2000):
+		a, b = rng.choice(nets, 2)
+		value = float(rng.uniform(0.1, 10) * 1e-15)
+		card = f"C{index} {a}.n{rng.integers(5)} {b} {formats[rng.integers(len(formats))](value)}"
+		lines.extend(card.rsplit(" ", 1) if rng.random() < 0.2 else [card])
+		lines[-1] = lines[-1] if len(lines[-1].split()) > 1 else "+ " + lines[-1]
+		total += value
+		if a != b and a not in nets[:3] and b not in nets[:3]:
+			pair = tuple(sorted((a, b)))
+			expected[pair] = expected.get(pair, 0.0) + value
+	parasitics = parse_parasitics_lines(lines)
+	assert parasitics.skipped == 0
+	assert parasitics.total_capacitance == pytest.approx(total, rel=1e-9)
+	assert coupling_table(parasitics) == pytest.approx(expected, rel=1e-9)
+
+
+MAGIC_PEX = """\
+* NGSPICE file created from nmos.ext - technology: sky130A
+
+.subckt nmos D G S B
+X0 D.n0 G S.n0 B sky130_fd_pr__nfet_01v8 ad=0.29 pd=2.58 as=0.29 ps=2.58 w=1 l=0.15
+R0 D.n0 D.n1 12.531
+R1 D.n1 D 0.8
+R2 S.n0 S 3.25
+C0 D G 0.151f
+C1 G S 0.0871f
+C2 D B 0.355f
+C3 S B 1.02f
+C4 G VSUBS 0.0221f
+.ends
+"""
+
+
+def test_totals_of_the_evaluators(tmp_path):
+	pex = tmp_path / "nmos_pex.spice"
+	pex.write_text(MAGIC_PEX)
+	totals = total_parasitics(pex)
+	# magic cards are single line with f suffixes, the old parser read them all
+	assert totals == pytest.approx(legacy_parse(MAGIC_PEX.splitlines()), rel=1e-12)
+	assert totals == pytest.approx((16.581, 1.6353e-15), rel=1e-12)
+	parasitics = parse_parasitics(pex)
+	assert (parasitics.total_resistance, parasitics.total_capacitance) == totals
+	assert total_parasitics(tmp_path / "missing_pex.spice") == (0.0, 0.0)
+
+
+def test_evaluator_reads_the_totals(tmp_path, monkeypatch):
+	physical_features = pytest.importorskip("glayout.blocks.evaluator_box.physical_features", exc_type=ImportError)
+	(tmp_path / "nmos_pex.spice").write_text(MAGIC_PEX + "C5 D S\n+ 1.2e-15\n")
+	monkeypatch.chdir(tmp_path)
+	assert physical_features._parse_simple_parasitics("nmos") == pytest.approx((16.581, 2.8353e-15), rel=1e-12)
+	assert physical_features._parse_simple_parasitics("missing") == (0.0, 0.0)
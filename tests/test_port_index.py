@@ -0,0 +1,87 @@
+"""
+PortIndex prefix queries and in place renames / removals against a plain scan of the port names
+"""
+from gdsfactory.component import Component
+import pytest
+
+from glayout.util.port_utils import PortIndex, port_index, remove_ports_with_prefix, rename_ports_by_list
+
+
+NAMES = ["A_source_W", "A_source_E", "A_drain_W", "B_source_W", "AB_gate_N", "A", "A_source_W"]
+
+
+def component() -> Component:
+	comp = Component()
+	for i, name in enumerate(NAMES):
+		comp.add_port(name=name, center=(i, 0), width=1, orientation=0, layer=(1, 0))
+	return comp
+
+
+def scan(names: list[str], prefix: str) -> list[str]:
+	"""unique names starting with prefix, in port order"""
+	return list(dict.fromkeys(name for name in names if name.startswith(prefix)))
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("prefix", ["", "A", "A_", "A_s", "A_source", "A_source_W", "AB", "B_source_", "C", "A_x_"])
+def test_prefix_queries_match_a_scan(lazy, prefix):
+	index = PortIndex(component(), lazy=lazy)
+	assert index.names_with_prefix(prefix) == scan(NAMES, prefix)
+	assert [port.name for port in index.ports_with_prefix(prefix)] == scan(NAMES, prefix)
+
+
+def test_duplicates_resolve_to_the_first_port():
+	index = PortIndex(component(), lazy=True)
+	assert len(index) == len(NAMES)
+	assert index["A_source_W"].center[0] == 0
+	index.remove_duplicates()
+	assert index.names == list(dict.fromkeys(NAMES))
+	assert [port.name for port in index.component.ports] == index.names
+	with pytest.raises(KeyError):
+		index["missing"]
+
+
+def test_rename_in_place_updates_the_trie():
+	comp = component()
+	index = PortIndex(comp)
+	index.rename({"A_source_E": "C_out", "A": "A_source"})
+	assert [port.name for port in comp.ports] == ["A_source_W", "C_out", "A_drain_W", "B_source_W", "AB_gate_N", "A_source", "A_source_W"]
+	assert index.names_with_prefix("C") == ["C_out"]
+	assert index.names_with_prefix("A_source") == ["A_source_W", "A_source"]
+	assert "A" not in index and index.is_valid()
+	# renaming back reuses the trie nodes the old names left behind
+	index.rename({"C_out": "A_source_E"})
+	assert index.names_with_prefix("A_source_") == ["A_source_W", "A_source_E"]
+	assert index.names_with_prefix("C") == []
+	with pytest.raises(KeyError):
+		index.rename({"missing": "x"})
+
+
+def test_remove_prunes_only_unused_trie_nodes():
+	comp = component()
+	index = PortIndex(comp)
+	index.remove(["A_source_W", "A_drain_W"])
+	assert [port.name for port in comp.ports] == ["A_source_E", "B_source_W", "AB_gate_N", "A"]
+	assert index.names_with_prefix("A_") == ["A_source_E"]
+	assert "drain" not in index.tree["A"]
+	assert index.names_with_prefix("A") == ["A_source_E", "AB_gate_N", "A"]
+
+
+def test_attached_index_is_rebuilt_when_names_change():
+	comp = component()
+	first = port_index(comp)
+	assert port_index(comp) is first
+	comp.add_port(name="D_new", center=(9, 0), width=1, orientation=0, layer=(1, 0))
+	second = port_index(comp)
+	assert second is not first and second.names_with_prefix("D") == ["D_new"]
+
+
+def test_helpers_on_locked_components_do_not_modify_them():
+	comp = component()
+	comp.lock()
+	removed = remove_ports_with_prefix(comp, "A_")
+	renamed = rename_ports_by_list(comp, [("source", "src")])
+	assert [port.name for port in comp.ports] == NAMES
+	assert [port.name for port in removed.ports] == ["B_source_W", "AB_gate_N", "A"]
+	# names containing a keyword are replaced, duplicates numbered, the repeated port name dropped
+	assert [port.name for port in renamed.ports] == ["src", "src1", "A_drain_W", "src2", "AB_gate_N", "A"]
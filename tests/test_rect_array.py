@@ -0,0 +1,79 @@
+"""
+RectArray rectangle kernel: vectorized transformations against one rectangle at a time, and the Component round trip
+"""
+from gdsfactory.component import Component
+import klayout.db as kdb
+import numpy as np
+import pytest
+
+from glayout.util.rect_array import RectArray
+
+
+MET1, MET2 = (68, 20), (69, 20)
+
+
+def sample() -> RectArray:
+	rects = RectArray()
+	rects.add(MET1, [(0, 0, 100, 50), (-20, 10, 30, 200)])
+	rects.add_rectangle(MET2, (0.17, 0.17), center=(0.5, -0.25))
+	return rects
+
+
+def rows(rects: RectArray) -> dict[int, list[tuple]]:
+	return {index: sorted(map(tuple, boxes.tolist())) for index, boxes in rects.rects.items()}
+
+
+def test_add_rectangle_is_centered_in_dbu():
+	rects = sample()
+	assert len(rects) == 3
+	assert rects.bbox([MET2]) == (415, -335, 585, -165)
+	assert rects.size([MET2]) == (0.17, 0.17)
+	assert rects.bbox() == (-20, -335, 585, 200)
+	assert RectArray().bbox() is None and RectArray().size() == (0.0, 0.0)
+
+
+def test_transformations_return_new_arrays():
+	rects = sample()
+	before = rows(rects)
+	moved = rects.translate(7, -3)
+	assert rows(rects) == before
+	assert moved.bbox() == (-13, -338, 592, 197)
+	mirrored = rects.mirror("y")
+	assert mirrored.bbox() == (-585, -335, 20, 200)
+	# rows stay ordered (min <= max) after mirroring
+	for boxes in mirrored.mirror("x").rects.values():
+		assert np.all(boxes[:, :2] <= boxes[:, 2:])
+	assert rows(mirrored.mirror("y")) == before
+	with pytest.raises(ValueError):
+		rects.mirror("z")
+
+
+def test_array_matches_translated_copies():
+	rects = sample()
+	arrayed = rects.array(3, 2, (1000, 700))
+	expected = RectArray.concatenate(rects.translate(col * 1000, row * 700) for col in range(3) for row in range(2))
+	assert rows(arrayed) == rows(expected)
+	assert len(arrayed) == 6 * len(rects)
+
+
+def test_concatenate_matches_extend():
+	first, second = sample(), sample().translate(50, 50)
+	extended = first.copy().extend(second)
+	assert rows(extended) == rows(RectArray.concatenate([first, second]))
+	assert len(first) == 3
+
+
+def test_component_round_trip():
+	rects = sample().array(2, 2, (2000, 2000))
+	comp = rects.commit(Component())
+	assert rows(RectArray.from_component(comp)) == rows(rects)
+
+
+def test_from_component_rejects_other_polygons():
+	comp = Component()
+	comp.add_polygon([(0, 0), (1, 0), (0, 1)], layer=MET1)
+	with pytest.raises(ValueError):
+		RectArray.from_component(comp)
+	comp = Component()
+	comp.shapes(comp.kcl.layer(*MET1)).insert(kdb.Box(0, 0, 10, 10))
+	assert RectArray.from_component(comp).bbox() == (0, 0, 10, 10)
@@ -0,0 +1,66 @@
+"""
+ATLAS results journal: torn last line repair, last record wins, compaction
+"""
+import csv
+import json
+
+import pytest
+
+from glayout.blocks.ATLAS.results_journal import ResultsJournal
+
+
+def write_journal(path, records, tail=b""):
+	with open(path, "wb") as f:
+		for record in records:
+			f.write((json.dumps(record) + "\n").encode())
+		f.write(tail)
+
+
+@pytest.mark.parametrize("tail", [b'{"sample_id": 3, "succ', b"{", b'{"sample_id": 3, "blob": "' + b"x" * 200000])
+def test_torn_last_line_is_dropped(tmp_path, tail):
+	path = tmp_path / "results.jsonl"
+	write_journal(path, [{"sample_id": 1, "success": True}, {"sample_id": 2, "success": False}], tail)
+	with ResultsJournal(path, fsync=False) as journal:
+		assert journal.completed_ids() == {1, 2}
+		assert journal.completed_ids(include_failed=False) == {1}
+		journal.append({"sample_id": 3, "success": True})
+	assert path.read_bytes().endswith(b'{"sample_id": 3, "success": true}\n')
+	with ResultsJournal(path, fsync=False) as journal:
+		assert [record["sample_id"] for record in journal] == [1, 2, 3]
+
+
+@pytest.mark.parametrize("content", [b"", b'{"sample_id": 1', b"x" * 150000])
+def test_journal_without_a_complete_line_is_emptied(tmp_path, content):
+	path = tmp_path / "results.jsonl"
+	path.write_bytes(content)
+	with ResultsJournal(path, fsync=False) as journal:
+		assert len(journal) == 0
+	assert path.read_bytes() == b""
+
+
+def test_clean_journal_is_not_modified(tmp_path):
+	path = tmp_path / "nested" / "results.jsonl"
+	path.parent.mkdir()
+	write_journal(path, [{"sample_id": 1}])
+	before = path.read_bytes()
+	ResultsJournal(path).close()
+	assert path.read_bytes() == before
+
+
+def test_last_record_wins_and_compaction(tmp_path):
+	path = tmp_path / "results.jsonl"
+	with ResultsJournal(path) as journal:
+		journal.append({"sample_id": "a", "success": False, "error": "drc"})
+		journal.append({"sample_id": "b", "success": True, "metrics": {"area": 1.5}})
+		journal.append({"sample_id": "a", "success": True, "metrics": {"area": 2.0}})
+		with pytest.raises(ValueError):
+			journal.append({"success": True})
+		assert len(journal) == 2
+		assert journal.completed_ids(include_failed=False) == {"a", "b"}
+		journal.compact(json_path=tmp_path / "results.json", csv_path=tmp_path / "summary.csv")
+	records = json.loads((tmp_path / "results.json").read_text())
+	assert records == [{"sample_id": "b", "success": True, "metrics": {"area": 1.5}}, {"sample_id": "a", "success": True, "metrics": {"area": 2.0}}]
+	with open(tmp_path / "summary.csv", newline="") as f:
+		rows = list(csv.DictReader(f))
+	assert [row["sample_id"] for row in rows] == ["b", "a"]
+	assert json.loads(rows[1]["metrics"]) == {"area": 2.0}
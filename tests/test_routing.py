@@ -0,0 +1,163 @@
+"""
+geometry of the routers and of their existing callers (tapring corners), RoutePlan against the routers
+needs the sky130 mapped pdk, skipped unless PDK_ROOT is set
+"""
+import os
+
+from gdsfactory.component import Component
+from gdsfactory.port import Port
+import klayout.db as kdb
+import pytest
+
+pytestmark = pytest.mark.skipif("PDK_ROOT" not in os.environ, reason="the sky130 mapped pdk needs PDK_ROOT")
+
+
+@pytest.fixture(scope="module")
+def pdk():
+	from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+	sky130_mapped_pdk.activate()
+	return sky130_mapped_pdk
+
+
+def region(comp: Component, layer) -> kdb.Region:
+	return kdb.Region(comp.begin_shapes_rec(comp.kcl.layer(*layer))).merged()
+
+
+def geometry(comp: Component) -> dict[str, list[str]]:
+	merged = dict()
+	for index in comp.kcl.layer_indexes():
+		polygons = kdb.Region(comp.begin_shapes_rec(index)).merged()
+		if not polygons.is_empty():
+			merged[str(comp.kcl.get_info(index))] = sorted(str(polygon) for polygon in polygons.each())
+	return merged
+
+
+def pads(pdk, top: Component, offsets: list[tuple[float, float]]):
+	from glayout.primitives.via_gen import via_array
+	pad = via_array(pdk, "met1", "met2", size=(2, 2))
+	return [(top << pad).movex(x).movey(y) for x, y in offsets]
+
+
+def test_L_route_via_at_the_corner(pdk):
+	from glayout.routing.L_route import L_route
+	top = Component()
+	pad1, pad2 = pads(pdk, top, [(0, 0), (10, 8)])
+	edge1, edge2 = pad1.ports["top_met_E"], pad2.ports["top_met_S"]
+	route = L_route(pdk, edge1, edge2, hglayer="met2", vglayer="met3")
+	via = region(route, pdk.get_glayer("via2")).bbox().to_dtype(route.kcl.dbu)
+	assert via.center().x == pytest.approx(edge2.center[0])
+	assert via.center().y == pytest.approx(edge1.center[1])
+	# nothing is left at the origin of the route cell
+	assert all(region(route, pdk.get_glayer(glayer)).interacting(kdb.Region(kdb.Box(-10, -10, 10, 10))).is_empty() for glayer in ("met2", "met3"))
+
+
+def test_tapring_has_no_stray_via_in_the_ring(pdk):
+	from glayout.primitives.guardring import tapring
+	ring = tapring(pdk, enclosed_rectangle=(5, 4))
+	center = kdb.Region(kdb.Box(-500, -500, 500, 500))
+	for glayer in ("via1", "met1", "met2"):
+		assert region(ring, pdk.get_glayer(glayer)).interacting(center).is_empty()
+	# every corner of the ring has the via of its L_route
+	vias = region(ring, pdk.get_glayer("via1"))
+	box = vias.bbox()
+	for x, y in ((box.left, box.bottom), (box.left, box.top), (box.right, box.bottom), (box.right, box.top)):
+		assert not vias.interacting(kdb.Region(kdb.Box(x - 1, y - 1, x + 1, y + 1))).is_empty()
+
+
+@pytest.mark.parametrize("side", ["N", "E", "S", "W"])
+def test_c_route_connects_both_edges(pdk, side):
+	from glayout.routing.c_route import c_route
+	top = Component()
+	pad1, pad2 = pads(pdk, top, [(0, 0), (7, 6)])
+	route = c_route(pdk, pad1.ports["top_met_" + side], pad2.ports["top_met_" + side], cglayer="met3")
+	top << route
+	# one met3 connection, reached through a via from the met2 extension of each pad
+	connection = region(top, pdk.get_glayer("met3"))
+	vias = region(top, pdk.get_glayer("via2"))
+	assert connection.count() == 1
+	for pad in (pad1, pad2):
+		extension = region(top, pdk.get_glayer("met2")).interacting(kdb.Region(pad.ibbox()))
+		assert not (extension & connection & vias).is_empty()
+	assert len([port for port in route.ports if port.name.startswith("con_")]) == 2
+
+
+def test_set_port_width_and_layer_keep_the_port(pdk):
+	from glayout.util.port_utils import set_port_layer, set_port_width
+	port = Port(name="gate_N", center=(1.005, 2), orientation=90, layer=pdk.get_glayer("met1"), width=0.5, port_type="electrical", info={"net": "g"})
+	for new in (set_port_width(port, 1.0), set_port_layer(port, pdk.get_glayer("met2"))):
+		assert (new.name, str(new.dcplx_trans), new.port_type, new.info.model_dump()) == (port.name, str(port.dcplx_trans), port.port_type, {"net": "g"})
+	assert (set_port_width(port, 1.0).width, set_port_width(port, 1.0).layer) == (1.0, port.layer)
+	assert (set_port_layer(port, pdk.get_glayer("met2")).width, set_port_layer(port, pdk.get_glayer("met2")).layer_info) == (0.5, Port(layer=pdk.get_glayer("met2"), width=0.5).layer_info)
+
+
+def port_signature(ports) -> list[tuple]:
+	return sorted((p.name, str(p.trans), p.width, str(p.layer)) for p in ports)
+
+
+def plan_and_route(pdk, offsets, routes):
+	"""routes (router, edges, kwargs) made by the routers on one top and by a RoutePlan on another
+	edges picks the edges from the pads and the ports of the routes made so far
+	"""
+	from glayout.routing.c_route import c_route
+	from glayout.routing.L_route import L_route
+	from glayout.routing.route_plan import RoutePlan
+	from glayout.routing.straight_route import straight_route
+	tops = [Component(), Component()]
+	placed = [pads(pdk, top, offsets) for top in tops]
+	routed, planned = list(), list()
+	plan = RoutePlan(pdk)
+	methods = {straight_route: plan.straight_route, L_route: plan.L_route, c_route: plan.c_route}
+	for router, edges, kwargs in routes:
+		routed.append({p.name: p for p in (tops[0] << router(pdk, *edges(placed[0], routed), **kwargs)).ports})
+		planned.append(methods[router](*edges(placed[1], planned), **kwargs))
+		assert port_signature(routed[-1].values()) == port_signature(planned[-1].values())
+	assert len(plan) == len(routes)
+	ref = plan.commit(tops[1])
+	# all routes are written into one flat cell
+	assert ref.cell.kdb_cell.child_instances() == 0
+	assert len(list(tops[1].insts)) == len(offsets) + 1
+	assert geometry(tops[0]) == geometry(tops[1])
+
+
+def test_route_plan_matches_the_routers(pdk):
+	from glayout.routing.c_route import c_route
+	from glayout.routing.L_route import L_route
+	from glayout.routing.straight_route import straight_route
+	plan_and_route(pdk, [(0, 0), (10, 0.2), (14, 9), (3, -7), (-9, 4)], [
+		(straight_route, lambda p, r: (p[0].ports["top_met_E"], p[1].ports["top_met_W"]), dict(glayer2="met3")),
+		(L_route, lambda p, r: (p[1].ports["top_met_E"], p[2].ports["top_met_S"]), dict(hglayer="met2", vglayer="met3")),
+		(c_route, lambda p, r: (p[0].ports["top_met_S"], p[3].ports["top_met_S"]), dict(extension=1)),
+		(c_route, lambda p, r: (p[4].ports["top_met_W"], p[0].ports["top_met_W"]), dict(viaoffset=None)),
+		(c_route, lambda p, r: (p[4].ports["top_met_N"], p[2].ports["top_met_N"]), dict(viaoffset=False, cglayer="met3")),
+		# routes from the ports of planned routes
+		(L_route, lambda p, r: (r[2]["con_E"], p[1].ports["top_met_S"]), dict(hglayer="met3", vglayer="met2")),
+	])
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_route_plan_matches_the_routers_on_random_routes(pdk, seed):
+	import random
+	from glayout.routing.c_route import c_route
+	from glayout.routing.L_route import L_route
+	from glayout.routing.straight_route import straight_route
+	rng = random.Random(seed)
+	offsets = [(rng.randint(-2000, 2000) / 100, rng.randint(-2000, 2000) / 100) for _ in range(12)]
+	routes = list()
+	for i in range(0, len(offsets), 2):
+		kind = rng.choice((straight_route, L_route, c_route))
+		if kind is straight_route:
+			# the second pad is moved in line with the first, right of it
+			offsets[i + 1] = (offsets[i][0] + rng.randint(300, 2000) / 100, offsets[i][1] + rng.randint(-50, 50) / 100)
+			kwargs = dict(glayer1=rng.choice(("met2", "met3")), glayer2=rng.choice(("met2", "met3")))
+			edges = lambda p, r, i=i: (p[i].ports["top_met_E"], p[i + 1].ports["top_met_W"])
+		elif kind is L_route:
+			offsets[i + 1] = (offsets[i][0] + rng.randint(500, 2000) / 100, offsets[i][1] + rng.choice((-1, 1)) * rng.randint(500, 2000) / 100)
+			side = "S" if offsets[i + 1][1] > offsets[i][1] else "N"
+			kwargs = dict(hglayer="met2", vglayer="met3", fullbottom=rng.choice((True, False)))
+			edges = lambda p, r, i=i, side=side: (p[i].ports["top_met_E"], p[i + 1].ports["top_met_" + side])
+		else:
+			side = rng.choice("NESW")
+			kwargs = dict(extension=rng.choice((0.5, 1, 2)), viaoffset=rng.choice(((True, True), (False, False), None)))
+			edges = lambda p, r, i=i, side=side: (p[i].ports["top_met_" + side], p[i + 1].ports["top_met_" + side])
+		routes.append((kind, edges, kwargs))
+	plan_and_route(pdk, offsets, routes)
@@ -0,0 +1,79 @@
+"""
+MappedPDK.snap_to_2xgrid_fast (integer grid, NumPy) against snap_to_2xgrid (Decimal) for sky130, gf180 and ihp130
+the pdks need PDK_ROOT, skipped unless it is set
+"""
+import os
+
+import numpy as np
+import pytest
+
+pytestmark = pytest.mark.skipif("PDK_ROOT" not in os.environ, reason="the mapped pdks need PDK_ROOT")
+
+
+@pytest.fixture(scope="module", params=["sky130", "gf180", "ihp130"])
+def pdk(request):
+	if request.param == "sky130":
+		from glayout.pdk.sky130_mapped import sky130_mapped_pdk
+		return sky130_mapped_pdk
+	if request.param == "gf180":
+		from glayout.pdk.gf180_mapped import gf180_mapped_pdk
+		return gf180_mapped_pdk
+	from glayout.pdk.ihp130_mapped import ihp130_mapped_pdk
+	return ihp130_mapped_pdk
+
+
+def sample_coordinates(pdk, count: int, rng: np.random.Generator) -> np.ndarray:
+	"""mix of coordinates which are likely to expose rounding differences"""
+	grid = 2 * (pdk.grid_size or 0.0005)
+	on_grid = rng.integers(-10**6, 10**6, count) * grid
+	dims = np.concatenate([
+		rng.uniform(-1000, 1000, count),
+		np.round(rng.uniform(-1000, 1000, count), 3),
+		np.round(rng.uniform(-10, 10, count), 4),
+		on_grid,
+		np.nextafter(on_grid, np.inf),
+		np.nextafter(on_grid, -np.inf),
+		np.array([0.0, -0.0, 1e-12, -1e-12, grid, -grid]),
+	])
+	return dims
+
+
+def check_equivalence(pdk, dims: np.ndarray, snap4: bool) -> None:
+	"""raises AssertionError on the first coordinate where the implementations differ (bit for bit)"""
+	reference = pdk.snap_to_2xgrid(dims.tolist(), return_type="float", snap4=snap4)
+	vectorized = pdk.snap_to_2xgrid_fast(dims, snap4=snap4)
+	listed = pdk.snap_to_2xgrid_fast(dims.tolist(), snap4=snap4)
+	for dim, ref, fast, from_list in zip(dims.tolist(), reference, vectorized.tolist(), listed):
+		scalar = pdk.snap_to_2xgrid_fast(dim, snap4=snap4)
+		if not (ref.hex() == fast.hex() == from_list.hex() == scalar.hex()):
+			raise AssertionError(f"{pdk.name} snap4={snap4}: {dim!r} -> decimal {ref!r}, array {fast!r}, list {from_list!r}, scalar {scalar!r}")
+
+
+@pytest.mark.parametrize("snap4", [False, True])
+@pytest.mark.parametrize("seed", range(3))
+def test_fast_matches_decimal_on_random_coordinates(pdk, snap4, seed):
+	check_equivalence(pdk, sample_coordinates(pdk, 2000, np.random.default_rng(seed)), snap4)
+
+
+@pytest.mark.parametrize("snap4", [False, True])
+def test_grid_multiples_and_negative_values(pdk, snap4):
+	grid = 2 * pdk.grid_size * (2 if snap4 else 1)
+	# the floats closest to the multiples of the grid
+	multiples = np.round(np.arange(-50, 51) * grid, 6)
+	check_equivalence(pdk, multiples, snap4)
+	# which do not move
+	assert pdk.snap_to_2xgrid_fast(multiples, snap4=snap4).tolist() == multiples.tolist()
+	# off grid values round away from zero
+	assert pdk.snap_to_2xgrid_fast(-0.3 * grid, snap4=snap4) == pdk.snap_to_2xgrid(-0.3 * grid, snap4=snap4) == -grid
+
+
+@pytest.mark.parametrize("snap4", [False, True])
+def test_return_types(pdk, snap4):
+	assert isinstance(pdk.snap_to_2xgrid_fast(1.2345, snap4=snap4), float)
+	assert isinstance(pdk.snap_to_2xgrid_fast(3, snap4=snap4), float)
+	assert pdk.snap_to_2xgrid_fast([1.2345, -0.0071], snap4=snap4) == pdk.snap_to_2xgrid([1.2345, -0.0071], snap4=snap4)
+	assert pdk.snap_to_2xgrid_fast((0.5,), snap4=snap4) == [pdk.snap_to_2xgrid(0.5, snap4=snap4)]
+	matrix = np.array([[0.0013, -7.2219], [4.1, -0.0005]])
+	snapped = pdk.snap_to_2xgrid_fast(matrix, snap4=snap4)
+	assert snapped.shape == matrix.shape
+	assert snapped.ravel().tolist() == pdk.snap_to_2xgrid(matrix.ravel().tolist(), snap4=snap4)
@@ -0,0 +1,81 @@
+"""
+which child instances snap_instances flattens (_flatten_instance), the hierarchy mode of hierarchy_kept
+"""
+from gdsfactory.component import Component
+import klayout.db as kdb
+
+from glayout.util.snap_to_grid import _flatten_instance, hierarchy_kept, keep_hierarchy, snap_instances
+
+
+def cell(name: str, shapes: int = 2) -> Component:
+	comp = Component(name=name)
+	for i in range(shapes):
+		comp.add_polygon([(i, 0), (i + 0.5, 0), (i + 0.5, 1), (i, 1)], layer=(1, 0))
+	return comp
+
+
+def flattened(top: Component) -> dict[str, bool]:
+	"""_flatten_instance of every instance of top, by cell name"""
+	instances = list(top.kdb_cell.each_inst())
+	placements = dict()
+	for inst in instances:
+		placements[inst.cell_index] = placements.get(inst.cell_index, 0) + inst.size()
+	return {inst.cell.name: _flatten_instance(inst, placements) for inst in instances}
+
+
+def test_repeated_cells_are_kept_the_others_flattened():
+	top = Component()
+	repeated, once, single = cell("snap_repeated"), cell("snap_once"), cell("snap_single", shapes=1)
+	for x in (0, 5, 10):
+		(top << repeated).dmovex(x)
+	(top << once).dmovey(5)
+	(top << single).dmovey(10)
+	(top << single).dmovey(15)
+	assert flattened(top) == {"snap_repeated": False, "snap_once": True, "snap_single": True}
+
+
+def test_cells_placed_by_other_parents_are_not_placed_once():
+	top, other = Component(), Component()
+	shared = cell("snap_shared")
+	other << shared
+	top << shared
+	assert flattened(top) == {"snap_shared": False}
+
+
+def test_complex_transformations_are_flattened():
+	top = Component()
+	repeated = cell("snap_complex")
+	top << repeated
+	rotated = top << repeated
+	rotated.drotate(45)
+	instances = list(top.kdb_cell.each_inst())
+	placements = {repeated.kdb_cell.cell_index(): 2}
+	assert [_flatten_instance(inst, placements) for inst in instances] == [False, True]
+
+
+def test_snap_instances_keeps_the_geometry():
+	top = Component()
+	repeated, once = cell("snap_kept"), cell("snap_flattened")
+	for x in (0, 5):
+		(top << repeated).dmovex(x)
+	(top << once).dmovey(5)
+	top.add_polygon([(0, -2), (1, -2), (1, -1), (0, -1)], layer=(1, 0))
+	top.add_polygon([(1, -2), (2, -2), (2, -1), (1, -1)], layer=(1, 0))
+	before = kdb.Region(top.begin_shapes_rec(top.kcl.layer(1, 0))).merged()
+	snap_instances(top)
+	assert [inst.cell.name for inst in top.kdb_cell.each_inst()] == ["snap_kept", "snap_kept"]
+	assert top.shapes(top.kcl.layer(1, 0)).size() == 3
+	assert (kdb.Region(top.begin_shapes_rec(top.kcl.layer(1, 0))) ^ before).is_empty()
+
+
+def test_hierarchy_kept_reads_the_environment_on_every_call(monkeypatch):
+	monkeypatch.delenv("GLAYOUT_KEEP_HIERARCHY", raising=False)
+	assert not hierarchy_kept()
+	monkeypatch.setenv("GLAYOUT_KEEP_HIERARCHY", "1")
+	assert hierarchy_kept()
+	with keep_hierarchy(False):
+		assert not hierarchy_kept()
+	monkeypatch.setenv("GLAYOUT_KEEP_HIERARCHY", "0")
+	assert not hierarchy_kept()
+	with keep_hierarchy():
+		assert hierarchy_kept()
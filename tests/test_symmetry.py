@@ -0,0 +1,45 @@
+"""
+raster symmetry scores (glayout.blocks.evaluator_box.symmetry) on hand made polygons
+"""
+import numpy as np
+import pytest
+
+from glayout.blocks.evaluator_box.symmetry import layer_asymmetry, rasterize_layer
+
+
+def rect(x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+	return np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]])
+
+
+def test_exact_areas_of_manhattan_layer():
+	# 2x1 um centered rectangle plus a 1x1 um square only on the right
+	report = layer_asymmetry([rect(-1000, -500, 1000, 500), rect(2000, 0, 3000, 1000)])
+	assert report["area"] == pytest.approx(3.0)
+	assert report["asymmetry_x"] == pytest.approx(2.0)
+	assert report["asymmetry_y"] == pytest.approx(2.0)
+
+
+def test_overlapping_and_clockwise_polygons_do_not_cancel():
+	report = layer_asymmetry([rect(-1000, -1000, 1000, 1000), rect(-1000, -1000, 1000, 1000)[::-1]])
+	assert report == pytest.approx({"area": 4.0, "asymmetry_x": 0.0, "asymmetry_y": 0.0})
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_bands_match_the_full_raster(seed):
+	rng = np.random.default_rng(seed)
+	polygons = list()
+	for _ in range(12):
+		x0, x1 = np.sort(rng.choice(np.arange(-5000, 5000), 2, replace=False))
+		y0, y1 = np.sort(rng.choice(np.arange(-5000, 5000), 2, replace=False))
+		polygons.append(rect(x0, y0, x1, y1))
+	polygons.append(np.array([[0, 0], [2000, 500], [600, 3000]]))
+	xs, ys, covered = rasterize_layer(polygons)
+	cell_area = np.outer(np.diff(ys), np.diff(xs)) / 1000**2
+	expected = {
+		"area": (cell_area * covered).sum(),
+		"asymmetry_x": (cell_area * (covered ^ covered[:, ::-1])).sum(),
+		"asymmetry_y": (cell_area * (covered ^ covered[::-1, :])).sum(),
+	}
+	# one band holding the whole grid, and bands of a single row
+	for max_cells in (covered.size, 1):
+		assert layer_asymmetry(polygons, max_cells=max_cells) == pytest.approx(expected)